@@ -40,7 +40,7 @@ if not exist "venv_windows" (
     if %errorlevel% neq 0 (
         echo [INFO] Installiere fehlende Module...
         pip install --upgrade pip
-        pip install pyarrow pandas numpy dash plotly dash-bootstrap-components openpyxl xlrd lz4 psutil
+        pip install pyarrow pandas numpy dash plotly dash-bootstrap-components openpyxl xlrd lz4 psutil diskcache multiprocess duckdb
     )
 )
 
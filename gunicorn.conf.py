@@ -0,0 +1,60 @@
+"""
+gunicorn-Konfiguration für den Produktionsmodus
+===============================================
+Start (Linux, aus dem Projektverzeichnis):
+    gunicorn -c gunicorn.conf.py "server_app:create_app()"
+
+preload_app lädt alle Datasets einmal im Master; die Worker werden danach
+geforkt und teilen die Daten copy-on-write. Worker werden nach
+max_requests (mit Jitter) recycelt, damit Fragmentierung und
+Cache-Wachstum nicht unbegrenzt anwachsen.
+
+Umgebungsvariablen:
+    MOKIG_BIND      Adresse (Default 0.0.0.0:8050)
+    MOKIG_WORKERS   Anzahl Worker (Default 4)
+    MOKIG_THREADS   Threads pro Worker (Default 4)
+"""
+
+import os
+from pathlib import Path
+
+
+chdir = str(Path(__file__).parent / "src")
+
+bind = os.environ.get('MOKIG_BIND', '0.0.0.0:8050')
+workers = int(os.environ.get('MOKIG_WORKERS', '4'))
+worker_class = 'gthread'
+threads = int(os.environ.get('MOKIG_THREADS', '4'))
+
+# Daten einmal im Master laden, Worker teilen sie copy-on-write
+preload_app = True
+
+# Worker-Recycling
+max_requests = 1000
+max_requests_jitter = 100
+
+# Schwere Pfade laufen als Background-Callbacks, Requests bleiben kurz
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = '-'
+errorlog = '-'
+
+
+def when_ready(server):
+    server.log.info("MokiG Dashboard bereit (Master-PID %s, %s Worker)", os.getpid(), workers)
+
+
+def post_fork(server, worker):
+    server.log.info("Worker gestartet (PID %s)", worker.pid)
+    if not server.cfg.preload_app:
+        # Ohne preload setzt create_app() im Worker die Readiness selbst
+        return
+    import server_app
+
+    # Readiness des Masters gilt nicht für den Worker: eigene Prüfung nach dem Fork
+    if server_app.mark_ready():
+        server.log.info("Worker %s bereit", worker.pid)
+    else:
+        server.log.warning("Worker %s nicht bereit (/ready liefert 503)", worker.pid)
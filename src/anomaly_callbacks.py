@@ -0,0 +1,37 @@
+"""
+Anomaly Callbacks
+=================
+Zeigt zum ausgewählten Ereignis des Anomalie-Scans (anomaly_engine) den
+Kanalverlauf im betroffenen Zeitfenster.
+"""
+
+from dash import Input, Output, State, dcc, html
+from dash.exceptions import PreventUpdate
+
+from instrumentation import section
+
+
+def register_anomaly_callbacks(app, ALL_DATA):
+    """Registriert die Callbacks des Anomalie-Scans"""
+
+    @app.callback(
+        Output("anomaly-window-chart", "children"),
+        [Input("anomaly-event-table", "selected_rows")],
+        [State("anomaly-event-table", "data"),
+         State("anomaly-context", "data")],
+        prevent_initial_call=True
+    )
+    def show_event_window(selected_rows, events, context):
+        """Zeichnet das Zeitfenster des ausgewählten Ereignisses"""
+        if not selected_rows or not events or not context:
+            raise PreventUpdate
+        event = events[selected_rows[0]]
+        df = ALL_DATA.get(context['source'], {}).get(context['dataset'])
+        if df is None or event['Kanal'] not in df.columns:
+            return html.Div("Dataset nicht mehr geladen", className="text-muted")
+        from payload_encoder import encode_figure
+        from ui_components_improved import create_anomaly_window_chart
+
+        with section('figure'):
+            fig = create_anomaly_window_chart(df, event)
+        return dcc.Graph(figure=encode_figure(fig), config={'displayModeBar': True, 'displaylogo': False})
@@ -0,0 +1,323 @@
+"""
+Anomalie-Scan
+=============
+Sucht Sensorfehler über alle Kanäle eines Datasets gleichzeitig. Die
+Kanäle werden blockweise als 2D-float32-Array (Zeilen x Kanäle, zeitlich
+sortiert über die Zeitachse) geprüft, jeder Detektor ist eine
+Array-Operation über den ganzen Block:
+
+- Ausreißer:  robuster z-Wert |x - Median| / (1,4826 x MAD) über ein
+              gleitendes, zentriertes Fenster (ROBUST_WINDOW); Untergrenze
+              der Streuung je Kanal aus P5-P95-Spanne und Auflösung der
+              Werte, Kanäle ohne Streuung entfallen
+- Hänger:     unveränderter Wert über mindestens STUCK_MIN_DURATION
+              (Kanäle mit überwiegend konstanten Werten wie Status- oder
+              Sollwertkanäle werden ausgelassen; Hänger auf 0 zählen nur bei
+              Kanälen, die nicht überwiegend 0 sind)
+- Sprung:     Änderung pro Messintervall, robust skaliert pro Kanal
+              (ohne Zählerstände, kpi_engine.counter_columns)
+
+Kanäle, die überwiegend 0 sind (Pumpen, Ventile, Leistung im Taktbetrieb),
+werden bei Ausreißern und Sprüngen ausgelassen: Ein/Aus ist ihr Normalbetrieb.
+- Bereich:    Werte außerhalb des plausiblen Bereichs der Einheit (z.B. °C)
+
+Zusammenhängende markierte Messpunkte werden zu Ereignissen (Kanal, Typ,
+Beginn, Ende, Bewertung) zusammengefasst. Ergebnisse werden pro
+Dataset-Version gecacht.
+
+Beispiel:
+    report = anomaly_report(df)
+    report.events             # DataFrame, ein Ereignis pro Zeile
+    report.channel_summary()  # Anzahl Ereignisse pro Kanal und Typ
+"""
+
+import re
+import threading
+import time
+import warnings
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from completeness_engine import measurement_channels, run_lengths
+from dataset_version import dataset_version
+from kpi_engine import classify_channel, counter_columns
+from time_axis import get_time_axis
+
+
+ROBUST_WINDOW = pd.Timedelta(days=1)
+ROBUST_Z_THRESHOLD = 6.0
+STUCK_MIN_DURATION = pd.Timedelta(hours=6)
+STUCK_MAX_SHARE = 0.5       # Kanäle mit > 50% konstanten Schritten überspringen
+RATE_Z_THRESHOLD = 12.0
+# Untergrenze der Streuung als Anteil der Kanalstreuung ((P95 - P5) / 3,29)
+OUTLIER_SCALE_FLOOR = 1.0
+RATE_SCALE_FLOOR = 0.5
+CHANNEL_BLOCK = 32          # Kanäle pro 2D-Block (begrenzt den Speicherbedarf)
+
+# Plausible Wertebereiche nach Einheit im Kanalnamen
+RANGE_LIMITS = {
+    '°C': (-40.0, 150.0),
+    '%': (0.0, 100.0)
+}
+
+EVENT_TYPES = {
+    'outlier': 'Ausreißer',
+    'stuck': 'Hänger',
+    'rate': 'Sprung',
+    'range': 'Bereich'
+}
+EVENT_COLUMNS = ['Kanal', 'Typ', 'Beginn', 'Ende', 'Dauer (h)', 'Messpunkte', 'Bewertung']
+
+_MAD_SCALE = 1.4826
+_UNIT_PATTERN = re.compile(r'\(([^)]+)\)\s*$')
+
+_REPORT_CACHE_MAX = 16
+_REPORT_CACHE = OrderedDict()
+_REPORT_LOCK = threading.Lock()
+
+
+def channel_unit(column):
+    """Einheit aus dem Kanalnamen ('Temperatur Vorlauf (°C)' -> '°C')"""
+    match = _UNIT_PATTERN.search(str(column))
+    return match.group(1).strip() if match else None
+
+
+def _nanmedian(values, axis):
+    with warnings.catch_warnings():
+        # Komplett leere Fenster/Kanäle liefern NaN
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return np.nanmedian(values, axis=axis)
+
+
+def _zero_share(block):
+    valid = ~np.isnan(block)
+    return ((block == 0) & valid).sum(axis=0) / np.maximum(valid.sum(axis=0), 1)
+
+
+def _channel_scale(block):
+    """
+    Robuste Streuung je Kanal ((P95 - P5) / 3,29, bei Normalverteilung die
+    Standardabweichung) und Auflösung (kleinster Werteabstand). Die Spanne
+    statt des IQR, weil viele Kanäle meist auf einem Wert stehen und nur
+    zeitweise (Takt, Heizbetrieb) abweichen.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        low, high = np.nanpercentile(block, [5, 95], axis=0)
+    resolution = np.zeros(block.shape[1], dtype=np.float32)
+    for i in range(block.shape[1]):
+        values = np.unique(block[:, i][~np.isnan(block[:, i])])
+        if len(values) > 1:
+            resolution[i] = np.diff(values).min()
+    return np.nan_to_num((high - low) / 3.29), resolution
+
+
+def _rolling_median(values, window):
+    frame = pd.DataFrame(values)
+    return frame.rolling(window, center=True, min_periods=max(window // 4, 3)).median().to_numpy(np.float32)
+
+
+def _robust_z(block, window, channel_scale, resolution):
+    """|x - Median| / (1,4826 x MAD) über ein gleitendes, zentriertes Fenster von window Zeilen"""
+    median = _rolling_median(block, window)
+    deviation = np.abs(block - median)
+    scale = _MAD_SCALE * _rolling_median(deviation, window)
+    floor = np.maximum(channel_scale * OUTLIER_SCALE_FLOOR, resolution)
+    scale = np.maximum(np.nan_to_num(scale), floor)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z = np.nan_to_num(deviation / scale)
+    # Kanäle ohne Streuung (überwiegend ein Wert): kein Maßstab für Ausreißer
+    z[:, channel_scale <= 0] = 0
+    return z
+
+
+def _stuck_mask(block, min_samples):
+    """Markiert Folgen unveränderter Werte mit mindestens min_samples Messpunkten"""
+    steps = np.diff(block, axis=0)
+    same = (steps == 0) & ~np.isnan(steps)
+    # Überwiegend 0 (z.B. Pumpe aus): Stillstand auf 0 ist der Normalzustand
+    same &= ~((block[1:] == 0) & (_zero_share(block) > STUCK_MAX_SHARE))
+    # Status-/Sollwertkanäle: überwiegend konstante Schritte sind normal
+    share = same.sum(axis=0) / np.maximum((~np.isnan(steps)).sum(axis=0), 1)
+    same[:, share > STUCK_MAX_SHARE] = False
+
+    mask = np.zeros(block.shape, dtype=bool)
+    cols, starts, lengths = run_lengths(same)
+    # n gleiche Schritte = n + 1 gleiche Werte
+    long_runs = lengths + 1 >= min_samples
+    for col, start, length in zip(cols[long_runs], starts[long_runs], lengths[long_runs]):
+        mask[start:start + length + 1, col] = True
+    return mask
+
+
+def _rate_z(block, steps_per_row, channel_scale, resolution, skip):
+    """Änderung pro Messintervall, skaliert mit der robusten Streuung der Änderungen"""
+    rate = np.abs(np.diff(block, axis=0)) / steps_per_row[:, None]
+    scale = _MAD_SCALE * _nanmedian(np.abs(rate - _nanmedian(rate, axis=0)), axis=0)
+    # Quantisierte Kanäle ändern sich selten (MAD = 0): typische Änderung, wenn
+    # sich der Wert ändert, Anteil der Kanalstreuung bzw. Auflösung als Untergrenze
+    typical = _nanmedian(np.where(rate > 0, rate, np.nan), axis=0)
+    floor = np.maximum(np.maximum(np.nan_to_num(typical), channel_scale * RATE_SCALE_FLOOR), resolution)
+    scale = np.maximum(np.nan_to_num(scale), floor)
+    z = np.zeros(block.shape, dtype=np.float32)
+    # Der Sprung wird dem Messpunkt nach der Änderung zugeordnet
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z[1:] = np.nan_to_num(rate / scale)
+    # Zählerstände (jeder Schritt ist Verbrauch) und Taktbetrieb auslassen
+    z[:, skip | (scale <= 0)] = 0
+    return z
+
+
+def _range_excess(block, channels):
+    """Abstand zum plausiblen Bereich (0 innerhalb bzw. für Kanäle ohne Grenzen)"""
+    excess = np.zeros(block.shape, dtype=np.float32)
+    for i, channel in enumerate(channels):
+        limits = RANGE_LIMITS.get(channel_unit(channel))
+        if limits is None:
+            continue
+        low, high = limits
+        excess[:, i] = np.maximum(low - block[:, i], 0) + np.maximum(block[:, i] - high, 0)
+    return np.nan_to_num(excess)
+
+
+def _run_max(scores, cols, starts, lengths):
+    """Maximum der Bewertung je Lauf (ein reduceat über alle Kanäle)"""
+    n_rows = scores.shape[0]
+    flat = np.append(np.nan_to_num(scores.T).ravel(), 0)
+    bounds = np.empty(2 * len(starts), dtype=np.int64)
+    bounds[0::2] = cols * n_rows + starts
+    bounds[1::2] = cols * n_rows + starts + lengths
+    return np.maximum.reduceat(flat, bounds)[0::2]
+
+
+class AnomalyReport:
+    """Ereignisse des Anomalie-Scans eines Datasets"""
+
+    def __init__(self, version, time_column, interval_ns, channels, events, n_rows, elapsed_ms):
+        self.version = version
+        self.time_column = time_column
+        self.interval_ns = interval_ns
+        self.channels = channels
+        self.events = events            # DataFrame (EVENT_COLUMNS), zeitlich sortiert
+        self.n_rows = n_rows
+        self.elapsed_ms = elapsed_ms
+
+    def counts(self):
+        """Anzahl Ereignisse pro Typ"""
+        return self.events['Typ'].value_counts().reindex(list(EVENT_TYPES.values()), fill_value=0)
+
+    def channel_summary(self):
+        """Eine Zeile pro betroffenem Kanal, Spalten je Ereignistyp"""
+        if self.events.empty:
+            return pd.DataFrame(columns=['Kanal'] + list(EVENT_TYPES.values()) + ['Gesamt'])
+        summary = pd.crosstab(self.events['Kanal'], self.events['Typ'])
+        summary = summary.reindex(columns=list(EVENT_TYPES.values()), fill_value=0)
+        summary['Gesamt'] = summary.sum(axis=1)
+        summary.columns.name = None
+        return summary.sort_values('Gesamt', ascending=False).reset_index()
+
+
+def scan_anomalies(df):
+    """Anomalie-Scan über alle Kanäle (ohne Cache); None ohne Zeitachse"""
+    t0 = time.perf_counter()
+    axis = get_time_axis(df)
+    if axis is None or len(axis) < 3:
+        return None
+    times = axis.values
+    diffs = np.diff(times)
+    positive = diffs[diffs > 0]
+    if not len(positive):
+        return None
+    interval = int(np.median(positive))
+
+    window = max(int(ROBUST_WINDOW.value // interval), 12)
+    stuck_samples = max(int(-(-STUCK_MIN_DURATION.value // interval)), 3)
+    steps_per_row = np.maximum(diffs / interval, 1.0).astype(np.float32)
+
+    channels = measurement_channels(df, axis.column)
+    found = []
+    for block_start in range(0, len(channels), CHANNEL_BLOCK):
+        names = channels[block_start:block_start + CHANNEL_BLOCK]
+        sub = df[names]
+        if not axis.is_identity:
+            sub = sub.iloc[axis.order]
+        block = sub.to_numpy(dtype=np.float32, na_value=np.nan)
+        channel_scale, resolution = _channel_scale(block)
+        energy = np.array([classify_channel(name)[0] == 'energy' for name in names])
+        counters = energy & counter_columns(block) if len(block) > 1 else np.zeros(len(names), dtype=bool)
+        # Überwiegend 0 (Pumpen, Ventile, Leistung im Taktbetrieb): Ein/Aus ist kein Ausreißer
+        intermittent = _zero_share(block) > STUCK_MAX_SHARE
+
+        detectors = {
+            'outlier': _robust_z(block, window, np.where(intermittent, 0, channel_scale), resolution),
+            'rate': _rate_z(block, steps_per_row, channel_scale, resolution, counters | intermittent),
+            'range': _range_excess(block, names)
+        }
+        masks = {
+            'outlier': detectors['outlier'] > ROBUST_Z_THRESHOLD,
+            'rate': detectors['rate'] > RATE_Z_THRESHOLD,
+            'range': detectors['range'] > 0,
+            'stuck': _stuck_mask(block, stuck_samples)
+        }
+        for kind, mask in masks.items():
+            cols, starts, lengths = run_lengths(mask)
+            if not len(starts):
+                continue
+            if kind == 'stuck':
+                score = (times[starts + lengths - 1] - times[starts] + interval) / 3.6e12
+            else:
+                score = _run_max(detectors[kind], cols, starts, lengths)
+            found.append(pd.DataFrame({
+                'Kanal': np.asarray(names, dtype=object)[cols],
+                'Typ': EVENT_TYPES[kind],
+                'start': starts,
+                'length': lengths,
+                'Bewertung': np.round(score.astype(np.float64), 2)
+            }))
+
+    if found:
+        events = pd.concat(found, ignore_index=True)
+        begin = times[events['start'].to_numpy()]
+        end = times[(events['start'] + events['length'] - 1).to_numpy()]
+        events['Beginn'] = pd.to_datetime(begin)
+        events['Ende'] = pd.to_datetime(end)
+        events['Dauer (h)'] = ((end - begin + interval) / 3.6e12).round(2)
+        events['Messpunkte'] = events['length']
+        events = events.sort_values(['Beginn', 'Kanal'], kind='stable')[EVENT_COLUMNS].reset_index(drop=True)
+    else:
+        events = pd.DataFrame({
+            'Kanal': pd.Series(dtype=object),
+            'Typ': pd.Series(dtype=object),
+            'Beginn': pd.Series(dtype='datetime64[ns]'),
+            'Ende': pd.Series(dtype='datetime64[ns]'),
+            'Dauer (h)': pd.Series(dtype=float),
+            'Messpunkte': pd.Series(dtype=int),
+            'Bewertung': pd.Series(dtype=float)
+        })
+
+    return AnomalyReport(
+        version=None, time_column=axis.column, interval_ns=interval, channels=channels,
+        events=events, n_rows=len(axis), elapsed_ms=(time.perf_counter() - t0) * 1000
+    )
+
+
+def anomaly_report(df):
+    """Anomalie-Scan, gecacht pro Dataset-Version"""
+    if df is None or df.empty:
+        return None
+    version = dataset_version(df)
+    with _REPORT_LOCK:
+        if version in _REPORT_CACHE:
+            _REPORT_CACHE.move_to_end(version)
+            return _REPORT_CACHE[version]
+
+    report = scan_anomalies(df)
+    if report is not None:
+        report.version = version
+    with _REPORT_LOCK:
+        _REPORT_CACHE[version] = report
+        if len(_REPORT_CACHE) > _REPORT_CACHE_MAX:
+            _REPORT_CACHE.popitem(last=False)
+    return report
@@ -0,0 +1,107 @@
+"""
+Hintergrund-Jobs für schwere Callbacks
+======================================
+Schwere Pfade (z.B. das Laden eines mehrjährigen KW-Datasets) laufen als
+Dash-Background-Callbacks in eigenen Prozessen, verwaltet über einen
+lokalen, festplattenbasierten Job-Manager (DiskcacheManager). Der
+Request-Thread wird sofort wieder frei, andere Nutzer bleiben schnell.
+
+- Fortschritt: Stufe und gelesene Zeilen über set_progress (gedrosselt)
+- Abbruch: ein neuer Klick ersetzt den laufenden Job (Dash beendet den
+  alten Prozess), zusätzlich über cancel-Inputs
+- Begrenzung: höchstens MAX_CONCURRENT_JOBS Jobs gleichzeitig; weitere
+  warten auf einen freien Slot. Slots abgebrochener (beendeter) Prozesse
+  werden beim nächsten Versuch automatisch freigegeben.
+
+Benötigt: pip install "dash[diskcache]" (diskcache, multiprocess, psutil)
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import diskcache
+import psutil
+from dash import DiskcacheManager
+
+
+MAX_CONCURRENT_JOBS = int(os.environ.get('MOKIG_MAX_BACKGROUND_JOBS', '2'))
+JOB_RESULT_EXPIRE = 3600  # Sekunden
+PROGRESS_POLL_INTERVAL = 250  # ms, Abfrageintervall des Browsers
+SLOT_POLL_SECONDS = 0.2
+
+_SLOTS_KEY = 'mokig-job-slots'
+
+
+def create_background_manager(base_path):
+    """Erstellt den Job-Manager mit Cache-Verzeichnis unter <base>/cache/background_jobs"""
+    cache_dir = Path(base_path) / "cache" / "background_jobs"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return DiskcacheManager(diskcache.Cache(str(cache_dir)), expire=JOB_RESULT_EXPIRE)
+
+
+def _try_acquire_slot(cache, pid, max_jobs):
+    """Belegt einen Slot; Einträge nicht mehr laufender Prozesse werden entfernt"""
+    with cache.transact():
+        slots = {slot_pid: started for slot_pid, started in cache.get(_SLOTS_KEY, {}).items()
+                 if psutil.pid_exists(slot_pid)}
+        acquired = pid in slots or len(slots) < max_jobs
+        if acquired:
+            slots[pid] = time.time()
+        cache.set(_SLOTS_KEY, slots)
+        return acquired, len(slots)
+
+
+def _release_slot(cache, pid):
+    with cache.transact():
+        slots = cache.get(_SLOTS_KEY, {})
+        slots.pop(pid, None)
+        cache.set(_SLOTS_KEY, slots)
+
+
+@contextmanager
+def job_slot(manager, on_wait=None, max_jobs=None):
+    """
+    Begrenzt die Anzahl gleichzeitig laufender Jobs.
+
+    Args:
+        manager: DiskcacheManager (dessen Cache hält die Slot-Tabelle)
+        on_wait: Optionaler Callback(belegte_slots), solange gewartet wird
+        max_jobs: Limit (Default: MAX_CONCURRENT_JOBS)
+    """
+    cache = manager.handle
+    pid = os.getpid()
+    max_jobs = max_jobs or MAX_CONCURRENT_JOBS
+    while True:
+        acquired, busy = _try_acquire_slot(cache, pid, max_jobs)
+        if acquired:
+            break
+        if on_wait:
+            on_wait(busy)
+        time.sleep(SLOT_POLL_SECONDS)
+    try:
+        yield
+    finally:
+        _release_slot(cache, pid)
+
+
+class ProgressReporter:
+    """
+    Gedrosselte Fortschrittsmeldungen für set_progress.
+
+    Meldet (Prozent, Balkenbeschriftung, Statustext) und schreibt nur, wenn
+    sich der Wert um mindestens min_step Prozentpunkte geändert hat.
+    """
+
+    def __init__(self, set_progress, min_step=2):
+        self.set_progress = set_progress
+        self.min_step = min_step
+        self._last = None
+
+    def report(self, percent, stage, detail="", force=False):
+        percent = int(max(0, min(100, percent)))
+        if not force and self._last is not None and percent - self._last < self.min_step:
+            return
+        self._last = percent
+        self.set_progress((percent, f"{percent}%", f"{stage} {detail}".strip()))
@@ -0,0 +1,253 @@
+"""
+Synthetische Benchmark-Daten für MokiG Dashboard
+================================================
+Erzeugt Daten in der Form der vier Quellen (Twin2Sim, Erentrudis, FIS, KW)
+inklusive der jeweiligen Dateiformate, damit Benchmarks ohne die
+vertraulichen Originaldaten (offline) laufen:
+
+- Twin2Sim:   CSV mit ';' und Dezimalkomma, Einheiten-/Leerzeile nach dem
+              Kopf, Zeitstempel "TT.MM.JJJJ HH:MM:SS,000", stündlich
+- Erentrudis: CSV mit ',' und Dezimalkomma in Anführungszeichen,
+              "Datum + Uhrzeit" im 5-Minuten-Raster
+- FIS:        wie Erentrudis, 111 Parameter
+- KW:         XLSX mit ZEIT_VON_UTC/ZEIT_BIS_UTC, WERT_ENERGIE,
+              WERT_LEISTUNG, EINHEIT im 15-Minuten-Raster
+
+Die Daten werden blockweise erzeugt und geschrieben (10k bis 100M Zeilen);
+Dateinamen entsprechen den Parquet-Präfixen der Dataset-Registry, sodass
+konvertierte Parquet-Dateien über den Dataset-Namen gefunden werden.
+
+Beispiel:
+    path = write_dataset('fis', Path('bench'), rows=100_000)
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+DEFAULT_CHUNK_ROWS = 250_000
+XLSX_MAX_ROWS = 1_048_575  # Excel-Limit abzüglich Kopfzeile
+START_TIME = pd.Timestamp('2024-01-01 00:00')
+
+SCHEMAS = {
+    'twin2sim': {
+        'time_column': 'Date',
+        'freq': '1h',
+        'channels': 8,
+        'format': 'csv',
+        'sep': ';',
+        'date_format': '%d.%m.%Y %H:%M:%S,000',
+        'file': 'T2S_IntPV',
+        'dataset': 'intpv'
+    },
+    'erentrudis': {
+        'time_column': 'Datum + Uhrzeit',
+        'freq': '5min',
+        'channels': 40,
+        'format': 'csv',
+        'sep': ',',
+        'date_format': '%d.%m.%Y %H:%M',
+        'file': 'Relevant-1_2024_export_2011_2024-01-01-00-00',
+        'dataset': 'gesamtdaten_2024'
+    },
+    'fis': {
+        'time_column': 'Datum + Uhrzeit',
+        'freq': '5min',
+        'channels': 111,
+        'format': 'csv',
+        'sep': ',',
+        'date_format': '%d.%m.%Y %H:%M',
+        'file': 'export_1551_2024-12-31-00-00',
+        'dataset': 'export_q1_2025'
+    },
+    'kw': {
+        'time_column': 'ZEIT_VON_UTC',
+        'freq': '15min',
+        'channels': 2,
+        'format': 'xlsx',
+        'file': 'KW DÜRNBACH_ERZEUGUNG_2020_2024',
+        'dataset': 'kw_duernbach_gesamt'
+    }
+}
+
+# Kanaltypen: (Name-Muster, Mittelwert, Tagesamplitude, Rauschen)
+_CHANNEL_KINDS = {
+    'twin2sim': [
+        ('Growatt_MIC_600TL_X_{d}.read_input_power', 150.0, 150.0, 20.0),
+        ('Growatt_MIC_600TL_X_{d}.read_output_power', 140.0, 140.0, 20.0),
+        ('Growatt_MIC_600TL_X_{d}.read_grid_frequency', 50.0, 0.0, 0.02),
+        ('Growatt_MIC_600TL_X_{d}.read_total_generate_energy', None, None, None),
+        ('Growatt_MIC_600TL_X_{d}.read_inverter_temperature', 35.0, 8.0, 1.0)
+    ],
+    'erentrudis': [
+        ('Temperatur Vorlauf Heizkreis {i} (°C)', 45.0, 5.0, 0.5),
+        ('Temperatur Rücklauf Heizkreis {i} (°C)', 35.0, 4.0, 0.5),
+        ('Durchfluss Zähler {i} (m³/h)', 2.5, 1.5, 0.3),
+        ('Leistung Wärmepumpe {i} (kW)', 20.0, 15.0, 2.0),
+        ('Energie Zähler {i} (kWh)', None, None, None)
+    ],
+    'fis': [
+        ('Temperatur Abluft WP Kanal F{i:03d} (°C)', 22.0, 4.0, 0.5),
+        ('Temperatur Abwasser WP Kanal F{i:03d} (°C)', 14.0, 3.0, 0.5),
+        ('Leistung Kanal F{i:03d} (kW)', 12.0, 10.0, 1.5)
+    ]
+}
+
+
+def channel_names(schema, channels=None):
+    """Kanalnamen eines Schemas (KW: feste Spalten)"""
+    if schema == 'kw':
+        return ['WERT_ENERGIE', 'WERT_LEISTUNG']
+    n = channels or SCHEMAS[schema]['channels']
+    kinds = _CHANNEL_KINDS[schema]
+    return [kinds[i % len(kinds)][0].format(i=i, d=i // len(kinds)) for i in range(n)]
+
+
+def _channel_values(kind, t_hours, rng, offset):
+    """Messwerte eines Kanals: Tagesgang + Rauschen, Zähler monoton steigend"""
+    _, mean, amplitude, noise = kind
+    n = len(t_hours)
+    if mean is None:
+        # Zählerstand: Startwert + kumulierte Inkremente
+        increments = np.abs(rng.normal(0.5, 0.2, n)).astype(np.float64)
+        return (offset + np.cumsum(increments)).astype(np.float32)
+    daily = np.sin(2 * np.pi * (t_hours % 24) / 24 - np.pi / 2)
+    values = mean + amplitude * daily + rng.normal(0, noise, n)
+    return values.astype(np.float32)
+
+
+def iter_frames(schema, rows, channels=None, chunk_rows=DEFAULT_CHUNK_ROWS, seed=42,
+                missing_share=0.01):
+    """
+    Erzeugt die Daten blockweise als DataFrames (gemeinsame Zeitachse).
+
+    Args:
+        schema: 'twin2sim', 'erentrudis', 'fis' oder 'kw'
+        rows: Gesamtzahl Zeilen
+        channels: Anzahl Messkanäle (Default: wie in den Originaldaten)
+        chunk_rows: Zeilen pro Block
+        missing_share: Anteil fehlender Werte (NaN)
+    """
+    spec = SCHEMAS[schema]
+    rng = np.random.default_rng(seed)
+    step = pd.Timedelta(spec['freq'])
+    names = channel_names(schema, channels)
+    counters = {}
+
+    for start in range(0, rows, chunk_rows):
+        n = min(chunk_rows, rows - start)
+        times = START_TIME + step * np.arange(start, start + n)
+        t_hours = (np.arange(start, start + n) * step / pd.Timedelta('1h')).astype(np.float64)
+
+        if schema == 'kw':
+            power = np.clip(150 + 120 * np.sin(2 * np.pi * t_hours / (24 * 365)) +
+                            rng.normal(0, 25, n), 0, 292.61).astype(np.float32)
+            data = {
+                'ZEIT_VON_UTC': times,
+                'ZEIT_BIS_UTC': times + step,
+                'WERT_ENERGIE': (power * (step / pd.Timedelta('1h'))).astype(np.float32),
+                'WERT_LEISTUNG': power,
+                'EINHEIT': np.full(n, 'kWh', dtype=object)
+            }
+        else:
+            kinds = _CHANNEL_KINDS[schema]
+            data = {spec['time_column']: times}
+            for i, name in enumerate(names):
+                kind = kinds[i % len(kinds)]
+                values = _channel_values(kind, t_hours, rng, counters.get(name, 1000.0))
+                if kind[1] is None:
+                    counters[name] = float(values[-1])
+                elif missing_share:
+                    values[rng.random(n) < missing_share] = np.nan
+                data[name] = values
+        yield pd.DataFrame(data)
+
+
+def generate_frame(schema, rows, channels=None, seed=42):
+    """Erzeugt die Daten eines Schemas als einen DataFrame"""
+    return pd.concat(list(iter_frames(schema, rows, channels, seed=seed)), ignore_index=True)
+
+
+def _write_csv(schema, path, frames):
+    spec = SCHEMAS[schema]
+    sep = spec['sep']
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        for i, df in enumerate(frames):
+            if i == 0 and schema == 'twin2sim':
+                # Twin2Sim-Exporte: Kopf, Einheitenzeile, Leerzeile
+                f.write(sep.join(df.columns) + "\n")
+                f.write(sep + sep.join([": "] * (len(df.columns) - 1)) + "\n")
+                f.write(sep * (len(df.columns) - 1) + "\n")
+            df.to_csv(
+                f,
+                sep=sep,
+                decimal=',',
+                float_format='%.2f',
+                date_format=spec['date_format'],
+                index=False,
+                header=(i == 0 and schema != 'twin2sim')
+            )
+
+
+def _write_xlsx(path, frames):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    for i, df in enumerate(frames):
+        if i == 0:
+            sheet.append(list(df.columns))
+        for row in df.itertuples(index=False):
+            sheet.append([value.to_pydatetime() if isinstance(value, pd.Timestamp) else
+                          (None if value != value else value) for value in row])
+    workbook.save(path)
+
+
+def _write_parquet(path, frames):
+    writer = None
+    try:
+        for df in frames:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema, compression='snappy')
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def write_dataset(schema, directory, rows, fmt=None, channels=None, seed=42):
+    """
+    Schreibt ein synthetisches Dataset im Originalformat der Quelle.
+
+    Args:
+        schema: 'twin2sim', 'erentrudis', 'fis' oder 'kw'
+        directory: Zielverzeichnis
+        rows: Anzahl Zeilen
+        fmt: 'csv', 'xlsx' oder 'parquet' (Default: Format der Quelle)
+
+    Returns:
+        Path zur geschriebenen Datei
+    """
+    spec = SCHEMAS[schema]
+    fmt = fmt or spec['format']
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{spec['file']}.{fmt}"
+    frames = iter_frames(schema, rows, channels, seed=seed)
+
+    if fmt == 'csv':
+        _write_csv(schema, path, frames)
+    elif fmt == 'xlsx':
+        if rows > XLSX_MAX_ROWS:
+            raise ValueError(f"XLSX unterstützt max. {XLSX_MAX_ROWS:,} Zeilen, angefragt: {rows:,}")
+        _write_xlsx(path, frames)
+    elif fmt == 'parquet':
+        _write_parquet(path, frames)
+    else:
+        raise ValueError(f"Unbekanntes Format: {fmt}")
+    return path
@@ -0,0 +1,127 @@
+"""
+Payload-Benchmark für MokiG Dashboard
+=====================================
+Vergleicht Größe und Kodierzeit der Browser-Payloads (Records-JSON vs.
+spaltenorientierte Typed Arrays) für FIS export_q1_2025 mit allen Parametern.
+Ohne Originaldaten wird ein synthetischer FIS-Frame (benchmark_data.py)
+verwendet; die Tabellenmessung läuft zusätzlich für alle Schemas in der
+Benchmark-Suite (benchmark_suite.py).
+
+Aufruf:
+    python src/benchmark_payload.py [--json ergebnis.json]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+src_path = Path(__file__).parent
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.io.json import to_json_plotly
+
+from benchmark_data import generate_frame
+from data_loader_optimized import OptimizedDataLoader
+from payload_encoder import encode_figure, encode_table_columns, dumps_numpy
+from time_axis import find_time_column
+
+
+def load_benchmark_frame(base_path):
+    """Lädt FIS export_q1_2025; Fallback auf synthetische Daten gleicher Form"""
+    loader = OptimizedDataLoader(base_path)
+    df = loader.load_dataset_optimized('fis', 'export_q1_2025')
+    if df is None or df.empty:
+        print("[INFO] FIS export_q1_2025 nicht verfügbar - verwende synthetische Daten")
+        return generate_frame('fis', 22806), 'synthetisch'
+    return df, 'fis/export_q1_2025'
+
+
+def _measure(func, repeat=3):
+    """Führt func mehrfach aus, gibt (Ergebnis, beste Zeit in ms) zurück"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return result, best * 1000
+
+
+def _build_figure(df, date_col, params, as_lists):
+    """Overlay-Figure über alle Parameter (as_lists simuliert Records-Daten)"""
+    x = df[date_col]
+    if as_lists:
+        x = x.astype(str).tolist()
+    fig = go.Figure()
+    for param in params:
+        y = df[param].tolist() if as_lists else df[param].to_numpy()
+        fig.add_trace(go.Scattergl(x=x, y=y, mode='lines', name=param))
+    return fig
+
+
+def run_payload_benchmark(df, dataset_label='fis/export_q1_2025'):
+    """Misst Payload-Größen und Kodierzeiten; gibt Ergebnis-Dict zurück"""
+    date_col = find_time_column(df)
+    params = [c for c in df.columns
+              if c != date_col and pd.api.types.is_numeric_dtype(df[c])]
+
+    results = {'dataset': dataset_label, 'rows': len(df), 'parameters': len(params)}
+
+    # Tabellen-/Store-Payload
+    records_json, t_records = _measure(lambda: to_json_plotly(df.to_dict('records')))
+    block_json, t_block = _measure(lambda: dumps_numpy(encode_table_columns(df)))
+    results['table'] = {
+        'records_bytes': len(records_json.encode('utf-8')),
+        'records_ms': round(t_records, 1),
+        'columnar_bytes': len(block_json),
+        'columnar_ms': round(t_block, 1)
+    }
+
+    # Figure-Payload (alle Parameter überlagert)
+    fig_lists = _build_figure(df, date_col, params, as_lists=True)
+    fig_arrays = _build_figure(df, date_col, params, as_lists=False)
+    lists_json, t_lists = _measure(lambda: to_json_plotly(fig_lists.to_plotly_json()), repeat=1)
+    typed_json, t_typed = _measure(lambda: dumps_numpy(encode_figure(fig_arrays)), repeat=1)
+    results['figure'] = {
+        'lists_bytes': len(lists_json.encode('utf-8')),
+        'lists_ms': round(t_lists, 1),
+        'typed_bytes': len(typed_json),
+        'typed_ms': round(t_typed, 1)
+    }
+    return results
+
+
+def print_results(results):
+    """Gibt die Ergebnisse als Tabelle aus"""
+    mb = 1024 * 1024
+    table, figure = results['table'], results['figure']
+    print("\n" + "=" * 60)
+    print(f"Payload-Benchmark: {results['dataset']} "
+          f"({results['rows']:,} Zeilen x {results['parameters']} Parameter)")
+    print("=" * 60)
+    print(f"{'Payload':<26}{'Größe (MB)':>12}{'Zeit (ms)':>12}")
+    print(f"{'Tabelle - Records':<26}{table['records_bytes'] / mb:>12.2f}{table['records_ms']:>12.1f}")
+    print(f"{'Tabelle - Spaltenblock':<26}{table['columnar_bytes'] / mb:>12.2f}{table['columnar_ms']:>12.1f}")
+    print(f"{'Figure - Listen':<26}{figure['lists_bytes'] / mb:>12.2f}{figure['lists_ms']:>12.1f}")
+    print(f"{'Figure - Typed Arrays':<26}{figure['typed_bytes'] / mb:>12.2f}{figure['typed_ms']:>12.1f}")
+    print(f"\nReduktion Tabelle: {table['records_bytes'] / table['columnar_bytes']:.1f}x, "
+          f"Figure: {figure['lists_bytes'] / figure['typed_bytes']:.1f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Payload-Benchmark für FIS export_q1_2025")
+    parser.add_argument('--json', help="Ergebnisse zusätzlich als JSON speichern")
+    args = parser.parse_args()
+
+    df, label = load_benchmark_frame(Path(__file__).parent.parent)
+    results = run_payload_benchmark(df, label)
+    print_results(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
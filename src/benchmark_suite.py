@@ -0,0 +1,460 @@
+"""
+Benchmark-Suite für MokiG Dashboard
+===================================
+Misst die Kernpfade auf synthetischen Daten in der Form aller vier Quellen
+(siehe benchmark_data.py) - offline, ohne Originaldaten:
+
+- convert_to_parquet       (CSV/XLSX -> Parquet, DataOptimizer)
+- load_dataset_optimized   (Parquet -> DataFrame, OptimizedDataLoader)
+- table                    (create_enhanced_data_table)
+- viz_panel / viz_<typ>    (Panel inkl. Store, create_visualization_figure
+                            ohne Figure-Cache je Darstellungsart)
+- stats                    (create_statistics_panel)
+- payload                  (Records-JSON vs. Spaltenblock, benchmark_payload)
+- tiering_mmap             (Auslagern als Arrow-IPC und Nachladen, dataset_memory)
+
+Pro Schritt werden beste Zeit ('ms'), Median und - wo sinnvoll - die
+Payload-Größe ('bytes', serialisiert wie im Callback-Pfad) erfasst. Für
+Laden, Tabelle, Visualisierung, Statistik und Tiering wird zusätzlich die
+Spitzenallokation per tracemalloc gemessen ('peak_bytes', eigener Lauf);
+sie wird wie eine Größe gegen die Baseline geprüft.
+Mit --compare-dtypes wird zusätzlich das Laden im NumPy- und im Arrow-Modus
+(OptimizedDataLoader(arrow_dtypes=True)) verglichen: Ladezeit, Speicher
+(deep), Spitzenallokation und Statistik-Zeit, Default für KW und FIS.
+Ergebnisse werden als JSON gespeichert und gegen eine Baseline verglichen:
+Zeiten gelten ab TIME_THRESHOLD (und MIN_TIME_DELTA_MS), Größen ab
+SIZE_THRESHOLD als Regression; dann endet der Lauf mit Exit-Code 1.
+
+Aufruf:
+    python src/benchmark_suite.py --rows 10k,100k
+    python src/benchmark_suite.py --rows 1m --schemas fis --output ergebnis.json
+    python src/benchmark_suite.py --update-baseline      # Baseline neu setzen
+    python src/benchmark_suite.py --compare-dtypes --rows 100k
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+src_path = Path(__file__).parent
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+import pandas as pd
+from plotly.io.json import to_json_plotly
+
+from benchmark_data import SCHEMAS, write_dataset
+from benchmark_payload import run_payload_benchmark
+from column_toggle_component import create_enhanced_data_table
+from data_loader_optimized import OptimizedDataLoader
+from data_optimizer import DataOptimizer
+from dataset_memory import MemoryManager, TieredDatasets
+from figure_cache import FIGURE_CACHE
+from payload_encoder import configure_fast_json
+from ui_components_improved import create_statistics_panel
+from visualization_improved import create_advanced_visualization_panel, create_visualization_figure
+
+
+DEFAULT_BASELINE = src_path.parent / "benchmarks" / "baseline.json"
+DEFAULT_ROWS = '10k,100k'
+DEFAULT_REPEAT = 3
+TIME_THRESHOLD = 0.25        # +25% Laufzeit gilt als Regression
+SIZE_THRESHOLD = 0.05        # +5% Payload-/Dateigröße gilt als Regression
+MIN_TIME_DELTA_MS = 20.0     # Rauschgrenze für kurze Messungen
+PAYLOAD_MAX_ROWS = 100_000   # Records-JSON darüber nicht mehr sinnvoll
+CHART_TYPES = ('separate', 'overlay', 'subplots')
+VIZ_PARAMETERS = 3
+WARMUP_ROWS = 2_000
+DTYPE_COMPARISON_SCHEMAS = ('kw', 'fis')
+DTYPE_BACKENDS = (('numpy', False), ('arrow', True))
+
+
+def parse_rows(value):
+    """'10k,1m,100m' -> [10000, 1000000, 100000000]"""
+    factors = {'k': 1_000, 'm': 1_000_000}
+    rows = []
+    for part in value.split(','):
+        part = part.strip().lower()
+        if not part:
+            continue
+        factor = factors.get(part[-1], 1)
+        rows.append(int(float(part.rstrip('km')) * factor))
+    return rows
+
+
+def _label(rows):
+    if rows >= 1_000_000 and rows % 1_000_000 == 0:
+        return f"{rows // 1_000_000}m"
+    if rows >= 1_000 and rows % 1_000 == 0:
+        return f"{rows // 1_000}k"
+    return str(rows)
+
+
+def _payload_bytes(component):
+    """Größe wie in der Callback-Antwort (plotly JSON-Engine)"""
+    return len(to_json_plotly(component).encode('utf-8'))
+
+
+def measure(func, repeat=DEFAULT_REPEAT, setup=None):
+    """
+    Führt func mehrfach aus.
+
+    Returns:
+        (Ergebnis des letzten Laufs, {'ms': beste Zeit, 'median_ms': Median})
+    """
+    times = []
+    result = None
+    for _ in range(max(repeat, 1)):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        result = func()
+        times.append((time.perf_counter() - start) * 1000)
+    return result, {'ms': round(min(times), 2), 'median_ms': round(statistics.median(times), 2)}
+
+
+def measure_peak(func):
+    """Spitzenallokation (Python + NumPy) eines Aufrufs per tracemalloc in Bytes"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@contextlib.contextmanager
+def _quiet():
+    """Unterdrückt die Fortschrittsausgaben von Optimizer und Loader"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def benchmark_case(schema, rows, workdir, repeat=DEFAULT_REPEAT, channels=None,
+                   payload_max_rows=PAYLOAD_MAX_ROWS):
+    """Misst alle Schritte für ein Schema und eine Zeilenzahl"""
+    spec = SCHEMAS[schema]
+    case_dir = Path(workdir) / f"{schema}_{_label(rows)}"
+    if case_dir.exists():
+        shutil.rmtree(case_dir)
+    results = {'schema': schema, 'rows': rows}
+
+    # Quelldatei im Originalformat
+    source_file, timing = measure(lambda: write_dataset(schema, case_dir, rows, channels=channels), repeat=1)
+    results['generate'] = dict(timing, bytes=source_file.stat().st_size)
+
+    # CSV/XLSX -> Parquet
+    source_type = 'csv' if spec['format'] == 'csv' else 'excel'
+    with _quiet():
+        parquet_path, timing = measure(
+            lambda: DataOptimizer(case_dir).convert_to_parquet(source_file, source_type, force=True),
+            repeat=repeat
+        )
+    if parquet_path is None:
+        results['error'] = "convert_to_parquet fehlgeschlagen"
+        return results
+    results['convert_to_parquet'] = dict(timing, bytes=Path(parquet_path).stat().st_size)
+
+    # Parquet -> DataFrame (frischer Loader je Lauf, kein Memory-Cache)
+    with _quiet():
+        df, timing = measure(
+            lambda: OptimizedDataLoader(case_dir).load_dataset_optimized(schema, spec['dataset']),
+            repeat=repeat
+        )
+    if df is None or df.empty:
+        results['error'] = "load_dataset_optimized lieferte keine Daten"
+        return results
+    with _quiet():
+        peak = measure_peak(lambda: OptimizedDataLoader(case_dir).load_dataset_optimized(schema, spec['dataset']))
+    results['load_dataset_optimized'] = dict(timing, bytes=int(df.memory_usage(deep=True).sum()),
+                                             peak_bytes=peak, columns=len(df.columns))
+
+    # Datentabelle
+    table, timing = measure(
+        lambda: create_enhanced_data_table(df, 'bench-table', schema, spec['dataset']), repeat=repeat
+    )
+    results['table'] = dict(timing, bytes=_payload_bytes(table), peak_bytes=measure_peak(
+        lambda: create_enhanced_data_table(df, 'bench-table', schema, spec['dataset'])))
+
+    # Visualisierung: Panel (inkl. Store) und Figures ohne Cache
+    panel, timing = measure(lambda: create_advanced_visualization_panel(df, 'bench-viz'), repeat=repeat)
+    results['viz_panel'] = dict(timing, bytes=_payload_bytes(panel),
+                                peak_bytes=measure_peak(lambda: create_advanced_visualization_panel(df, 'bench-viz')))
+    store = _find_viz_store(panel)
+    if store is not None:
+        params = store['numeric_cols'][:VIZ_PARAMETERS]
+        for chart_type in CHART_TYPES:
+            figure, timing = measure(
+                lambda: create_visualization_figure(store['df'], params, chart_type, [], store['date_col']),
+                repeat=repeat, setup=FIGURE_CACHE.clear
+            )
+            results[f"viz_{chart_type}"] = dict(timing, bytes=_payload_bytes(figure))
+
+    # Statistik
+    stats_panel, timing = measure(lambda: create_statistics_panel(df), repeat=repeat)
+    results['stats'] = dict(timing, bytes=_payload_bytes(stats_panel),
+                            peak_bytes=measure_peak(lambda: create_statistics_panel(df)))
+
+    # Tiering: als Arrow-IPC auslagern und memory-mapped zurückholen
+    store = TieredDatasets(schema, MemoryManager(spill_dir=case_dir / "tiering"))
+    store.put(spec['dataset'], df)
+
+    def roundtrip():
+        with _quiet():
+            store.demote(spec['dataset'])
+        return store[spec['dataset']]
+
+    _, timing = measure(roundtrip, repeat=repeat)
+    results['tiering_mmap'] = dict(timing, peak_bytes=measure_peak(roundtrip))
+
+    # Payload-Vergleich Records vs. Spaltenblock (ehemals nur FIS)
+    if rows <= payload_max_rows:
+        payload = run_payload_benchmark(df, f"{schema}/{_label(rows)}")
+        results['payload_records'] = {'ms': payload['table']['records_ms'],
+                                      'bytes': payload['table']['records_bytes']}
+        results['payload_columnar'] = {'ms': payload['table']['columnar_ms'],
+                                       'bytes': payload['table']['columnar_bytes']}
+
+    shutil.rmtree(case_dir, ignore_errors=True)
+    return results
+
+
+def compare_dtype_backends(schema, rows, workdir, repeat=DEFAULT_REPEAT, channels=None):
+    """
+    Vergleicht NumPy- und Arrow-Dtypes für ein Schema (gleiche Parquet-Datei).
+
+    Returns:
+        {'numpy': {...}, 'arrow': {...}} mit load_ms, memory_bytes,
+        peak_bytes, stats_ms und den Dtypes der Nicht-Float-Spalten
+    """
+    spec = SCHEMAS[schema]
+    case_dir = Path(workdir) / f"dtypes_{schema}_{_label(rows)}"
+    if case_dir.exists():
+        shutil.rmtree(case_dir)
+    source_file = write_dataset(schema, case_dir, rows, channels=channels)
+    source_type = 'csv' if spec['format'] == 'csv' else 'excel'
+    with _quiet():
+        parquet_path = DataOptimizer(case_dir).convert_to_parquet(source_file, source_type, force=True)
+    if parquet_path is None:
+        return {'error': "convert_to_parquet fehlgeschlagen"}
+
+    results = {'schema': schema, 'rows': rows}
+    for backend, arrow_dtypes in DTYPE_BACKENDS:
+        def load():
+            return OptimizedDataLoader(case_dir, arrow_dtypes=arrow_dtypes).load_dataset_optimized(
+                schema, spec['dataset'])
+
+        with _quiet():
+            df, load_timing = measure(load, repeat=repeat)
+            peak = measure_peak(load)
+        _, stats_timing = measure(lambda: create_statistics_panel(df), repeat=repeat)
+        results[backend] = {
+            'load_ms': load_timing['ms'],
+            'memory_bytes': int(df.memory_usage(deep=True, index=True).sum()),
+            'peak_bytes': peak,
+            'stats_ms': stats_timing['ms'],
+            'dtypes': {col: str(dtype) for col, dtype in df.dtypes.items()
+                       if not pd.api.types.is_float_dtype(dtype)}
+        }
+
+    shutil.rmtree(case_dir, ignore_errors=True)
+    return results
+
+
+def print_dtype_comparison(comparison):
+    """Gibt den NumPy/Arrow-Vergleich als Tabelle aus"""
+    print("\n" + "=" * 90)
+    print(f"{'Fall / Backend':<28}{'Laden ms':>12}{'Speicher (MB)':>16}{'Peak (MB)':>12}{'Statistik ms':>14}")
+    print("=" * 90)
+    for case, entry in comparison.items():
+        print(case)
+        if 'error' in entry:
+            print(f"  [FEHLER] {entry['error']}")
+            continue
+        for backend, _ in DTYPE_BACKENDS:
+            metrics = entry[backend]
+            print(f"  {backend:<26}{metrics['load_ms']:>12.1f}{metrics['memory_bytes'] / 1024 / 1024:>16.1f}"
+                  f"{metrics['peak_bytes'] / 1024 / 1024:>12.1f}{metrics['stats_ms']:>14.1f}")
+        for col, dtype in entry['arrow']['dtypes'].items():
+            print(f"    {col}: {entry['numpy']['dtypes'].get(col, '-')} -> {dtype}")
+
+
+def _find_viz_store(component):
+    """Sucht den viz-data-store im Panel-Komponentenbaum"""
+    if isinstance(component, (list, tuple)):
+        for child in component:
+            found = _find_viz_store(child)
+            if found is not None:
+                return found
+        return None
+    component_id = getattr(component, 'id', None)
+    if isinstance(component_id, dict) and component_id.get('type') == 'viz-data-store':
+        return component.data
+    return _find_viz_store(getattr(component, 'children', None) or [])
+
+
+def run_suite(schemas, rows_list, workdir=None, repeat=DEFAULT_REPEAT, channels=None,
+              payload_max_rows=PAYLOAD_MAX_ROWS, dtype_schemas=()):
+    """Führt alle Fälle aus; gibt Ergebnis-Dict (JSON-fähig) zurück"""
+    configure_fast_json()
+    own_workdir = workdir is None
+    workdir = Path(workdir or tempfile.mkdtemp(prefix="mokig_bench_"))
+    results = {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'repeat': repeat
+        },
+        'cases': {}
+    }
+    try:
+        # Aufwärmen (Imports, Plotly-Validatoren), Ergebnis wird verworfen
+        with _quiet():
+            benchmark_case(schemas[0], WARMUP_ROWS, workdir, repeat=1, payload_max_rows=0)
+        for schema in schemas:
+            for rows in rows_list:
+                key = f"{schema}/{_label(rows)}"
+                print(f"[BENCH] {key} ...", flush=True)
+                results['cases'][key] = benchmark_case(schema, rows, workdir, repeat, channels, payload_max_rows)
+        if dtype_schemas:
+            results['dtype_comparison'] = {}
+            for schema in dtype_schemas:
+                for rows in rows_list:
+                    key = f"{schema}/{_label(rows)}"
+                    print(f"[BENCH] Dtypes {key} ...", flush=True)
+                    results['dtype_comparison'][key] = compare_dtype_backends(schema, rows, workdir,
+                                                                              repeat, channels)
+    finally:
+        if own_workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def flatten_metrics(results):
+    """{'fis/100k.table.ms': 12.3, ...} - nur vergleichbare Kennzahlen (Zeit, Größen)"""
+    flat = {}
+    for case, steps in results.get('cases', {}).items():
+        for step, metrics in steps.items():
+            if not isinstance(metrics, dict):
+                continue
+            for metric in ('ms', 'bytes', 'peak_bytes'):
+                if metric in metrics:
+                    flat[f"{case}.{step}.{metric}"] = metrics[metric]
+    return flat
+
+
+def compare_results(current, baseline, time_threshold=TIME_THRESHOLD, size_threshold=SIZE_THRESHOLD,
+                    min_time_delta_ms=MIN_TIME_DELTA_MS):
+    """
+    Vergleicht zwei Ergebnis-Dicts.
+
+    Returns:
+        Liste von Dicts (metric, baseline, current, change, regression)
+        für alle gemeinsamen Kennzahlen
+    """
+    current_flat = flatten_metrics(current)
+    baseline_flat = flatten_metrics(baseline)
+    comparison = []
+    for metric in sorted(current_flat.keys() & baseline_flat.keys()):
+        old, new = baseline_flat[metric], current_flat[metric]
+        change = (new - old) / old if old else 0.0
+        if metric.endswith('.ms'):
+            regression = change > time_threshold and (new - old) > min_time_delta_ms
+        else:
+            regression = change > size_threshold
+        comparison.append({'metric': metric, 'baseline': old, 'current': new,
+                           'change': round(change, 4), 'regression': regression})
+    return comparison
+
+
+def print_results(results):
+    """Gibt die Ergebnisse als Tabelle aus"""
+    print("\n" + "=" * 90)
+    print(f"{'Fall / Schritt':<40}{'beste ms':>12}{'Median ms':>12}{'Größe (kB)':>14}{'Peak (MB)':>12}")
+    print("=" * 90)
+    for case, steps in results['cases'].items():
+        print(f"{case} ({steps['rows']:,} Zeilen)")
+        if 'error' in steps:
+            print(f"  [FEHLER] {steps['error']}")
+        for step, metrics in steps.items():
+            if not isinstance(metrics, dict):
+                continue
+            size = f"{metrics['bytes'] / 1024:,.1f}" if 'bytes' in metrics else ""
+            peak = f"{metrics['peak_bytes'] / 1024 / 1024:,.1f}" if 'peak_bytes' in metrics else ""
+            print(f"  {step:<38}{metrics['ms']:>12.1f}{metrics.get('median_ms', metrics['ms']):>12.1f}"
+                  f"{size:>14}{peak:>12}")
+
+
+def print_comparison(comparison):
+    """Gibt Regressionen (und Anzahl verglichener Kennzahlen) aus"""
+    regressions = [entry for entry in comparison if entry['regression']]
+    print(f"\nBaseline-Vergleich: {len(comparison)} Kennzahlen, {len(regressions)} Regressionen")
+    for entry in regressions:
+        print(f"  [REGRESSION] {entry['metric']}: {entry['baseline']} -> {entry['current']} "
+              f"({entry['change']:+.0%})")
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark-Suite mit synthetischen Daten")
+    parser.add_argument('--schemas', default=','.join(SCHEMAS),
+                        help="Kommagetrennt: twin2sim, erentrudis, fis, kw")
+    parser.add_argument('--rows', default=DEFAULT_ROWS, help="Zeilenzahlen, z.B. 10k,100k,1m,100m")
+    parser.add_argument('--channels', type=int, help="Anzahl Messkanäle (Default: wie Originaldaten)")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="Wiederholungen pro Messung")
+    parser.add_argument('--workdir', help="Arbeitsverzeichnis für Testdateien (Default: temporär)")
+    parser.add_argument('--payload-max-rows', type=int, default=PAYLOAD_MAX_ROWS,
+                        help="Records-vs-Spaltenblock-Vergleich nur bis zu dieser Zeilenzahl")
+    parser.add_argument('--output', help="Ergebnisse als JSON speichern")
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help="Baseline-JSON für den Vergleich")
+    parser.add_argument('--update-baseline', action='store_true', help="Ergebnisse als neue Baseline speichern")
+    parser.add_argument('--time-threshold', type=float, default=TIME_THRESHOLD)
+    parser.add_argument('--size-threshold', type=float, default=SIZE_THRESHOLD)
+    parser.add_argument('--compare-dtypes', nargs='?', const=','.join(DTYPE_COMPARISON_SCHEMAS),
+                        help="NumPy- vs. Arrow-Dtypes vergleichen (Default: kw,fis)")
+    args = parser.parse_args()
+
+    schemas = [s.strip() for s in args.schemas.split(',') if s.strip()]
+    dtype_schemas = [s.strip() for s in (args.compare_dtypes or '').split(',') if s.strip()]
+    unknown = [s for s in schemas + dtype_schemas if s not in SCHEMAS]
+    if unknown:
+        parser.error(f"Unbekannte Schemas: {', '.join(unknown)}")
+
+    results = run_suite(schemas, parse_rows(args.rows), args.workdir, args.repeat, args.channels,
+                        args.payload_max_rows, dtype_schemas)
+    print_results(results)
+    if dtype_schemas:
+        print_dtype_comparison(results['dtype_comparison'])
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n[OK] Ergebnisse gespeichert: {args.output}")
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"[OK] Baseline aktualisiert: {baseline_path}")
+    elif baseline_path.exists():
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = print_comparison(compare_results(results, baseline, args.time_threshold,
+                                                       args.size_threshold))
+        if regressions:
+            sys.exit(1)
+    else:
+        print(f"\n[INFO] Keine Baseline unter {baseline_path} - mit --update-baseline anlegen")
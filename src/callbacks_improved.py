@@ -6,31 +6,88 @@ Callbacks mit Fixes für Visualisierungen und Datenauswahl.
 
 from dash import Input, Output, State, callback_context, MATCH, ALL
 from dash.exceptions import PreventUpdate
+from pathlib import Path
 import dash_bootstrap_components as dbc
-from dash import dcc, html
-import plotly.graph_objects as go
-import plotly.express as px
-import pandas as pd
-import numpy as np
+from dash import html
 
-from ui_components_improved import (
-    COLORS, 
-    create_data_table_with_full_columns,
-    create_visualization_panel_with_defaults,
-    create_statistics_panel,
-    get_dataset_description
-)
-from visualization_improved import create_advanced_visualization_panel, create_visualization_figure
-from column_toggle_component import create_enhanced_data_table
 from column_toggle_callbacks import register_column_toggle_callbacks
+from server_table_callbacks import register_server_table_callbacks
+from comparison_callbacks import register_comparison_callbacks
+from channel_callbacks import register_channel_callbacks
+from kpi_callbacks import register_kpi_callbacks
+from anomaly_callbacks import register_anomaly_callbacks
+from export_callbacks import register_export_callbacks
+from performance_callbacks import register_performance_callbacks
+from instrumentation import section
+from background_jobs import PROGRESS_POLL_INTERVAL, ProgressReporter, create_background_manager, job_slot
 
 
-def register_callbacks(app, ALL_DATA):
-    """Registriert alle Callbacks für die App"""
+BASE_PATH = Path(__file__).parent.parent
+
+
+def create_table_tab(df, source, dataset):
+    """Inhalt des Sub-Tabs 'Datentabelle'"""
+    from column_toggle_component import create_enhanced_data_table
+
+    with section('data'):
+        table = create_enhanced_data_table(df, f"table-{dataset}", source, dataset)
+    return dbc.Card([
+        dbc.CardHeader([
+            html.I(className="fas fa-table me-2"),
+            f"Datentabelle: {dataset}"
+        ]),
+        dbc.CardBody([
+            dbc.Alert(
+                [
+                    f"📊 Dataset: {len(df):,} Zeilen × {len(df.columns)} Spalten",
+                    html.Br(),
+                    "💡 Tipp: Nutzen Sie 'Spalten verwalten' um Spalten gruppiert ein-/auszublenden!"
+                ],
+                color="info",
+                className="mb-3"
+            ),
+            # Verwende die erweiterte Tabelle mit Column Toggle
+            table
+        ])
+    ], className="shadow-sm")
+
+
+def register_callbacks(app, ALL_DATA, background_manager=None):
+    """
+    Registriert alle Callbacks für die App.
+
+    Pandas, UI-Bausteine und Loader werden erst in den Callbacks importiert,
+    damit der Start (Layout aus dem Katalog) ohne sie auskommt.
+    """
+    
+    # Job-Manager für Background-Callbacks (Default: <Projekt>/cache/background_jobs)
+    if background_manager is None:
+        background_manager = create_background_manager(BASE_PATH)
     
     # Registriere Column Toggle Callbacks
     register_column_toggle_callbacks(app)
     
+    # Registriere Callbacks für serverseitige Tabellen
+    register_server_table_callbacks(app, ALL_DATA)
+    
+    # Registriere Callbacks der Vergleichsansicht
+    register_comparison_callbacks(app, ALL_DATA)
+    
+    # Registriere Callbacks der Kanalsuche (Visualisierung, Vergleich)
+    register_channel_callbacks(app)
+    
+    # Registriere Callbacks der KPI-Übersicht
+    register_kpi_callbacks(app, ALL_DATA)
+    
+    # Registriere Callbacks des Anomalie-Scans
+    register_anomaly_callbacks(app, ALL_DATA)
+    
+    # Registriere Callbacks der Export-Leisten
+    register_export_callbacks(app)
+    
+    # Registriere Callbacks des Performance-Tabs
+    register_performance_callbacks(app)
+    
     # Callback for collapsing/expanding column toggle panel
     @app.callback(
         Output({'type': 'column-panel-collapse', 'id': MATCH}, 'is_open'),
@@ -44,44 +101,6 @@ def register_callbacks(app, ALL_DATA):
             return not is_open
         return is_open
     
-    # Callback to update table based on column selection
-    @app.callback(
-        Output({'type': 'table-container', 'id': MATCH}, 'children'),
-        [Input({'type': 'column-toggle', 'column': ALL, 'category': ALL}, 'value')],
-        [State({'type': 'table-data-store', 'id': MATCH}, 'data')],
-        prevent_initial_call=False
-    )
-    def update_table_columns(column_values, stored_data):
-        """Update the table to show only selected columns."""
-        if not stored_data:
-            return html.Div("Keine Daten verfügbar")
-        
-        # Get context to find which table this is for
-        ctx = callback_context
-        
-        # Extract visible columns from the callback values
-        visible_columns = []
-        for i, value in enumerate(column_values):
-            if value:
-                # Extract column name from the input id
-                input_id = ctx.inputs_list[0][i]['id']
-                if 'column' in input_id:
-                    visible_columns.append(input_id['column'])
-        
-        # If no columns selected, show a message
-        if not visible_columns:
-            return dbc.Alert("Bitte wählen Sie mindestens eine Spalte aus", color="warning")
-        
-        # Create DataFrame from stored data
-        df = pd.DataFrame(stored_data)
-        
-        # Create table with only visible columns
-        return create_data_table_with_full_columns(
-            df, 
-            "dynamic-table",
-            visible_columns=visible_columns
-        )
-    
     # Callback to save dataset selection per tab
     @app.callback(
         Output("tab-datasets-store", "data"),
@@ -116,10 +135,19 @@ def register_callbacks(app, ALL_DATA):
                 className="mt-3"
             )
         
-        df_dict = stored_data['df']
         date_col = stored_data['date_col']
+        from visualization_improved import create_visualization_figure
         
-        return create_visualization_figure(df_dict, selected_params, chart_type, chart_options or [], date_col)
+        # Daten (und damit der Figure-Cache-Key) aus dem Server-Frame, nicht
+        # aus dem Browser; nur Panels ohne Dataset-Bezug tragen sie im Store
+        data = stored_data.get('df')
+        if stored_data.get('dataset'):
+            data = ALL_DATA.get(stored_data.get('source'), {}).get(stored_data['dataset'])
+        if data is None:
+            return html.Div("Dataset nicht mehr geladen", className="text-muted")
+        
+        with section('figure'):
+            return create_visualization_figure(data, selected_params, chart_type, chart_options or [], date_col)
     
     @app.callback(
         Output("dataset-description", "children"),
@@ -130,53 +158,82 @@ def register_callbacks(app, ALL_DATA):
         """Aktualisiert die Dataset-Beschreibung"""
         if not selected_dataset or not current_source:
             return ""
+        from ui_components_improved import get_dataset_description
         
         return get_dataset_description(current_source, selected_dataset)
     
     
+    # Dataset laden als Background-Callback: läuft in eigenem Prozess mit
+    # Fortschrittsanzeige; ein neuer Klick oder Dataset-Wechsel bricht ab
     @app.callback(
-        [Output("dataset-content", "children"),
-         Output("load-dataset-btn", "children"),
-         Output("load-dataset-btn", "disabled")],
+        Output("dataset-content", "children"),
         [Input("load-dataset-btn", "n_clicks")],
         [State("dataset-selector", "value"),
-         State("current-source-store", "data")]
+         State("current-source-store", "data")],
+        background=True,
+        manager=background_manager,
+        interval=PROGRESS_POLL_INTERVAL,
+        progress=[Output("dataset-load-progress", "value"),
+                  Output("dataset-load-progress", "label"),
+                  Output("dataset-load-status", "children")],
+        running=[(Output("load-dataset-btn", "disabled"), True, False),
+                 (Output("cancel-load-btn", "disabled"), False, True),
+                 (Output("dataset-load-progress-container", "style"),
+                  {'display': 'block'}, {'display': 'none'})],
+        cancel=[Input("cancel-load-btn", "n_clicks"),
+                Input("dataset-selector", "value")],
+        prevent_initial_call=True
     )
-    def load_dataset_content(n_clicks, selected_dataset, current_source):
-        """Lädt den Inhalt für das ausgewählte Dataset mit Ladeindikator"""
+    def load_dataset_content(set_progress, n_clicks, selected_dataset, current_source):
+        """Lädt den Inhalt für das ausgewählte Dataset mit Fortschrittsanzeige"""
         if not n_clicks or not selected_dataset or not current_source:
             return html.Div(
                 "Bitte wählen Sie ein Dataset und klicken Sie auf 'Dataset laden'", 
                 className="text-muted text-center p-4"
-            ), [html.I(className="fas fa-download me-2"), "Dataset laden"], False
+            )
         
-        # Lade das Dataset
-        df = ALL_DATA.get(current_source, {}).get(selected_dataset, pd.DataFrame())
-        if df.empty:
-            return dbc.Alert(
-                f"Dataset '{selected_dataset}' konnte nicht geladen werden.", 
-                color="danger"
-            ), [html.I(className="fas fa-download me-2"), "Dataset laden"], False
+        from data_loader_optimized import OptimizedDataLoader, load_dashboard_dataset
         
-        # Erstelle Sub-Tabs für verschiedene Ansichten
-        return html.Div([
-            dbc.Tabs([
-                dbc.Tab(label="📊 Datentabelle", tab_id="table"),
-                dbc.Tab(label="📈 Visualisierungen", tab_id="viz"),
-                dbc.Tab(label="📉 Statistiken", tab_id="stats")
-            ], id="sub-tabs", active_tab="table", className="nav-fill"),
+        progress = ProgressReporter(set_progress)
+        progress.report(0, "In Warteschlange:", "warte auf freien Job-Slot", force=True)
+        
+        with job_slot(background_manager):
+            # Dataset im Job über Registry und Loader laden, nicht aus ALL_DATA:
+            # der Job-Prozess serialisiert die Closure (unter spawn alle Datasets)
+            progress.report(5, "Dataset laden:", selected_dataset, force=True)
+            df = load_dashboard_dataset(OptimizedDataLoader(BASE_PATH), current_source, selected_dataset)
+            if df is None or df.empty:
+                return dbc.Alert(
+                    f"Dataset '{selected_dataset}' konnte nicht geladen werden.", 
+                    color="danger"
+                )
+            
+            # Erster Sub-Tab wird im Job aufgebaut (update_sub_tab erst beim Wechsel)
+            n_rows = len(df)
+            progress.report(60, "Tabelle aufbauen:", f"{n_rows:,} Zeilen × {len(df.columns)} Spalten", force=True)
+            table_tab = create_table_tab(df, current_source, selected_dataset)
             
-            html.Div(id="sub-tab-content", className="mt-3"),
+            progress.report(95, "Ansicht aufbauen:", f"{n_rows:,} Zeilen", force=True)
             
-            # Hidden Store für aktuelles Dataset
-            dcc.Store(id="current-dataset-data", data=df.to_dict('records'))
-        ]), [html.I(className="fas fa-download me-2"), "Dataset laden"], False
+            # Erstelle Sub-Tabs für verschiedene Ansichten
+            return html.Div([
+                dbc.Tabs([
+                    dbc.Tab(label="📊 Datentabelle", tab_id="table"),
+                    dbc.Tab(label="📈 Visualisierungen", tab_id="viz"),
+                    dbc.Tab(label="📉 Statistiken", tab_id="stats"),
+                    dbc.Tab(label="🧩 Datenqualität", tab_id="quality"),
+                    dbc.Tab(label="🚨 Anomalien", tab_id="anomalies")
+                ], id="sub-tabs", active_tab="table", className="nav-fill"),
+                
+                html.Div(table_tab, id="sub-tab-content", className="mt-3")
+            ])
     
     @app.callback(
         Output("sub-tab-content", "children"),
         [Input("sub-tabs", "active_tab")],
         [State("dataset-selector", "value"),
-         State("current-source-store", "data")]
+         State("current-source-store", "data")],
+        prevent_initial_call=True
     )
     def update_sub_tab(active_sub_tab, selected_dataset, current_source):
         """Aktualisiert den Inhalt der Sub-Tabs"""
@@ -184,37 +241,33 @@ def register_callbacks(app, ALL_DATA):
             return html.Div("Kein Dataset geladen", className="text-muted text-center p-4")
         
         # Lade das Dataset
-        df = ALL_DATA.get(current_source, {}).get(selected_dataset, pd.DataFrame())
-        if df.empty:
+        df = ALL_DATA.get(current_source, {}).get(selected_dataset)
+        if df is None or df.empty:
             return html.Div("Dataset ist leer", className="text-muted text-center p-4")
+        from ui_components_improved import create_anomaly_panel, create_quality_panel, create_statistics_panel
+        from visualization_improved import create_advanced_visualization_panel
         
         if active_sub_tab == "table":
-            return dbc.Card([
-                dbc.CardHeader([
-                    html.I(className="fas fa-table me-2"),
-                    f"Datentabelle: {selected_dataset}"
-                ]),
-                dbc.CardBody([
-                    dbc.Alert(
-                        [
-                            f"📊 Dataset: {len(df):,} Zeilen × {len(df.columns)} Spalten",
-                            html.Br(),
-                            "💡 Tipp: Nutzen Sie 'Spalten verwalten' um Spalten gruppiert ein-/auszublenden!"
-                        ],
-                        color="info",
-                        className="mb-3"
-                    ),
-                    # Verwende die erweiterte Tabelle mit Column Toggle
-                    create_enhanced_data_table(df, f"table-{selected_dataset}")
-                ])
-            ], className="shadow-sm")
+            return create_table_tab(df, current_source, selected_dataset)
         
         elif active_sub_tab == "viz":
             # Use the improved visualization with user-defined parameter selection
-            return create_advanced_visualization_panel(df, f"viz-{selected_dataset}")
+            with section('figure'):
+                return create_advanced_visualization_panel(
+                    df, f"viz-{selected_dataset}", current_source, selected_dataset
+                )
         
         elif active_sub_tab == "stats":
-            return create_statistics_panel(df)
+            with section('data'):
+                return create_statistics_panel(df)
+        
+        elif active_sub_tab == "quality":
+            with section('data'):
+                return create_quality_panel(df)
+        
+        elif active_sub_tab == "anomalies":
+            with section('data'):
+                return create_anomaly_panel(df, current_source, selected_dataset)
         
         return html.Div("Tab nicht implementiert")
     
@@ -0,0 +1,104 @@
+"""
+Katalog-Snapshot
+================
+Metadaten aller geladenen Datasets (Name, Zeilen, Spalten, Zeitspalte und
+Zeitraum) als JSON unter <base>/cache/catalog_snapshot.json.
+
+Der Snapshot wird nach jedem vollständigen Laden neu geschrieben. Im
+Schnellstart (MOKIG_FAST_START=1) rendert das Dashboard Übersichtskarten
+und Dataset-Auswahl daraus, während die Daten im Hintergrund geladen
+werden. Ein Snapshot einer anderen Registry (Datasets hinzugefügt,
+entfernt oder umbenannt) gilt als veraltet und wird ignoriert.
+
+Beispiel:
+    catalog = {}
+    catalog_add(catalog, 'fis', 'data_2024_2025_at', df)
+    save_snapshot(catalog, REGISTRY)
+    load_snapshot(REGISTRY)['fis']['data_2024_2025_at']['rows']   # 54154
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+
+SNAPSHOT_VERSION = 1
+DEFAULT_SNAPSHOT_PATH = Path(__file__).parent.parent / "cache" / "catalog_snapshot.json"
+
+
+def registry_key(registry):
+    """Kurzer Hash über Quellen und Dataset-IDs der Registry"""
+    layout = [[source.id, [spec.id for spec in source.datasets]] for source in registry.sources]
+    return hashlib.sha1(json.dumps(layout).encode('utf-8')).hexdigest()[:16]
+
+
+def describe_dataset(df):
+    """Metadaten eines geladenen Datasets (JSON-fähig)"""
+    from time_axis import find_time_column
+
+    entry = {
+        'rows': len(df),
+        'columns': [str(col) for col in df.columns],
+        'time_column': None,
+        'start': None,
+        'end': None
+    }
+    column = find_time_column(df)
+    if column is not None and len(df):
+        start, end = df[column].min(), df[column].max()
+        if start == start and end == end:  # NaT, wenn die Spalte leer ist
+            entry.update(time_column=column, start=start.isoformat(), end=end.isoformat())
+    return entry
+
+
+def catalog_add(catalog, source, dataset, df):
+    """Trägt ein Dataset in den Katalog {quelle: {dataset: Metadaten}} ein"""
+    catalog.setdefault(source, {})[dataset] = describe_dataset(df)
+    return catalog
+
+
+def catalog_rows(catalog, source):
+    """{dataset: Zeilen} einer Quelle, leere Datasets ausgelassen"""
+    return {name: entry['rows'] for name, entry in catalog.get(source, {}).items() if entry['rows']}
+
+
+def save_snapshot(catalog, registry, path=DEFAULT_SNAPSHOT_PATH):
+    """Schreibt den Snapshot atomar (temporäre Datei im selben Verzeichnis)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        'version': SNAPSHOT_VERSION,
+        'registry': registry_key(registry),
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'sources': catalog
+    }
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return path
+
+
+def load_snapshot(registry, path=DEFAULT_SNAPSHOT_PATH):
+    """Katalog aus dem Snapshot oder None (fehlt, unlesbar oder veraltet)"""
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[WARNUNG] Katalog-Snapshot nicht lesbar ({e}), wird neu erstellt")
+        return None
+    if payload.get('version') != SNAPSHOT_VERSION or payload.get('registry') != registry_key(registry):
+        return None
+    return payload.get('sources', {})
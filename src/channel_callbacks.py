@@ -0,0 +1,64 @@
+"""
+Channel Callbacks
+=================
+Kanalsuche für die Parameter-Auswahl der Visualisierung und die
+Kanalauswahl der Vergleichsansicht. Die Dropdowns starten mit wenigen
+Optionen; weitere werden beim Tippen (search_value) aus dem Kanalkatalog
+(channel_catalog) geladen, statt alle Kanäle mit dem Layout zu senden.
+Gewählte Kanäle bleiben in den Optionen, sonst verwirft das Dropdown sie.
+"""
+
+from dash import Input, Output, State, MATCH
+from dash.exceptions import PreventUpdate
+
+from instrumentation import section
+
+
+def _comparison_value(channel):
+    from comparison_engine import channel_value
+
+    return channel_value(channel.source, channel.dataset, channel.name)
+
+
+def register_channel_callbacks(app):
+    """Registriert die Callbacks der Kanalsuche"""
+
+    @app.callback(
+        Output({'type': 'param-selector', 'index': MATCH}, 'options'),
+        Input({'type': 'param-selector', 'index': MATCH}, 'search_value'),
+        [State({'type': 'param-selector', 'index': MATCH}, 'value'),
+         State({'type': 'param-scope', 'index': MATCH}, 'data')]
+    )
+    def search_parameters(search_value, selected, scope):
+        """Parameter eines Datasets zum Suchtext"""
+        if not search_value or not scope:
+            raise PreventUpdate
+        from channel_catalog import CHANNEL_CATALOG, SEARCH_LIMIT, dropdown_options
+        source, dataset = scope['source'], scope['dataset']
+        with section('data'):
+            hits = CHANNEL_CATALOG.search(search_value, source=source, dataset=dataset, limit=SEARCH_LIMIT)
+        kept = [CHANNEL_CATALOG.get(source, dataset, name) for name in selected or []]
+        kept = [channel for channel in kept if channel is not None]
+        names = {channel.name for channel in kept}
+        return dropdown_options(kept) + dropdown_options(
+            [channel for channel in hits if channel.name not in names], search=search_value)
+
+    @app.callback(
+        Output("comparison-channels", "options"),
+        Input("comparison-channels", "search_value"),
+        State("comparison-channels", "value")
+    )
+    def search_comparison_channels(search_value, selected):
+        """Kanäle aller Quellen zum Suchtext (z.B. 'Vorlauftemperatur' in allen Gebäuden)"""
+        if not search_value:
+            raise PreventUpdate
+        from channel_catalog import CHANNEL_CATALOG, SEARCH_LIMIT, dropdown_options
+        from comparison_engine import parse_channel_value
+        with section('data'):
+            hits = CHANNEL_CATALOG.search(search_value, limit=SEARCH_LIMIT)
+        kept = [CHANNEL_CATALOG.get(*parse_channel_value(value)) for value in selected or []]
+        kept = [channel for channel in kept if channel is not None]
+        keys = {channel.key for channel in kept}
+        return (dropdown_options(kept, _comparison_value, with_dataset=True)
+                + dropdown_options([channel for channel in hits if channel.key not in keys],
+                                   _comparison_value, with_dataset=True, search=search_value))
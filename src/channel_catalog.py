@@ -0,0 +1,287 @@
+"""
+Kanalkatalog
+============
+Alle Messkanäle der geladenen Datasets mit Name, Beschreibung, Einheit,
+Kategorie, Dataset und Kennzahlen (Anzahl, Minimum, Maximum, Mittelwert).
+Der Katalog wird beim Laden aufgebaut (add_dataset); Beschreibungen kommen
+aus den Kopfzeilen der Quelldateien (Twin2Sim, read_channel_header), die
+Einheit aus '[...]' in der Beschreibung oder '(...)' am Ende des Namens,
+die Kategorie aus der Stichwortsuche von categorize_columns (einmal pro
+Dataset statt bei jedem Rendern).
+
+Suche über einen invertierten Index (Token -> Kanäle):
+- Präfix: 'vorl' findet 'Vorlauf ...' (bisect auf der sortierten Tokenliste)
+- Zusammensetzungen: 'Vorlauftemperatur' findet 'Vorlauf HK1 Ost (°C)'
+  (Index-Token ab 4 Zeichen als Teil des Suchworts, dazu der längste Anfang
+  des Suchworts, mit dem ein Token beginnt)
+- Unscharf: Tippfehler über difflib, wenn ein Suchwort sonst nichts findet
+Alle Suchwörter müssen passen; Treffer mit mehr abgedecktem Text zuerst.
+
+Beispiel:
+    CHANNEL_CATALOG.add_dataset('erentrudis', 'detail_juli_2024', df)
+    CHANNEL_CATALOG.search('Vorlauftemperatur')          # alle Gebäude
+    CHANNEL_CATALOG.search('temp', source='twin2sim', dataset='lüftung')
+"""
+
+import bisect
+import difflib
+import re
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from column_toggle_component import categorize_columns
+from dataset_registry import REGISTRY
+from time_axis import find_time_column
+
+
+SEARCH_LIMIT = 50
+# Optionen, mit denen ein Dropdown ohne Suchtext startet
+INITIAL_OPTIONS = 50
+MIN_COMPOUND_TOKEN = 4
+FUZZY_CUTOFF = 0.8
+
+_TOKEN_SPLIT = re.compile(r'[^0-9a-z]+')
+_CAMEL_CASE = re.compile(r'(?<=[a-zäöü])(?=[A-ZÄÖÜ])')
+_UMLAUTS = str.maketrans({'ä': 'ae', 'ö': 'oe', 'ü': 'ue'})
+_UNIT_IN_DESCRIPTION = re.compile(r'\[([^\[\]]+)\]')
+_UNIT_IN_NAME = re.compile(r'\(([^()]+)\)\s*$')
+
+SOURCE_LABELS = REGISTRY.source_labels()
+
+
+def tokenize(text):
+    """Suchtokens eines Texts (Kleinschreibung, Umlaute/ß ausgeschrieben, CamelCase getrennt)"""
+    text = _CAMEL_CASE.sub(' ', str(text)).casefold().translate(_UMLAUTS)
+    return [token for token in _TOKEN_SPLIT.split(text) if token]
+
+
+def channel_unit(name, description=''):
+    """Einheit aus '[...]' der Beschreibung oder '(...)' am Ende des Namens, sonst ''"""
+    match = _UNIT_IN_DESCRIPTION.search(description or '') or _UNIT_IN_NAME.search(str(name))
+    return match.group(1).strip() if match else ''
+
+
+@dataclass(frozen=True)
+class Channel:
+    """Ein Messkanal eines Datasets"""
+    source: str
+    dataset: str
+    name: str
+    description: str = ''
+    unit: str = ''
+    category: str = 'Sonstige'
+    count: int = 0
+    minimum: float = None
+    maximum: float = None
+    mean: float = None
+
+    @property
+    def key(self):
+        return (self.source, self.dataset, self.name)
+
+    def label(self, with_dataset=False):
+        """Anzeigename für Dropdowns ('Quelle / dataset: ' nur mit with_dataset)"""
+        label = self.name
+        if self.description and self.description != self.name:
+            label = f"{label} - {self.description}"
+        elif self.unit and self.unit not in label:
+            label = f"{label} [{self.unit}]"
+        if with_dataset:
+            label = f"{SOURCE_LABELS.get(self.source, self.source)} / {self.dataset}: {label}"
+        return label
+
+
+def dropdown_options(channels, value=None, with_dataset=False, search=None):
+    """
+    Dropdown-Optionen zu Kanälen. value bildet einen Channel auf den Wert ab
+    (Default: Spaltenname); search wird an den Suchtext der Option gehängt,
+    damit die Dropdown-eigene Filterung Treffer der Server-Suche
+    (z.B. Zusammensetzungen) nicht wieder ausblendet.
+    """
+    value = value or (lambda channel: channel.name)
+    options = []
+    for channel in channels:
+        label = channel.label(with_dataset)
+        option = {'label': label, 'value': value(channel)}
+        if search:
+            option['search'] = f"{label} {search}"
+        options.append(option)
+    return options
+
+
+def _channel_stats(values):
+    """(Anzahl, Minimum, Maximum, Mittelwert) gültiger Werte je Spalte"""
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=0)
+    with np.errstate(invalid='ignore'):
+        minimum = np.where(count > 0, np.nanmin(np.where(valid, values, np.inf), axis=0), np.nan)
+        maximum = np.where(count > 0, np.nanmax(np.where(valid, values, -np.inf), axis=0), np.nan)
+        mean = np.where(count > 0, np.where(valid, values, 0.0).sum(axis=0) / np.maximum(count, 1), np.nan)
+    return count, minimum, maximum, mean
+
+
+def describe_channels(source, dataset, df, descriptions=None):
+    """Channel-Einträge der numerischen Spalten eines Datasets (ohne Zeitspalte)"""
+    descriptions = descriptions or {}
+    time_col = find_time_column(df)
+    columns = [col for col in df.columns
+               if col != time_col and pd.api.types.is_numeric_dtype(df[col])
+               and not pd.api.types.is_bool_dtype(df[col])]
+    if not columns:
+        return []
+
+    by_name = {col: category for category, cols in categorize_columns([str(col) for col in columns]).items()
+               for col in cols}
+    unresolved = [descriptions[col] for col in columns
+                  if by_name.get(str(col)) == 'Sonstige' and descriptions.get(col)]
+    by_description = {text: category for category, texts in categorize_columns(unresolved).items()
+                      for text in texts}
+
+    values = df[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+    count, minimum, maximum, mean = _channel_stats(values)
+
+    channels = []
+    for i, col in enumerate(columns):
+        description = descriptions.get(col, '')
+        category = by_name.get(str(col), 'Sonstige')
+        if category == 'Sonstige' and description:
+            category = by_description.get(description, category)
+        channels.append(Channel(
+            source=source, dataset=dataset, name=str(col), description=description,
+            unit=channel_unit(col, description), category=category, count=int(count[i]),
+            minimum=None if np.isnan(minimum[i]) else float(minimum[i]),
+            maximum=None if np.isnan(maximum[i]) else float(maximum[i]),
+            mean=None if np.isnan(mean[i]) else float(mean[i])
+        ))
+    return channels
+
+
+class ChannelCatalog:
+    """Kanalkatalog mit invertiertem Index für Präfix- und unscharfe Suche"""
+
+    def __init__(self):
+        self._channels = {}       # (source, dataset, name) -> Channel
+        self._postings = {}       # token -> {(source, dataset, name)}
+        self._tokens = []         # sortierte Tokens (Präfixsuche)
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._channels)
+
+    def _channel_tokens(self, channel):
+        text = ' '.join((channel.name, channel.description, channel.unit, channel.category,
+                         channel.dataset, SOURCE_LABELS.get(channel.source, channel.source)))
+        return set(tokenize(text))
+
+    def add_dataset(self, source, dataset, df, descriptions=None):
+        """Nimmt alle Kanäle eines Datasets auf (ersetzt einen früheren Stand)"""
+        channels = describe_channels(source, dataset, df, descriptions)
+        with self._lock:
+            self._remove(source, dataset)
+            for channel in channels:
+                self._channels[channel.key] = channel
+                for token in self._channel_tokens(channel):
+                    self._postings.setdefault(token, set()).add(channel.key)
+            self._tokens = sorted(self._postings)
+        return channels
+
+    def remove_dataset(self, source, dataset):
+        with self._lock:
+            self._remove(source, dataset)
+            self._tokens = sorted(self._postings)
+
+    def _remove(self, source, dataset):
+        for key in [key for key in self._channels if key[0] == source and key[1] == dataset]:
+            channel = self._channels.pop(key)
+            for token in self._channel_tokens(channel):
+                keys = self._postings.get(token)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._postings[token]
+
+    def get(self, source, dataset, name):
+        """Channel oder None"""
+        return self._channels.get((source, dataset, name))
+
+    def channels(self, source=None, dataset=None):
+        """Kanäle (in Lade-Reihenfolge), optional einer Quelle bzw. eines Datasets"""
+        with self._lock:
+            return [channel for channel in self._channels.values()
+                    if (source is None or channel.source == source)
+                    and (dataset is None or channel.dataset == dataset)]
+
+    def _prefixed(self, prefix):
+        """Index-Tokens, die mit prefix beginnen (bisect auf der sortierten Liste)"""
+        start = bisect.bisect_left(self._tokens, prefix)
+        for token in self._tokens[start:]:
+            if not token.startswith(prefix):
+                break
+            yield token
+
+    def _matches(self, word):
+        """{kanal: Punktzahl} für ein Suchwort (abgedeckte Zeichen)"""
+        scores = {}
+        # Präfix (exakter Treffer einen Punkt höher)
+        for token in self._prefixed(word):
+            score = len(word) + (1 if token == word else 0)
+            for key in self._postings[token]:
+                scores[key] = max(scores.get(key, 0), score)
+
+        # Zusammensetzungen: bekannte Teilwörter des Suchworts, je Kanal summiert
+        if len(word) > MIN_COMPOUND_TOKEN:
+            parts = [token for token in self._tokens
+                     if len(token) >= MIN_COMPOUND_TOKEN and token != word and token in word]
+            # Bestimmungswort, das selbst kein Token ist ('aussen' in 'aussenfuehler')
+            for end in range(len(word) - 1, MIN_COMPOUND_TOKEN - 1, -1):
+                if next(self._prefixed(word[:end]), None) is not None:
+                    parts.append(word[:end])
+                    break
+            parts = list(dict.fromkeys(parts))
+            parts = [part for part in parts if not any(part != other and part in other for other in parts)]
+            covered = {}
+            for part in parts:
+                keys = set().union(*(self._postings[token] for token in self._prefixed(part)))
+                for key in keys:
+                    covered[key] = covered.get(key, 0) + len(part)
+            for key, score in covered.items():
+                scores[key] = max(scores.get(key, 0), min(score, len(word)))
+
+        # Tippfehler
+        if not scores:
+            for token in difflib.get_close_matches(word, self._tokens, n=5, cutoff=FUZZY_CUTOFF):
+                for key in self._postings[token]:
+                    scores[key] = max(scores.get(key, 0), len(token) // 2)
+        return scores
+
+    def search(self, query, source=None, dataset=None, limit=SEARCH_LIMIT):
+        """
+        Kanäle zu einem Suchtext, bester Treffer zuerst.
+
+        Mehrere Teilwörter eines Suchworts (Vorlauf + Temperatur) addieren
+        sich; bei gleicher Punktzahl bleibt die Lade-Reihenfolge.
+        """
+        words = tokenize(query)
+        if not words:
+            return self.channels(source, dataset)[:limit]
+        with self._lock:
+            total = None
+            for word in words:
+                scores = self._matches(word)
+                if total is None:
+                    total = scores
+                else:
+                    total = {key: total[key] + score for key, score in scores.items() if key in total}
+                if not total:
+                    return []
+            order = {key: i for i, key in enumerate(self._channels)}
+            hits = [key for key in total
+                    if (source is None or key[0] == source) and (dataset is None or key[1] == dataset)]
+            hits.sort(key=lambda key: (-total[key], order[key]))
+            return [self._channels[key] for key in hits[:limit]]
+
+
+CHANNEL_CATALOG = ChannelCatalog()
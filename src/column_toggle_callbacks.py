@@ -3,12 +3,35 @@ Column Toggle Callbacks - Fixed Circular Dependency
 ====================================================
 Handles the interaction logic for the grouped column toggle functionality.
 Fixed version without circular dependencies.
+
+All toggle callbacks run clientside: visibility is applied through the
+DataTable's hidden_columns property, so no row data travels to the server
+or back when columns are switched on or off.
+"""
+
+from dash import Input, Output, State, ALL, MATCH
+
+
+# Hidden columns = all toggles of this table that are switched off
+_HIDDEN_COLUMNS_JS = """
+function(values) {
+    const inputs = window.dash_clientside.callback_context.inputs_list[0];
+    return inputs.filter((input, i) => !values[i]).map(input => input.id.column);
+}
 """
 
-from dash import Input, Output, State, ALL, MATCH, callback_context
-from dash.exceptions import PreventUpdate
-import pandas as pd
-from ui_components_improved import create_data_table_with_full_columns
+_VISIBLE_COUNT_JS = """
+function(values) {
+    const visible = values.filter(Boolean).length;
+    return visible + " von " + values.length + " Spalten sichtbar";
+}
+"""
+
+_CATEGORY_TOGGLE_JS = """
+function(categoryChecked, columnValues) {
+    return columnValues.map(() => categoryChecked);
+}
+"""
 
 
 def register_column_toggle_callbacks(app):
@@ -16,25 +39,41 @@ def register_column_toggle_callbacks(app):
     Registers callbacks for column toggle functionality without circular dependencies.
     Only allows one-way updates to avoid cycles.
     """
-    
+
     # Callback 1: Category checkbox toggles its columns (one-way only)
-    @app.callback(
-        Output({'type': 'column-toggle', 'column': ALL, 'category': MATCH}, 'value'),
-        Input({'type': 'category-toggle', 'category': MATCH}, 'value'),
-        State({'type': 'column-toggle', 'column': ALL, 'category': MATCH}, 'value'),
+    app.clientside_callback(
+        _CATEGORY_TOGGLE_JS,
+        Output({'type': 'column-toggle', 'id': MATCH, 'column': ALL, 'category': MATCH}, 'value'),
+        Input({'type': 'category-toggle', 'id': MATCH, 'category': MATCH}, 'value'),
+        State({'type': 'column-toggle', 'id': MATCH, 'column': ALL, 'category': MATCH}, 'value'),
         prevent_initial_call=True
     )
-    def toggle_category_columns(category_checked, column_values):
-        """Toggle all columns in a category when category checkbox is clicked."""
-        if callback_context.triggered:
-            # Only update if the trigger came from a user click, not from another callback
-            trigger_id = callback_context.triggered[0]['prop_id']
-            if 'category-toggle' in trigger_id:
-                # Set all columns in the category to the same state as the category checkbox
-                return [category_checked] * len(column_values)
-        return column_values
-    
-    
+
+    # Callback 2: Column checkboxes -> hidden_columns of the native table
+    app.clientside_callback(
+        _HIDDEN_COLUMNS_JS,
+        Output({'type': 'data-table', 'id': MATCH}, 'hidden_columns'),
+        Input({'type': 'column-toggle', 'id': MATCH, 'column': ALL, 'category': ALL}, 'value'),
+        prevent_initial_call=True
+    )
+
+    # Callback 3: Column checkboxes -> hidden_columns of the server-side table
+    # (the server table callback then drops these columns from its page payload)
+    app.clientside_callback(
+        _HIDDEN_COLUMNS_JS,
+        Output({'type': 'server-table', 'id': MATCH}, 'hidden_columns'),
+        Input({'type': 'column-toggle', 'id': MATCH, 'column': ALL, 'category': ALL}, 'value'),
+        prevent_initial_call=True
+    )
+
+    # Callback 4: Visible column counter
+    app.clientside_callback(
+        _VISIBLE_COUNT_JS,
+        Output({'type': 'visible-count', 'id': MATCH}, 'children'),
+        Input({'type': 'column-toggle', 'id': MATCH, 'column': ALL, 'category': ALL}, 'value'),
+        prevent_initial_call=True
+    )
+
     # Removed the reverse callback to avoid circular dependency
     # Category checkboxes will not auto-update based on column selections
-    # This prevents the circular dependency error
\ No newline at end of file
+    # This prevents the circular dependency error
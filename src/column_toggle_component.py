@@ -9,11 +9,22 @@ from dash import dcc, html, Input, Output, State, ALL, MATCH
 import dash_bootstrap_components as dbc
 import pandas as pd
 import re
+from functools import lru_cache
+
+from table_server import SERVER_SIDE_ROW_THRESHOLD
 
 def categorize_columns(columns):
     """
     Categorizes columns into logical groups based on their names.
+    
+    The keyword scan is cached per schema (tuple of column names).
     """
+    return {category: list(cols) for category, cols in _categorize_schema(tuple(columns))}
+
+
+@lru_cache(maxsize=64)
+def _categorize_schema(columns):
+    """Keyword classification for one schema; returns immutable (category, columns) pairs."""
     categories = {
         'Datum & Zeit': [],
         'Temperaturen': [],
@@ -87,9 +98,7 @@ def categorize_columns(columns):
             categories['Sonstige'].append(col)
     
     # Entferne leere Kategorien
-    categories = {k: v for k, v in categories.items() if v}
-    
-    return categories
+    return tuple((k, tuple(v)) for k, v in categories.items() if v)
 
 
 def create_column_toggle_panel(df, table_id, visible_columns=None):
@@ -130,7 +139,7 @@ def create_column_toggle_panel(df, table_id, visible_columns=None):
         category_header = dbc.Row([
             dbc.Col([
                 dbc.Checkbox(
-                    id={'type': 'category-toggle', 'category': category_id},
+                    id={'type': 'category-toggle', 'id': table_id, 'category': category_id},
                     label=f"{category} ({len(columns)} Spalten)",
                     value=all_checked,
                     className="fw-bold"
@@ -143,7 +152,7 @@ def create_column_toggle_panel(df, table_id, visible_columns=None):
         for col in columns:
             column_checkboxes.append(
                 dbc.Checkbox(
-                    id={'type': 'column-toggle', 'column': col, 'category': category_id},
+                    id={'type': 'column-toggle', 'id': table_id, 'column': col, 'category': category_id},
                     label=col,
                     value=col in visible_columns,
                     className="ms-4 small"
@@ -196,7 +205,7 @@ def create_column_toggle_panel(df, table_id, visible_columns=None):
                 html.Hr(className="my-3"),
                 dbc.Badge(
                     f"{len(visible_columns)} von {len(all_columns)} Spalten sichtbar",
-                    id=f"{table_id}-visible-count",
+                    id={'type': 'visible-count', 'id': table_id},
                     color="primary",
                     className="p-2"
                 )
@@ -207,17 +216,36 @@ def create_column_toggle_panel(df, table_id, visible_columns=None):
     return panel
 
 
-def create_enhanced_data_table(df, table_id):
+def create_enhanced_data_table(df, table_id, source=None, dataset=None):
     """
     Creates an enhanced data table with integrated column toggle functionality.
     
+    Large datasets (known source/dataset, more than SERVER_SIDE_ROW_THRESHOLD
+    rows) use the server-side table; only the visible page is sent.
+    
     Returns a container with both the toggle panel and the table.
     """
-    from ui_components_improved import create_data_table_with_full_columns
+    from ui_components_improved import (
+        create_data_table_with_full_columns, create_export_bar, create_server_side_table
+    )
     
     if df.empty:
         return html.Div("Keine Daten verfügbar", className="text-muted text-center p-4")
     
+    # Column visibility is applied via the table's hidden_columns property
+    # (clientside), so toggling never re-sends row data.
+    server_side = bool(source and dataset) and len(df) > SERVER_SIDE_ROW_THRESHOLD
+    if server_side:
+        table = create_server_side_table(df, table_id, source, dataset)
+    else:
+        table = create_data_table_with_full_columns(df, {'type': 'data-table', 'id': table_id})
+    
+    # Streaming export of the current selection (needs the dataset reference)
+    export_bar = None
+    if source and dataset:
+        export_bar = create_export_bar(table_id, 'server-table' if server_side else 'data-table',
+                                       source, dataset)
+    
     # Create container with toggle button and table
     container = html.Div([
         # Toggle button to show/hide the column panel
@@ -236,18 +264,12 @@ def create_enhanced_data_table(df, table_id):
             is_open=False
         ),
         
+        export_bar if export_bar else html.Div(),
+        
         # The actual data table container - initialize with full table
         html.Div(
             id={'type': 'table-container', 'id': table_id},
-            children=[
-                create_data_table_with_full_columns(df, table_id)
-            ]
-        ),
-        
-        # Store for the dataframe
-        dcc.Store(
-            id={'type': 'table-data-store', 'id': table_id},
-            data=df.to_dict('records')
+            children=[table]
         )
     ])
     
@@ -0,0 +1,68 @@
+"""
+Comparison Callbacks
+====================
+Überlagert Kanäle aus verschiedenen Quellen in der Vergleichsansicht.
+Die Ausrichtung auf das gemeinsame Zeitraster übernimmt die
+Vergleichs-Engine (comparison_engine) mit der gewählten Aggregation
+(resampling_engine), das Diagramm create_comparison_chart.
+"""
+
+import time
+
+from dash import Input, Output, dcc
+import dash_bootstrap_components as dbc
+
+from instrumentation import section
+
+
+def register_comparison_callbacks(app, ALL_DATA):
+    """Registriert die Callbacks der Vergleichsansicht"""
+
+    @app.callback(
+        [Output("comparison-chart-container", "children"),
+         Output("comparison-info", "children")],
+        [Input("comparison-channels", "value"),
+         Input("comparison-date-range", "start_date"),
+         Input("comparison-date-range", "end_date"),
+         Input("comparison-resolution", "value"),
+         Input("comparison-method", "value"),
+         Input("comparison-chart-type", "value")]
+    )
+    def update_comparison_chart(channel_values, start_date, end_date, resolution, method, chart_type):
+        """Richtet die gewählten Kanäle aus und zeichnet das Vergleichsdiagramm"""
+        if not channel_values:
+            return dbc.Alert("Bitte wählen Sie mindestens einen Kanal aus", color="info"), ""
+        import pandas as pd
+        from comparison_engine import SOURCE_LABELS, align_channels, channel_label, parse_channel_value
+        from payload_encoder import encode_figure
+        from resampling_engine import RESAMPLE_METHODS
+        from ui_components_improved import create_comparison_chart
+
+        t0 = time.perf_counter()
+        channels = [parse_channel_value(value) for value in channel_values]
+        # Enddatum inklusive (DatePicker liefert nur das Datum)
+        end = pd.Timestamp(end_date) + pd.Timedelta(days=1) - pd.Timedelta(1, 'ns') if end_date else None
+        with section('data'):
+            aligned, used_resolution = align_channels(
+                ALL_DATA, channels,
+                start=pd.Timestamp(start_date) if start_date else None,
+                end=end,
+                resolution=None if resolution in (None, 'auto') else resolution,
+                method=method or 'mean'
+            )
+        if aligned.empty:
+            return dbc.Alert("Für die gewählten Kanäle liegen keine Zeitreihen vor", color="warning"), ""
+
+        dataframes, labels = [], []
+        for source, dataset, column in channels:
+            label = channel_label(source, dataset, column)
+            if label in aligned.columns:
+                dataframes.append(pd.DataFrame({'Date': aligned.index, column: aligned[label].to_numpy()}))
+                labels.append(f"{SOURCE_LABELS.get(source, source)} / {dataset}")
+
+        with section('figure'):
+            fig = create_comparison_chart(dataframes, labels, chart_type or 'line')
+        elapsed = (time.perf_counter() - t0) * 1000
+        info = (f"{len(dataframes)} Kanäle auf {len(aligned):,} Rasterpunkte "
+                f"({used_resolution}, {RESAMPLE_METHODS.get(method or 'mean')}) ausgerichtet - {elapsed:.0f} ms")
+        return dcc.Graph(figure=encode_figure(fig), config={'displayModeBar': True}), info
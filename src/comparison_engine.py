@@ -0,0 +1,188 @@
+"""
+Vergleichs-Engine für die Vergleichsansicht
+===========================================
+Richtet Kanäle aus verschiedenen Quellen (z.B. FIS Außentemperatur,
+Erentrudis Heizkreise, Twin2Sim Wetter) auf ein gemeinsames Zeitraster aus.
+
+- Rasterauflösung wird aus dem Punktbudget gewählt (Zeitspanne / Budget)
+- Aggregation pro Rasterzelle über die Resampling-Engine (Mittelwert,
+  letzter Wert, zeitgewichteter Mittelwert, Integral)
+- Grobe Quellen (z.B. Tageswerte) werden mit dem letzten Messwert auf das
+  feinere Raster übertragen, höchstens für ihr eigenes Messintervall
+- Ausgerichtete Frames werden im LRU-Cache gehalten
+- Zeiträume und Kanallisten werden pro Dataset-Signatur gecacht, damit
+  ausgelagerte Datasets (dataset_memory) nicht nachgeladen werden
+"""
+
+import json
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from dataset_memory import dataset_signature
+from dataset_registry import REGISTRY
+from resampling_engine import regular_grid, resample_arrays
+from time_axis import find_time_column, get_time_axis, time_bounds
+
+
+# Wählbare Rasterauflösungen (aufsteigend)
+NICE_RESOLUTIONS = ['1min', '5min', '15min', '30min', '1h', '3h', '6h', '12h', '1D', '7D', '30D']
+
+DEFAULT_POINT_BUDGET = 2000
+_ALIGN_CACHE_MAX = 16
+_ALIGN_CACHE = OrderedDict()
+_SUMMARY_CACHE = {}
+
+SOURCE_LABELS = REGISTRY.source_labels()
+
+
+def channel_value(source, dataset, column):
+    """Kodiert einen Kanal als Dropdown-Wert"""
+    return json.dumps([source, dataset, column], ensure_ascii=False)
+
+
+def parse_channel_value(value):
+    """Dekodiert einen Dropdown-Wert in (source, dataset, column)"""
+    source, dataset, column = json.loads(value)
+    return source, dataset, column
+
+
+def channel_label(source, dataset, column):
+    """Lesbare Bezeichnung eines Kanals"""
+    return f"{SOURCE_LABELS.get(source, source)} / {dataset}: {column}"
+
+
+def _summarize_dataset(source, dataset, df):
+    """Zeitraum und numerische Kanäle eines Datasets"""
+    time_col = find_time_column(df) if df is not None and not df.empty else None
+    if not time_col:
+        return {'time_range': None, 'channels': []}
+    channels = [{'label': channel_label(source, dataset, col),
+                 'value': channel_value(source, dataset, col)}
+                for col in df.columns
+                if col != time_col and pd.api.types.is_numeric_dtype(df[col])
+                and not pd.api.types.is_bool_dtype(df[col])]
+    return {'time_range': dataset_time_range(df), 'channels': channels}
+
+
+def dataset_summaries(all_data):
+    """{(source, dataset): {'time_range', 'channels'}}, gecacht pro Dataset-Signatur"""
+    summaries = {}
+    for source, datasets in all_data.items():
+        for dataset in datasets:
+            key = (source, dataset)
+            signature = dataset_signature(datasets, dataset)
+            cached = _SUMMARY_CACHE.get(key)
+            if cached is None or cached[0] != signature:
+                cached = (signature, _summarize_dataset(source, dataset, datasets.get(dataset)))
+                _SUMMARY_CACHE[key] = cached
+            summaries[key] = cached[1]
+    return summaries
+
+
+def list_comparison_channels(all_data):
+    """Alle numerischen Kanäle mit Zeitspalte als Dropdown-Optionen"""
+    return [option for summary in dataset_summaries(all_data).values() for option in summary['channels']]
+
+
+def default_comparison_channels(options, max_channels=3):
+    """Vorauswahl: je Quelle der erste Temperaturkanal"""
+    selected, used_sources = [], set()
+    for option in options:
+        source, _, column = parse_channel_value(option['value'])
+        if source not in used_sources and 'temp' in column.lower():
+            selected.append(option['value'])
+            used_sources.add(source)
+        if len(selected) >= max_channels:
+            break
+    return selected
+
+
+def dataset_time_range(df):
+    """(Start, Ende) der Zeitachse eines Datasets oder None"""
+    return time_bounds(df)
+
+
+def choose_resolution(start, end, point_budget=DEFAULT_POINT_BUDGET):
+    """Kleinste Rasterauflösung, bei der die Zeitspanne ins Punktbudget passt"""
+    span = pd.Timestamp(end) - pd.Timestamp(start)
+    for resolution in NICE_RESOLUTIONS:
+        if span / pd.Timedelta(resolution) <= point_budget:
+            return resolution
+    return NICE_RESOLUTIONS[-1]
+
+
+def _slice_channel(df, axis, column, start_ns, end_ns):
+    """Schneidet Zeit- und Wertarray über die Zeitachse auf [start, end]"""
+    i0, i1 = axis.index_range(start_ns, end_ns)
+    t = axis.values[i0:i1]
+    v = df[column].iloc[axis.indexer(i0, i1)].to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = ~np.isnan(v)
+    return t[valid], v[valid]
+
+
+def _dataset_signature(df):
+    """Günstige Signatur eines Datasets für den Cache-Key"""
+    return (id(df), len(df), len(df.columns))
+
+
+def align_channels(all_data, channels, start=None, end=None,
+                   point_budget=DEFAULT_POINT_BUDGET, resolution=None, method='mean'):
+    """
+    Richtet Kanäle auf ein gemeinsames Zeitraster aus.
+
+    Args:
+        all_data: ALL_DATA-Struktur {source: {dataset: DataFrame}}
+        channels: Liste von (source, dataset, column)
+        start, end: Zeitfenster (Default: Vereinigung der Kanal-Zeiträume)
+        point_budget: Maximale Anzahl Rasterpunkte
+        resolution: Feste Auflösung (z.B. '1h'); None = aus Budget wählen
+        method: Aggregation pro Rasterzelle (siehe RESAMPLE_METHODS)
+
+    Returns:
+        (DataFrame mit DatetimeIndex und einer Spalte pro Kanal, Auflösung)
+    """
+    frames = []
+    for source, dataset, column in channels:
+        df = all_data.get(source, {}).get(dataset)
+        if df is None or df.empty or column not in df.columns:
+            continue
+        axis = get_time_axis(df)
+        if axis is not None and len(axis):
+            frames.append((source, dataset, column, df, axis))
+
+    if not frames:
+        return pd.DataFrame(), resolution
+
+    if start is None or end is None:
+        ranges = [dataset_time_range(df) for _, _, _, df, _ in frames]
+        start = start or min(r[0] for r in ranges)
+        end = end or max(r[1] for r in ranges)
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    resolution = resolution or choose_resolution(start, end, point_budget)
+
+    cache_key = (
+        tuple((s, d, c, _dataset_signature(df)) for s, d, c, df, _ in frames),
+        start, end, resolution, method
+    )
+    if cache_key in _ALIGN_CACHE:
+        _ALIGN_CACHE.move_to_end(cache_key)
+        return _ALIGN_CACHE[cache_key], resolution
+
+    grid_start_ns, step_ns, n_bins = regular_grid(start, end, resolution)
+
+    aligned = {}
+    for source, dataset, column, df, axis in frames:
+        t, v = _slice_channel(df, axis, column, grid_start_ns, end.as_unit('ns').value)
+        aligned[channel_label(source, dataset, column)] = resample_arrays(
+            t, v, grid_start_ns, step_ns, n_bins, method
+        )[:, 0]
+
+    index = pd.date_range(pd.Timestamp(grid_start_ns), periods=n_bins, freq=pd.Timedelta(resolution), name='Date')
+    result = pd.DataFrame(aligned, index=index)
+
+    _ALIGN_CACHE[cache_key] = result
+    if len(_ALIGN_CACHE) > _ALIGN_CACHE_MAX:
+        _ALIGN_CACHE.popitem(last=False)
+    return result, resolution
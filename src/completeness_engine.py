@@ -0,0 +1,241 @@
+"""
+Vollständigkeits-Engine
+=======================
+Erkennt Datenlücken pro Kanal und berechnet die Vollständigkeit pro Kanal
+und Tag (Grundlage der Qualitätskarte Kanal x Zeit):
+
+- Messintervall: Median der Zeitstempel-Abstände auf der Zeitachse
+- Abtastlücken: Abstände > GAP_FACTOR x Intervall (betreffen alle Kanäle)
+- Fehlwerte: Null-Masken pro Kanal, lauflängenkodiert (Start, Länge)
+- Vollständigkeit pro Kanal und Tag: vorhandene Werte / erwartete
+  Messpunkte, in einem Durchlauf per np.add.reduceat über die Tagesgrenzen
+  der sortierten Zeitachse (Kanäle blockweise als 2D-Maske)
+
+Berichte werden pro Dataset-Version gecacht, damit die Qualitätskarte
+(auch für FIS mit 111 Kanälen) beim erneuten Öffnen sofort erscheint.
+
+Beispiel:
+    report = completeness_report(df)
+    report.completeness       # float32, Kanäle x Tage (0..1)
+    report.gap_table()        # längste Lücken als DataFrame
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from dataset_version import dataset_version
+from time_axis import get_time_axis
+
+
+DAY_NS = 86_400 * 10**9
+GAP_FACTOR = 1.5          # Abstand > 1,5 Intervalle gilt als Abtastlücke
+CHANNEL_BLOCK = 64        # Kanäle pro 2D-Block (begrenzt den Speicherbedarf)
+ALL_CHANNELS = 'Alle Kanäle'
+
+_REPORT_CACHE_MAX = 16
+_REPORT_CACHE = OrderedDict()
+_REPORT_LOCK = threading.Lock()
+
+
+def measurement_channels(df, time_col):
+    """Numerische Messkanäle (ohne Zeit- und Bool-Spalten)"""
+    return [col for col in df.columns
+            if col != time_col and pd.api.types.is_numeric_dtype(df[col])
+            and not pd.api.types.is_bool_dtype(df[col])]
+
+
+def _sampling_interval(times):
+    """Typisches Messintervall (Median der positiven Abstände) in ns"""
+    diffs = np.diff(times)
+    diffs = diffs[diffs > 0]
+    return int(np.median(diffs)) if len(diffs) else 0
+
+
+def run_lengths(missing):
+    """
+    Lauflängen der True-Blöcke einer 2D-Maske (Zeilen x Kanäle).
+
+    Returns:
+        (kanal, start, länge) als Arrays, sortiert nach Kanal und Start
+    """
+    n_rows, n_cols = missing.shape
+    edge = np.zeros((1, n_cols), dtype=np.int8)
+    steps = np.diff(np.vstack([edge, missing.astype(np.int8), edge]), axis=0)
+    start_cols, starts = np.nonzero(steps.T == 1)
+    _, ends = np.nonzero(steps.T == -1)
+    return start_cols, starts.astype(np.int64), (ends - starts).astype(np.int64)
+
+
+class CompletenessReport:
+    """Lücken und Vollständigkeit eines Datasets"""
+
+    def __init__(self, version, time_column, interval_ns, times, channels, days, expected,
+                 completeness, valid_counts, sampling_gaps, null_runs):
+        self.version = version
+        self.time_column = time_column
+        self.interval_ns = interval_ns
+        self.times = times                  # sortierte Zeitachse (int64-ns)
+        self.channels = channels
+        self.days = days                    # DatetimeIndex (Tagesbeginn)
+        self.expected = expected            # erwartete Messpunkte pro Tag
+        self.completeness = completeness    # float32, Kanäle x Tage
+        self.valid_counts = valid_counts    # vorhandene Werte pro Kanal
+        self.sampling_gaps = sampling_gaps  # (start_ns, ende_ns, fehlende Punkte)
+        self.null_runs = null_runs          # {kanal: (start_pos, länge)}
+
+    @property
+    def overall(self):
+        """Vollständigkeit pro Kanal über den gesamten Zeitraum (0..1)"""
+        total = max(int(self.expected.sum()), 1)
+        return np.minimum(self.valid_counts / total, 1.0)
+
+    def channel_summary(self):
+        """Eine Zeile pro Kanal: Vollständigkeit, Anzahl und längste Lücke"""
+        rows = []
+        for i, channel in enumerate(self.channels):
+            starts, lengths = self.null_runs[channel]
+            longest = 0.0
+            if len(lengths):
+                durations = self._run_durations_ns(starts, lengths)
+                longest = durations.max() / 3.6e12
+            rows.append({
+                'Kanal': channel,
+                'Vollständigkeit (%)': round(float(self.overall[i]) * 100, 1),
+                'Lücken': int(len(lengths)),
+                'Längste Lücke (h)': round(float(longest), 2)
+            })
+        return pd.DataFrame(rows)
+
+    def _run_durations_ns(self, starts, lengths):
+        """Dauer einer Fehlwert-Folge: letzter gültiger bis nächster gültiger Zeitpunkt"""
+        n = len(self.times)
+        before = self.times[np.maximum(starts - 1, 0)]
+        after_pos = starts + lengths
+        after = np.where(after_pos < n, self.times[np.minimum(after_pos, n - 1)],
+                         self.times[-1] + self.interval_ns)
+        return after - before
+
+    def gap_table(self, min_samples=1, limit=500):
+        """
+        Lücken (Abtastlücken aller Kanäle und Fehlwert-Folgen pro Kanal),
+        längste zuerst.
+        """
+        frames = []
+        gap_start, gap_end, gap_missing = self.sampling_gaps
+        keep = gap_missing >= min_samples
+        if keep.any():
+            frames.append(pd.DataFrame({
+                'Kanal': ALL_CHANNELS,
+                'Beginn': gap_start[keep],
+                'Ende': gap_end[keep],
+                'Fehlende Werte': gap_missing[keep]
+            }))
+        for channel in self.channels:
+            starts, lengths = self.null_runs[channel]
+            keep = lengths >= min_samples
+            if not keep.any():
+                continue
+            starts, lengths = starts[keep], lengths[keep]
+            frames.append(pd.DataFrame({
+                'Kanal': channel,
+                'Beginn': self.times[starts],
+                'Ende': self.times[starts + lengths - 1],
+                'Fehlende Werte': lengths
+            }))
+        if not frames:
+            return pd.DataFrame({
+                'Kanal': pd.Series(dtype=object),
+                'Beginn': pd.Series(dtype='datetime64[ns]'),
+                'Ende': pd.Series(dtype='datetime64[ns]'),
+                'Dauer (h)': pd.Series(dtype=float),
+                'Fehlende Werte': pd.Series(dtype=int)
+            })
+
+        table = pd.concat(frames, ignore_index=True)
+        table['Dauer (h)'] = ((table['Ende'] - table['Beginn'] + self.interval_ns) / 3.6e12).round(2)
+        table['Beginn'] = pd.to_datetime(table['Beginn'])
+        table['Ende'] = pd.to_datetime(table['Ende'])
+        table = table.sort_values(['Fehlende Werte', 'Beginn'], ascending=[False, True], kind='stable')
+        return table[['Kanal', 'Beginn', 'Ende', 'Dauer (h)', 'Fehlende Werte']].head(limit).reset_index(drop=True)
+
+
+def compute_completeness(df):
+    """Berechnet den Vollständigkeitsbericht (ohne Cache); None ohne Zeitachse"""
+    axis = get_time_axis(df)
+    if axis is None or len(axis) < 2:
+        return None
+    times = axis.values
+    interval = _sampling_interval(times)
+    if interval <= 0:
+        return None
+
+    # Tagesgrenzen auf der sortierten Zeitachse
+    first_day = times[0] - times[0] % DAY_NS
+    n_days = int((times[-1] - first_day) // DAY_NS) + 1
+    day_starts = first_day + np.arange(n_days, dtype=np.int64) * DAY_NS
+    boundaries = np.searchsorted(times, day_starts, side='left')
+    empty_days = np.diff(np.append(boundaries, len(times))) == 0
+
+    # Erwartete Messpunkte pro Tag (erster/letzter Tag nur anteilig)
+    lo = np.maximum(day_starts, times[0])
+    hi = np.minimum(day_starts + DAY_NS, times[-1] + interval)
+    expected = np.maximum(-(-(hi - lo) // interval), 1)
+
+    # Abtastlücken (alle Kanäle)
+    diffs = np.diff(times)
+    gap_idx = np.flatnonzero(diffs > GAP_FACTOR * interval)
+    sampling_gaps = (times[gap_idx] + interval, times[gap_idx + 1] - interval,
+                     (diffs[gap_idx] // interval - 1).astype(np.int64))
+
+    channels = measurement_channels(df, axis.column)
+    completeness = np.zeros((len(channels), n_days), dtype=np.float32)
+    valid_counts = np.zeros(len(channels), dtype=np.int64)
+    null_runs = {}
+
+    for block_start in range(0, len(channels), CHANNEL_BLOCK):
+        block = channels[block_start:block_start + CHANNEL_BLOCK]
+        sub = df[block]
+        if not axis.is_identity:
+            sub = sub.iloc[axis.order]
+        valid = sub.notna().to_numpy()
+
+        counts = np.add.reduceat(valid, boundaries, axis=0, dtype=np.int64)
+        counts[empty_days] = 0
+        rows = slice(block_start, block_start + len(block))
+        completeness[rows] = np.minimum(counts.T / expected, 1.0)
+        valid_counts[rows] = valid.sum(axis=0)
+
+        cols, starts, lengths = run_lengths(~valid)
+        split = np.searchsorted(cols, np.arange(len(block) + 1))
+        for i, channel in enumerate(block):
+            null_runs[channel] = (starts[split[i]:split[i + 1]], lengths[split[i]:split[i + 1]])
+
+    return CompletenessReport(
+        version=None, time_column=axis.column, interval_ns=interval, times=times,
+        channels=channels, days=pd.DatetimeIndex(day_starts), expected=expected,
+        completeness=completeness, valid_counts=valid_counts,
+        sampling_gaps=sampling_gaps, null_runs=null_runs
+    )
+
+
+def completeness_report(df):
+    """Vollständigkeitsbericht, gecacht pro Dataset-Version"""
+    if df is None or df.empty:
+        return None
+    version = dataset_version(df)
+    with _REPORT_LOCK:
+        if version in _REPORT_CACHE:
+            _REPORT_CACHE.move_to_end(version)
+            return _REPORT_CACHE[version]
+
+    report = compute_completeness(df)
+    if report is not None:
+        report.version = version
+    with _REPORT_LOCK:
+        _REPORT_CACHE[version] = report
+        if len(_REPORT_CACHE) > _REPORT_CACHE_MAX:
+            _REPORT_CACHE.popitem(last=False)
+    return report
@@ -2,6 +2,14 @@
 MokiG Dashboard - Energiemonitoring
 ====================================
 ORIGINALE VERSION mit optimiertem Datenlade-Verhalten
+
+Schnellstart (MOKIG_FAST_START=1 oder --fast-start): der Server antwortet
+sofort, Übersichtskarten und Dataset-Auswahl kommen aus dem Katalog-Snapshot
+des letzten Starts (catalog_snapshot), die Daten werden im Hintergrund
+geladen. Callbacks und Exporte, die Daten brauchen, warten so lange.
+pandas, Loader, Engines und UI-Bausteine werden erst beim Laden bzw. in den
+Callbacks importiert: für '/' reichen Dash und der Katalog-Snapshot.
+Startzeit messen: python src/startup_profile.py (Port: MOKIG_PORT, Default 8050)
 """
 
 import sys
@@ -12,97 +20,161 @@ src_path = Path(__file__).parent
 if str(src_path) not in sys.path:
     sys.path.insert(0, str(src_path))
 
+import os
+import threading
+import traceback
+
 import dash
 from dash import dcc, html, Input, Output, State, callback_context
 import dash_bootstrap_components as dbc
-from pathlib import Path
-import pandas as pd
-import traceback
+from flask import Response, request
 
-# Importiere eigene Module
-from data_loader_optimized import OptimizedDataLoader  # NEU: Optimierter Loader
-from ui_components_improved import (
-    create_navbar, 
-    create_metric_card,
-    create_data_table_with_full_columns,
-    create_statistics_panel,
-    get_dataset_description,
-    COLORS
-)
+# Importiere eigene Module (nur ohne pandas; der Rest in den Funktionen)
+from layout_components import COLORS, create_metric_card, create_navbar
 from callbacks_improved import register_callbacks
-# Visualization wird bei Bedarf importiert
+from background_jobs import create_background_manager
+from response_compression import register_response_compression
+from instrumentation import install_instrumentation, register_instrumentation_routes
+from performance_callbacks import performance_extras
+from query_callbacks import register_query_callbacks
+from export_service import EXPORT_URL, register_export_routes
+from dataset_memory import MEMORY_MANAGER, TieredDatasets
+from dataset_registry import REGISTRY
+from catalog_snapshot import catalog_add, catalog_rows, load_snapshot, save_snapshot
 
 # ============================================================================
 # APP INITIALISIERUNG
 # ============================================================================
 
+# Lokaler Job-Manager für Background-Callbacks (schwere Ladepfade)
+background_manager = create_background_manager(Path(__file__).parent.parent)
+
 app = dash.Dash(
     __name__, 
     external_stylesheets=[dbc.themes.BOOTSTRAP, dbc.icons.FONT_AWESOME],
-    suppress_callback_exceptions=True
+    suppress_callback_exceptions=True,
+    background_callback_manager=background_manager
 )
 app.title = "MokiG Dashboard - Energiemonitoring"
 
+# Kompression (Brotli/gzip) und ETag-Validierung
+register_response_compression(app.server)
+
+# Callback-Instrumentierung (nur aktiv mit MOKIG_INSTRUMENTATION=1); muss vor
+# dem Registrieren der Callbacks installiert werden
+install_instrumentation(app)
+register_instrumentation_routes(app.server, extra_metrics=performance_extras)
+
 # ============================================================================
 # DATEN LADEN - MIT OPTIMIERTEM LOADER
 # ============================================================================
 
-import os
+# Schnellstart: Layout aus dem Katalog-Snapshot, Daten im Hintergrund
+FAST_START = os.environ.get('MOKIG_FAST_START') == '1' or '--fast-start' in sys.argv
+
+# Wie lange datenabhängige Requests im Schnellstart auf das Laden warten
+DATA_WAIT_TIMEOUT_S = 600
+
+# Schnellstart ohne Request: Laden beginnt so lange nach dem Binden
+DATA_LOAD_DELAY_S = 2.0
+
+BASE_PATH = Path(__file__).parent.parent
+
+
+def get_data_loader():
+    """OptimizedDataLoader (beim ersten Aufruf erzeugt, importiert pandas)"""
+    global _data_loader
+    with _data_loader_lock:
+        if _data_loader is None:
+            from data_loader_optimized import OptimizedDataLoader  # NEU: Optimierter Loader
+            _data_loader = OptimizedDataLoader(BASE_PATH)
+        return _data_loader
+
+
+_data_loader_lock = threading.Lock()
+_data_loader = None
+
+
+def load_all_data():
+    """
+    Lädt alle Datasets nach ALL_DATA, aktualisiert den Katalog (und dessen
+    Snapshot für den nächsten Schnellstart) sowie den Kanalkatalog für die
+    Kanalsuche und materialisiert die KPIs.
+    Setzt DATA_READY auch im Fehlerfall, damit wartende Requests weiterlaufen.
+    """
+    global CATALOG
+    try:
+        from channel_catalog import CHANNEL_CATALOG
+        from data_loader_optimized import iter_dashboard_datasets
+        from kpi_engine import KPI_ENGINE
+        from payload_encoder import configure_fast_json
+        
+        # Schneller JSON-Serializer für NumPy-Arrays im Callback-Pfad
+        configure_fast_json()
+        
+        data_loader = get_data_loader()
+        catalog = {source.id: {} for source in REGISTRY.sources}
+        for source, dataset, df, reload in iter_dashboard_datasets(data_loader):
+            ALL_DATA[source].put(dataset, df, reload=reload)
+            catalog_add(catalog, source, dataset, df)
+            CHANNEL_CATALOG.add_dataset(source, dataset, df, data_loader.channel_descriptions(source, dataset))
+        
+        # Loader-Cache freigeben: die Datasets liegen jetzt (nur) in ALL_DATA
+        data_loader.clear_cache()
+        CATALOG = catalog
+        try:
+            save_snapshot(catalog, REGISTRY)
+        except OSError as e:
+            print(f"[WARNUNG] Katalog-Snapshot nicht gespeichert: {e}")
+        
+        # KPIs für alle Datasets einmalig materialisieren
+        kpi_table = KPI_ENGINE.refresh(ALL_DATA)
+        if os.environ.get('WERKZEUG_RUN_MAIN') != 'true':
+            print(f"KPI-Tabelle berechnet: {len(kpi_table):,} Zeilen")
+            memory = MEMORY_MANAGER.state()
+            print(f"Speicher: {memory['hot_mb']:,.1f} MB Daten im Speicher "
+                  f"(Budget {memory['budget_mb']:,.0f} MB), RSS {memory['rss_mb']:,.1f} MB")
+    finally:
+        DATA_READY.set()
+
+
+def start_data_loading():
+    """
+    Schnellstart: lädt die Daten in einem Hintergrund-Thread (einmalig). Wird
+    nach der ersten Antwort gestartet (oder DATA_LOAD_DELAY_S nach dem
+    Binden), damit die Imports von pandas & Co. nicht mit der ersten Antwort
+    um den Interpreter konkurrieren; sofort, wenn ein Request Daten braucht.
+    """
+    global _load_thread
+    with _load_lock:
+        if _load_thread is None and not DATA_READY.is_set():
+            _load_thread = threading.Thread(target=load_all_data, name="mokig-data-load", daemon=True)
+            _load_thread.start()
+
+
+_load_lock = threading.Lock()
+_load_thread = None
+
 
 # Nur einmal laden, nicht bei jedem Import
 if not hasattr(sys.modules[__name__], '_data_loaded'):
-    BASE_PATH = Path(__file__).parent.parent
-    
-    # NEU: Verwende OptimizedDataLoader statt DataLoader
-    data_loader = OptimizedDataLoader(BASE_PATH)
-    
     # Nur ausgeben wenn nicht im Reload-Modus
     if os.environ.get('WERKZEUG_RUN_MAIN') != 'true':
         print("\n" + "="*60)
         print("MokiG Dashboard wird gestartet...")
         print("="*60)
-        print("Lade Datenquellen...")
-    
-    # Lade alle Daten mit dem optimierten Loader
-    ALL_DATA = {
-        'twin2sim': {},
-        'erentrudis': {},
-        'fis': {},
-        'kw': {}
-    }
+        print("Lade Datenquellen..." if not FAST_START else
+              "Schnellstart: Layout aus dem Katalog-Snapshot, Daten werden im Hintergrund geladen")
     
-    # Twin2Sim Daten
-    for dataset in ['intpv', 'lüftung', 'manipv', 'rau006', 'wetterdaten']:
-        df = data_loader.load_dataset_optimized('twin2sim', dataset)
-        if df is not None and not df.empty:
-            ALL_DATA['twin2sim'][dataset] = df
+    # Pro Quelle ein Speicher mit Budget und Tiering (kalte Datasets werden
+    # ausgelagert/verworfen); CATALOG hält Zeilen, Spalten und Zeitraum
+    ALL_DATA = {source.id: TieredDatasets(source.id) for source in REGISTRY.sources}
+    CATALOG = (load_snapshot(REGISTRY) if FAST_START else None) or {}
+    DATA_READY = threading.Event()
     
-    # Erentrudisstraße Daten
-    for dataset in ['gesamtdaten_2024', 'detail_juli_2024', 'langzeit_2023_2025']:
-        df = data_loader.load_dataset_optimized('erentrudis', dataset)
-        if df is not None and not df.empty:
-            ALL_DATA['erentrudis'][dataset] = df
-    
-    # FIS Inhauser Daten
-    for dataset in ['export_q1_2025', 'data_2024_2025_at']:
-        df = data_loader.load_dataset_optimized('fis', dataset)
-        if df is not None and not df.empty:
-            ALL_DATA['fis'][dataset] = df
-    
-    # KW Neukirchen Daten - Lade ALLE Jahre (2020-2024)
-    from load_kw_aggregated import aggregate_all_kw_data
-    kw_data = aggregate_all_kw_data(BASE_PATH)
-    for dataset_name, df in kw_data.items():
-        if not df.empty:
-            ALL_DATA['kw'][dataset_name] = df
-    
-    # Falls keine KW-Daten über aggregate_all_kw_data geladen wurden, verwende Fallback
-    if not ALL_DATA['kw']:
-        print("⚠️ Verwende Fallback für KW Neukirchen...")
-        for dataset in ['kw_duernbach_gesamt', 'kw_untersulzbach_gesamt', 'kw_wiesbach_gesamt']:
-            df = data_loader.load_dataset_optimized('kw', dataset)
-            if df is not None and not df.empty:
-                ALL_DATA['kw'][dataset] = df
+    # Im Schnellstart startet das Laden erst mit dem Server (start_data_loading)
+    if not FAST_START:
+        load_all_data()
     
     sys.modules[__name__]._data_loaded = True
 else:
@@ -116,87 +188,102 @@ else:
 # ============================================================================
 
 def create_overview_cards():
-    """Erstellt die Übersichtskarten für alle Datenquellen"""
+    """Erstellt die Übersichtskarten für alle Datenquellen (aus dem Katalog)"""
     try:
         return dbc.Row([
             dbc.Col([
                 create_metric_card(
-                    "Twin2Sim",
-                    sum(len(df) for df in ALL_DATA.get('twin2sim', {}).values() if not df.empty),
-                    f"{len([df for df in ALL_DATA.get('twin2sim', {}).values() if not df.empty])} Datasets",
-                    "primary",
-                    "chart-area"
-                )
-            ], width=6, md=3),
-            dbc.Col([
-                create_metric_card(
-                    "Erentrudisstraße",
-                    sum(len(df) for df in ALL_DATA.get('erentrudis', {}).values() if not df.empty),
-                    f"{len([df for df in ALL_DATA.get('erentrudis', {}).values() if not df.empty])} Datasets",
-                    "info",
-                    "building"
-                )
-            ], width=6, md=3),
-            dbc.Col([
-                create_metric_card(
-                    "FIS Inhauser",
-                    sum(len(df) for df in ALL_DATA.get('fis', {}).values() if not df.empty),
-                    f"{len([df for df in ALL_DATA.get('fis', {}).values() if not df.empty])} Datasets",
-                    "warning",
-                    "industry"
+                    source.label,
+                    sum(catalog_rows(CATALOG, source.id).values()),
+                    f"{len(CATALOG[source.id])} Datasets",
+                    source.color,
+                    source.icon
+                ) if source.id in CATALOG else create_metric_card(
+                    source.label, "…", "Daten werden geladen", source.color, source.icon
                 )
-            ], width=6, md=3),
-            dbc.Col([
-                create_metric_card(
-                    "KW Neukirchen",
-                    sum(len(df) for df in ALL_DATA.get('kw', {}).values() if not df.empty),
-                    f"{len([df for df in ALL_DATA.get('kw', {}).values() if not df.empty])} Datasets",
-                    "success",
-                    "bolt"
-                )
-            ], width=6, md=3)
+            ], width=6, md=max(12 // len(REGISTRY.sources), 2))
+            for source in REGISTRY.sources
         ], className="mb-4")
     except Exception as e:
         print(f"[FEHLER] in create_overview_cards: {e}")
         return html.Div(f"Fehler beim Erstellen der Übersichtskarten: {e}")
 
-app.layout = html.Div([
-    # Navigation
-    create_navbar(),
+def serve_layout():
+    """Layout pro Seitenaufruf: die Karten zeigen den aktuellen Katalog"""
+    return html.Div([
+        # Navigation
+        create_navbar(),
     
-    # Haupt-Container
-    dbc.Container([
-        # Übersichtskarten
-        create_overview_cards(),
+        # Haupt-Container
+        dbc.Container([
+            # Übersichtskarten
+            create_overview_cards(),
         
-        # Tab-Navigation mit dcc.Tabs für bessere Stabilität
-        dbc.Card([
-            dbc.CardBody([
-                dcc.Tabs(
-                    id="main-tabs",
-                    value="twin2sim",
-                    children=[
-                        dcc.Tab(label="Twin2Sim", value="twin2sim"),
-                        dcc.Tab(label="Erentrudisstraße", value="erentrudis"),
-                        dcc.Tab(label="FIS Inhauser", value="fis"),
-                        dcc.Tab(label="KW Neukirchen", value="kw"),
-                        dcc.Tab(label="Vergleichsansicht", value="comparison")
-                    ]
-                ),
+            # Tab-Navigation mit dcc.Tabs für bessere Stabilität
+            dbc.Card([
+                dbc.CardBody([
+                    dcc.Tabs(
+                        id="main-tabs",
+                        value=REGISTRY.sources[0].id,
+                        children=[
+                            dcc.Tab(label=source.label, value=source.id) for source in REGISTRY.sources
+                        ] + [
+                            dcc.Tab(label="Vergleichsansicht", value="comparison"),
+                            dcc.Tab(label="KPI-Übersicht", value="kpi"),
+                            # Versteckter Admin-Tab, sichtbar mit ?admin=1
+                            dcc.Tab(label="Performance", value="performance",
+                                    id="performance-tab", style={'display': 'none'})
+                        ]
+                    ),
                 
-                html.Hr(),
+                    html.Hr(),
                 
-                # Tab-Inhalt wird hier dynamisch geladen
-                html.Div(id="main-tab-content", className="mt-3")
-            ])
-        ], className="shadow-sm mb-4")
-    ], fluid=True),
+                    # Tab-Inhalt wird hier dynamisch geladen
+                    html.Div(id="main-tab-content", className="mt-3")
+                ])
+            ], className="shadow-sm mb-4")
+        ], fluid=True),
+    
+        # URL (für ?admin=1 - blendet den Performance-Tab ein)
+        dcc.Location(id="url", refresh=False),
     
-    # Hidden Stores für State Management
-    dcc.Store(id="current-source-store", data="twin2sim"),
-    dcc.Store(id="current-dataset-store"),
-    dcc.Store(id="tab-datasets-store", data={})
-], style={'backgroundColor': COLORS.get('background', '#f5f7fa')})
+        # Hidden Stores für State Management
+        dcc.Store(id="current-source-store", data=REGISTRY.sources[0].id),
+        dcc.Store(id="current-dataset-store"),
+        dcc.Store(id="tab-datasets-store", data={})
+    ], style={'backgroundColor': COLORS.get('background', '#f5f7fa')})
+
+
+app.layout = serve_layout
+
+
+@app.server.before_request
+def wait_for_data():
+    """
+    Schnellstart: Callbacks und Exporte warten, bis die Daten geladen sind.
+    Ausgenommen ist der Tab-Callback, der aus dem Katalog rendert.
+    """
+    if DATA_READY.is_set():
+        return None
+    if request.path == app.config.requests_pathname_prefix + '_dash-update-component':
+        body = request.get_json(silent=True) or {}
+        if 'main-tab-content.children' in body.get('output', ''):
+            return None
+    elif request.path != EXPORT_URL:
+        return None
+    start_data_loading()
+    if not DATA_READY.wait(DATA_WAIT_TIMEOUT_S):
+        return Response("Datasets werden noch geladen, bitte später erneut versuchen", status=503)
+    return None
+
+
+@app.server.after_request
+def load_after_response(response):
+    """Schnellstart: Laden beginnt, sobald die Antwort gesendet ist"""
+    if not DATA_READY.is_set():
+        response.call_on_close(start_data_loading)
+    return response
+
 
 # ============================================================================
 # HAUPTCALLBACK MIT VOLLSTÄNDIGER FEHLERBEHANDLUNG - WIE IM ORIGINAL
@@ -213,57 +300,48 @@ def update_main_tab(active_tab):
     """
     
     try:
+        from ui_components_improved import (
+            create_comparison_panel,
+            create_kpi_overview_panel,
+            create_performance_panel,
+            get_dataset_description
+        )
+        
+        # Vergleich und KPIs brauchen die Daten (Schnellstart: warten)
+        if active_tab in ("comparison", "kpi") and not DATA_READY.wait(DATA_WAIT_TIMEOUT_S):
+            return html.Div(
+                dbc.Alert("Datasets werden noch geladen, bitte später erneut öffnen.", color="info")
+            ), active_tab
+        
         # Spezialfall: Vergleichsansicht
         if active_tab == "comparison":
-            content = dbc.Card([
-                dbc.CardHeader([
-                    html.I(className="fas fa-chart-bar me-2"),
-                    "Datenquellen-Vergleich"
-                ]),
-                dbc.CardBody([
-                    dbc.Alert("Vergleichsansicht zeigt Übersicht über alle verfügbaren Datenquellen.", color="info"),
-                    dbc.Row([
-                        dbc.Col([
-                            html.H5("Verfügbare Datenquellen:", className="mb-3"),
-                            html.Ul([
-                                html.Li(f"Twin2Sim: {len(ALL_DATA.get('twin2sim', {}))} Datasets"),
-                                html.Li(f"Erentrudisstraße: {len(ALL_DATA.get('erentrudis', {}))} Datasets"),
-                                html.Li(f"FIS Inhauser: {len(ALL_DATA.get('fis', {}))} Datasets"),
-                                html.Li(f"KW Neukirchen: {len(ALL_DATA.get('kw', {}))} Datasets")
-                            ])
-                        ], md=6),
-                        dbc.Col([
-                            html.H5("Datenzeiträume:", className="mb-3"),
-                            html.Ul([
-                                html.Li("Twin2Sim: 2022-01-01 bis aktuell"),
-                                html.Li("Erentrudisstraße: 01.12.2023 bis 31.03.2025"),
-                                html.Li("FIS Inhauser: 31.12.2024 bis 31.05.2025"),
-                                html.Li("KW Neukirchen: 01.01.2020 bis 31.12.2024")
-                            ])
-                        ], md=6)
-                    ])
-                ])
-            ], className="shadow-sm")
+            content = create_comparison_panel(ALL_DATA)
             return content, "comparison"
         
-        # Hole Daten für den aktiven Tab
+        # Spezialfall: KPI-Übersicht (materialisierte Tabelle, inkrementell aktualisiert)
+        if active_tab == "kpi":
+            from kpi_engine import KPI_ENGINE
+            content = create_kpi_overview_panel(KPI_ENGINE.refresh(ALL_DATA))
+            return content, "kpi"
+        
+        # Spezialfall: Performance-Admin-Tab
+        if active_tab == "performance":
+            return create_performance_panel(), "performance"
+        
+        # Datasets des aktiven Tabs aus dem Katalog (ohne ausgelagerte
+        # Datasets nachzuladen; im Schnellstart aus dem Snapshot)
         
         if active_tab not in ALL_DATA:
             return html.Div(
                 dbc.Alert(f"Tab '{active_tab}' nicht gefunden in Daten.", color="danger")
             ), active_tab
         
-        datasets = ALL_DATA[active_tab]
-        
-        # Filtere leere Datasets
-        valid_datasets = {}
-        for k, v in datasets.items():
-            if hasattr(v, 'empty'):
-                if not v.empty:
-                    valid_datasets[k] = v
-            else:
-                pass  # Dataset ist kein DataFrame
+        # Ohne Snapshot (erster Schnellstart) auf die geladenen Daten warten
+        if active_tab not in CATALOG:
+            DATA_READY.wait(DATA_WAIT_TIMEOUT_S)
         
+        # Leere Datasets auslassen
+        valid_datasets = catalog_rows(CATALOG, active_tab)
         
         if not valid_datasets:
             content = html.Div(
@@ -271,53 +349,16 @@ def update_main_tab(active_tab):
             )
             return content, active_tab
         
-        # Erstelle Dataset-Optionen basierend auf Tab
+        # Dataset-Optionen in Registry-Reihenfolge mit deutschen Labels
+        source_spec = REGISTRY.source(active_tab)
+        ordered = [spec.id for spec in source_spec.datasets] if source_spec else []
+        ordered += [key for key in valid_datasets if key not in ordered]
         options = []
-        
-        if active_tab == "erentrudis":
-            # Deutsche Labels für Erentrudisstr
-            label_map = {
-                'gesamtdaten_2024': '📊 Jahresübersicht 2024 (89.202 Zeilen)',
-                'detail_juli_2024': '🌡️ Juli 2024 Detailanalyse (8.322 Zeilen)',
-                'langzeit_2023_2025': '📈 Langzeitdaten 2023-2025 (484 Zeilen)'
-            }
-            for key in valid_datasets:
-                label = label_map.get(key, f"{key} ({len(valid_datasets[key]):,} Zeilen)")
-                options.append({'label': label, 'value': key})
-                
-        elif active_tab == "fis":
-            # Deutsche Labels für FIS
-            label_map = {
-                'export_q1_2025': '🏢 Gebäudemonitoring Q1 2025 (22.806 Zeilen)',
-                'data_2024_2025_at': '🌡️ Außentemperatur 2024-2025 (54.154 Zeilen)'
-            }
-            for key in valid_datasets:
-                label = label_map.get(key, f"{key} ({len(valid_datasets[key]):,} Zeilen)")
-                options.append({'label': label, 'value': key})
-                
-        elif active_tab == "kw":
-            # Spezielle Gruppierung für KW Neukirchen mit deutschen Labels
-            label_map = {
-                'uebergabe_bezug_gesamt': 'Uebergabe Bezug - Gesamtdaten 2020-2024',
-                'uebergabe_lieferung_gesamt': 'Uebergabe Lieferung - Gesamtdaten 2020-2024',
-                'kw_duernbach_gesamt': 'Kraftwerk Duernbach - Erzeugung 2020-2024',
-                'kw_untersulzbach_gesamt': 'Kraftwerk Untersulzbach - Erzeugung 2020-2024',
-                'kw_wiesbach_gesamt': 'Kraftwerk Wiesbach - Erzeugung 2020-2024'
-            }
-            
-            # Erstelle gruppierte Optionen
-            for key in ['uebergabe_bezug_gesamt', 'uebergabe_lieferung_gesamt', 
-                       'kw_duernbach_gesamt', 'kw_untersulzbach_gesamt', 'kw_wiesbach_gesamt']:
-                if key in valid_datasets:
-                    df = valid_datasets[key]
-                    rows_count = len(df) if not df.empty else 0
-                    label = f"{label_map.get(key, key)} ({rows_count:,} Datenpunkte)"
-                    options.append({'label': label, 'value': key})
-                
-        else:
-            # Standard Labels für andere Tabs
-            for key, df in valid_datasets.items():
-                options.append({'label': f"{key} ({len(df):,} Zeilen)", 'value': key})
+        for key in ordered:
+            if key in valid_datasets:
+                spec = source_spec.dataset(key) if source_spec else None
+                label = spec.display_label if spec else key
+                options.append({'label': f"{label} ({valid_datasets[key]:,} Zeilen)", 'value': key})
         
         
         # Erstelle den Tab-Content
@@ -358,10 +399,26 @@ def update_main_tab(active_tab):
                             id="load-dataset-btn",
                             color="primary",
                             className="w-100"
+                        ),
+                        dbc.Button(
+                            [html.I(className="fas fa-times me-2"), "Abbrechen"],
+                            id="cancel-load-btn",
+                            color="secondary",
+                            outline=True,
+                            size="sm",
+                            className="w-100 mt-2",
+                            disabled=True
                         )
                     ], md=4)
                 ]),
                 
+                # Fortschritt des Hintergrund-Ladejobs
+                html.Div([
+                    dbc.Progress(id="dataset-load-progress", value=0, label="",
+                                 striped=True, animated=True, className="mt-3"),
+                    html.Small(id="dataset-load-status", className="text-muted")
+                ], id="dataset-load-progress-container", style={'display': 'none'}),
+                
                 html.Hr(),
                 
                 # Container für Dataset-Content mit Loading Indicator
@@ -369,7 +426,11 @@ def update_main_tab(active_tab):
                     id="loading-dataset",
                     type="circle",
                     children=[
-                        html.Div(id="dataset-content", className="mt-3")
+                        html.Div(
+                            "Bitte wählen Sie ein Dataset und klicken Sie auf 'Dataset laden'",
+                            id="dataset-content",
+                            className="mt-3 text-muted text-center p-4"
+                        )
                     ],
                     color="#2E86AB",
                     className="loading-wrapper"
@@ -400,15 +461,16 @@ def update_main_tab(active_tab):
 # Registriere weitere Callbacks
 try:
     # Performance-Info
-    BASE_PATH = Path(__file__).parent.parent
     parquet_dir = BASE_PATH / "data_optimized"
     parquet_files = list(parquet_dir.glob("*.parquet")) if parquet_dir.exists() else []
     
-    register_callbacks(app, ALL_DATA)
+    register_callbacks(app, ALL_DATA, background_manager)
+    register_query_callbacks(app, lambda: get_data_loader().query_service)
+    register_export_routes(app.server, ALL_DATA, get_data_loader)
     if os.environ.get('WERKZEUG_RUN_MAIN') != 'true':
         print("[OK] Callbacks erfolgreich registriert")
         print(f"[OK] {len(parquet_files)} Parquet-Dateien für schnelleres Laden gefunden")
-        print("     -> Daten werden 5-10x schneller geladen!")
+        print("     -> Ladezeiten messen: python src/benchmark_suite.py")
         
 except Exception as e:
     print(f"[FEHLER] beim Registrieren der Callbacks: {e}")
@@ -422,13 +484,18 @@ server = app.server
 
 if __name__ == '__main__':
     # Verhindere doppeltes Laden durch Werkzeug Reloader
-    import os
     if os.environ.get('WERKZEUG_RUN_MAIN') != 'true':
         # Nur beim ersten Start ausgeben, nicht beim Reload
         print("\n" + "="*60)
-        print("[OK] Dashboard bereit auf http://127.0.0.1:8050")
+        print(f"[OK] Dashboard bereit auf http://127.0.0.1:{os.environ.get('MOKIG_PORT', '8050')}")
         print("     Druecke Ctrl+C zum Beenden")
         print("="*60 + "\n")
     
-    # Debug-Modus deaktiviert um doppeltes Laden zu verhindern
-    app.run(debug=False, host='127.0.0.1', port=8050)
\ No newline at end of file
+    # Debug-Modus deaktiviert um doppeltes Laden zu verhindern; der Server
+    # wird direkt erzeugt, damit der Schnellstart erst nach dem Binden lädt
+    from werkzeug.serving import make_server
+    
+    http_server = make_server('127.0.0.1', int(os.environ.get('MOKIG_PORT', '8050')), server, threaded=True)
+    if FAST_START:
+        threading.Timer(DATA_LOAD_DELAY_S, start_data_loading).start()
+    http_server.serve_forever()
\ No newline at end of file
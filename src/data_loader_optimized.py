@@ -2,14 +2,29 @@
 Optimierter Datenlade-Modul für MokiG Dashboard
 ===============================================
 Verwendet Parquet-Format, Caching und Lazy Loading für maximale Performance.
+
+Arrow-Modus (arrow_dtypes=True bzw. MOKIG_ARROW_DTYPES=1): Parquet wird mit
+types_mapper=pd.ArrowDtype gelesen, Legacy-Daten werden nach Arrow
+konvertiert. Strings, nullable Integer und Zeitstempel bleiben Arrow-backed
+(kein object/category, keine Float-Konvertierung wegen fehlender Werte).
+
+Vollständig geladene Datasets erhalten als Version den Hash ihrer
+Quelldatei(en) und der Lade-Parameter (source_version); abgeleitete
+Ergebnisse in cache/derived (derived_cache) sind darüber adressiert.
 """
 
+import os
 import pandas as pd
 import numpy as np
 from pathlib import Path
 from functools import lru_cache
+import pyarrow as pa
 import pyarrow.parquet as pq
-import pickle
+from query_service import QueryService
+from time_axis import drop_time_index
+from dataset_registry import REGISTRY, parse_time_column, read_channel_header, read_source_file
+from dataset_version import register_version
+from derived_cache import source_version
 import hashlib
 import time
 from datetime import datetime, timedelta
@@ -17,19 +32,36 @@ import warnings
 warnings.filterwarnings('ignore')
 
 
+ARROW_DTYPES_DEFAULT = os.environ.get('MOKIG_ARROW_DTYPES', '0') == '1'
+
+# Bei Änderungen an der Ladelogik erhöhen (neue Dataset-Versionen, abgeleitete Caches ungültig)
+LOADER_VERSION = 2
+
+
+def is_arrow_backed(df):
+    """True wenn mindestens eine Spalte einen pd.ArrowDtype hat"""
+    return any(isinstance(dtype, pd.ArrowDtype) for dtype in df.dtypes)
+
+
+def to_arrow_dtypes(df):
+    """Konvertiert einen DataFrame (inkl. Index) auf pd.ArrowDtype-Spalten"""
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
 class OptimizedDataLoader:
     """Hochperformanter Datenloader mit Caching und Lazy Loading"""
     
-    def __init__(self, base_path):
+    def __init__(self, base_path, arrow_dtypes=None, registry=None):
         self.base_path = Path(base_path)
+        self.arrow_dtypes = ARROW_DTYPES_DEFAULT if arrow_dtypes is None else arrow_dtypes
         self.parquet_dir = self.base_path / "data_optimized"
         self.cache_dir = self.base_path / "cache"
         
-        # Legacy Pfade für Fallback
-        self.twin2sim_path = self.base_path / "Daten" / "Beispieldaten"
-        self.erentrudis_path = self.base_path / "Daten" / "Monitoringdaten" / "Erentrudisstr"
-        self.fis_path = self.base_path / "Daten" / "Monitoringdaten" / "FIS_Inhauser"
-        self.kw_path = self.base_path / "Daten" / "vertraulich_erzeugungsdaten-kw-neukirchen_2025-07-21_0937"
+        # Datasets, Quelldateien und Parquet-Präfixe (dataset_registry)
+        self.registry = registry or REGISTRY
+        self._parquet_files = {}
+        self._parquet_dir_mtime = None
         
         # In-Memory Cache mit LRU (Least Recently Used)
         self.memory_cache = {}
@@ -38,6 +70,10 @@ class OptimizedDataLoader:
         
         # Performance Monitoring
         self.load_times = []
+        self.memory_savings = {}  # (source, dataset) -> (Bytes vorher, Bytes nachher)
+        
+        # SQL-Abfragen (DuckDB) direkt auf den Parquet-Dateien
+        self._query_service = None
     
     def _get_cache_key(self, source, dataset, columns=None, filters=None):
         """Generiert eindeutigen Cache-Key"""
@@ -80,8 +116,8 @@ class OptimizedDataLoader:
         Lädt Dataset mit Optimierungen
         
         Args:
-            source: Datenquelle ('twin2sim', 'erentrudis', 'fis', 'kw')
-            dataset_name: Name des Datasets
+            source: Datenquelle (Quelle der Dataset-Registry)
+            dataset_name: Name des Datasets (Registry-ID)
             columns: Optionale Spaltenliste zum Laden
             filters: Optionale Filter für Zeilen
             sample_size: Optionale Anzahl Zeilen für Sampling
@@ -110,11 +146,21 @@ class OptimizedDataLoader:
             df = self._load_legacy(source, dataset_name)
             
             if df is not None and not df.empty:
-                # Optimiere für zukünftige Loads
+                # Optimiere für zukünftige Loads (Ersparnis wird protokolliert)
+                memory_before = df.memory_usage(deep=True, index=True).sum()
+                if self.arrow_dtypes:
+                    df = to_arrow_dtypes(df)
                 df = self._optimize_dataframe(df)
+                memory_after = df.memory_usage(deep=True, index=True).sum()
+                self.memory_savings[(source, dataset_name)] = (int(memory_before), int(memory_after))
+                print(f"[SPEICHER] {dataset_name}: {memory_before / 1024 / 1024:.1f} MB -> "
+                      f"{memory_after / 1024 / 1024:.1f} MB nach Downcast")
         
         # Cache das Ergebnis
         if df is not None and not df.empty:
+            version = self.source_version(source, dataset_name)
+            if version is not None and columns is None and filters is None and sample_size is None:
+                register_version(df, version)
             self._save_to_cache(cache_key, df)
         
         load_time = time.time() - start_time
@@ -123,51 +169,43 @@ class OptimizedDataLoader:
         
         return df
     
+    def source_version(self, source, dataset_name):
+        """
+        Version eines vollständig geladenen Datasets aus dem Hash der
+        Parquet-Datei bzw. der Legacy-Quelldateien (ohne die Werte zu hashen)
+        """
+        params = {'loader': LOADER_VERSION, 'arrow_dtypes': self.arrow_dtypes}
+        parquet_path = self._find_parquet_file(source, dataset_name)
+        if parquet_path is not None and parquet_path.exists():
+            return source_version([parquet_path], dict(params, kind='parquet'))
+        spec = self.registry.dataset(source, dataset_name)
+        if spec is None:
+            return None
+        params.update(kind='legacy', parser=spec.parser, time_column=spec.time_column,
+                      time_format=spec.time_format, years=spec.years)
+        return source_version([path for path, _ in spec.source_files(self.base_path)], params)
+    
+    def channel_descriptions(self, source, dataset_name):
+        """{spalte: Beschreibung} aus den Kopfzeilen der Quelldateien (leer ohne 'channel_header')"""
+        spec = self.registry.dataset(source, dataset_name)
+        descriptions = {}
+        if spec is None or not spec.channel_header:
+            return descriptions
+        for file_path, _ in spec.source_files(self.base_path):
+            if file_path.exists():
+                descriptions.update(read_channel_header(file_path, spec)[0])
+        return descriptions
+    
     def _find_parquet_file(self, source, dataset_name):
-        """Findet die passende Parquet-Datei"""
-        if not self.parquet_dir.exists():
+        """Parquet-Datei eines Datasets (Zuordnung nur bei geändertem Verzeichnis neu)"""
+        try:
+            mtime = self.parquet_dir.stat().st_mtime_ns
+        except FileNotFoundError:
             return None
-        
-        # Mapping von Dataset-Namen zu Dateinamen
-        mappings = {
-            'erentrudis': {
-                'gesamtdaten_2024': 'Relevant-1_2024_export',
-                'detail_juli_2024': 'All_24-07_export',
-                'langzeit_2023_2025': 'export_ERS_2023'
-            },
-            'fis': {
-                'export_q1_2025': 'export_1551_2024',
-                'data_2024_2025_at': '2024-2025-05_AT'
-            },
-            'kw': {
-                'kw_duernbach_gesamt': 'KW DÜRNBACH_ERZEUGUNG_2020_2024',
-                'kw_untersulzbach_gesamt': 'KW UNTERSULZBACH_ERZEUGUNG_2020_2024',
-                'kw_wiesbach_gesamt': 'KW WIESBACH_ERZEUGUNG_2020_2024',
-                'uebergabe_bezug_gesamt': 'ÜBERGABE_BEZUG_2020_2024',
-                'uebergabe_lieferung_gesamt': 'ÜBERGABE_LIEFERUNG_2020_2024'
-            },
-            'twin2sim': {
-                'intpv': 'T2S_IntPV',
-                'lüftung': 'T2S_Lüftung',
-                'manipv': 'T2S_ManiPV',
-                'rau006': 'T2S_RAU006',
-                'wetterdaten': 'T2S_Wetterdaten'
-            }
-        }
-        
-        # Suche nach passendem Parquet-File
-        if source in mappings and dataset_name in mappings[source]:
-            pattern = mappings[source][dataset_name]
-            for parquet_file in self.parquet_dir.glob("*.parquet"):
-                if pattern.lower() in parquet_file.name.lower():
-                    return parquet_file
-        
-        # Generischer Fallback
-        for parquet_file in self.parquet_dir.glob("*.parquet"):
-            if dataset_name.lower() in parquet_file.name.lower():
-                return parquet_file
-        
-        return None
+        if mtime != self._parquet_dir_mtime:
+            self._parquet_files = self.registry.resolve_parquet_files(self.parquet_dir)
+            self._parquet_dir_mtime = mtime
+        return self._parquet_files.get((source, dataset_name))
     
     def _load_from_parquet(self, parquet_path, columns=None, filters=None, sample_size=None):
         """Lädt Daten aus Parquet mit Optimierungen"""
@@ -184,37 +222,21 @@ class OptimizedDataLoader:
                         total_rows - sample_size, 
                         replace=False
                     )
-                    df = pd.read_parquet(
-                        parquet_path,
-                        columns=columns,
-                        engine='pyarrow'
-                    )
+                    df = self._read_parquet(parquet_path, columns)
                     df = df.drop(skip_rows)
                 else:
-                    df = pd.read_parquet(
-                        parquet_path,
-                        columns=columns,
-                        filters=filters,
-                        engine='pyarrow'
-                    )
+                    df = self._read_parquet(parquet_path, columns, filters)
             else:
                 # Normales Laden mit optionalen Filtern
-                df = pd.read_parquet(
-                    parquet_path,
-                    columns=columns,
-                    filters=filters,
-                    engine='pyarrow'
-                )
+                df = self._read_parquet(parquet_path, columns, filters)
             
-            # WICHTIG: Stelle sicher, dass Date-Spalte existiert und korrekt ist
-            if df.index.name in ['Date', 'DateTime', 'ZEIT_VON_UTC', 'Datum']:
-                # Index ist bereits ein Datum - kopiere es als Spalte
-                df['Date'] = df.index
+            # Ältere Dateien speichern das Datum zusätzlich als Index - nur die Spalte behalten
+            df = drop_time_index(df)
             
             # Konvertiere Date-Spalten zu datetime wenn nötig
             date_cols = ['Date', 'DateTime', 'ZEIT_VON_UTC', 'ZEIT_BIS_UTC', 'Datum']
             for col in date_cols:
-                if col in df.columns:
+                if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
                     try:
                         df[col] = pd.to_datetime(df[col])
                     except:
@@ -226,20 +248,40 @@ class OptimizedDataLoader:
             print(f"Fehler beim Parquet-Laden: {e}")
             return None
     
+    def _read_parquet(self, parquet_path, columns=None, filters=None):
+        """Liest Parquet - im Arrow-Modus mit pd.ArrowDtype-Spalten"""
+        if self.arrow_dtypes:
+            table = pq.read_table(parquet_path, columns=columns, filters=filters)
+            return table.to_pandas(types_mapper=pd.ArrowDtype)
+        return pd.read_parquet(parquet_path, columns=columns, filters=filters, engine='pyarrow')
+    
     def _load_legacy(self, source, dataset_name):
-        """Legacy-Loader als Fallback"""
-        try:
-            if source == 'twin2sim':
-                return self._load_twin2sim_legacy(dataset_name)
-            elif source == 'erentrudis':
-                return self._load_erentrudis_legacy(dataset_name)
-            elif source == 'fis':
-                return self._load_fis_legacy(dataset_name)
-            elif source == 'kw':
-                return self._load_kw_legacy(dataset_name)
-        except Exception as e:
-            print(f"Legacy-Loading fehlgeschlagen: {e}")
+        """Legacy-Loader als Fallback: Quelldateien laut Registry (mehrere Jahre zusammengeführt)"""
+        spec = self.registry.dataset(source, dataset_name)
+        if spec is None:
             return None
+        
+        dfs = []
+        for file_path, year in spec.source_files(self.base_path):
+            if not file_path.exists():
+                continue
+            try:
+                df = read_source_file(file_path, spec)
+            except Exception as e:
+                print(f"   [FEHLER] bei {file_path.name}: {e}")
+                continue
+            if year is not None:
+                # Jahr als Spalte für Nachverfolgbarkeit
+                df['Jahr'] = year
+                print(f"   [OK] {file_path.name}: {len(df):,} Zeilen")
+            dfs.append(df)
+        
+        if not dfs:
+            return None
+        combined_df = pd.concat(dfs, ignore_index=True) if len(dfs) > 1 else dfs[0]
+        if len(dfs) > 1:
+            print(f"   → Gesamt: {len(combined_df):,} Zeilen ({len(dfs)} Dateien)")
+        return parse_time_column(combined_df, spec)
     
     def _optimize_dataframe(self, df):
         """Optimiert DataFrame für bessere Performance"""
@@ -247,11 +289,17 @@ class OptimizedDataLoader:
         for col in df.columns:
             col_type = df[col].dtype
             
-            if col_type != 'object' and col_type != 'datetime64[ns]':
+            # Nur numerische Spalten (Text-, Datums- und Bool-Spalten bleiben unverändert)
+            if pd.api.types.is_numeric_dtype(col_type) and not pd.api.types.is_bool_dtype(col_type):
                 c_min = df[col].min()
                 c_max = df[col].max()
                 
-                if str(col_type)[:3] == 'int':
+                if isinstance(col_type, pd.ArrowDtype):
+                    # Arrow-Spalten innerhalb der Arrow-Typen verkleinern (nullable bleibt erhalten)
+                    target = self._arrow_downcast_type(col_type.pyarrow_dtype, c_min, c_max)
+                    if target is not None:
+                        df[col] = df[col].astype(pd.ArrowDtype(target))
+                elif str(col_type)[:3] == 'int':
                     if c_min > np.iinfo(np.int8).min and c_max < np.iinfo(np.int8).max:
                         df[col] = df[col].astype(np.int8)
                     elif c_min > np.iinfo(np.int16).min and c_max < np.iinfo(np.int16).max:
@@ -264,6 +312,23 @@ class OptimizedDataLoader:
         
         return df
     
+    @staticmethod
+    def _arrow_downcast_type(arrow_type, c_min, c_max):
+        """Kleinster Arrow-Typ für den Wertebereich (None = unverändert)"""
+        if pd.isna(c_min) or pd.isna(c_max):
+            return None
+        if pa.types.is_integer(arrow_type):
+            for candidate, info in ((pa.int8(), np.iinfo(np.int8)),
+                                    (pa.int16(), np.iinfo(np.int16)),
+                                    (pa.int32(), np.iinfo(np.int32))):
+                if c_min > info.min and c_max < info.max:
+                    return candidate if candidate.bit_width < arrow_type.bit_width else None
+            return None
+        if pa.types.is_float64(arrow_type):
+            if c_min > np.finfo(np.float32).min and c_max < np.finfo(np.float32).max:
+                return pa.float32()
+        return None
+    
     def load_dataset_paginated(self, source, dataset_name, page=1, page_size=1000):
         """
         Lädt Dataset seitenweise für große Datenmengen
@@ -317,6 +382,21 @@ class OptimizedDataLoader:
         
         return None
     
+    def get_streaming_statistics(self, source, dataset_name, columns=None):
+        """
+        Berechnet Kennzahlen direkt über die Parquet-Record-Batches (Welford + KLL),
+        ohne das Dataset zu laden. Speicherbedarf unabhängig von der Dateigröße.
+        
+        Returns:
+            StreamingStatistics oder None wenn kein Parquet vorhanden
+        """
+        from streaming_stats import StreamingStatistics
+        
+        parquet_path = self._find_parquet_file(source, dataset_name)
+        if not parquet_path or not parquet_path.exists():
+            return None
+        return StreamingStatistics.from_parquet(parquet_path, columns=columns)
+    
     def preload_common_datasets(self):
         """Lädt häufig verwendete Datasets im Voraus"""
         common_datasets = [
@@ -329,6 +409,60 @@ class OptimizedDataLoader:
         for source, dataset in common_datasets:
             self.load_dataset_optimized(source, dataset)
     
+    def evict(self, source, dataset_name):
+        """Entfernt ein Dataset (ohne Spalten-/Filterauswahl) aus dem Memory-Cache"""
+        cache_key = self._get_cache_key(source, dataset_name)
+        self.memory_cache.pop(cache_key, None)
+        self.cache_timestamps.pop(cache_key, None)
+    
+    def reloader(self, source, dataset_name):
+        """
+        Funktion zum erneuten Laden aus der Parquet-Datei (für das Tiering
+        in dataset_memory); None wenn keine Parquet-Quelle existiert
+        """
+        parquet_path = self._find_parquet_file(source, dataset_name)
+        if parquet_path is None or not parquet_path.exists():
+            return None
+        
+        def reload():
+            df = self.load_dataset_optimized(source, dataset_name)
+            # Nicht im Loader-Cache halten, sonst bliebe das Dataset resident
+            self.evict(source, dataset_name)
+            return df
+        return reload
+    
+    @property
+    def query_service(self):
+        """QueryService über data_optimized/ mit Views '<quelle>_<dataset>'"""
+        if self._query_service is None:
+            self._query_service = QueryService(self.parquet_dir)
+            for spec in self.registry.datasets():
+                parquet_path = self._find_parquet_file(spec.source, spec.id)
+                if parquet_path is not None:
+                    self._query_service.register(f"{spec.source}_{spec.id}", parquet_path)
+        return self._query_service
+    
+    def query(self, source, dataset_name, columns=None, filters=None, group_by=None,
+              aggregations=None, time_bucket=None, order_by=None, limit=None, timeout_s=None):
+        """
+        Abfrage direkt auf der Parquet-Datei (DuckDB), ohne das Dataset zu laden
+        
+        Projektion, Filter, Gruppierung und Aggregation laufen in DuckDB;
+        zurück kommt nur das Ergebnis. Parameter siehe query_service.build_query.
+        
+        Returns:
+            DataFrame oder None (keine Parquet-Datei)
+        
+        Raises:
+            QueryError: ungültige Abfrage, Zeitlimit überschritten
+        """
+        parquet_path = self._find_parquet_file(source, dataset_name)
+        if parquet_path is None:
+            print(f"Keine Parquet-Datei für {source}/{dataset_name} - Abfrage nicht möglich")
+            return None
+        return self.query_service.query(parquet_path, columns, filters, group_by, aggregations,
+                                        time_bucket, order_by, limit, timeout_s)
+    
     def clear_cache(self):
         """Leert den Memory-Cache"""
         self.memory_cache.clear()
@@ -348,90 +482,52 @@ class OptimizedDataLoader:
             'cache_size': len(self.memory_cache),
             'cache_hit_rate': len([t for t in self.load_times if t < 0.1]) / len(self.load_times)
         }
-    
-    # Legacy Loading Methods (vereinfacht)
-    def _load_twin2sim_legacy(self, dataset_name):
-        """Legacy Twin2Sim Loader"""
-        file_map = {
-            'intpv': 'T2S_IntPV.csv',
-            'lüftung': 'T2S_Lüftung.csv',
-            'manipv': 'T2S_ManiPV.csv',
-            'rau006': 'T2S_RAU006.csv',
-            'wetterdaten': 'T2S_Wetterdaten.csv'
-        }
-        
-        if dataset_name in file_map:
-            filepath = self.twin2sim_path / file_map[dataset_name]
-            if filepath.exists():
-                return pd.read_csv(filepath, sep=';', decimal=',', parse_dates=True)
-        return None
-    
-    def _load_erentrudis_legacy(self, dataset_name):
-        """Legacy Erentrudis Loader"""
-        file_map = {
-            'gesamtdaten_2024': self.erentrudis_path / "Monitoring" / "2024" / 
-                               "Relevant-1_2024_export_2011_2024-01-01-00-00_2024-12-31-23-59 (3).csv",
-            'detail_juli_2024': self.erentrudis_path / "Monitoring" / "2024" / 
-                               "All_24-07_export_2011_2024-07-01-00-00_2024-07-31-23-59.csv",
-            'langzeit_2023_2025': self.erentrudis_path / "Monitoring" / 
-                                 "export_ERS_2023-12-01-00-00_2025-03-31-23-59.csv"
-        }
-        
-        if dataset_name in file_map and file_map[dataset_name].exists():
-            return pd.read_csv(file_map[dataset_name], parse_dates=True)
-        return None
-    
-    def _load_fis_legacy(self, dataset_name):
-        """Legacy FIS Loader"""
-        file_map = {
-            'export_q1_2025': self.fis_path / "Monitoring" / "250101-250331" / 
-                             "export_1551_2024-12-31-00-00_2025-03-31-23-55.csv",
-            'data_2024_2025_at': self.fis_path / "Monitoring" / "2024-2025-05_AT.csv"
-        }
-        
-        if dataset_name in file_map and file_map[dataset_name].exists():
-            return pd.read_csv(file_map[dataset_name], parse_dates=True)
+
+
+def iter_dashboard_datasets(data_loader, sources=None):
+    """
+    Lädt die Datasets aller Quellen der Registry nacheinander.
+
+    Quellen mit Loader 'kw_aggregated' (KW Neukirchen) kommen aus den
+    aggregierten Parquet-Dateien (alle Jahre), sonst einzeln über den Loader.
+
+    Yields:
+        (quelle, dataset, DataFrame, reload) - reload für das Tiering oder None
+    """
+    for source in data_loader.registry.sources:
+        if sources is not None and source.id not in sources:
+            continue
+        if source.loader == 'kw_aggregated':
+            from load_kw_aggregated import aggregate_all_kw_data
+            aggregated = {name: df for name, df in
+                          aggregate_all_kw_data(data_loader.base_path, source.id, data_loader.registry).items()
+                          if not df.empty}
+            for dataset_name, df in aggregated.items():
+                yield source.id, dataset_name, df, None
+            if aggregated:
+                continue
+            print(f"⚠️ Verwende Fallback für {source.label}...")
+        for spec in source.datasets:
+            df = data_loader.load_dataset_optimized(source.id, spec.id)
+            if df is not None and not df.empty:
+                yield source.id, spec.id, df, data_loader.reloader(source.id, spec.id)
+
+
+def load_dashboard_dataset(data_loader, source, dataset_name):
+    """
+    Lädt ein einzelnes Dataset wie iter_dashboard_datasets (KW aus der
+    aggregierten Parquet-Datei, sonst über den Loader), z.B. in einem
+    Background-Job, der keinen Zugriff auf die Datasets des Hauptprozesses hat.
+
+    Returns:
+        DataFrame oder None
+    """
+    spec = data_loader.registry.dataset(source, dataset_name)
+    if spec is None:
         return None
-    
-    def _load_kw_legacy(self, dataset_name):
-        """Legacy KW Loader - Lädt ALLE Jahre 2020-2024"""
-        dfs = []
-        
-        # Bestimme welches Kraftwerk
-        if 'duernbach' in dataset_name.lower():
-            base_name = "KW DÜRNBACH_ERZEUGUNG"
-        elif 'untersulzbach' in dataset_name.lower():
-            base_name = "KW UNTERSULZBACH_ERZEUGUNG"
-        elif 'wiesbach' in dataset_name.lower():
-            base_name = "KW WIESBACH_ERZEUGUNG"
-        else:
-            return None
-        
-        # Lade ALLE Jahre (2020-2024)
-        for year in range(2020, 2025):  # 2020 bis 2024
-            file_path = self.kw_path / f"{base_name}_{year}.XLSX"
-            if file_path.exists():
-                try:
-                    df = pd.read_excel(file_path, engine='openpyxl')
-                    # Füge Jahr als Spalte hinzu für Nachverfolgbarkeit
-                    df['Jahr'] = year
-                    dfs.append(df)
-                    print(f"   [OK] {base_name} {year}: {len(df):,} Zeilen")
-                except Exception as e:
-                    print(f"   [FEHLER] bei {file_path.name}: {e}")
-        
-        if dfs:
-            # Kombiniere alle Jahre
-            combined_df = pd.concat(dfs, ignore_index=True)
-            
-            # Stelle sicher, dass Date-Spalte existiert
-            if 'ZEIT_VON_UTC' in combined_df.columns:
-                combined_df['Date'] = pd.to_datetime(combined_df['ZEIT_VON_UTC'])
-            elif 'Date' not in combined_df.columns:
-                # Fallback: erstelle Date aus Index oder Jahr
-                combined_df['Date'] = pd.date_range(start='2020-01-01', periods=len(combined_df), freq='H')
-            
-            print(f"   → Gesamt: {len(combined_df):,} Zeilen (2020-2024)")
-            return combined_df
-        
-        return None
\ No newline at end of file
+    if data_loader.registry.source(source).loader == 'kw_aggregated':
+        from load_kw_aggregated import load_kw_complete
+        df = load_kw_complete(data_loader.base_path, spec)
+        if not df.empty:
+            return df
+    return data_loader.load_dataset_optimized(source, dataset_name)
@@ -10,17 +10,21 @@ import numpy as np
 from pathlib import Path
 import pyarrow.parquet as pq
 import pyarrow as pa
-import pickle
 import hashlib
 import json
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+from dataset_registry import REGISTRY
+
 
 class DataOptimizer:
     """Optimiert Datenladezeiten durch Parquet-Format und intelligentes Caching"""
     
+    # Zeitspalten der Quellen (werden nicht numerisch konvertiert, sondern indiziert)
+    DATE_COLUMNS = ['Date', 'DateTime', 'Datum', 'Datum + Uhrzeit', 'Zeit', 'ZEIT_VON_UTC', 'Zeitstempel']
+    
     def __init__(self, base_path):
         self.base_path = Path(base_path)
         self.cache_dir = self.base_path / "cache"
@@ -96,8 +100,9 @@ class DataOptimizer:
             df = self._optimize_datatypes(df)
             df = self._add_indices(df)
             
-            # Speichere als Parquet mit Kompression
-            table = pa.Table.from_pandas(df, preserve_index=True)
+            # Speichere als Parquet mit Kompression (Zeitachse nur als Spalte,
+            # kein Index - die Zeilennummern ergeben sich aus der Sortierung)
+            table = pa.Table.from_pandas(df, preserve_index=False)
             pq.write_table(
                 table, 
                 parquet_path,
@@ -142,13 +147,14 @@ class DataOptimizer:
                             filepath,
                             sep=sep,
                             parse_dates=True,
-                            infer_datetime_format=True,
                             low_memory=False  # Für c engine
                         )
                         
                         # Optimiere Datentypen nach dem Laden
                         for col in df.columns:
-                            if df[col].dtype == 'object':
+                            if col in self.DATE_COLUMNS:
+                                continue
+                            if df[col].dtype == 'object' or pd.api.types.is_string_dtype(df[col]):
                                 # Versuche numerische Konvertierung
                                 try:
                                     # Ersetze Komma durch Punkt für deutsche Zahlen
@@ -229,24 +235,19 @@ class DataOptimizer:
         return df
     
     def _add_indices(self, df):
-        """Fügt Indizes für schnellere Abfragen hinzu"""
-        # WICHTIG: Setze Datum als Index OHNE drop=False zu verlieren
-        date_columns = ['Date', 'DateTime', 'Datum', 'Datum + Uhrzeit', 'Zeit', 'ZEIT_VON_UTC', 'Zeitstempel']
-        for col in date_columns:
+        """Sortiert nach der Zeitspalte (kanonische Zeitachse, siehe time_axis)"""
+        # Zeitstempel nur einmal speichern: als Spalte, nicht zusätzlich als
+        # Index; die Sortierung erlaubt searchsorted und Row-Group-Pruning
+        for col in self.DATE_COLUMNS:
             if col in df.columns:
                 try:
-                    df[col] = pd.to_datetime(df[col])
-                    # WICHTIG: drop=False behält die Spalte im DataFrame!
-                    df = df.set_index(col, drop=False)
-                    df = df.sort_index()
+                    # Quellen verwenden deutsches Datumsformat (TT.MM.JJJJ)
+                    df[col] = pd.to_datetime(df[col], dayfirst=True)
+                    df = df.sort_values(col, kind='stable').reset_index(drop=True)
                     break
                 except:
                     continue
         
-        # Stelle sicher, dass Date-Spalte existiert
-        if 'Date' not in df.columns and df.index.name in date_columns:
-            df['Date'] = df.index
-        
         return df
     
     def load_parquet_chunked(self, parquet_path, chunk_size=10000):
@@ -288,56 +289,18 @@ class DataOptimizer:
             'created': datetime.fromtimestamp(Path(parquet_path).stat().st_ctime)
         }
     
-    def preprocess_all_data(self):
-        """Konvertiert alle Datenquellen zu Parquet"""
+    def preprocess_all_data(self, registry=None):
+        """Konvertiert die Quelldateien aller Datasets der Registry zu Parquet"""
         conversions = []
         
-        # Twin2Sim Daten
-        twin2sim_path = self.base_path / "Daten" / "Beispieldaten"
-        if twin2sim_path.exists():
-            print("\n📊 Konvertiere Twin2Sim Daten...")
-            for csv_file in twin2sim_path.glob("*.csv"):
-                result = self.convert_to_parquet(csv_file, "csv")
-                if result:
-                    conversions.append(result)
-        
-        # Erentrudisstraße Daten
-        erentrudis_path = self.base_path / "Daten" / "Monitoringdaten" / "Erentrudisstr" / "Monitoring"
-        if erentrudis_path.exists():
-            print("\n🏢 Konvertiere Erentrudisstraße Daten...")
-            # Spezifische wichtige Dateien
-            important_files = [
-                erentrudis_path / "2024" / "Relevant-1_2024_export_2011_2024-01-01-00-00_2024-12-31-23-59 (3).csv",
-                erentrudis_path / "2024" / "All_24-07_export_2011_2024-07-01-00-00_2024-07-31-23-59.csv",
-                erentrudis_path / "export_ERS_2023-12-01-00-00_2025-03-31-23-59.csv"
-            ]
-            for csv_file in important_files:
-                if csv_file.exists():
-                    result = self.convert_to_parquet(csv_file, "csv")
-                    if result:
-                        conversions.append(result)
-        
-        # FIS Inhauser Daten
-        fis_path = self.base_path / "Daten" / "Monitoringdaten" / "FIS_Inhauser" / "Monitoring"
-        if fis_path.exists():
-            print("\n🏭 Konvertiere FIS Inhauser Daten...")
-            important_files = [
-                fis_path / "250101-250331" / "export_1551_2024-12-31-00-00_2025-03-31-23-55.csv",
-                fis_path / "2024-2025-05_AT.csv"
-            ]
-            for csv_file in important_files:
-                if csv_file.exists():
-                    result = self.convert_to_parquet(csv_file, "csv")
-                    if result:
-                        conversions.append(result)
-        
-        # KW Neukirchen Excel-Daten (nur Hauptdateien)
-        kw_path = self.base_path / "Daten" / "vertraulich_erzeugungsdaten-kw-neukirchen_2025-07-21_0937"
-        if kw_path.exists():
-            print("\n⚡ Konvertiere KW Neukirchen Daten...")
-            # Nur die aggregierten Hauptdateien
-            for xlsx_file in kw_path.glob("KW*.XLSX"):
-                result = self.convert_to_parquet(xlsx_file, "excel")
+        for source in (registry or REGISTRY).sources:
+            files = [(file_path, spec) for spec in source.datasets
+                     for file_path, _ in spec.source_files(self.base_path) if file_path.exists()]
+            if not files:
+                continue
+            print(f"\n📊 Konvertiere {source.label} Daten...")
+            for file_path, spec in files:
+                result = self.convert_to_parquet(file_path, spec.file_kind)
                 if result:
                     conversions.append(result)
         
@@ -0,0 +1,326 @@
+"""
+Speicherverwaltung für geladene Datasets
+========================================
+Deep-Memory-Accounting pro Dataset, RSS des Prozesses und ein globales
+Speicherbudget mit Tiering:
+
+- hot:     DataFrame im Speicher
+- mmap:    als Arrow-IPC-Datei ausgelagert (cache/tiering); beim Zugriff
+           memory-mapped gelesen (kein Parsen) und wieder 'hot'
+- parquet: verworfen; beim Zugriff aus der Parquet-Datei neu geladen
+           (nur für Datasets mit Parquet-Quelle)
+
+TieredDatasets ersetzt pro Quelle das Dict in ALL_DATA und bietet dieselbe
+Mapping-Schnittstelle (get, [], items, values, in, len). Übersteigen die
+'hot' Datasets das Budget (MOKIG_MEMORY_BUDGET_MB, Default 4096) oder der
+Prozess das optionale RSS-Limit (MOKIG_RSS_LIMIT_MB), werden die am
+längsten nicht genutzten Datasets herabgestuft: mit Parquet-Quelle
+verworfen, sonst als Arrow-IPC ausgelagert.
+
+Metadaten (Zeilen, Größe, Signatur) bleiben unabhängig vom Tier verfügbar,
+sodass Übersichten und der KPI-Abgleich keine Datasets nachladen.
+
+Nachgeladen wird außerhalb des globalen Locks (nur mit dem Lock des
+Datasets): ein langsames Parquet-Nachladen blockiert keine Zugriffe auf
+andere Datasets, parallele Zugriffe auf dasselbe Dataset laden nur einmal.
+"""
+
+import itertools
+import os
+import re
+import threading
+import time
+from collections.abc import MutableMapping
+from pathlib import Path
+
+import psutil
+
+from dataset_version import dataset_version, register_version
+
+
+MB = 1024 * 1024
+MEMORY_BUDGET_BYTES = int(os.environ.get('MOKIG_MEMORY_BUDGET_MB', '4096')) * MB
+RSS_LIMIT_BYTES = int(os.environ.get('MOKIG_RSS_LIMIT_MB', '0')) * MB
+DEFAULT_SPILL_DIR = Path(__file__).parent.parent / "cache" / "tiering"
+
+TIER_HOT = 'hot'
+TIER_MMAP = 'mmap'
+TIER_PARQUET = 'parquet'
+
+_GENERATIONS = itertools.count(1)
+
+
+def deep_memory_bytes(df):
+    """Tatsächlicher Speicherbedarf eines DataFrames inkl. Index und Strings"""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def process_rss_bytes():
+    """Resident Set Size des aktuellen Prozesses"""
+    return psutil.Process().memory_info().rss
+
+
+def row_counts(datasets):
+    """Zeilen pro Dataset, ohne ausgelagerte Datasets nachzuladen"""
+    if isinstance(datasets, TieredDatasets):
+        return datasets.row_counts()
+    return {name: len(df) for name, df in datasets.items()}
+
+
+def dataset_signature(datasets, name):
+    """Günstige Signatur eines Datasets (TieredDatasets: ohne Nachladen)"""
+    if isinstance(datasets, TieredDatasets):
+        return datasets.signature(name)
+    df = datasets[name]
+    return (id(df), len(df), len(df.columns))
+
+
+def _safe_name(value):
+    return re.sub(r'[^\w.-]+', '_', value)
+
+
+class _DatasetEntry:
+    """Zustand eines Datasets (Tier, Größe, Zugriff)"""
+
+    __slots__ = ('source', 'name', 'df', 'tier', 'nbytes', 'rows', 'columns', 'arrow_backed',
+                 'generation', 'last_access', 'ipc_path', 'reload', 'pinned', 'promotions', 'lock')
+
+    def __init__(self, source, name, df, reload=None):
+        import pandas as pd
+
+        self.source = source
+        self.name = name
+        self.df = df
+        self.tier = TIER_HOT
+        self.nbytes = deep_memory_bytes(df)
+        self.rows = len(df)
+        self.columns = len(df.columns)
+        self.arrow_backed = any(isinstance(dtype, pd.ArrowDtype) for dtype in df.dtypes)
+        self.generation = next(_GENERATIONS)
+        self.last_access = time.time()
+        self.ipc_path = None
+        self.reload = reload
+        self.pinned = False
+        self.promotions = 0
+        self.lock = threading.Lock()  # Nachladen (vor manager.lock nehmen, nie umgekehrt)
+
+
+class MemoryManager:
+    """Globales Speicherbudget über alle TieredDatasets"""
+
+    def __init__(self, budget_bytes=MEMORY_BUDGET_BYTES, rss_limit_bytes=RSS_LIMIT_BYTES,
+                 spill_dir=DEFAULT_SPILL_DIR):
+        self.budget_bytes = budget_bytes
+        self.rss_limit_bytes = rss_limit_bytes
+        self.spill_dir = Path(spill_dir)
+        self.stores = {}
+        self.lock = threading.RLock()
+        self.demotions = 0
+        self.promotions = 0
+
+    def register(self, store):
+        self.stores[store.source] = store
+
+    def _entries(self):
+        for store in self.stores.values():
+            yield from store._entries.values()
+
+    def hot_bytes(self):
+        return sum(entry.nbytes for entry in self._entries() if entry.tier == TIER_HOT)
+
+    def _over_budget(self):
+        if self.hot_bytes() > self.budget_bytes:
+            return True
+        return bool(self.rss_limit_bytes) and process_rss_bytes() > self.rss_limit_bytes
+
+    def enforce(self, keep=None):
+        """Stuft LRU-Datasets herab, bis Budget (und RSS-Limit) eingehalten sind"""
+        with self.lock:
+            while self._over_budget():
+                candidates = [entry for entry in self._entries()
+                              if entry.tier == TIER_HOT and entry is not keep and not entry.pinned]
+                if not candidates:
+                    break
+                victim = min(candidates, key=lambda entry: entry.last_access)
+                self.stores[victim.source]._demote(victim)
+
+    def state(self):
+        """Aktueller Tiering-Zustand für Monitoring"""
+        with self.lock:
+            entries = sorted(self._entries(), key=lambda entry: (entry.source, entry.name))
+            return {
+                'budget_mb': round(self.budget_bytes / MB, 1),
+                'rss_limit_mb': round(self.rss_limit_bytes / MB, 1),
+                'hot_mb': round(self.hot_bytes() / MB, 1),
+                'rss_mb': round(process_rss_bytes() / MB, 1),
+                'demotions': self.demotions,
+                'promotions': self.promotions,
+                'datasets': [{
+                    'source': entry.source,
+                    'dataset': entry.name,
+                    'tier': entry.tier,
+                    'memory_mb': round(entry.nbytes / MB, 2),
+                    'rows': entry.rows,
+                    'columns': entry.columns,
+                    'arrow': entry.arrow_backed,
+                    'reloadable': entry.reload is not None,
+                    'promotions': entry.promotions,
+                    'idle_s': round(time.time() - entry.last_access, 1)
+                } for entry in entries]
+            }
+
+
+# Gemeinsamer Manager für ALL_DATA
+MEMORY_MANAGER = MemoryManager()
+
+
+class TieredDatasets(MutableMapping):
+    """
+    Datasets einer Quelle mit Tiering (Mapping-Schnittstelle wie ein Dict).
+
+    Beispiel:
+        ALL_DATA['fis'] = TieredDatasets('fis')
+        ALL_DATA['fis'].put('export_q1_2025', df, reload=loader.reloader('fis', 'export_q1_2025'))
+        df = ALL_DATA['fis']['export_q1_2025']    # lädt bei Bedarf nach
+    """
+
+    def __init__(self, source, manager=None):
+        self.source = source
+        self.manager = manager or MEMORY_MANAGER
+        self._entries = {}
+        self.manager.register(self)
+
+    def put(self, name, df, reload=None):
+        """
+        Legt ein Dataset 'hot' ab.
+
+        Args:
+            reload: Optional Funktion ohne Argumente, die das Dataset aus
+                der Parquet-Quelle neu lädt (erlaubt das Verwerfen)
+        """
+        with self.manager.lock:
+            old = self._entries.get(name)
+            if old is not None:
+                self._remove_spill(old)
+            entry = _DatasetEntry(self.source, name, df, reload)
+            self._entries[name] = entry
+            self.manager.enforce(keep=entry)
+
+    def __setitem__(self, name, df):
+        self.put(name, df)
+
+    def __getitem__(self, name):
+        with self.manager.lock:
+            entry = self._entries[name]
+            entry.last_access = time.time()
+            if entry.tier == TIER_HOT:
+                return entry.df
+        with entry.lock:
+            return self._promote(entry)
+
+    def __delitem__(self, name):
+        with self.manager.lock:
+            self._remove_spill(self._entries.pop(name))
+
+    def __iter__(self):
+        return iter(list(self._entries))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def signature(self, name):
+        """Stabile Signatur (unabhängig vom Tier), ändert sich bei put()"""
+        entry = self._entries[name]
+        return (self.source, name, entry.generation, entry.rows, entry.columns)
+
+    def row_counts(self):
+        return {name: entry.rows for name, entry in self._entries.items()}
+
+    def tier(self, name):
+        return self._entries[name].tier
+
+    def demote(self, name):
+        """Stuft ein Dataset manuell herab (mmap bzw. verwerfen)"""
+        with self.manager.lock:
+            entry = self._entries[name]
+            if entry.tier == TIER_HOT:
+                self._demote(entry)
+            return entry.tier
+
+    def _spill_path(self, entry):
+        version = dataset_version(entry.df)
+        return self.manager.spill_dir / f"{_safe_name(self.source)}__{_safe_name(entry.name)}__{version}.arrow"
+
+    def _write_ipc(self, entry):
+        import pyarrow as pa
+
+        path = self._spill_path(entry)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            table = pa.Table.from_pandas(entry.df, preserve_index=None)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            with pa.OSFile(str(tmp_path), 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp_path, path)
+        return path
+
+    def _demote(self, entry):
+        if entry.reload is not None:
+            entry.tier = TIER_PARQUET
+        else:
+            try:
+                entry.ipc_path = entry.ipc_path or self._write_ipc(entry)
+            except Exception as e:
+                print(f"[SPEICHER] {self.source}/{entry.name} kann nicht ausgelagert werden: {e}")
+                entry.pinned = True
+                return
+            entry.tier = TIER_MMAP
+        entry.df = None
+        self.manager.demotions += 1
+        print(f"[SPEICHER] {self.source}/{entry.name} -> {entry.tier} "
+              f"({entry.nbytes / MB:.1f} MB freigegeben)")
+
+    def _promote(self, entry):
+        """Lädt ein herabgestuftes Dataset nach (Aufrufer hält entry.lock, nicht manager.lock)"""
+        import pandas as pd
+        import pyarrow as pa
+
+        with self.manager.lock:
+            # Ein paralleler Zugriff hat bereits nachgeladen
+            if entry.tier == TIER_HOT:
+                return entry.df
+            tier, ipc_path = entry.tier, entry.ipc_path
+
+        if tier == TIER_MMAP:
+            # Arrow-backed Datasets behalten ihre pd.ArrowDtype-Spalten
+            types_mapper = pd.ArrowDtype if entry.arrow_backed else None
+            with pa.memory_map(str(ipc_path), 'r') as source:
+                df = pa.ipc.open_file(source).read_all().to_pandas(types_mapper=types_mapper)
+            # Version steht im Dateinamen (_spill_path) - kein erneutes Hashen
+            register_version(df, ipc_path.stem.rsplit('__', 1)[-1])
+        else:
+            df = entry.reload()
+            if df is None:
+                raise KeyError(f"{self.source}/{entry.name} konnte nicht neu geladen werden")
+        nbytes = deep_memory_bytes(df)
+
+        with self.manager.lock:
+            # Während des Nachladens per put() ersetzt: der neue Stand gilt
+            if self._entries.get(entry.name) is not entry:
+                return df
+            entry.df = df
+            entry.tier = TIER_HOT
+            entry.nbytes = nbytes
+            entry.promotions += 1
+            self.manager.promotions += 1
+            self.manager.enforce(keep=entry)
+        return df
+
+    def _remove_spill(self, entry):
+        if entry.ipc_path is not None:
+            entry.ipc_path.unlink(missing_ok=True)
+            entry.ipc_path = None
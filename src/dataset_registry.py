@@ -0,0 +1,323 @@
+"""
+Dataset-Registry
+================
+Eine Stelle für alles Wissen über Gebäude/Kraftwerke (Quellen) und ihre
+Datasets: Anzeigename, Quelldateien, Parser, Zeitspalte und Name der
+optimierten Parquet-Datei. Die Registry wird aus dataset_registry.json (oder
+der Datei in MOKIG_DATASETS) geladen und dabei validiert; Loader,
+DataOptimizer, KW-Aggregation und Dashboard lesen nur noch von hier.
+
+Neues Gebäude: Eintrag in dataset_registry.json ergänzen - Quelldateien
+(relativ zum Projektverzeichnis, '{year}' wird über 'years' expandiert),
+Parser aus PARSERS, Zeitspalte und Parquet-Präfix. 'channel_header' kennzeichnet
+CSV-Dateien mit Beschreibungszeile unter der Kopfzeile (Twin2Sim: 'Anlage:
+Beschreibung [Einheit]'); sie wird für den Kanalkatalog gelesen und beim
+Laden übersprungen.
+
+Die Parquet-Dateien in data_optimized/ werden einmal pro Verzeichnisstand
+(mtime) den Datasets zugeordnet (resolve_parquet_files); danach ist die
+Suche ein Dict-Zugriff.
+
+Beispiel:
+    spec = REGISTRY.dataset('fis', 'export_q1_2025')
+    spec.source_files(BASE_PATH)      # [(Path, None)]
+    REGISTRY.source_labels()          # {'twin2sim': 'Twin2Sim', ...}
+"""
+
+import json
+import os
+import unicodedata
+from dataclasses import dataclass, field
+from pathlib import Path
+
+
+DEFAULT_REGISTRY_PATH = Path(__file__).parent / "dataset_registry.json"
+REGISTRY_PATH = Path(os.environ.get('MOKIG_DATASETS', DEFAULT_REGISTRY_PATH))
+
+# Parser: Name -> (Dateiart, Argumente für pd.read_csv bzw. pd.read_excel)
+PARSERS = {
+    'csv': ('csv', {}),
+    'csv_de': ('csv', {'sep': ';', 'decimal': ','}),
+    'xlsx': ('excel', {'engine': 'openpyxl'})
+}
+
+# Ladewege einer Quelle: einzeln über den OptimizedDataLoader oder (KW)
+# zuerst aus den aggregierten Parquet-Dateien (load_kw_aggregated)
+LOADERS = ('standard', 'kw_aggregated')
+
+BOOTSTRAP_COLORS = ('primary', 'secondary', 'success', 'danger', 'warning', 'info', 'light', 'dark')
+
+
+def _normalize(name):
+    """Vergleichsform eines Dateinamens (Unicode NFC, Kleinschreibung)"""
+    return unicodedata.normalize('NFC', str(name)).casefold()
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    """Ein Dataset einer Quelle"""
+    source: str
+    id: str
+    parser: str
+    time_column: str
+    parquet: str
+    files: tuple = ()
+    label: str = None
+    time_format: str = None
+    years: tuple = None
+    channel_header: bool = False
+
+    def __post_init__(self):
+        where = f"Dataset {self.source}/{self.id}"
+        if not self.id:
+            raise ValueError(f"{where}: 'id' fehlt")
+        if self.parser not in PARSERS:
+            raise ValueError(f"{where}: unbekannter Parser '{self.parser}' (erlaubt: {', '.join(PARSERS)})")
+        if not self.time_column:
+            raise ValueError(f"{where}: 'time_column' fehlt")
+        if not self.parquet:
+            raise ValueError(f"{where}: 'parquet' fehlt")
+        uses_year = any('{year}' in f for f in self.files)
+        if uses_year != (self.years is not None):
+            raise ValueError(f"{where}: '{{year}}' in 'files' und 'years' nur gemeinsam angeben")
+        if self.years is not None and (len(self.years) != 2 or self.years[0] > self.years[1]):
+            raise ValueError(f"{where}: 'years' muss [erstes, letztes] Jahr sein")
+        if self.channel_header and self.file_kind != 'csv':
+            raise ValueError(f"{where}: 'channel_header' nur für CSV-Parser")
+
+    @property
+    def file_kind(self):
+        """'csv' oder 'excel'"""
+        return PARSERS[self.parser][0]
+
+    @property
+    def display_label(self):
+        return self.label or self.id
+
+    def source_files(self, base_path):
+        """Quelldateien als (Pfad, Jahr) - Jahr nur bei '{year}'-Mustern, sonst None"""
+        base_path = Path(base_path)
+        result = []
+        for pattern in self.files:
+            if self.years is None:
+                result.append((base_path / pattern, None))
+                continue
+            for year in range(self.years[0], self.years[1] + 1):
+                result.append((base_path / pattern.format(year=year), year))
+        return result
+
+
+@dataclass(frozen=True)
+class SourceSpec:
+    """Eine Quelle (Gebäude bzw. Kraftwerksgruppe) mit ihren Datasets"""
+    id: str
+    label: str
+    datasets: tuple
+    color: str = 'primary'
+    icon: str = 'database'
+    loader: str = 'standard'
+    _by_id: dict = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if not self.id or not self.label:
+            raise ValueError(f"Quelle {self.id or '?'}: 'id' und 'label' sind Pflicht")
+        if self.loader not in LOADERS:
+            raise ValueError(f"Quelle {self.id}: unbekannter Loader '{self.loader}' (erlaubt: {', '.join(LOADERS)})")
+        if self.color not in BOOTSTRAP_COLORS:
+            raise ValueError(f"Quelle {self.id}: unbekannte Farbe '{self.color}'")
+        by_id = {}
+        for spec in self.datasets:
+            if spec.id in by_id:
+                raise ValueError(f"Quelle {self.id}: Dataset '{spec.id}' doppelt")
+            by_id[spec.id] = spec
+        object.__setattr__(self, '_by_id', by_id)
+
+    def dataset(self, dataset_id):
+        """DatasetSpec oder None"""
+        return self._by_id.get(dataset_id)
+
+
+_SOURCE_KEYS = {'id', 'label', 'color', 'icon', 'loader', 'datasets'}
+_DATASET_KEYS = {'id', 'label', 'files', 'years', 'parser', 'time_column', 'time_format', 'parquet',
+                 'channel_header'}
+
+
+def _check_keys(entry, allowed, where):
+    """Unbekannte Schlüssel (Tippfehler) als Fehler melden"""
+    unknown = set(entry) - allowed
+    if unknown:
+        raise ValueError(f"{where}: unbekannte Felder {', '.join(sorted(unknown))}")
+
+
+class DatasetRegistry:
+    """Validierte Registry aller Quellen und Datasets"""
+
+    def __init__(self, sources):
+        self.sources = tuple(sources)
+        self._by_id = {}
+        for source in self.sources:
+            if source.id in self._by_id:
+                raise ValueError(f"Quelle '{source.id}' doppelt")
+            self._by_id[source.id] = source
+        prefixes = {}
+        for spec in self.datasets():
+            key = _normalize(spec.parquet)
+            if key in prefixes:
+                raise ValueError(f"Parquet-Präfix '{spec.parquet}' doppelt "
+                                 f"({prefixes[key]} und {spec.source}/{spec.id})")
+            prefixes[key] = f"{spec.source}/{spec.id}"
+
+    @classmethod
+    def from_dict(cls, data):
+        """Registry aus dem JSON-Inhalt (wirft ValueError bei ungültigen Einträgen)"""
+        sources = []
+        for source in data.get('sources', []):
+            source = dict(source)
+            _check_keys(source, _SOURCE_KEYS, f"Quelle {source.get('id', '?')}")
+            for entry in source.get('datasets', []):
+                _check_keys(entry, _DATASET_KEYS, f"Dataset {source.get('id', '?')}/{entry.get('id', '?')}")
+            datasets = tuple(
+                DatasetSpec(
+                    source=source.get('id'),
+                    id=entry.get('id'),
+                    parser=entry.get('parser'),
+                    time_column=entry.get('time_column'),
+                    parquet=entry.get('parquet'),
+                    files=tuple(entry.get('files', ())),
+                    label=entry.get('label'),
+                    time_format=entry.get('time_format'),
+                    years=tuple(entry['years']) if entry.get('years') is not None else None,
+                    channel_header=bool(entry.get('channel_header', False))
+                )
+                for entry in source.pop('datasets', [])
+            )
+            sources.append(SourceSpec(datasets=datasets, **source))
+        return cls(sources)
+
+    @classmethod
+    def load(cls, path=REGISTRY_PATH):
+        """Registry aus einer JSON-Datei"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        try:
+            return cls.from_dict(data)
+        except ValueError as e:
+            raise ValueError(f"Ungültige Dataset-Registry {path}: {e}") from e
+
+    def source(self, source_id):
+        """SourceSpec oder None"""
+        return self._by_id.get(source_id)
+
+    def dataset(self, source_id, dataset_id):
+        """DatasetSpec oder None"""
+        source = self._by_id.get(source_id)
+        return source.dataset(dataset_id) if source is not None else None
+
+    def datasets(self, source_id=None):
+        """Alle DatasetSpecs (in Registry-Reihenfolge), optional einer Quelle"""
+        return [spec for source in self.sources
+                if source_id is None or source.id == source_id
+                for spec in source.datasets]
+
+    def source_labels(self):
+        """{quelle: Anzeigename}"""
+        return {source.id: source.label for source in self.sources}
+
+    def resolve_parquet_files(self, parquet_dir):
+        """
+        Ordnet die Parquet-Dateien eines Verzeichnisses den Datasets zu (ein
+        Verzeichnisdurchlauf).
+
+        Eine Datei gehört zum Dataset mit dem längsten passenden Präfix
+        (DataOptimizer hängt einen Hash an den Dateinamen an); bei mehreren
+        Dateien pro Dataset gewinnt die jüngste.
+
+        Returns:
+            {(quelle, dataset): Path}
+        """
+        parquet_dir = Path(parquet_dir)
+        if not parquet_dir.exists():
+            return {}
+        prefixes = sorted(((_normalize(spec.parquet), (spec.source, spec.id)) for spec in self.datasets()),
+                          key=lambda item: len(item[0]), reverse=True)
+        resolved = {}
+        newest = {}
+        for entry in os.scandir(parquet_dir):
+            if not entry.name.endswith('.parquet') or not entry.is_file():
+                continue
+            name = _normalize(entry.name)
+            key = next((key for prefix, key in prefixes if name.startswith(prefix)), None)
+            if key is None:
+                continue
+            mtime = entry.stat().st_mtime_ns
+            if key not in newest or mtime > newest[key]:
+                newest[key] = mtime
+                resolved[key] = Path(entry.path)
+        return resolved
+
+
+def read_channel_header(path, spec):
+    """
+    Beschreibungszeile unter der Kopfzeile (nur Datasets mit 'channel_header').
+
+    Beschreibungen können unmaskierte Zeilenumbrüche enthalten (Twin2Sim
+    Wetterdaten); die Zeile reicht daher bis alle Spalten gefunden sind.
+    Weitere Metadatenzeilen ohne Zeitstempel (leere erste Spalte) folgen.
+
+    Returns:
+        ({spalte: beschreibung}, Anzahl Metadatenzeilen in der Datei)
+    """
+    if not spec.channel_header:
+        return {}, 0
+    sep = PARSERS[spec.parser][1].get('sep', ',')
+    with open(path, 'r', encoding='utf-8-sig', errors='replace') as f:
+        columns = f.readline().rstrip('\r\n').split(sep)
+        text, lines = f.readline().rstrip('\r\n'), 1
+        while text.count(sep) < len(columns) - 1:
+            line = f.readline()
+            if not line:
+                break
+            text = f"{text} {line.rstrip(chr(13) + chr(10))}"
+            lines += 1
+        for line in f:
+            if line.split(sep, 1)[0].strip():
+                break
+            lines += 1
+    descriptions = {column: value.strip() for column, value in zip(columns, text.split(sep))
+                    if value.strip(' :')}
+    return descriptions, lines
+
+
+def read_source_file(path, spec):
+    """Liest eine Quelldatei mit dem Parser des Datasets (ohne Metadatenzeilen)"""
+    import pandas as pd
+
+    kind, options = PARSERS[spec.parser]
+    if kind == 'csv':
+        if spec.channel_header:
+            _, header_lines = read_channel_header(path, spec)
+            options = dict(options, skiprows=range(1, header_lines + 1))
+        return pd.read_csv(path, **options)
+    return pd.read_excel(path, **options)
+
+
+def parse_time_column(df, spec):
+    """
+    Wandelt die Zeitspalte in datetime (Format aus der Registry, sonst
+    deutsches Datumsformat); unlesbare Zeilen (z.B. Einheitenzeilen) werden NaT.
+    """
+    import pandas as pd
+
+    column = spec.time_column
+    if column not in df.columns or pd.api.types.is_datetime64_any_dtype(df[column]):
+        return df
+    if spec.time_format:
+        parsed = pd.to_datetime(df[column], format=spec.time_format, errors='coerce')
+    else:
+        parsed = pd.to_datetime(df[column], dayfirst=True, errors='coerce')
+    if parsed.notna().any():
+        df[column] = parsed
+    return df
+
+
+REGISTRY = DatasetRegistry.load()
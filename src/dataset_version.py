@@ -0,0 +1,80 @@
+"""
+Dataset-Versionen
+=================
+Stabile Inhaltskennung eines DataFrames für Cache-Keys (Figure-Cache,
+abgeleitete Ergebnisse). Die Version ist ein Hash über Spalten, Dtypes
+und Werte; sie ist prozessübergreifend gleich (Worker, Background-Jobs)
+und ändert sich, sobald sich der Inhalt ändert.
+
+Die Berechnung wird pro DataFrame-Objekt gecacht (schwache Referenz, LRU
+über die letzten _VERSION_CACHE_MAX Objekte), da geladene Datasets im
+Dashboard unveränderlich sind. Der Loader hinterlegt für frisch geladene
+Datasets eine Version aus dem Hash der Quelldatei (register_version); dann
+entfällt das Hashen der Werte. Hinterlegte Versionen liegen getrennt vom
+LRU und werden nie verdrängt (nur mit dem DataFrame freigegeben): sonst
+würden kurzlebige Frames (Figure-Cache-Keys) sie durch einen Inhalts-Hash
+ersetzen, und abgeleitete Cache-Keys wären nicht mehr prozessübergreifend
+gleich.
+"""
+
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+
+
+_VERSION_CACHE = OrderedDict()   # id(df) -> (weakref, Version), berechnet (LRU)
+_VERSION_CACHE_MAX = 256
+_REGISTERED = {}                 # id(df) -> (weakref, Version), vom Loader hinterlegt
+# RLock: der weakref-Callback kann während einer Allokation unter dem Lock laufen
+_LOCK = threading.RLock()
+
+
+def _compute_version(df):
+    import pandas as pd
+
+    digest = hashlib.blake2b(digest_size=12)
+    digest.update(repr((df.shape, [str(col) for col in df.columns],
+                        [str(dtype) for dtype in df.dtypes])).encode('utf-8'))
+    if len(df):
+        digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _forget_registered(key, ref):
+    """weakref-Callback: Eintrag eines freigegebenen DataFrames entfernen"""
+    with _LOCK:
+        entry = _REGISTERED.get(key)
+        if entry is not None and entry[0] is ref:
+            del _REGISTERED[key]
+
+
+def register_version(df, version):
+    """Hinterlegt eine bekannte Version (z.B. Quelldatei-Hash) für ein DataFrame-Objekt"""
+    key = id(df)
+    ref = weakref.ref(df, lambda ref, key=key: _forget_registered(key, ref))
+    with _LOCK:
+        _VERSION_CACHE.pop(key, None)
+        _REGISTERED[key] = (ref, version)
+    return version
+
+
+def dataset_version(df):
+    """Inhalts-Hash eines DataFrames (hex), gecacht pro Objekt"""
+    key = id(df)
+    with _LOCK:
+        entry = _REGISTERED.get(key)
+        if entry is not None and entry[0]() is df:
+            return entry[1]
+        entry = _VERSION_CACHE.get(key)
+        if entry is not None and entry[0]() is df:
+            _VERSION_CACHE.move_to_end(key)
+            return entry[1]
+
+    version = _compute_version(df)
+    with _LOCK:
+        _VERSION_CACHE[key] = (weakref.ref(df), version)
+        _VERSION_CACHE.move_to_end(key)
+        while len(_VERSION_CACHE) > _VERSION_CACHE_MAX:
+            _VERSION_CACHE.popitem(last=False)
+    return version
@@ -0,0 +1,242 @@
+"""
+Persistenter Cache für abgeleitete Ergebnisse
+=============================================
+Abgeleitete Tabellen (KPI-Teilergebnisse, Resampling-Raster) werden als
+Arrow-IPC-Dateien unter <base>/cache/derived/<namespace>/<key>.arrow
+abgelegt. Sie überstehen Neustarts und werden von allen Worker-Prozessen
+geteilt.
+
+- Schlüssel: Hash über Namespace, Code-Version des Namespace
+  (NAMESPACE_VERSIONS), Dataset-Version und Transformations-Parameter. Geladene Datasets tragen als Version den Hash ihrer
+  Quelldatei (source_version, register_version in dataset_version), eine
+  geänderte Datei ergibt neue Schlüssel; alte Einträge altern aus.
+- Schreiben atomar: temporäre Datei im selben Verzeichnis, dann os.replace.
+  Parallele Schreiber desselben Schlüssels schreiben identischen Inhalt,
+  Leser sehen nie eine halbe Datei.
+- Größenbudget (MOKIG_DERIVED_CACHE_MB, Default 512): nach dem Schreiben
+  werden die am längsten nicht gelesenen Dateien gelöscht (Lesezugriffe
+  setzen die mtime).
+- Kein pickle: nur DataFrames mit Arrow-kompatiblen Spalten; was sich nicht
+  schreiben lässt, wird nur berechnet.
+
+Beispiel:
+    table = DERIVED_CACHE.get_or_compute(
+        'kpi', dataset_version(df), {'resolutions': ['D', 'M']},
+        lambda: compute_dataset_kpis('fis', 'export_q1_2025', df))
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+
+CACHE_VERSION = 1
+# Code-Version je Namespace: erhöhen, wenn sich die Berechnung ändert
+# (kpi_engine, resampling_engine), damit alte Einträge nicht mehr treffen
+NAMESPACE_VERSIONS = {
+    'kpi': 2,
+    'resample': 2
+}
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / "cache" / "derived"
+MAX_BYTES = int(os.environ.get('MOKIG_DERIVED_CACHE_MB', '512')) * 1024 * 1024
+
+# Nach dem Aufräumen bleibt dieser Anteil des Budgets belegt (Luft für neue Einträge)
+EVICT_TARGET_SHARE = 0.8
+
+_FILE_HASHES = {}
+_FILE_HASHES_LOCK = threading.Lock()
+
+
+def file_hash(path):
+    """Inhalts-Hash einer Datei (hex), pro Prozess gecacht bis sich Größe oder mtime ändern"""
+    path = Path(path)
+    stat = path.stat()
+    key = str(path.resolve())
+    with _FILE_HASHES_LOCK:
+        entry = _FILE_HASHES.get(key)
+    if entry is not None and entry[0] == (stat.st_size, stat.st_mtime_ns):
+        return entry[1]
+
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    with _FILE_HASHES_LOCK:
+        _FILE_HASHES[key] = ((stat.st_size, stat.st_mtime_ns), digest.hexdigest())
+    return digest.hexdigest()
+
+
+def source_version(paths, params=None):
+    """
+    Dataset-Version aus den Quelldateien und den Lade-Parametern.
+
+    Gleiche Dateiinhalte und Parameter ergeben in jedem Prozess dieselbe
+    Version; fehlende Dateien werden ausgelassen.
+    """
+    digest = hashlib.blake2b(digest_size=12)
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode('utf-8'))
+    for path in paths:
+        if Path(path).exists():
+            digest.update(file_hash(path).encode('ascii'))
+    return digest.hexdigest()
+
+
+def cache_key(namespace, version, params=None):
+    """Inhaltsadressierter Schlüssel (hex) eines abgeleiteten Ergebnisses"""
+    payload = json.dumps([CACHE_VERSION, namespace, NAMESPACE_VERSIONS.get(namespace, 1), version, params],
+                         sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class DerivedCache:
+    """Dateibasierter Cache für abgeleitete DataFrames (Arrow IPC)"""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def path(self, namespace, key):
+        return self.directory / namespace / f"{key}.arrow"
+
+    def get(self, namespace, version, params=None):
+        """DataFrame aus dem Cache oder None"""
+        path = self.path(namespace, cache_key(namespace, version, params))
+        try:
+            with pa.memory_map(str(path), 'r') as source:
+                table = pa.ipc.open_file(source).read_all()
+            df = table.to_pandas()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, pa.ArrowInvalid) as e:
+            print(f"[WARNUNG] Abgeleiteter Cache-Eintrag {path.name} unlesbar ({e}), wird verworfen")
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                pass  # z.B. Windows: noch von einem anderen Prozess gemappt
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)  # für die Verdrängung: zuletzt genutzt
+        except OSError:
+            pass
+        self.hits += 1
+        return df
+
+    def put(self, namespace, version, params, df):
+        """Schreibt ein DataFrame atomar; False wenn es sich nicht als Arrow schreiben lässt"""
+        path = self.path(namespace, cache_key(namespace, version, params))
+        try:
+            table = pa.Table.from_pandas(df)
+        except (pa.ArrowException, TypeError, ValueError) as e:
+            print(f"[WARNUNG] {namespace}: Ergebnis nicht als Arrow speicherbar ({e})")
+            return False
+
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}.", suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f, pa.ipc.new_file(f, table.schema) as writer:
+                    writer.write_table(table)
+                os.chmod(tmp, 0o644)
+                os.replace(tmp, path)
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+        except OSError as e:
+            print(f"[WARNUNG] Abgeleiteter Cache nicht beschreibbar ({e})")
+            return False
+        self.writes += 1
+        self.evict()
+        return True
+
+    def get_or_compute(self, namespace, version, params, compute):
+        """Ergebnis aus dem Cache, sonst compute() ausführen und speichern"""
+        df = self.get(namespace, version, params)
+        if df is None:
+            df = compute()
+            if isinstance(df, pd.DataFrame):
+                self.put(namespace, version, params, df)
+        return df
+
+    def _files(self):
+        """[(mtime_ns, Größe, Pfad)] aller Einträge; parallel gelöschte fehlen"""
+        files = []
+        if not self.directory.exists():
+            return files
+        for namespace in os.scandir(self.directory):
+            if not namespace.is_dir():
+                continue
+            for entry in os.scandir(namespace.path):
+                if not entry.name.endswith('.arrow'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                files.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        return files
+
+    def evict(self):
+        """Löscht die am längsten nicht genutzten Einträge, bis das Budget eingehalten ist"""
+        with self._lock:
+            files = self._files()
+            total = sum(size for _, size, _ in files)
+            if total <= self.max_bytes:
+                return 0
+            target = self.max_bytes * EVICT_TARGET_SHARE
+            removed = 0
+            for _, size, path in sorted(files):
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass  # von einem anderen Prozess bereits entfernt
+                except OSError as e:
+                    # z.B. Windows: Datei von einem Leser noch gemappt
+                    print(f"[WARNUNG] Cache-Eintrag {os.path.basename(path)} nicht löschbar ({e})")
+                    continue
+                total -= size
+                removed += 1
+            self.evictions += removed
+            return removed
+
+    def clear(self):
+        """Löscht alle Einträge"""
+        with self._lock:
+            for _, _, path in self._files():
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    print(f"[WARNUNG] Cache-Eintrag {os.path.basename(path)} nicht löschbar ({e})")
+
+    def stats(self):
+        """Belegung und Trefferzahlen (dieser Prozess)"""
+        files = self._files()
+        return {
+            'entries': len(files),
+            'bytes': sum(size for _, size, _ in files),
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'writes': self.writes,
+            'evictions': self.evictions
+        }
+
+
+DERIVED_CACHE = DerivedCache()
@@ -0,0 +1,43 @@
+"""
+Export Callbacks
+================
+Hält den Export-Link einer Tabelle aktuell: Format, Zeitraum sowie
+Filter und ausgeblendete Spalten der Tabelle werden in die URL des
+Streaming-Exports (export_service) übernommen.
+"""
+
+from dash import Input, Output, State, MATCH
+from dash.exceptions import PreventUpdate
+
+from export_service import export_url
+
+
+# Tabellenarten mit Export-Leiste (native bzw. serverseitige DataTable)
+EXPORT_TABLE_TYPES = ('data-table', 'server-table')
+
+
+def register_export_callbacks(app):
+    """Registriert die Callbacks der Export-Leisten"""
+
+    for table_type in EXPORT_TABLE_TYPES:
+        def export_id(kind, table_type=table_type):
+            return {'type': kind, 'table': table_type, 'id': MATCH}
+
+        @app.callback(
+            Output(export_id('export-link'), 'href'),
+            [Input(export_id('export-format'), 'value'),
+             Input(export_id('export-range'), 'start_date'),
+             Input(export_id('export-range'), 'end_date'),
+             Input({'type': table_type, 'id': MATCH}, 'filter_query'),
+             Input({'type': table_type, 'id': MATCH}, 'hidden_columns')],
+            [State(export_id('export-meta'), 'data')]
+        )
+        def update_export_link(fmt, start_date, end_date, filter_query, hidden_columns, meta):
+            """Export-URL der aktuellen Tabellenauswahl"""
+            if not meta:
+                raise PreventUpdate
+            return export_url(
+                meta['source'], meta['dataset'], fmt or 'csv_de',
+                exclude=hidden_columns, start=start_date, end=end_date,
+                filter_query=filter_query
+            )
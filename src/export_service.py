@@ -0,0 +1,321 @@
+"""
+Streaming-Export
+================
+GET /_mokig/export liefert die aktuelle Auswahl einer Tabelle (Dataset,
+Spalten, Zeitraum, filter_query der DataTable) als Datei:
+
+- csv:      international (Komma, Dezimalpunkt, ISO-Datum)
+- csv_de:   deutsch (Semikolon, Dezimalkomma, TT.MM.JJJJ, BOM für Excel)
+- parquet:  eine Row-Group pro Batch
+- xlsx:     Excel (max. 1.048.575 Zeilen)
+
+Die Daten werden batchweise erzeugt und sofort gesendet: liegt das
+Dataset in data_optimized/, wird die Parquet-Datei per Record-Batches
+gelesen (Zeitraum als Filter mit Row-Group-Pruning), sonst das geladene
+Dataset in Blöcken durchlaufen. Die filter_query wird mit derselben
+Übersetzung wie in der serverseitigen Tabelle (table_server) pro Batch
+angewendet. Der Speicherbedarf hängt damit nur von der Batchgröße ab.
+CSV und Parquet beginnen sofort mit dem Download; XLSX muss als ZIP-Archiv
+erst vollständig (in eine temporäre Datei) geschrieben werden.
+
+pandas, pyarrow und table_server werden erst beim Export importiert: URL
+und Route stehen ohne sie bereit (Schnellstart des Dashboards).
+
+Parameter: source, dataset, format, columns (mehrfach), exclude (mehrfach),
+start, end, filter
+
+Beispiel:
+    /_mokig/export?source=kw&dataset=kw_duernbach_gesamt&format=csv_de
+        &start=2021-01-01&end=2023-12-31&filter={WERT_LEISTUNG} > 100
+"""
+
+import os
+import tempfile
+from datetime import datetime
+from urllib.parse import quote, urlencode
+
+from flask import Response, abort, request, stream_with_context
+
+
+EXPORT_URL = '/_mokig/export'
+EXPORT_BATCH_ROWS = 50_000
+XLSX_MAX_ROWS = 1_048_575  # Excel-Limit abzüglich Kopfzeile
+
+EXPORT_FORMATS = {
+    'csv': ('CSV (international)', 'csv', 'text/csv'),
+    'csv_de': ('CSV (deutsch)', 'csv', 'text/csv'),
+    'parquet': ('Parquet', 'parquet', 'application/vnd.apache.parquet'),
+    'xlsx': ('Excel (XLSX)', 'xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+}
+
+_CSV_OPTIONS = {
+    'csv': dict(sep=',', decimal='.', date_format='%Y-%m-%d %H:%M:%S'),
+    'csv_de': dict(sep=';', decimal=',')  # Datumsformat der Tabelle (DATE_DISPLAY_FORMAT)
+}
+_STREAM_CHUNK_BYTES = 1024 * 1024
+
+
+def export_url(source, dataset, fmt='csv', columns=None, exclude=None, start=None, end=None,
+               filter_query=None):
+    """URL für den Export einer Auswahl"""
+    params = {'source': source, 'dataset': dataset, 'format': fmt}
+    if columns:
+        params['columns'] = list(columns)
+    if exclude:
+        params['exclude'] = list(exclude)
+    if start:
+        params['start'] = str(start)
+    if end:
+        params['end'] = str(end)
+    if filter_query:
+        params['filter'] = filter_query
+    return f"{EXPORT_URL}?{urlencode(params, doseq=True)}"
+
+
+def _end_inclusive(end):
+    """Enddatum ohne Uhrzeit gilt für den ganzen Tag"""
+    if end is None:
+        return None
+    import pandas as pd
+
+    ts = pd.Timestamp(end)
+    if ts == ts.normalize() and ':' not in str(end):
+        ts += pd.Timedelta(days=1) - pd.Timedelta(1, 'ns')
+    return ts
+
+
+def _parquet_time_filter(schema, start, end):
+    """Zeitraum als pyarrow-Ausdruck (Row-Group-Pruning über die Statistiken)"""
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    from time_axis import TIME_COLUMNS
+
+    column = next((c for c in TIME_COLUMNS if c in schema.names
+                   and pa.types.is_timestamp(schema.field(c).type)), None)
+    if column is None or (start is None and end is None):
+        return None
+    tz = schema.field(column).type.tz
+    expression = None
+    for bound, op in ((start, '__ge__'), (end, '__le__')):
+        if bound is None:
+            continue
+        ts = pd.Timestamp(bound)
+        if tz is not None and ts.tzinfo is None:
+            ts = ts.tz_localize('UTC')
+        term = getattr(ds.field(column), op)(pa.scalar(ts.to_pydatetime(), type=pa.timestamp('us', tz=tz)))
+        expression = term if expression is None else expression & term
+    return expression
+
+
+def iter_parquet_batches(path, columns=None, start=None, end=None, filter_query=None,
+                         batch_rows=EXPORT_BATCH_ROWS):
+    """DataFrame-Batches aus einer Parquet-Datei (Zeitraum per Pruning, Filter pro Batch)"""
+    import pyarrow.dataset as ds
+    from table_server import filter_positions
+
+    dataset = ds.dataset(str(path), format='parquet')
+    names = [name for name in dataset.schema.names if not name.startswith('__index_level_')]
+    columns = [col for col in columns if col in names] if columns else names
+    expression = _parquet_time_filter(dataset.schema, start, end)
+
+    for batch in dataset.to_batches(columns=columns, filter=expression, batch_size=batch_rows):
+        if batch.num_rows == 0:
+            continue
+        df = batch.to_pandas()
+        positions = filter_positions(df, filter_query)
+        if positions is not None:
+            if not len(positions):
+                continue
+            df = df.iloc[positions]
+        yield df
+
+
+def iter_frame_batches(df, columns=None, start=None, end=None, filter_query=None,
+                       batch_rows=EXPORT_BATCH_ROWS):
+    """DataFrame-Batches aus einem geladenen Dataset (zeitlich sortiert)"""
+    import numpy as np
+    from table_server import filter_positions
+    from time_axis import get_time_axis
+
+    columns = [col for col in columns if col in df.columns] if columns else list(df.columns)
+    axis = get_time_axis(df)
+    if axis is not None:
+        rows = axis.positions(start, end)
+    else:
+        rows = np.arange(len(df))
+
+    positions = filter_positions(df, filter_query)
+    if positions is not None:
+        rows = rows[np.isin(rows, positions, assume_unique=True)]
+
+    column_positions = [df.columns.get_loc(col) for col in columns]
+    for i in range(0, len(rows), batch_rows):
+        yield df.iloc[rows[i:i + batch_rows], column_positions]
+
+
+def _naive_datetimes(df):
+    """Zeitzonen entfernen (UTC), Excel kennt keine Zeitzonen"""
+    import pandas as pd
+
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.DatetimeTZDtype):
+            df[col] = df[col].dt.tz_convert('UTC').dt.tz_localize(None)
+    return df
+
+
+def stream_csv(batches, fmt='csv'):
+    """CSV-Bytes pro Batch (Kopfzeile nur im ersten, deutsch mit BOM für Excel)"""
+    from table_server import DATE_DISPLAY_FORMAT
+
+    options = dict(_CSV_OPTIONS[fmt])
+    options.setdefault('date_format', DATE_DISPLAY_FORMAT)
+    prefix = '\ufeff' if fmt == 'csv_de' else ''
+    for i, df in enumerate(batches):
+        yield (prefix + df.to_csv(index=False, header=(i == 0), **options)).encode('utf-8')
+        prefix = ''
+
+
+class _ChunkSink:
+    """Datei-Ersatz für den ParquetWriter: sammelt geschriebene Bytes bis zum Abholen"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_parquet(batches):
+    """Parquet-Bytes: eine Row-Group pro Batch, sofort weitergegeben"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = _ChunkSink()
+    writer = None
+    try:
+        for df in batches:
+            if writer is None:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                writer = pq.ParquetWriter(pa.PythonFile(sink, mode='w'), table.schema, compression='snappy')
+            else:
+                table = pa.Table.from_pandas(df, schema=writer.schema, preserve_index=False)
+            writer.write_table(table)
+            yield sink.drain()
+    finally:
+        if writer is not None:
+            writer.close()
+    yield sink.drain()
+
+
+def stream_xlsx(batches, max_rows=XLSX_MAX_ROWS):
+    """XLSX über openpyxl (write-only, Zeilen gehen auf die Platte), danach blockweise"""
+    import pandas as pd
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Export')
+    written = 0
+    for df in batches:
+        if written == 0:
+            sheet.append([str(col) for col in df.columns])
+        df = _naive_datetimes(df.head(max_rows - written).copy())
+        for row in df.astype(object).where(df.notna(), None).itertuples(index=False):
+            sheet.append([value.to_pydatetime() if isinstance(value, pd.Timestamp) else value
+                          for value in row])
+        written += len(df)
+        if written >= max_rows:
+            print(f"[EXPORT] XLSX auf {max_rows:,} Zeilen begrenzt")
+            break
+
+    fd, path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(fd)
+    try:
+        workbook.save(path)
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(_STREAM_CHUNK_BYTES)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        os.remove(path)
+
+
+def stream_export(batches, fmt):
+    """Bytes-Generator für das Format"""
+    if fmt in _CSV_OPTIONS:
+        return stream_csv(batches, fmt)
+    if fmt == 'parquet':
+        return stream_parquet(batches)
+    return stream_xlsx(batches)
+
+
+def register_export_routes(server, all_data, get_data_loader=None):
+    """Registriert GET /_mokig/export am Flask-Server (get_data_loader: Loader-Fabrik, optional)"""
+
+    @server.route(EXPORT_URL)
+    def export_selection():
+        import pandas as pd
+        import pyarrow.parquet as pq
+
+        args = request.args
+        source, dataset = args.get('source'), args.get('dataset')
+        fmt = args.get('format', 'csv')
+        if fmt not in EXPORT_FORMATS:
+            abort(400, f"Unbekanntes Format: {fmt} (erlaubt: {', '.join(EXPORT_FORMATS)})")
+        try:
+            start = pd.Timestamp(args['start']) if args.get('start') else None
+            end = _end_inclusive(args.get('end'))
+        except ValueError:
+            abort(400, "Ungültiger Zeitraum")
+
+        columns = args.getlist('columns') or None
+        exclude = set(args.getlist('exclude'))
+        filter_query = args.get('filter') or None
+
+        # Parquet, sofern vorhanden und alle gewünschten Spalten enthalten
+        # (das Dataset muss dann nicht im Speicher liegen)
+        batches = None
+        data_loader = get_data_loader() if get_data_loader is not None else None
+        parquet_path = data_loader._find_parquet_file(source, dataset) if data_loader is not None else None
+        if parquet_path is not None:
+            names = [name for name in pq.read_schema(parquet_path).names
+                     if not name.startswith('__index_level_')]
+            selected = [col for col in (columns or names) if col not in exclude]
+            if all(col in names for col in selected):
+                batches = iter_parquet_batches(parquet_path, selected, start, end, filter_query)
+        if batches is None:
+            df = all_data[source][dataset] if dataset in all_data.get(source, {}) else None
+            if df is None:
+                abort(404, f"Dataset {source}/{dataset} nicht gefunden")
+            selected = [col for col in (columns or df.columns) if col not in exclude]
+            batches = iter_frame_batches(df, selected, start, end, filter_query)
+
+        _, extension, mimetype = EXPORT_FORMATS[fmt]
+        filename = f"{source}_{dataset}_{datetime.now():%Y%m%d-%H%M}.{extension}"
+        response = Response(stream_with_context(stream_export(batches, fmt)), mimetype=mimetype,
+                            direct_passthrough=True)
+        response.headers['Content-Disposition'] = f"attachment; filename*=UTF-8''{quote(filename)}"
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+
+    return server
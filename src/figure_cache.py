@@ -0,0 +1,150 @@
+"""
+Figure-Cache
+============
+Memoisiert Figure-Builder (z.B. create_visualization_figure,
+create_comparison_chart) in einem LRU-Cache mit Byte-Budget.
+
+Der Key wird aus den Argumenten gebildet: DataFrames gehen über ihre
+(serverseitig berechnete) Dataset-Version ein, Listen/Dicts werden
+eingefroren. Versionsangaben aus dem Browser (Stores) fließen nie ein,
+sonst könnte ein Client fremde Einträge überschreiben. Wiederholte Kombinationen (z.B. Wechsel
+zwischen "Getrennt", "Überlagert" und "Subplots" auf derselben Auswahl)
+kommen damit direkt aus dem Cache.
+
+Beispiel:
+    @memoize_figure()
+    def build_chart(df, params, chart_type): ...
+"""
+
+import functools
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from dataset_version import dataset_version
+
+
+FIGURE_CACHE_MAX_BYTES = int(os.environ.get('MOKIG_FIGURE_CACHE_MB', '256')) * 1024 * 1024
+
+
+def estimate_nbytes(obj):
+    """Grobe Größe eines Figure-/Komponenten-Objekts in Bytes"""
+    import numpy as np
+
+    if isinstance(obj, (str, bytes)):
+        return len(obj)
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, dict):
+        return sum(len(str(k)) + estimate_nbytes(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return sum(estimate_nbytes(v) for v in obj) + 8 * len(obj)
+    if hasattr(obj, 'to_plotly_json'):
+        return estimate_nbytes(obj.to_plotly_json())
+    return 16
+
+
+class FigureCache:
+    """Thread-sicherer LRU-Cache mit Byte-Budget"""
+
+    def __init__(self, max_bytes=FIGURE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, nbytes=None):
+        nbytes = estimate_nbytes(value) if nbytes is None else nbytes
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, nbytes)
+            self.current_bytes += nbytes
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_bytes
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """Kennzahlen für Monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+
+# Gemeinsamer Cache für alle Figure-Builder
+FIGURE_CACHE = FigureCache()
+
+
+def freeze_argument(value):
+    """Wandelt ein Argument in einen hashbaren Key-Bestandteil um"""
+    import numpy as np
+    import pandas as pd
+
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return ('df', dataset_version(value.to_frame() if isinstance(value, pd.Series) else value))
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), freeze_argument(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze_argument(v) for v in value)
+    if isinstance(value, set):
+        return tuple(sorted(freeze_argument(v) for v in value))
+    if isinstance(value, np.ndarray):
+        return ('array', value.shape, hashlib.blake2b(value.tobytes(), digest_size=12).hexdigest())
+    return value
+
+
+def memoize_figure(cache=None, key_func=None):
+    """
+    Decorator: memoisiert einen Figure-Builder im Figure-Cache.
+
+    Args:
+        cache: FigureCache (Default: FIGURE_CACHE)
+        key_func: Optional eigene Key-Funktion mit der Signatur des Builders
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            target = cache or FIGURE_CACHE
+            if key_func is not None:
+                key = (func.__qualname__, key_func(*args, **kwargs))
+            else:
+                key = (func.__qualname__, freeze_argument(args), freeze_argument(kwargs))
+            result = target.get(key)
+            if result is None:
+                result = func(*args, **kwargs)
+                target.put(key, result)
+            return result
+
+        wrapper.cache = cache or FIGURE_CACHE
+        return wrapper
+    return decorator
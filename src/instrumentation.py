@@ -0,0 +1,233 @@
+"""
+Callback-Instrumentierung
+=========================
+Misst pro Callback Laufzeit, Abschnitte (Datenzugriff, Figure-Aufbau),
+Serialisierung sowie Request-/Response-Größen und hält die Werte in
+rollierenden Histogrammen (letzte HISTOGRAM_SIZE Aufrufe).
+
+Aktivierung: Umgebungsvariable MOKIG_INSTRUMENTATION=1 (oder
+enable_instrumentation()). Ist sie deaktiviert, werden keine Callbacks
+umhüllt und section() liefert einen leeren Kontext - der Overhead
+beschränkt sich auf einen Funktionsaufruf pro Abschnitt.
+
+- install_instrumentation(app): vor dem Registrieren der Callbacks
+  aufrufen; umhüllt jede über app.callback registrierte Funktion
+  (Background-Callbacks laufen in eigenen Prozessen und werden nur über
+  die Request-Zeit erfasst, clientseitige Callbacks gar nicht)
+- section('data') / section('figure'): Abschnitte innerhalb von Callbacks
+- Serialisierung = Request-Zeit minus Callback-Zeit (JSON-Kodierung und
+  Dash-Overhead)
+- GET /_mokig/metrics (JSON) bzw. ?format=prometheus; nur von localhost
+  und den Adressen in MOKIG_METRICS_ALLOW (kommagetrennt, z.B. der
+  Prometheus-Host), sonst 403; dieselbe Prüfung (admin_client) gilt für
+  andere Admin-Funktionen wie die SQL-Abfragebox
+"""
+
+import contextlib
+import contextvars
+import functools
+import os
+import threading
+import time
+
+from flask import Response, abort, g, has_request_context, jsonify, request
+
+
+HISTOGRAM_SIZE = 2048
+METRIC_NAMES = ('wall_ms', 'data_ms', 'figure_ms', 'serialization_ms', 'request_bytes', 'response_bytes')
+SUMMARY_QUANTILES = (0.5, 0.95, 0.99)
+
+# Clients, die /_mokig/metrics und Admin-Funktionen nutzen dürfen (neben localhost)
+LOCAL_ADDRESSES = ('127.0.0.1', '::1')
+METRICS_ALLOW = tuple(addr.strip() for addr in os.environ.get('MOKIG_METRICS_ALLOW', '').split(',')
+                      if addr.strip())
+
+
+def admin_client():
+    """True, wenn der aktuelle Request von localhost oder aus MOKIG_METRICS_ALLOW kommt"""
+    return has_request_context() and request.remote_addr in LOCAL_ADDRESSES + METRICS_ALLOW
+
+_STATE = {'enabled': os.environ.get('MOKIG_INSTRUMENTATION', '0') == '1'}
+_SECTIONS = contextvars.ContextVar('mokig_callback_sections', default=None)
+_NULL_SECTION = contextlib.nullcontext()
+_METRICS = {}
+_METRICS_LOCK = threading.Lock()
+
+
+class RollingHistogram:
+    """Ringpuffer der letzten Messwerte mit Quantil-Zusammenfassung"""
+
+    def __init__(self, size=HISTOGRAM_SIZE):
+        import numpy as np
+
+        self.values = np.zeros(size, dtype=np.float64)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value):
+        self.values[self.count % len(self.values)] = value
+        self.count += 1
+        self.total += value
+
+    def summary(self):
+        window = self.values[:min(self.count, len(self.values))]
+        if len(window) == 0:
+            return {'count': 0}
+        import numpy as np
+
+        quantiles = np.quantile(window, SUMMARY_QUANTILES)
+        result = {'count': self.count, 'mean': float(window.mean()), 'max': float(window.max())}
+        for q, value in zip(SUMMARY_QUANTILES, quantiles):
+            result[f"p{int(q * 100)}"] = float(value)
+        return result
+
+
+def instrumentation_enabled():
+    return _STATE['enabled']
+
+
+def enable_instrumentation(enabled=True):
+    _STATE['enabled'] = enabled
+
+
+def section(name):
+    """Kontextmanager für einen Abschnitt ('data', 'figure') im laufenden Callback"""
+    if not _STATE['enabled']:
+        return _NULL_SECTION
+    sections = _SECTIONS.get()
+    if sections is None:
+        return _NULL_SECTION
+    return _timed_section(sections, name)
+
+
+@contextlib.contextmanager
+def _timed_section(sections, name):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        sections[name] = sections.get(name, 0.0) + (time.perf_counter() - t0) * 1000
+
+
+def _timed_callback(func):
+    @functools.wraps(func)
+    def timed(*args, **kwargs):
+        sections = {}
+        token = _SECTIONS.set(sections)
+        t0 = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            wall_ms = (time.perf_counter() - t0) * 1000
+            _SECTIONS.reset(token)
+            if has_request_context():
+                g.mokig_timing = (func.__name__, wall_ms, sections)
+    return timed
+
+
+def install_instrumentation(app):
+    """Umhüllt alle künftig über app.callback registrierten Funktionen"""
+    if not _STATE['enabled']:
+        return app
+    original_callback = app.callback
+
+    def instrumented_callback(*args, **kwargs):
+        decorator = original_callback(*args, **kwargs)
+        if kwargs.get('background'):
+            return decorator
+        return lambda func: decorator(_timed_callback(func))
+
+    app.callback = instrumented_callback
+    return app
+
+
+def record(name, **values):
+    """Trägt Messwerte eines Aufrufs in die Histogramme ein"""
+    with _METRICS_LOCK:
+        metrics = _METRICS.get(name)
+        if metrics is None:
+            metrics = _METRICS[name] = {metric: RollingHistogram() for metric in METRIC_NAMES}
+        for metric, value in values.items():
+            if value is not None:
+                metrics[metric].add(value)
+
+
+def metrics_snapshot():
+    """Zusammenfassung aller Histogramme pro Callback"""
+    with _METRICS_LOCK:
+        return {name: {metric: hist.summary() for metric, hist in metrics.items()}
+                for name, metrics in _METRICS.items()}
+
+
+def reset_metrics():
+    with _METRICS_LOCK:
+        _METRICS.clear()
+
+
+def _prometheus_text(snapshot):
+    lines = []
+    for metric in METRIC_NAMES:
+        prom_name = f"mokig_callback_{metric}"
+        lines.append(f"# TYPE {prom_name} summary")
+        for name, metrics in snapshot.items():
+            summary = metrics[metric]
+            if not summary.get('count'):
+                continue
+            label = name.replace('\\', '\\\\').replace('"', '\\"')
+            for q in SUMMARY_QUANTILES:
+                lines.append(f'{prom_name}{{callback="{label}",quantile="{q}"}} {summary[f"p{int(q * 100)}"]}')
+            lines.append(f'{prom_name}_count{{callback="{label}"}} {summary["count"]}')
+    return "\n".join(lines) + "\n"
+
+
+def register_instrumentation_routes(server, extra_metrics=None):
+    """
+    Registriert die Request-Hooks und GET /_mokig/metrics.
+
+    Args:
+        extra_metrics: Optional Funktion, die weitere Kennzahlen als Dict liefert
+            (z.B. Figure-Cache, Kompression)
+    """
+
+    @server.before_request
+    def start_timer():
+        if _STATE['enabled'] and request.path == '/_dash-update-component':
+            g.mokig_t0 = time.perf_counter()
+
+    @server.after_request
+    def record_request(response):
+        t0 = g.pop('mokig_t0', None)
+        if t0 is None:
+            return response
+        total_ms = (time.perf_counter() - t0) * 1000
+        timing = g.pop('mokig_timing', None)
+        if timing:
+            name, wall_ms, sections = timing
+        else:
+            body = request.get_json(silent=True) or {}
+            name, wall_ms, sections = str(body.get('output', 'unbekannt'))[:80], None, {}
+        response_bytes = None if response.direct_passthrough else len(response.get_data())
+        record(
+            name,
+            wall_ms=wall_ms if wall_ms is not None else total_ms,
+            data_ms=sections.get('data'),
+            figure_ms=sections.get('figure'),
+            serialization_ms=max(total_ms - wall_ms, 0.0) if wall_ms is not None else None,
+            request_bytes=request.content_length or 0,
+            response_bytes=response_bytes
+        )
+        return response
+
+    @server.route('/_mokig/metrics')
+    def metrics_endpoint():
+        if not admin_client():
+            abort(403)
+        snapshot = metrics_snapshot()
+        if request.args.get('format') == 'prometheus':
+            return Response(_prometheus_text(snapshot), mimetype='text/plain')
+        payload = {'enabled': _STATE['enabled'], 'callbacks': snapshot}
+        if extra_metrics:
+            payload.update(extra_metrics())
+        return jsonify(payload)
+
+    return server
@@ -0,0 +1,34 @@
+"""
+KPI Callbacks
+=============
+Filtert die materialisierte KPI-Tabelle (kpi_engine) für die KPI-Übersicht.
+"""
+
+import time
+
+from dash import Input, Output
+
+from instrumentation import section
+
+
+def register_kpi_callbacks(app, ALL_DATA):
+    """Registriert die Callbacks der KPI-Übersicht"""
+
+    @app.callback(
+        [Output("kpi-table", "data"),
+         Output("kpi-info", "children")],
+        [Input("kpi-resolution", "value"),
+         Input("kpi-source", "value")]
+    )
+    def update_kpi_table(resolution, source):
+        """Liefert die KPI-Zeilen für Auflösung und Datenquelle"""
+        from kpi_engine import KPI_ENGINE
+
+        t0 = time.perf_counter()
+        # Inkrementell: berechnet nur geänderte Datasets neu
+        with section('data'):
+            KPI_ENGINE.refresh(ALL_DATA)
+            table = KPI_ENGINE.query(resolution or 'Monat', source=source)
+        records = table.drop(columns='Auflösung').round(2).to_dict('records')
+        elapsed = (time.perf_counter() - t0) * 1000
+        return records, f"{len(records):,} KPI-Zeilen - {elapsed:.0f} ms"
@@ -0,0 +1,282 @@
+"""
+KPI-Engine für Gebäude und Kraftwerke
+=====================================
+Berechnet einen konfigurierbaren KPI-Satz (Energie, Spitzenleistung,
+mittlere Leistung, Volllaststunden, mittlere Außentemperatur) für alle
+geladenen Datasets und materialisiert das Ergebnis als kleine Tabelle.
+
+- Kanäle werden über Namensregeln (KPI_CHANNEL_RULES) klassifiziert
+- Pro Dataset und Auflösung ein vektorisierter Durchlauf: Periodencodes
+  einmal berechnen, eine Gruppierung für alle Kanäle gemeinsam
+- Zählerstände werden automatisch erkannt und als Differenzen summiert
+  (Rücksetzungen/Zählertausch werden ignoriert)
+- Inkrementell: nur geänderte Datasets werden neu berechnet
+- Teilergebnisse pro Dataset liegen im abgeleiteten Cache (derived_cache)
+  und werden nach einem Neustart ohne Neuberechnung übernommen
+"""
+
+import re
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from dataset_memory import dataset_signature
+from dataset_version import dataset_version
+from derived_cache import DERIVED_CACHE
+from time_axis import get_time_axis
+
+
+# Kanal-Regeln: erste passende Regel gewinnt; scale rechnet auf kW/kWh um
+KPI_CHANNEL_RULES = [
+    {'kind': 'energy', 'pattern': r'\(kWh\)$|^WERT_ENERGIE$|^WERT$', 'scale': 1.0},
+    {'kind': 'energy', 'pattern': r'\(Wh\)$|_ges_E$', 'scale': 0.001},
+    {'kind': 'power', 'pattern': r'\(kW\)$|^WERT_LEISTUNG$', 'scale': 1.0},
+    {'kind': 'power', 'pattern': r'\(W\)$|_akt_P$|_ges_P$', 'scale': 0.001},
+    {'kind': 'temperature', 'pattern': r'(?i)au(ss|ß)en(fühler|luft|temperatur)|lufttemperatur', 'scale': 1.0},
+]
+
+# KPI-Satz: id -> (Kanaltyp, Aggregation, Anzeigename)
+KPI_DEFINITIONS = {
+    'energie_kwh': ('energy', 'sum', 'Energie (kWh)'),
+    'spitzenleistung_kw': ('power', 'max', 'Spitzenleistung (kW)'),
+    'mittlere_leistung_kw': ('power', 'mean', 'Mittlere Leistung (kW)'),
+    'aussentemperatur_c': ('temperature', 'mean', 'Ø Außentemperatur (°C)'),
+}
+
+# Abgeleitete KPI: Energie / Spitzenleistung je Dataset (wenn eindeutig zuordenbar)
+FULL_LOAD_HOURS_KPI = 'volllaststunden_h'
+FULL_LOAD_HOURS_LABEL = 'Volllaststunden (h)'
+PLANT_CHANNEL = '(Anlage)'
+
+KPI_RESOLUTIONS = {'Tag': 'D', 'Monat': 'M', 'Jahr': 'Y'}
+
+# Zählerstand-Erkennung (counter_columns): Anteil steigender unter den Änderungen
+# ungleich 0 (Tageszähler fallen einmal pro Tag, Intervallkanäle etwa jedes
+# zweite Mal), Mindestanzahl Änderungen, Wertebereich in typischen Schritten
+COUNTER_MONOTONIC_SHARE = 0.8
+COUNTER_MIN_STEPS = 10
+COUNTER_MIN_RANGE_STEPS = 10
+
+KEY_COLUMNS = ['Quelle', 'Dataset', 'Kanal', 'Auflösung', 'Periode']
+
+_COMPILED_RULES = [(re.compile(rule['pattern']), rule['kind'], rule['scale']) for rule in KPI_CHANNEL_RULES]
+
+
+def classify_channel(column):
+    """(Kanaltyp, Skalierung) einer Spalte oder (None, None)"""
+    for pattern, kind, scale in _COMPILED_RULES:
+        if pattern.search(str(column)):
+            return kind, scale
+    return None, None
+
+
+def period_codes(times_ns, resolution):
+    """Periodencodes (int64) und Beschriftungen für 'D', 'M' oder 'Y'"""
+    codes = times_ns.astype('datetime64[ns]').astype(f'datetime64[{resolution}]')
+    return codes.astype(np.int64), resolution
+
+
+def counter_columns(values):
+    """
+    Erkennt Zählerstände spaltenweise (2D-Array Zeilen x Kanäle, zeitlich sortiert).
+
+    Zählerstand: unter den Änderungen ungleich 0 steigen mindestens
+    COUNTER_MONOTONIC_SHARE, es gibt mindestens COUNTER_MIN_STEPS Änderungen
+    und der Wertebereich umfasst mindestens COUNTER_MIN_RANGE_STEPS typische
+    Schritte. Überwiegend leere Intervallkanäle (Einspeisung mit 0-Werten)
+    steigen und fallen gleich oft und gelten nicht als Zähler.
+    """
+    diffs = np.diff(values, axis=0)
+    changed = ~np.isnan(diffs) & (diffs != 0)
+    n_changed = changed.sum(axis=0)
+    rising = (changed & (diffs > 0)).sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        share = np.where(n_changed > 0, rising / np.maximum(n_changed, 1), 0.0)
+    with warnings.catch_warnings():
+        # Spalten ohne Änderungen bzw. ohne Werte liefern NaN
+        warnings.simplefilter('ignore', RuntimeWarning)
+        typical_step = np.nanmedian(np.where(changed, np.abs(diffs), np.nan), axis=0)
+        value_range = np.nanmax(values, axis=0) - np.nanmin(values, axis=0)
+    return ((share >= COUNTER_MONOTONIC_SHARE) & (n_changed >= COUNTER_MIN_STEPS)
+            & (np.nan_to_num(value_range) >= COUNTER_MIN_RANGE_STEPS * np.nan_to_num(typical_step, nan=np.inf)))
+
+
+def _energy_matrix(values):
+    """Wandelt Zählerstände in Intervallwerte um (spaltenweise erkannt)"""
+    is_counter = counter_columns(values) if len(values) > 1 else np.zeros(values.shape[1], dtype=bool)
+    if is_counter.any():
+        diffs = np.diff(values, axis=0, prepend=np.nan)
+        values = values.copy()
+        values[:, is_counter] = np.clip(diffs[:, is_counter], 0, None)
+    return values
+
+
+def compute_dataset_kpis(source, dataset, df, resolutions=KPI_RESOLUTIONS):
+    """
+    Berechnet alle KPIs eines Datasets für alle Auflösungen.
+
+    Returns:
+        DataFrame mit KEY_COLUMNS und einer Spalte pro KPI
+    """
+    axis = get_time_axis(df)
+    if axis is None or not len(axis):
+        return pd.DataFrame(columns=KEY_COLUMNS)
+    time_col = axis.column
+
+    channels = {'energy': [], 'power': [], 'temperature': []}
+    scales = {}
+    for col in df.columns:
+        if col == time_col or not pd.api.types.is_numeric_dtype(df[col]) or pd.api.types.is_bool_dtype(df[col]):
+            continue
+        kind, scale = classify_channel(col)
+        if kind:
+            channels[kind].append(col)
+            scales[col] = scale
+    if not any(channels.values()):
+        return pd.DataFrame(columns=KEY_COLUMNS)
+
+    # Kanonische Zeitachse: sortiert, ohne NaT (order bildet auf Zeilen ab)
+    times_ns = axis.values
+    order = axis.order
+
+    # Alle Kanäle eines Typs als 2D-Block (Zeilen x Kanäle), auf kW/kWh skaliert
+    blocks = {}
+    for kind, cols in channels.items():
+        if not cols:
+            continue
+        block = np.column_stack([df[col].to_numpy(dtype=np.float64, na_value=np.nan) * scales[col]
+                                 for col in cols])
+        if order is not None:
+            block = block[order]
+        blocks[kind] = _energy_matrix(block) if kind == 'energy' else block
+
+    frames = []
+    for res_label, resolution in resolutions.items():
+        codes, unit = period_codes(times_ns, resolution)
+        grouped = {kind: pd.DataFrame(block, columns=channels[kind]).groupby(codes, sort=True)
+                   for kind, block in blocks.items()}
+        results = {}
+        for kpi, (kind, agg, _) in KPI_DEFINITIONS.items():
+            if kind not in grouped:
+                continue
+            table = grouped[kind].sum(min_count=1) if agg == 'sum' else getattr(grouped[kind], agg)()
+            results[kpi] = table.stack(future_stack=True).rename(kpi)
+
+        if not results:
+            continue
+        wide = pd.concat(results.values(), axis=1)
+        wide.index = wide.index.set_names(['code', 'Kanal'])
+        wide = wide.reset_index()
+
+        # Volllaststunden nur bei genau einem Energie- und einem Leistungskanal
+        if len(channels['energy']) == 1 and len(channels['power']) == 1:
+            energy = wide.loc[wide['Kanal'] == channels['energy'][0]].set_index('code')['energie_kwh']
+            peak = wide.loc[wide['Kanal'] == channels['power'][0]].set_index('code')['spitzenleistung_kw']
+            with np.errstate(invalid='ignore', divide='ignore'):
+                hours = (energy / peak.where(peak > 0)).rename(FULL_LOAD_HOURS_KPI)
+            plant = pd.DataFrame({'code': hours.index, 'Kanal': PLANT_CHANNEL,
+                                  'energie_kwh': energy.to_numpy(),
+                                  'spitzenleistung_kw': peak.reindex(hours.index).to_numpy(),
+                                  FULL_LOAD_HOURS_KPI: hours.to_numpy()})
+            wide = pd.concat([wide, plant], ignore_index=True)
+
+        wide['Periode'] = np.datetime_as_string(wide['code'].to_numpy(dtype=np.int64).astype(f'datetime64[{unit}]'))
+        wide['Auflösung'] = res_label
+        frames.append(wide.drop(columns='code'))
+
+    if not frames:
+        return pd.DataFrame(columns=KEY_COLUMNS)
+    result = pd.concat(frames, ignore_index=True)
+    result['Quelle'] = source
+    result['Dataset'] = dataset
+    kpi_columns = [kpi for kpi in list(KPI_DEFINITIONS) + [FULL_LOAD_HOURS_KPI] if kpi in result.columns]
+    return result[KEY_COLUMNS + kpi_columns]
+
+
+class KPIEngine:
+    """
+    Materialisierte KPI-Tabelle über alle Datasets mit inkrementeller
+    Aktualisierung.
+
+    Beispiel:
+        engine = KPIEngine()
+        table = engine.refresh(ALL_DATA)     # berechnet nur geänderte Datasets
+        engine.query('Monat', source='kw')
+    """
+
+    def __init__(self, resolutions=KPI_RESOLUTIONS, cache=DERIVED_CACHE):
+        self.resolutions = dict(resolutions)
+        self.cache = cache
+        self._partials = {}
+        self._signatures = {}
+        self._table = None
+        self.last_recomputed = []
+
+    def refresh(self, all_data):
+        """Berechnet KPIs für neue/geänderte Datasets und entfernt verschwundene"""
+        # Signaturen ohne Nachladen ausgelagerter Datasets (TieredDatasets)
+        current = {(source, dataset): (datasets, dataset_signature(datasets, dataset))
+                   for source, datasets in all_data.items()
+                   for dataset in datasets}
+        self.last_recomputed = []
+
+        for key in list(self._partials):
+            if key not in current:
+                del self._partials[key]
+                del self._signatures[key]
+                self._table = None
+
+        for key, (datasets, signature) in current.items():
+            if self._signatures.get(key) != signature:
+                self._partials[key] = self._dataset_partial(key[0], key[1], datasets[key[1]])
+                self._signatures[key] = signature
+                self.last_recomputed.append(key)
+                self._table = None
+
+        if self._table is None:
+            partials = [part for part in self._partials.values() if not part.empty]
+            self._table = pd.concat(partials, ignore_index=True) if partials else pd.DataFrame(columns=KEY_COLUMNS)
+        return self._table
+
+    def _dataset_partial(self, source, dataset, df):
+        """KPI-Teilergebnis eines Datasets (aus dem abgeleiteten Cache, falls vorhanden)"""
+        def compute():
+            return compute_dataset_kpis(source, dataset, df, self.resolutions)
+
+        if self.cache is None:
+            return compute()
+        params = {
+            'source': source, 'dataset': dataset, 'resolutions': self.resolutions,
+            'rules': KPI_CHANNEL_RULES, 'definitions': KPI_DEFINITIONS,
+            'counter': [COUNTER_MONOTONIC_SHARE, COUNTER_MIN_STEPS, COUNTER_MIN_RANGE_STEPS]
+        }
+        return self.cache.get_or_compute('kpi', dataset_version(df), params, compute)
+
+    @property
+    def table(self):
+        """Materialisierte KPI-Tabelle (nach refresh)"""
+        return self._table if self._table is not None else pd.DataFrame(columns=KEY_COLUMNS)
+
+    def query(self, resolution='Monat', source=None, dataset=None):
+        """Ausschnitt der KPI-Tabelle für eine Auflösung und optional Quelle/Dataset"""
+        table = self.table
+        if table.empty:
+            return table
+        mask = table['Auflösung'] == resolution
+        if source:
+            mask &= table['Quelle'] == source
+        if dataset:
+            mask &= table['Dataset'] == dataset
+        return table.loc[mask]
+
+
+def kpi_column_labels():
+    """Anzeigenamen aller KPI-Spalten"""
+    labels = {kpi: label for kpi, (_, _, label) in KPI_DEFINITIONS.items()}
+    labels[FULL_LOAD_HOURS_KPI] = FULL_LOAD_HOURS_LABEL
+    return labels
+
+
+# Gemeinsame Instanz für Dashboard und Callbacks
+KPI_ENGINE = KPIEngine()
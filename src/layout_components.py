@@ -0,0 +1,60 @@
+"""
+Layout-Komponenten
+==================
+Farbschema, Navigation und Metrik-Karten für das Grundlayout der Seite.
+Nur Dash-Abhängigkeiten: das Layout (und damit GET /) entsteht, ohne
+pandas, die Engines oder die Daten zu importieren (Schnellstart).
+Die übrigen UI-Komponenten liegen in ui_components_improved.
+"""
+
+from dash import html
+import dash_bootstrap_components as dbc
+
+
+# Farbschema
+COLORS = {
+    'primary': '#2E86AB',
+    'secondary': '#A23B72',
+    'success': '#2ca02c',
+    'danger': '#d62728',
+    'warning': '#ff9800',
+    'info': '#17a2b8',
+    'twin2sim': '#2E86AB',
+    'erentrudis': '#A23B72',
+    'fis': '#F18F01',
+    'kw': '#048A81',
+    'background': '#f5f7fa',
+    'card': '#ffffff',
+    'text': '#2c3e50'
+}
+
+
+def create_navbar():
+    """Erstellt die Navigation"""
+    return dbc.Navbar([
+        dbc.Container([
+            dbc.NavbarBrand([
+                html.I(className="fas fa-chart-line me-2"),
+                "MokiG Dashboard - Energiemonitoring"
+            ], className="ms-2"),
+            dbc.Nav([
+                dbc.NavItem(dbc.NavLink("Übersicht", href="#", id="nav-overview")),
+                dbc.NavItem(dbc.NavLink("Dokumentation", href="#", id="nav-docs")),
+            ], className="ms-auto", navbar=True)
+        ], fluid=True)
+    ], color="dark", dark=True, className="mb-4")
+
+
+def create_metric_card(title, value, subtitle="", color="primary", icon=None):
+    """Erstellt eine Metrik-Karte"""
+    return dbc.Card([
+        dbc.CardBody([
+            html.Div([
+                html.I(className=f"fas fa-{icon} me-2", style={'color': COLORS[color]}) if icon else None,
+                html.H6(title, className="text-muted mb-2")
+            ], className="d-flex align-items-center"),
+            html.H3(f"{value:,}" if isinstance(value, (int, float)) else value, 
+                   style={'color': COLORS[color]}),
+            html.Small(subtitle, className="text-muted")
+        ])
+    ], className="h-100 shadow-sm")
@@ -0,0 +1,251 @@
+"""
+Kompakte Payload-Kodierung für MokiG Dashboard
+==============================================
+Überträgt Daten spaltenweise als typisierte Arrays statt als JSON-Records.
+
+- Plotly-Traces: x/y als base64-kodierte Typed Arrays ({'dtype', 'bdata'}),
+  Zeitstempel als Epoch-Millisekunden (float64) auf einer 'date'-Achse.
+- Tabellen/Stores: spaltenorientierte Blöcke, Zeitstempel als int64 Epoch-ms.
+- Schneller JSON-Serializer für NumPy-Arrays (orjson, falls installiert).
+"""
+
+import base64
+import json
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # orjson ist optional
+    orjson = None
+
+
+# NumPy-Dtype -> Typed-Array-Code (Plotly.js unterstützt kein int64)
+TYPED_ARRAY_CODES = {
+    'int8': 'i1',
+    'uint8': 'u1',
+    'int16': 'i2',
+    'uint16': 'u2',
+    'int32': 'i4',
+    'uint32': 'u4',
+    'float32': 'f4',
+    'float64': 'f8'
+}
+
+# Zusätzliche Codes, die nur in unseren eigenen Spaltenblöcken vorkommen
+COLUMN_BLOCK_CODES = dict(TYPED_ARRAY_CODES, int64='i8', uint64='u8')
+
+_CODE_TO_DTYPE = {code: np.dtype(name).newbyteorder('<')
+                  for name, code in COLUMN_BLOCK_CODES.items()}
+
+# Marker für fehlende Zeitstempel in int64-Spalten
+NAT_INT64 = np.iinfo(np.int64).min
+
+
+def _to_little_endian(arr):
+    """Stellt Little-Endian-Byteorder sicher (Typed Arrays im Browser)"""
+    if arr.dtype.byteorder == '>':
+        return arr.astype(arr.dtype.newbyteorder('<'))
+    return arr
+
+
+def encode_typed_array(values, codes=TYPED_ARRAY_CODES):
+    """
+    Kodiert ein numerisches Array als base64 Typed Array.
+
+    Returns:
+        Dict {'dtype': 'f8', 'bdata': '...'} oder None, wenn der Dtype
+        nicht als Typed Array darstellbar ist
+    """
+    arr = np.asarray(values)
+    if arr.dtype == np.bool_:
+        arr = arr.astype(np.uint8)
+    code = codes.get(arr.dtype.name)
+    if code is None:
+        return None
+    arr = _to_little_endian(np.ascontiguousarray(arr))
+    return {'dtype': code, 'bdata': base64.b64encode(arr.tobytes()).decode('ascii')}
+
+
+def decode_typed_array(block):
+    """Dekodiert ein {'dtype', 'bdata'}-Dict zurück in ein NumPy-Array"""
+    dtype = _CODE_TO_DTYPE[block['dtype']]
+    return np.frombuffer(base64.b64decode(block['bdata']), dtype=dtype)
+
+
+def datetime_to_epoch_ms(values):
+    """Konvertiert Datetime-Werte in Epoch-Millisekunden (float64, NaT -> NaN)"""
+    dt = pd.DatetimeIndex(pd.to_datetime(values))
+    if dt.tz is not None:
+        dt = dt.tz_convert('UTC').tz_localize(None)
+    ms = dt.as_unit('ms').asi8.astype(np.float64)
+    ms[dt.isna()] = np.nan
+    return ms
+
+
+def _encode_trace_values(values):
+    """Kodiert x/y eines Traces; gibt (kodierter Wert, ist_datum) zurück"""
+    if values is None or isinstance(values, dict):
+        return values, False
+    if isinstance(values, (pd.Series, pd.Index)):
+        values = values.to_numpy()
+    arr = np.asarray(values)
+    if np.issubdtype(arr.dtype, np.datetime64) or isinstance(
+            getattr(values, 'dtype', None), pd.DatetimeTZDtype):
+        return encode_typed_array(datetime_to_epoch_ms(values)), True
+    if arr.dtype == object or arr.dtype.kind in 'US':
+        # Kategorien (z.B. Kanalnamen einer Heatmap) unverändert
+        return values, False
+    encoded = encode_typed_array(arr)
+    if encoded is None:
+        # z.B. int64 -> float64 (Plotly.js kennt kein int64)
+        encoded = encode_typed_array(arr.astype(np.float64))
+    return encoded, False
+
+
+def encode_figure(fig):
+    """
+    Wandelt eine Plotly-Figure in ein Dict mit Typed Arrays für x/y um.
+
+    Zeitachsen werden als Epoch-ms übertragen; die zugehörige x-Achse wird
+    explizit auf type='date' gesetzt, damit Plotly.js sie als Datum rendert.
+
+    Returns:
+        Dict, das direkt an dcc.Graph(figure=...) übergeben werden kann
+    """
+    traces = []
+    date_axes = set()
+
+    for trace in fig.data:
+        trace_json = trace.to_plotly_json()
+        for attr in ('x', 'y'):
+            if attr in trace_json:
+                encoded, is_date = _encode_trace_values(trace_json[attr])
+                trace_json[attr] = encoded
+                if is_date:
+                    axis = trace_json.get(f'{attr}axis', attr)
+                    date_axes.add(axis)
+        traces.append(trace_json)
+
+    layout = fig.layout.to_plotly_json()
+    for axis in date_axes:
+        # 'x2' -> 'xaxis2'
+        layout_key = f"{axis[0]}axis{axis[1:]}"
+        layout.setdefault(layout_key, {})['type'] = 'date'
+
+    return {'data': traces, 'layout': layout}
+
+
+def encode_table_columns(df, progress=None):
+    """
+    Kodiert einen DataFrame als spaltenorientierten Block.
+
+    Numerische Spalten werden als Typed Arrays übertragen, Datetime-Spalten
+    als int64 Epoch-ms (NaT -> NAT_INT64), alle anderen als JSON-Listen.
+    Optional wird nach jeder Spalte progress(erledigt, gesamt) aufgerufen.
+    """
+    block = {'columns': [str(col) for col in df.columns],
+             'length': len(df),
+             'data': {},
+             'datetime': []}
+
+    n_columns = len(df.columns)
+    for i, col in enumerate(df.columns):
+        if progress:
+            progress(i, n_columns)
+        series = df[col]
+        key = str(col)
+        if pd.api.types.is_datetime64_any_dtype(series):
+            dt = pd.DatetimeIndex(series)
+            if dt.tz is not None:
+                dt = dt.tz_convert('UTC').tz_localize(None)
+            ms = dt.as_unit('ms').asi8.copy()
+            ms[dt.isna()] = NAT_INT64
+            block['data'][key] = encode_typed_array(ms, COLUMN_BLOCK_CODES)
+            block['datetime'].append(key)
+            continue
+
+        encoded = None
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            values = series.to_numpy()
+            if values.dtype == object:
+                values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            encoded = encode_typed_array(values, COLUMN_BLOCK_CODES)
+        if encoded is None:
+            values = series.astype(object).where(series.notna(), None)
+            encoded = values.tolist()
+        block['data'][key] = encoded
+
+    if progress:
+        progress(n_columns, n_columns)
+    return block
+
+
+def decode_table_columns(block):
+    """Baut aus einem spaltenorientierten Block wieder einen DataFrame"""
+    if not block:
+        return pd.DataFrame()
+
+    datetime_cols = set(block.get('datetime', []))
+    data = {}
+    for col in block['columns']:
+        values = block['data'][col]
+        if isinstance(values, dict):
+            arr = decode_typed_array(values)
+            if col in datetime_cols:
+                # NAT_INT64 entspricht NumPys interner NaT-Darstellung
+                data[col] = pd.to_datetime(arr.astype('datetime64[ms]'))
+            else:
+                data[col] = arr
+        else:
+            data[col] = values
+    return pd.DataFrame(data, columns=block['columns'])
+
+
+def is_column_block(data):
+    """Prüft ob ein Store-Inhalt ein spaltenorientierter Block ist"""
+    return isinstance(data, dict) and 'columns' in data and 'data' in data
+
+
+def _json_default(obj):
+    """Fallback-Serialisierung für NumPy/Pandas-Objekte ohne orjson"""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(obj).isoformat()
+    raise TypeError(f"Objekt vom Typ {type(obj).__name__} nicht JSON-serialisierbar")
+
+
+def dumps_numpy(obj):
+    """
+    Serialisiert Objekte mit NumPy-Arrays zu JSON-Bytes.
+
+    Verwendet orjson (OPT_SERIALIZE_NUMPY) wenn verfügbar, sonst json.
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            obj,
+            default=_json_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+    return json.dumps(obj, default=_json_default, allow_nan=False).encode('utf-8')
+
+
+def configure_fast_json():
+    """
+    Stellt den Callback-Pfad auf den schnellen JSON-Serializer um.
+
+    Dash serialisiert Callback-Antworten über plotly.io.json; mit orjson
+    werden NumPy-Arrays direkt ohne tolist() serialisiert.
+
+    Returns:
+        Name der aktiven JSON-Engine
+    """
+    import plotly.io as pio
+
+    if orjson is not None:
+        pio.json.config.default_engine = 'orjson'
+    return pio.json.config.default_engine
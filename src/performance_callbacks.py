@@ -0,0 +1,100 @@
+"""
+Performance Callbacks
+=====================
+Versteckter Admin-Tab "Performance": zeigt die Callback-Histogramme der
+Instrumentierung, Figure-Cache- und Kompressionsstatistik sowie den
+Speicher-/Tiering-Zustand der Datasets.
+Der Tab wird nur mit ?admin=1 in der URL eingeblendet.
+"""
+
+from dash import Input, Output, html
+
+from dataset_memory import MEMORY_MANAGER
+from figure_cache import FIGURE_CACHE
+from instrumentation import instrumentation_enabled, metrics_snapshot
+from response_compression import compression_stats
+
+
+_ADMIN_TAB_STYLE_JS = """
+function(search) {
+    return (search || '').includes('admin=1') ? {} : {'display': 'none'};
+}
+"""
+
+
+def performance_extras():
+    """Weitere Kennzahlen für /_mokig/metrics und den Performance-Tab"""
+    return {'figure_cache': FIGURE_CACHE.stats(), 'compression': compression_stats(),
+            'memory': MEMORY_MANAGER.state()}
+
+
+def performance_rows(snapshot):
+    """Eine Tabellenzeile pro Callback (Zeiten in ms, Größen in kB)"""
+    rows = []
+    for name, metrics in sorted(snapshot.items(), key=lambda item: -item[1]['wall_ms'].get('p95', 0)):
+        wall = metrics['wall_ms']
+        rows.append({
+            'callback': name,
+            'calls': wall.get('count', 0),
+            'wall_mean': round(wall.get('mean', 0), 1),
+            'wall_p50': round(wall.get('p50', 0), 1),
+            'wall_p95': round(wall.get('p95', 0), 1),
+            'wall_p99': round(wall.get('p99', 0), 1),
+            'data_p95': round(metrics['data_ms'].get('p95', 0), 1),
+            'figure_p95': round(metrics['figure_ms'].get('p95', 0), 1),
+            'serialization_p95': round(metrics['serialization_ms'].get('p95', 0), 1),
+            'request_kb_p95': round(metrics['request_bytes'].get('p95', 0) / 1024, 1),
+            'response_kb_p95': round(metrics['response_bytes'].get('p95', 0) / 1024, 1)
+        })
+    return rows
+
+
+def register_performance_callbacks(app):
+    """Registriert die Callbacks des Performance-Tabs"""
+
+    # Admin-Tab nur mit ?admin=1 einblenden
+    app.clientside_callback(
+        _ADMIN_TAB_STYLE_JS,
+        Output("performance-tab", "style"),
+        Input("url", "search")
+    )
+
+    @app.callback(
+        [Output("memory-table", "data"),
+         Output("memory-summary", "children")],
+        [Input("performance-refresh", "n_intervals")]
+    )
+    def update_memory_table(n_intervals):
+        """Aktualisiert den Speicher-/Tiering-Zustand (unabhängig von der Instrumentierung)"""
+        memory = MEMORY_MANAGER.state()
+        summary = (f"Daten im Speicher: {memory['hot_mb']:,.1f} / {memory['budget_mb']:,.0f} MB Budget, "
+                   f"RSS {memory['rss_mb']:,.1f} MB, {memory['demotions']} ausgelagert, "
+                   f"{memory['promotions']} nachgeladen")
+        rows = [dict(entry, arrow='ja' if entry['arrow'] else 'nein',
+                     reloadable='ja' if entry['reloadable'] else 'nein') for entry in memory['datasets']]
+        return rows, summary
+    
+    @app.callback(
+        [Output("performance-table", "data"),
+         Output("performance-extras", "children")],
+        [Input("performance-refresh", "n_intervals")]
+    )
+    def update_performance_table(n_intervals):
+        """Aktualisiert die Performance-Übersicht"""
+        if not instrumentation_enabled():
+            return [], "Instrumentierung deaktiviert - mit MOKIG_INSTRUMENTATION=1 starten."
+
+        extras = performance_extras()
+        cache = extras['figure_cache']
+        details = [
+            html.Li(f"Figure-Cache: {cache['entries']} Einträge, "
+                    f"{cache['bytes'] / 1024 / 1024:.1f} / {cache['max_bytes'] / 1024 / 1024:.0f} MB, "
+                    f"Trefferquote {cache['hit_rate']:.0%}, {cache['evictions']} verdrängt")
+        ]
+        for path, entry in extras['compression'].items():
+            details.append(html.Li(
+                f"Kompression {path}: {entry['raw_bytes'] / 1024:,.0f} kB -> "
+                f"{entry['sent_bytes'] / 1024:,.0f} kB ({entry['saving_pct']}% gespart, "
+                f"{entry['not_modified']}x 304)"
+            ))
+        return performance_rows(metrics_snapshot()), html.Ul(details)
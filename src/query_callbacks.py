@@ -0,0 +1,63 @@
+"""
+Query Callbacks
+===============
+SQL-Abfragebox im versteckten Admin-Tab "Performance": freie SELECT-Abfragen
+über die Parquet-Dateien (DuckDB, siehe query_service) mit Zeit- und
+Zeilenlimit. Ergebnisse werden wie Tabellenseiten formatiert.
+
+?admin=1 blendet den Tab nur im Browser ein; der Callback selbst ist per
+POST erreichbar und führt Abfragen daher nur für localhost bzw. die
+Adressen in MOKIG_METRICS_ALLOW aus (instrumentation.admin_client).
+"""
+
+from dash import Input, Output, State, html
+
+from instrumentation import admin_client, section
+from query_service import QUERY_MAX_ROWS, QUERY_TIMEOUT_S, QueryError, duckdb_available
+
+
+def register_query_callbacks(app, get_query_service):
+    """Registriert die Callbacks der SQL-Abfragebox (get_query_service: liefert den QueryService)"""
+
+    @app.callback(
+        [Output("query-result-table", "data"),
+         Output("query-result-table", "columns"),
+         Output("query-status", "children"),
+         Output("query-views", "children")],
+        [Input("query-run-btn", "n_clicks")],
+        [State("query-sql", "value"),
+         State("query-timeout", "value"),
+         State("query-max-rows", "value")]
+    )
+    def run_query(n_clicks, statement, timeout_s, max_rows):
+        """Führt die Abfrage aus (beim ersten Aufruf nur die verfügbaren Views)"""
+        if not admin_client():
+            message = "Abfragen nur von localhost oder freigegebenen Adressen (MOKIG_METRICS_ALLOW)."
+            return [], [], html.Span(message, className="text-danger"), ""
+        if not duckdb_available():
+            return [], [], "DuckDB ist nicht installiert (pip install duckdb).", ""
+        from table_server import format_page
+
+        query_service = get_query_service()
+        views = f"Views: {', '.join(query_service.views()) or 'keine Parquet-Dateien in data_optimized/'}"
+        if not n_clicks or not (statement or '').strip():
+            return [], [], "", views
+
+        timeout_s = min(float(timeout_s or QUERY_TIMEOUT_S), 120.0)
+        max_rows = min(int(max_rows or QUERY_MAX_ROWS), QUERY_MAX_ROWS)
+        try:
+            with section('data'):
+                result = query_service.sql(statement, timeout_s=timeout_s, max_rows=max_rows)
+        except QueryError as e:
+            return [], [], html.Span(f"Fehler: {e}", className="text-danger"), views
+
+        df = result.df
+        df.columns = [str(col) for col in df.columns]
+        status = f"{len(df):,} Zeilen in {result.elapsed_ms:,.0f} ms"
+        if result.truncated:
+            status += f" (auf {max_rows:,} Zeilen begrenzt)"
+        columns = [{'name': col, 'id': col} for col in df.columns]
+        return format_page(df), columns, status, views
+
+
+__all__ = ['register_query_callbacks']
@@ -0,0 +1,297 @@
+"""
+SQL-Abfragen über den Parquet-Speicher
+======================================
+Eingebettete DuckDB-Engine über den Dateien in data_optimized/. Projektion,
+Filter, Zeit-Buckets und Aggregationen werden direkt auf den Parquet-Dateien
+ausgeführt (Row-Group-Pruning, spaltenweises Lesen); in Python kommt nur
+das Ergebnis an, nie die Rohzeilen.
+
+- QueryService.query():  parametrisierte Abfrage (Spalten, Filter im
+                         pyarrow-Format, group_by, Aggregationen, Zeit-Bucket)
+- QueryService.sql():    freie SELECT-Abfrage für den Admin-Tab mit
+                         Zeit- und Zeilenlimit
+
+Jede Abfrage läuft auf einer eigenen In-Memory-Verbindung mit Views auf die
+Parquet-Dateien. Dateizugriffe sind auf das Parquet-Verzeichnis beschränkt
+(allowed_directories, enable_external_access=false); freie Abfragen müssen
+genau ein SELECT sein. Ein Timer bricht Abfragen nach dem Zeitlimit ab.
+
+Beispiel (Tagesmaximum der Vorlauftemperatur im Januar 2025):
+    service.query(path, group_by=[], time_bucket=('Datum + Uhrzeit', 'day'),
+                  aggregations=[('max', 'Temperatur Vorlauf Heizkreis 1 (°C)')],
+                  filters=[('Datum + Uhrzeit', '>=', '2025-01-01'),
+                           ('Datum + Uhrzeit', '<', '2025-02-01')])
+"""
+
+import importlib.util
+import re
+import threading
+import time
+from pathlib import Path
+
+# DuckDB ist optional (ohne sie gibt es keine SQL-Abfragen) und wird erst
+# bei der ersten Abfrage importiert, damit der Dashboard-Start schnell bleibt
+duckdb = None
+
+
+QUERY_TIMEOUT_S = 10.0
+QUERY_MAX_ROWS = 10_000
+QUERY_THREADS = 4
+QUERY_MEMORY_LIMIT = '2GB'
+
+AGGREGATIONS = {
+    'min': 'min', 'max': 'max', 'sum': 'sum', 'mean': 'avg', 'avg': 'avg',
+    'median': 'median', 'std': 'stddev_samp', 'count': 'count'
+}
+FILTER_OPERATORS = {'==': '=', '=': '=', '!=': '<>', '<': '<', '<=': '<=', '>': '>', '>=': '>=',
+                    'in': 'IN', 'not in': 'NOT IN'}
+TIME_UNITS = ('minute', 'hour', 'day', 'week', 'month', 'quarter', 'year')
+_INTERVAL_PATTERN = re.compile(r'^\d+\s*(minutes?|hours?|days?)$')
+
+
+class QueryError(ValueError):
+    """Ungültige, abgebrochene oder fehlgeschlagene Abfrage"""
+
+
+def duckdb_available():
+    return duckdb is not None or importlib.util.find_spec('duckdb') is not None
+
+
+def _import_duckdb():
+    """Importiert DuckDB beim ersten Gebrauch (QueryError, wenn nicht installiert)"""
+    global duckdb
+    if duckdb is None:
+        try:
+            import duckdb as module
+        except ImportError:
+            raise QueryError("DuckDB ist nicht installiert (pip install duckdb)")
+        duckdb = module
+    return duckdb
+
+
+def quote_identifier(name):
+    """SQL-Bezeichner in doppelten Anführungszeichen (Spaltennamen mit Leerzeichen, Umlauten)"""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def view_name(value):
+    """Gültiger View-Name aus Datei- oder Dataset-Namen"""
+    name = re.sub(r'\W+', '_', value.lower()).strip('_')
+    return name if name and not name[0].isdigit() else f"t_{name}"
+
+
+def _filter_sql(filters, params):
+    """pyarrow-Filter ([(col, op, wert)] oder [[...], [...]] als ODER) -> WHERE-Ausdruck"""
+    if not filters:
+        return ''
+    groups = filters if isinstance(filters[0], list) else [filters]
+    clauses = []
+    for group in groups:
+        terms = []
+        for column, op, value in group:
+            sql_op = FILTER_OPERATORS.get(str(op).lower())
+            if sql_op is None:
+                raise QueryError(f"Unbekannter Filter-Operator: {op}")
+            if sql_op in ('IN', 'NOT IN'):
+                values = list(value)
+                if not values:
+                    raise QueryError(f"Leere Werteliste für '{op}' auf {column}")
+                terms.append(f"{quote_identifier(column)} {sql_op} ({', '.join('?' * len(values))})")
+                params.extend(values)
+            else:
+                terms.append(f"{quote_identifier(column)} {sql_op} ?")
+                params.append(value)
+        clauses.append('(' + ' AND '.join(terms) + ')')
+    return ' OR '.join(clauses)
+
+
+def _bucket_sql(time_bucket):
+    """Zeit-Bucket (Spalte, Einheit) -> SQL-Ausdruck"""
+    column, unit = time_bucket
+    unit = str(unit).strip().lower()
+    if unit in TIME_UNITS:
+        return f"date_trunc('{unit}', {quote_identifier(column)})"
+    if _INTERVAL_PATTERN.match(unit):
+        return f"time_bucket(INTERVAL '{unit}', {quote_identifier(column)})"
+    raise QueryError(f"Unbekannte Zeiteinheit: {unit} (erlaubt: {', '.join(TIME_UNITS)} oder z.B. '15 minutes')")
+
+
+def build_query(source_sql, columns=None, filters=None, group_by=None, aggregations=None,
+                time_bucket=None, order_by=None, limit=None):
+    """
+    Baut eine parametrisierte SELECT-Abfrage.
+
+    Args:
+        source_sql: FROM-Ausdruck (View-Name oder read_parquet(...))
+        columns: Spalten ohne Aggregation (Default: alle bzw. group_by)
+        filters: pyarrow-Filter, Werte werden als Parameter übergeben
+        group_by: Gruppierungsspalten
+        aggregations: [(funktion, spalte)] oder [(funktion, spalte, alias)]
+        time_bucket: (zeitspalte, 'day' | '15 minutes' | ...) - gruppiert
+            nach dem Bucket (Ergebnisspalte heißt wie die Zeitspalte)
+        order_by: Spalten; Präfix '-' sortiert absteigend
+        limit: maximale Zeilenzahl
+
+    Returns:
+        (sql, params)
+    """
+    params = []
+    select, groups = [], []
+
+    if time_bucket:
+        bucket = _bucket_sql(time_bucket)
+        select.append(f"{bucket} AS {quote_identifier(time_bucket[0])}")
+        groups.append(bucket)
+    for column in group_by or []:
+        select.append(quote_identifier(column))
+        groups.append(quote_identifier(column))
+    for aggregation in aggregations or []:
+        func, column = aggregation[0], aggregation[1]
+        sql_func = AGGREGATIONS.get(str(func).lower())
+        if sql_func is None:
+            raise QueryError(f"Unbekannte Aggregation: {func} (erlaubt: {', '.join(AGGREGATIONS)})")
+        alias = aggregation[2] if len(aggregation) > 2 else f"{func}({column})"
+        argument = '*' if column == '*' else quote_identifier(column)
+        select.append(f"{sql_func}({argument}) AS {quote_identifier(alias)}")
+
+    if aggregations or time_bucket or group_by:
+        if columns:
+            raise QueryError("columns und Aggregationen/Gruppierung nicht kombinierbar")
+    else:
+        select = [quote_identifier(column) for column in columns] if columns else ['*']
+
+    sql = f"SELECT {', '.join(select)} FROM {source_sql}"
+    where = _filter_sql(filters, params)
+    if where:
+        sql += f" WHERE {where}"
+    if groups:
+        sql += f" GROUP BY {', '.join(groups)}"
+    if order_by:
+        order = [f"{quote_identifier(col[1:])} DESC" if col.startswith('-') else quote_identifier(col)
+                 for col in order_by]
+        sql += f" ORDER BY {', '.join(order)}"
+    elif time_bucket:
+        sql += " ORDER BY 1"
+    if limit is not None:
+        sql += f" LIMIT {int(limit)}"
+    return sql, params
+
+
+class QueryResult:
+    """Ergebnis einer Abfrage (DataFrame, abgeschnitten?, Laufzeit)"""
+
+    __slots__ = ('df', 'truncated', 'elapsed_ms', 'sql')
+
+    def __init__(self, df, truncated, elapsed_ms, sql):
+        self.df = df
+        self.truncated = truncated
+        self.elapsed_ms = elapsed_ms
+        self.sql = sql
+
+
+class QueryService:
+    """DuckDB-Abfragen über die Parquet-Dateien eines Verzeichnisses"""
+
+    def __init__(self, parquet_dir, timeout_s=QUERY_TIMEOUT_S, max_rows=QUERY_MAX_ROWS,
+                 threads=QUERY_THREADS, memory_limit=QUERY_MEMORY_LIMIT):
+        self.parquet_dir = Path(parquet_dir)
+        self.timeout_s = timeout_s
+        self.max_rows = max_rows
+        self.threads = threads
+        self.memory_limit = memory_limit
+        self.aliases = {}
+
+    def register(self, name, path):
+        """Zusätzlicher View-Name für eine Datei (z.B. 'fis_export_q1_2025')"""
+        self.aliases[view_name(name)] = Path(path)
+
+    def views(self):
+        """{view_name: Parquet-Pfad} - Dateinamen plus registrierte Aliase"""
+        views = {}
+        if self.parquet_dir.exists():
+            for path in sorted(self.parquet_dir.glob("*.parquet")):
+                views[view_name(path.stem)] = path
+        views.update(self.aliases)
+        return views
+
+    @staticmethod
+    def _source_sql(path):
+        """read_parquet(...) ohne die von pandas gespeicherten Index-Spalten"""
+        import pyarrow.parquet as pq
+
+        hidden = [name for name in pq.read_schema(path).names if name.startswith('__index_level_')]
+        source = "read_parquet('" + str(path).replace("'", "''") + "')"
+        if hidden:
+            return f"(SELECT * EXCLUDE ({', '.join(quote_identifier(n) for n in hidden)}) FROM {source})"
+        return source
+
+    def _connect(self, views):
+        con = _import_duckdb().connect(':memory:', config={'threads': self.threads, 'memory_limit': self.memory_limit})
+        for name, path in views.items():
+            con.execute(f"CREATE VIEW {quote_identifier(name)} AS SELECT * FROM {self._source_sql(path)}")
+        # Danach nur noch Lesezugriff auf das Parquet-Verzeichnis
+        allowed = [str(self.parquet_dir.resolve()) + '/'] + [str(p.parent.resolve()) + '/' for p in views.values()]
+        con.execute("SET allowed_directories = ?", [sorted(set(allowed))])
+        con.execute("SET enable_external_access = false")
+        con.execute("SET lock_configuration = true")
+        return con
+
+    def _execute(self, con, sql, params, timeout_s):
+        """Führt aus und bricht nach timeout_s ab (QueryError)"""
+        timer = threading.Timer(timeout_s, con.interrupt)
+        timer.daemon = True
+        start = time.perf_counter()
+        timer.start()
+        try:
+            table = con.execute(sql, params).to_arrow_table()
+        except duckdb.InterruptException:
+            raise QueryError(f"Abfrage nach {timeout_s:g} s abgebrochen (Zeitlimit)")
+        except duckdb.Error as e:
+            raise QueryError(str(e))
+        finally:
+            timer.cancel()
+        return table.to_pandas(), (time.perf_counter() - start) * 1000
+
+    def query(self, path, columns=None, filters=None, group_by=None, aggregations=None,
+              time_bucket=None, order_by=None, limit=None, timeout_s=None):
+        """
+        Parametrisierte Abfrage auf einer Parquet-Datei (siehe build_query).
+
+        Returns:
+            DataFrame mit dem (aggregierten) Ergebnis
+        """
+        path = Path(path)
+        sql, params = build_query('dataset', columns, filters, group_by, aggregations,
+                                  time_bucket, order_by, limit)
+        con = self._connect({'dataset': path})
+        try:
+            df, _ = self._execute(con, sql, params, timeout_s or self.timeout_s)
+        finally:
+            con.close()
+        return df
+
+    def sql(self, statement, params=None, timeout_s=None, max_rows=None):
+        """
+        Freie SELECT-Abfrage über alle Views (Admin).
+
+        Returns:
+            QueryResult; bei mehr als max_rows Zeilen wird abgeschnitten
+        """
+        statement = (statement or '').strip().rstrip(';').strip()
+        if not statement:
+            raise QueryError("Leere Abfrage")
+        max_rows = max_rows or self.max_rows
+        con = self._connect(self.views())
+        try:
+            try:
+                statements = con.extract_statements(statement)
+            except duckdb.Error as e:
+                raise QueryError(str(e))
+            if len(statements) != 1 or statements[0].type != duckdb.StatementType.SELECT:
+                raise QueryError("Nur eine einzelne SELECT-Abfrage ist erlaubt")
+            wrapped = f"SELECT * FROM ({statement}) AS abfrage LIMIT {int(max_rows) + 1}"
+            df, elapsed_ms = self._execute(con, wrapped, params or [], timeout_s or self.timeout_s)
+        finally:
+            con.close()
+        truncated = len(df) > max_rows
+        return QueryResult(df.iloc[:max_rows], truncated, elapsed_ms, statement)
@@ -0,0 +1,525 @@
+"""
+Berichtsgenerator
+=================
+Erzeugt ohne Dashboard eigenständige HTML-Monatsberichte pro Gebäude bzw.
+Kraftwerk (Dataset) und Monat:
+
+- KPI-Tabelle des Monats und Tagesenergie (kpi_engine)
+- Verlaufsdiagramme, auf ein Raster im Punktbudget verdichtet
+  (resampling_engine, create_comparison_chart)
+- Datenqualität: Vollständigkeit, Lücken, Qualitätskarte (completeness_engine)
+- Anomalien: Ereignisse pro Typ und Kanal (anomaly_engine)
+
+Die Datasets werden einmal geladen (wie im Dashboard), die Monate als
+Ausschnitte an einen Prozess-Pool verteilt (REPORT_MAX_PENDING Aufträge pro
+Worker gleichzeitig, der Speicherbedarf bleibt begrenzt). Pro Bericht wird
+ein Fingerabdruck der Eingangsdaten (Dataset-Version des Monatsausschnitts
+und REPORT_VERSION) im Manifest gespeichert; unveränderte Monate werden
+übersprungen. Das Manifest wird laufend gesichert, ein abgebrochener
+Nachlauf setzt beim nächsten Aufruf fort.
+
+Ausgabe: reports/<quelle>/<dataset>/<JJJJ-MM>.html, reports/index.html,
+reports/plotly.min.js (einmal für alle Berichte, --plotlyjs directory)
+
+Aufruf:
+    python src/report_renderer.py                          # alle Datasets und Monate
+    python src/report_renderer.py --source kw --from 2020-01 --to 2024-12 --workers 8
+    python src/report_renderer.py --plotlyjs inline        # plotly.js in jeden Bericht einbetten
+    python src/report_renderer.py --force                  # alle Berichte neu erzeugen
+"""
+
+import argparse
+import html
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+
+src_path = Path(__file__).parent
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.offline import get_plotlyjs
+
+from anomaly_engine import anomaly_report
+from comparison_engine import SOURCE_LABELS, choose_resolution
+from completeness_engine import completeness_report, measurement_channels
+from dataset_version import dataset_version
+from kpi_engine import classify_channel, compute_dataset_kpis, kpi_column_labels
+from resampling_engine import resample
+from time_axis import get_time_axis, slice_frame
+
+
+REPORT_VERSION = 1             # erhöhen, wenn sich Inhalt/Layout ändern (alle neu)
+DEFAULT_OUTPUT = Path(__file__).parent.parent / "reports"
+MANIFEST_NAME = 'manifest.json'
+PLOTLYJS_FILE = 'plotly.min.js'
+PLOTLYJS_MODES = ('inline', 'directory', 'cdn')
+
+REPORT_POINT_BUDGET = 1500     # Rasterpunkte pro Verlaufsdiagramm
+REPORT_MAX_CHANNELS = 8        # Kanäle pro Diagramm
+REPORT_TABLE_ROWS = 25         # Zeilen der Lücken-/Ereignistabellen
+REPORT_MAX_PENDING = 2         # Aufträge pro Worker gleichzeitig unterwegs
+MANIFEST_SAVE_EVERY = 25       # Manifest nach so vielen Berichten sichern
+
+KIND_TITLES = {
+    'power': 'Leistung',
+    'energy': 'Energie',
+    'temperature': 'Außentemperatur',
+    None: 'Messkanäle'
+}
+KPI_REPORT_RESOLUTIONS = {'Monat': 'M', 'Tag': 'D'}
+
+_FIGURE_CONFIG = {'displaylogo': False, 'responsive': True}
+
+_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="de">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: -apple-system, "Segoe UI", Roboto, Arial, sans-serif; margin: 24px auto;
+       max-width: 1200px; color: #2c3e50; }}
+h1 {{ border-bottom: 3px solid #3498db; padding-bottom: 8px; }}
+h2 {{ margin-top: 36px; color: #34495e; }}
+table {{ border-collapse: collapse; font-size: 13px; margin: 8px 0 16px; }}
+th, td {{ border: 1px solid #dee2e6; padding: 4px 8px; text-align: right; }}
+th {{ background: #f8f9fa; }}
+td:first-child, th:first-child {{ text-align: left; }}
+.meta {{ color: #7f8c8d; white-space: pre-line; }}
+.muted {{ color: #7f8c8d; }}
+.kpi {{ display: inline-block; margin: 0 24px 12px 0; }}
+.kpi b {{ display: block; font-size: 22px; }}
+</style>
+</head>
+<body>
+{body}
+<p class="muted">Erzeugt am {created} (Berichtsversion {version})</p>
+</body>
+</html>
+"""
+
+
+# ============================================================================
+# PLANUNG
+# ============================================================================
+
+def month_periods(df, first=None, last=None):
+    """Monate (pd.Period) der Zeitachse eines Datasets, optional begrenzt"""
+    axis = get_time_axis(df)
+    if axis is None or not len(axis):
+        return []
+    start, end = axis.start.to_period('M'), axis.end.to_period('M')
+    if first is not None:
+        start = max(start, first)
+    if last is not None:
+        end = min(end, last)
+    if start > end:
+        return []
+    return list(pd.period_range(start, end, freq='M'))
+
+
+def month_slice(df, period):
+    """Ausschnitt eines Monats (Beginn inklusive, Ende exklusive)"""
+    return slice_frame(df, period.start_time, (period + 1).start_time, closed='left')
+
+
+def report_relpath(source, dataset, period):
+    """Pfad eines Berichts relativ zum Ausgabeverzeichnis"""
+    return f"{source}/{dataset}/{period.strftime('%Y-%m')}.html"
+
+
+def input_fingerprint(df):
+    """Fingerabdruck der Eingangsdaten eines Berichts"""
+    return f"{REPORT_VERSION}:{dataset_version(df)}"
+
+
+def iter_jobs(all_data, output, manifest, first=None, last=None, force=False, plotlyjs='directory',
+              skipped=None):
+    """
+    Aufträge (ein Dict pro Dataset und Monat) für alle geänderten Monate.
+
+    Monate mit unverändertem Fingerabdruck und vorhandener Datei werden
+    übersprungen und in skipped gezählt.
+    """
+    for source, datasets in all_data.items():
+        for dataset in list(datasets):
+            df = datasets[dataset]
+            for period in month_periods(df, first, last):
+                part = month_slice(df, period)
+                if part.empty:
+                    continue
+                relpath = report_relpath(source, dataset, period)
+                fingerprint = input_fingerprint(part)
+                entry = manifest.get(relpath)
+                if (not force and entry and entry['fingerprint'] == fingerprint
+                        and (output / relpath).exists()):
+                    if skipped is not None:
+                        skipped.append(relpath)
+                    continue
+                yield {
+                    'source': source,
+                    'dataset': dataset,
+                    'period': str(period),
+                    'relpath': relpath,
+                    'fingerprint': fingerprint,
+                    'path': str(output / relpath),
+                    'plotlyjs': plotlyjs,
+                    'df': part
+                }
+
+
+# ============================================================================
+# ABSCHNITTE
+# ============================================================================
+
+def _table_html(df, float_format='{:,.2f}'):
+    """DataFrame als HTML-Tabelle (ohne Index)"""
+    if df is None or df.empty:
+        return '<p class="muted">Keine Einträge</p>'
+    return df.to_html(index=False, border=0, na_rep='–', float_format=float_format.format)
+
+
+def _retitled(fig, title, **layout):
+    """Kopie einer (ggf. gecachten) Figure mit eigenem Titel"""
+    fig = go.Figure(fig)
+    fig.update_layout(title=title, **layout)
+    return fig
+
+
+def _kpi_section(source, dataset, df):
+    """KPI-Tabelle des Monats und Tagesenergie der wichtigsten Zähler"""
+    # Import hier: ui_components_improved zieht Dash nach (nur im Worker nötig)
+    from ui_components_improved import create_comparison_chart
+
+    parts = ['<h2>Kennzahlen</h2>']
+    kpis = compute_dataset_kpis(source, dataset, df, KPI_REPORT_RESOLUTIONS)
+    if kpis.empty:
+        parts.append('<p class="muted">Keine KPI-Kanäle (Energie, Leistung, Außentemperatur) erkannt</p>')
+        return parts
+
+    labels = kpi_column_labels()
+    kpi_columns = [kpi for kpi in labels if kpi in kpis.columns]
+    monthly = kpis.loc[kpis['Auflösung'] == 'Monat', ['Kanal'] + kpi_columns]
+    parts.append(_table_html(monthly.dropna(how='all', subset=kpi_columns).rename(columns=labels)))
+
+    daily = kpis.loc[kpis['Auflösung'] == 'Tag']
+    if 'energie_kwh' in daily.columns and daily['energie_kwh'].notna().any():
+        energy = daily.pivot_table(index='Periode', columns='Kanal', values='energie_kwh', aggfunc='sum')
+        top = energy.sum().sort_values(ascending=False).index[:REPORT_MAX_CHANNELS]
+        days = pd.to_datetime(energy.index)
+        frames = [pd.DataFrame({'Date': days, channel: energy[channel].to_numpy()}) for channel in top]
+        fig = create_comparison_chart(frames, ['Tag'] * len(frames), 'bar')
+        parts.append(_retitled(fig, "Energie pro Tag", yaxis_title="kWh", barmode='group', height=400))
+    return parts
+
+
+def _chart_channels(df, time_col):
+    """Kanäle je KPI-Typ (Rest unter None), jeweils höchstens REPORT_MAX_CHANNELS"""
+    groups = {}
+    for column in measurement_channels(df, time_col):
+        kind, _ = classify_channel(column)
+        groups.setdefault(kind, []).append(column)
+    # Unklassifizierte Kanäle nur, wenn sonst nichts darstellbar ist
+    if len(groups) > 1:
+        groups.pop(None, None)
+    return {kind: columns[:REPORT_MAX_CHANNELS] for kind, columns in groups.items()}
+
+
+def _chart_section(dataset, df):
+    """Verlaufsdiagramme, auf ein Raster im Punktbudget verdichtet (Mittelwert)"""
+    from ui_components_improved import create_comparison_chart
+
+    axis = get_time_axis(df)
+    resolution = choose_resolution(axis.start, axis.end, REPORT_POINT_BUDGET)
+    parts = ['<h2>Verläufe</h2>', f'<p class="muted">Mittelwerte im {resolution}-Raster</p>']
+    for kind, columns in _chart_channels(df, axis.column).items():
+        grid = resample(df, resolution, 'mean', columns=columns)
+        if grid.empty:
+            continue
+        frames = [pd.DataFrame({'Date': grid[axis.column], column: grid[column].to_numpy()})
+                  for column in columns]
+        fig = create_comparison_chart(frames, [dataset] * len(frames), 'line')
+        parts.append(_retitled(fig, KIND_TITLES.get(kind, kind), height=420))
+    return parts
+
+
+def _quality_section(df):
+    """Vollständigkeit pro Kanal, längste Lücken und Qualitätskarte"""
+    from ui_components_improved import create_quality_heatmap
+
+    parts = ['<h2>Datenqualität</h2>']
+    report = completeness_report(df)
+    if report is None:
+        parts.append('<p class="muted">Keine Zeitachse</p>')
+        return parts
+    summary = report.channel_summary()
+    overall = float(np.mean(report.overall)) * 100 if len(report.channels) else 0.0
+    parts.append(
+        f'<div class="kpi">Vollständigkeit<b>{overall:.1f} %</b></div>'
+        f'<div class="kpi">Kanäle<b>{len(report.channels)}</b></div>'
+        f'<div class="kpi">Lücken<b>{int(summary["Lücken"].sum()) if not summary.empty else 0}</b></div>'
+    )
+    parts.append('<h3>Kanäle mit der geringsten Vollständigkeit</h3>')
+    parts.append(_table_html(summary.sort_values('Vollständigkeit (%)', kind='stable')
+                             .head(REPORT_TABLE_ROWS), '{:,.1f}'))
+    parts.append('<h3>Längste Lücken</h3>')
+    parts.append(_table_html(report.gap_table(limit=REPORT_TABLE_ROWS)))
+    parts.append(create_quality_heatmap(report))
+    return parts
+
+
+def _anomaly_section(df):
+    """Anomalie-Ereignisse pro Typ und Kanal, die auffälligsten Ereignisse"""
+    parts = ['<h2>Anomalien</h2>']
+    report = anomaly_report(df)
+    if report is None:
+        parts.append('<p class="muted">Zu wenige Messpunkte für den Anomalie-Scan</p>')
+        return parts
+    counts = report.counts()
+    parts.append(''.join(f'<div class="kpi">{html.escape(kind)}<b>{int(n)}</b></div>'
+                         for kind, n in counts.items()))
+    if report.events.empty:
+        parts.append('<p class="muted">Keine Auffälligkeiten</p>')
+        return parts
+    parts.append('<h3>Betroffene Kanäle</h3>')
+    parts.append(_table_html(report.channel_summary().head(REPORT_TABLE_ROWS)))
+    parts.append('<h3>Auffälligste Ereignisse</h3>')
+    events = report.events.sort_values('Bewertung', ascending=False, kind='stable')
+    parts.append(_table_html(events.head(REPORT_TABLE_ROWS)))
+    return parts
+
+
+# ============================================================================
+# RENDERN
+# ============================================================================
+
+def _plotlyjs_include(mode):
+    """include_plotlyjs für die erste Figure eines Berichts"""
+    if mode == 'inline':
+        return True
+    if mode == 'directory':
+        # Berichte liegen zwei Ebenen unter dem Ausgabeverzeichnis
+        return f"../../{PLOTLYJS_FILE}"
+    return 'cdn'
+
+
+def build_report_html(source, dataset, period, df, plotlyjs='directory'):
+    """Vollständige HTML-Seite des Monatsberichts"""
+    from ui_components_improved import get_dataset_description
+
+    axis = get_time_axis(df)
+    source_label = SOURCE_LABELS.get(source, source)
+    title = f"{source_label} / {dataset} - {period}"
+
+    parts = [
+        f'<h1>{html.escape(title)}</h1>',
+        f'<p class="meta">{html.escape(get_dataset_description(source, dataset))}</p>',
+        f'<p class="muted">{len(df):,} Messpunkte, {axis.start:%d.%m.%Y %H:%M} bis '
+        f'{axis.end:%d.%m.%Y %H:%M}</p>'
+    ]
+    parts += _kpi_section(source, dataset, df)
+    parts += _chart_section(dataset, df)
+    parts += _quality_section(df)
+    parts += _anomaly_section(df)
+
+    include = _plotlyjs_include(plotlyjs)
+    body = []
+    for part in parts:
+        if isinstance(part, go.Figure):
+            body.append(part.to_html(full_html=False, include_plotlyjs=include, config=_FIGURE_CONFIG))
+            include = False
+        else:
+            body.append(part)
+    return _PAGE_TEMPLATE.format(title=html.escape(title), body='\n'.join(body),
+                                 created=f"{datetime.now():%d.%m.%Y %H:%M}", version=REPORT_VERSION)
+
+
+def _write_atomic(path, text):
+    """Schreibt eine Datei über eine temporäre Datei im selben Verzeichnis"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def render_report(job):
+    """
+    Erzeugt einen Monatsbericht (läuft im Worker-Prozess).
+
+    Returns:
+        Dict mit relpath, fingerprint, rows, elapsed_s und ggf. error
+    """
+    t0 = time.perf_counter()
+    result = {'relpath': job['relpath'], 'fingerprint': job['fingerprint'], 'rows': len(job['df'])}
+    try:
+        text = build_report_html(job['source'], job['dataset'], job['period'], job['df'], job['plotlyjs'])
+        _write_atomic(job['path'], text)
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['elapsed_s'] = round(time.perf_counter() - t0, 2)
+    return result
+
+
+# ============================================================================
+# ABLAUF
+# ============================================================================
+
+def load_manifest(output):
+    """Manifest der erzeugten Berichte (relpath -> Eintrag)"""
+    path = Path(output) / MANIFEST_NAME
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    # Berichte einer anderen Berichtsversion gelten als veraltet
+    return {relpath: entry for relpath, entry in manifest.get('reports', {}).items()
+            if entry.get('fingerprint', '').startswith(f"{REPORT_VERSION}:")}
+
+
+def save_manifest(output, manifest):
+    """Sichert das Manifest (atomar)"""
+    _write_atomic(Path(output) / MANIFEST_NAME,
+                  json.dumps({'version': REPORT_VERSION, 'reports': manifest}, indent=1, ensure_ascii=False))
+
+
+def write_index(output, manifest):
+    """Übersichtsseite mit Links auf alle Berichte"""
+    groups = {}
+    for relpath in sorted(manifest):
+        source, dataset, name = relpath.split('/')
+        groups.setdefault((source, dataset), []).append((name[:-len('.html')], relpath))
+    body = ['<h1>MokiG Monatsberichte</h1>']
+    for (source, dataset), months in groups.items():
+        links = ' '.join(f'<a href="{html.escape(relpath)}">{month}</a>' for month, relpath in months)
+        body.append(f'<h2>{html.escape(SOURCE_LABELS.get(source, source))} / {html.escape(dataset)}</h2>'
+                    f'<p>{links}</p>')
+    _write_atomic(Path(output) / 'index.html',
+                  _PAGE_TEMPLATE.format(title='MokiG Monatsberichte', body='\n'.join(body),
+                                        created=f"{datetime.now():%d.%m.%Y %H:%M}", version=REPORT_VERSION))
+
+
+def run_reports(all_data, output=DEFAULT_OUTPUT, first=None, last=None, workers=None, force=False,
+                plotlyjs='directory'):
+    """
+    Erzeugt alle geänderten Monatsberichte.
+
+    Args:
+        all_data: {quelle: {dataset: DataFrame}}
+        first, last: erster/letzter Monat (pd.Period, optional)
+        workers: Anzahl Worker-Prozesse (Default: CPU-Anzahl, 1 = ohne Pool)
+
+    Returns:
+        Dict mit rendered, skipped, errors und elapsed_s
+    """
+    if plotlyjs not in PLOTLYJS_MODES:
+        raise ValueError(f"Unbekannter plotly.js-Modus: {plotlyjs} (erlaubt: {', '.join(PLOTLYJS_MODES)})")
+    t0 = time.perf_counter()
+    output = Path(output)
+    output.mkdir(parents=True, exist_ok=True)
+    if plotlyjs == 'directory' and not (output / PLOTLYJS_FILE).exists():
+        _write_atomic(output / PLOTLYJS_FILE, get_plotlyjs())
+
+    manifest = load_manifest(output)
+    workers = workers or os.cpu_count() or 1
+    skipped, rendered, errors = [], [], []
+
+    def collect(result):
+        if 'error' in result:
+            errors.append(result)
+            print(f"   [FEHLER] {result['relpath']}: {result['error']}")
+            return
+        manifest[result['relpath']] = {
+            'fingerprint': result['fingerprint'],
+            'rows': result['rows'],
+            'rendered': datetime.now().isoformat(timespec='seconds')
+        }
+        rendered.append(result)
+        print(f"   [OK] {result['relpath']} ({result['rows']:,} Zeilen, {result['elapsed_s']:.1f} s)")
+        if len(rendered) % MANIFEST_SAVE_EVERY == 0:
+            save_manifest(output, manifest)
+
+    jobs = iter_jobs(all_data, output, manifest, first, last, force, plotlyjs, skipped)
+    if workers == 1:
+        for job in jobs:
+            collect(render_report(job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+            for job in jobs:
+                pending.add(pool.submit(render_report, job))
+                if len(pending) >= workers * REPORT_MAX_PENDING:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future.result())
+            for future in wait(pending).done:
+                collect(future.result())
+
+    save_manifest(output, manifest)
+    write_index(output, manifest)
+    return {
+        'rendered': len(rendered),
+        'skipped': len(skipped),
+        'errors': len(errors),
+        'elapsed_s': round(time.perf_counter() - t0, 1)
+    }
+
+
+def load_all_data(base_path, sources=None):
+    """Lädt die Datasets wie das Dashboard (ohne Tiering)"""
+    from data_loader_optimized import OptimizedDataLoader, iter_dashboard_datasets
+
+    data_loader = OptimizedDataLoader(base_path)
+    all_data = {}
+    for source, dataset, df, _ in iter_dashboard_datasets(data_loader, sources):
+        all_data.setdefault(source, {})[dataset] = df
+    data_loader.clear_cache()
+    return all_data
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="HTML-Monatsberichte für alle Gebäude und Kraftwerke")
+    parser.add_argument('--output', default=str(DEFAULT_OUTPUT), help="Ausgabeverzeichnis")
+    parser.add_argument('--source', action='append', help="Nur diese Quelle(n), mehrfach möglich")
+    parser.add_argument('--dataset', action='append', help="Nur diese(s) Dataset(s), mehrfach möglich")
+    parser.add_argument('--from', dest='first', help="Erster Monat (JJJJ-MM)")
+    parser.add_argument('--to', dest='last', help="Letzter Monat (JJJJ-MM)")
+    parser.add_argument('--workers', type=int, help="Worker-Prozesse (Default: CPU-Anzahl, 1 = ohne Pool)")
+    parser.add_argument('--plotlyjs', choices=PLOTLYJS_MODES, default='directory',
+                        help="plotly.js einmal im Ausgabeverzeichnis ablegen (Default), "
+                             "pro Bericht einbetten (inline, ca. 4.8 MB je Datei) oder per CDN laden")
+    parser.add_argument('--force', action='store_true', help="Auch unveränderte Monate neu erzeugen")
+    args = parser.parse_args()
+
+    try:
+        first = pd.Period(args.first, 'M') if args.first else None
+        last = pd.Period(args.last, 'M') if args.last else None
+    except ValueError:
+        parser.error("Monate im Format JJJJ-MM angeben")
+
+    print("Lade Datenquellen...")
+    all_data = load_all_data(Path(__file__).parent.parent, args.source)
+    if args.dataset:
+        all_data = {source: {name: df for name, df in datasets.items() if name in args.dataset}
+                    for source, datasets in all_data.items()}
+
+    summary = run_reports(all_data, args.output, first, last, args.workers, args.force, args.plotlyjs)
+    print(f"\n[OK] {summary['rendered']} Berichte erzeugt, {summary['skipped']} unverändert, "
+          f"{summary['errors']} Fehler ({summary['elapsed_s']} s) -> {args.output}")
+    if summary['errors']:
+        sys.exit(1)
@@ -0,0 +1,234 @@
+"""
+Resampling-Engine
+=================
+Bringt unregelmäßig abgetastete Zeitreihen (z.B. Twin2Sim mit 1-5 s
+Abstand) auf ein regelmäßiges Zeitraster. Alle Spalten werden gemeinsam als
+2D-Array verarbeitet, die Rasterzellen über searchsorted auf der sortierten
+Zeitachse und kumulative Summen bestimmt (keine Schleife über Zellen).
+
+Aggregationen (RESAMPLE_METHODS):
+- mean:      Mittelwert der Messpunkte je Zelle
+- last:      letzter gültiger Messpunkt je Zelle
+- twa:       zeitgewichteter Mittelwert (Wert gilt bis zum nächsten Messpunkt
+             desselben Kanals)
+- integral:  Integral des gehaltenen Werts in Wert x Stunden (kW -> kWh)
+
+max_gap begrenzt, wie lange ein Messwert gilt: bei twa/integral endet die
+Haltezeit nach max_gap, bei mean/last werden leere Zellen nur innerhalb von
+max_gap nach dem letzten Messpunkt mit diesem Wert gefüllt. Default ist das
+typische Messintervall bzw. die Rasterweite (der größere Wert), so dass
+Ausfälle als Lücken sichtbar bleiben.
+
+Ergebnisse werden pro (Dataset-Version, Raster, Methode) gecacht; Raster
+über die gesamte Zeitachse zusätzlich im abgeleiteten Cache auf der Platte
+(derived_cache), damit sie Neustarts überstehen.
+
+Beispiel:
+    hourly = resample(df, '1h', method='twa')
+    energy = resample(df, '15min', method='integral', columns=['Leistung (kW)'])
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from completeness_engine import measurement_channels
+from dataset_version import dataset_version
+from derived_cache import DERIVED_CACHE
+from time_axis import get_time_axis, to_ns
+
+
+RESAMPLE_METHODS = {
+    'mean': 'Mittelwert',
+    'last': 'Letzter Wert',
+    'twa': 'Zeitgewichteter Mittelwert',
+    'integral': 'Integral (Wert x h)'
+}
+
+_HOUR_NS = 3_600 * 10**9
+_RESAMPLE_CACHE_MAX = 32
+_RESAMPLE_CACHE = OrderedDict()
+_RESAMPLE_LOCK = threading.Lock()
+
+
+def typical_interval(times):
+    """Typisches Messintervall (Median der positiven Abstände) in ns, 0 bei < 2 Punkten"""
+    diffs = np.diff(times)
+    diffs = diffs[diffs > 0]
+    return int(np.median(diffs)) if len(diffs) else 0
+
+
+def _last_valid(valid):
+    """Zeile des letzten gültigen Werts bis einschließlich jeder Zeile (-1 = keiner)"""
+    rows = np.arange(valid.shape[0])[:, None]
+    return np.maximum.accumulate(np.where(valid, rows, -1), axis=0)
+
+
+def _next_valid(valid):
+    """Zeile des nächsten gültigen Werts nach jeder Zeile (n_rows = keiner)"""
+    n_rows = valid.shape[0]
+    rows = np.arange(n_rows)[:, None]
+    at_or_after = np.minimum.accumulate(np.where(valid, rows, n_rows)[::-1], axis=0)[::-1]
+    return np.vstack([at_or_after[1:], np.full((1, valid.shape[1]), n_rows)])
+
+
+def _hold_fill(result, empty, values, last_valid, times, cell_starts, pos, max_gap_ns):
+    """Füllt leere Zellen mit dem letzten Messwert, wenn er höchstens max_gap alt ist"""
+    before = pos[:-1] - 1   # letzte Zeile vor Zellbeginn
+    has_row = before >= 0
+    idx = np.where(has_row[:, None], last_valid[np.maximum(before, 0)], -1)
+    age = cell_starts[:, None] - times[np.maximum(idx, 0)]
+    fill = empty & (idx >= 0) & (age <= max_gap_ns)
+    result[fill] = values[idx[fill], np.nonzero(fill)[1]]
+    return result
+
+
+def resample_arrays(times, values, grid_start_ns, step_ns, n_cells, method='mean', max_gap_ns=None):
+    """
+    Resampling auf das Raster grid_start + k x step (k = 0..n_cells-1).
+
+    Args:
+        times: aufsteigend sortierte Zeitstempel (int64-ns)
+        values: Messwerte (Zeilen x Spalten), NaN = fehlend
+        method: Schlüssel aus RESAMPLE_METHODS
+        max_gap_ns: Gültigkeitsdauer eines Messwerts (Default: siehe Modul)
+
+    Returns:
+        float64-Array (Zellen x Spalten)
+    """
+    if method not in RESAMPLE_METHODS:
+        raise ValueError(f"Unbekannte Aggregation: {method} (erlaubt: {', '.join(RESAMPLE_METHODS)})")
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        values = values[:, None]
+    n_rows, n_cols = values.shape
+    if n_rows == 0 or n_cells <= 0:
+        return np.full((max(n_cells, 0), n_cols), np.nan)
+    if max_gap_ns is None:
+        max_gap_ns = max(typical_interval(times), step_ns)
+
+    edges = grid_start_ns + np.arange(n_cells + 1, dtype=np.int64) * step_ns
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+
+    if method in ('mean', 'last'):
+        pos = np.searchsorted(times, edges, side='left')
+        last_valid = _last_valid(valid)
+        if method == 'mean':
+            sums = np.vstack([np.zeros((1, n_cols)), np.cumsum(filled, axis=0)])
+            counts = np.vstack([np.zeros((1, n_cols), dtype=np.int64), np.cumsum(valid, axis=0)])
+            cell_counts = counts[pos[1:]] - counts[pos[:-1]]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                result = (sums[pos[1:]] - sums[pos[:-1]]) / cell_counts
+            empty = cell_counts == 0
+        else:
+            last_row = pos[1:] - 1
+            idx = np.where((last_row >= 0)[:, None], last_valid[np.maximum(last_row, 0)], -1)
+            empty = idx < pos[:-1, None]
+            result = np.where(empty, np.nan, values[np.maximum(idx, 0), np.arange(n_cols)])
+        result[empty] = np.nan
+        return _hold_fill(result, empty, values, last_valid, times, edges[:-1], pos, max_gap_ns)
+
+    # twa/integral: Stammfunktion des gehaltenen Werts an den Zellgrenzen.
+    # Haltezeit je Spalte bis zum nächsten gültigen Wert dieser Spalte (verschränkt
+    # schreibende Sensoren: NaN in der Folgezeile beendet die Haltezeit nicht)
+    next_row = _next_valid(valid)
+    end_time = np.where(next_row < n_rows, times[np.minimum(next_row, n_rows - 1)],
+                        times[:, None] + max(typical_interval(times), 1))
+    hold = np.minimum(end_time - times[:, None], max_gap_ns).astype(np.float64)
+    weights = hold * valid
+    area = np.vstack([np.zeros((1, n_cols)), np.cumsum(filled * weights, axis=0)])
+    covered = np.vstack([np.zeros((1, n_cols)), np.cumsum(weights, axis=0)])
+
+    # Letzter gültiger Wert je Spalte bis zur Zellgrenze, seine Haltezeit anteilig
+    k = np.searchsorted(times, edges, side='right') - 1
+    last = np.where((k >= 0)[:, None], _last_valid(valid)[np.maximum(k, 0)], -1)
+    cols = np.arange(n_cols)
+    lv = np.maximum(last, 0)
+    partial = np.clip(edges[:, None] - times[lv], 0, hold[lv, cols])
+    before = last < 0
+    area_at = np.where(before, 0.0, area[lv, cols] + filled[lv, cols] * partial)
+    covered_at = np.where(before, 0.0, covered[lv, cols] + partial)
+
+    cell_area = np.diff(area_at, axis=0)
+    cell_covered = np.diff(covered_at, axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if method == 'twa':
+            return np.where(cell_covered > 0, cell_area / cell_covered, np.nan)
+        return np.where(cell_covered > 0, cell_area / _HOUR_NS, np.nan)
+
+
+def regular_grid(start, end, freq):
+    """(grid_start_ns, step_ns, n_cells) für das Raster über [start, end]"""
+    step = pd.Timedelta(freq)
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    grid_start = start.floor(step) if step <= pd.Timedelta('1D') else start.normalize()
+    grid_start_ns = to_ns(grid_start)
+    n_cells = int((to_ns(end) - grid_start_ns) // step.value) + 1
+    return grid_start_ns, step.value, n_cells
+
+
+def resample(df, freq, method='mean', columns=None, max_gap=None, start=None, end=None):
+    """
+    Resampling eines Datasets auf ein regelmäßiges Raster (gecacht).
+
+    Args:
+        freq: Rasterweite (z.B. '1min', '15min', '1h')
+        method: 'mean', 'last', 'twa' oder 'integral'
+        columns: Spalten (Default: alle numerischen)
+        max_gap: Gültigkeitsdauer eines Messwerts (Timedelta oder String)
+        start, end: Zeitfenster (Default: gesamte Zeitachse)
+
+    Returns:
+        DataFrame mit der Zeitspalte des Datasets und einer Spalte pro Kanal
+        (leer ohne Zeitachse)
+    """
+    axis = get_time_axis(df)
+    if axis is None or not len(axis):
+        return pd.DataFrame()
+    if columns is None:
+        columns = measurement_channels(df, axis.column)
+    max_gap_ns = pd.Timedelta(max_gap).value if max_gap is not None else None
+
+    key = (dataset_version(df), tuple(columns), str(freq), method, max_gap_ns,
+           None if start is None else to_ns(start), None if end is None else to_ns(end))
+    with _RESAMPLE_LOCK:
+        if key in _RESAMPLE_CACHE:
+            _RESAMPLE_CACHE.move_to_end(key)
+            return _RESAMPLE_CACHE[key]
+
+    # Nur vollständige Raster persistieren (Zoom-Fenster wiederholen sich selten)
+    persistent = start is None and end is None
+    params = {'columns': list(columns), 'freq': str(freq), 'method': method, 'max_gap_ns': max_gap_ns}
+    result = DERIVED_CACHE.get('resample', key[0], params) if persistent else None
+    if result is None:
+        result = _resample_window(df, axis, columns, freq, method, max_gap_ns, start, end)
+        if persistent:
+            DERIVED_CACHE.put('resample', key[0], params, result)
+
+    with _RESAMPLE_LOCK:
+        _RESAMPLE_CACHE[key] = result
+        if len(_RESAMPLE_CACHE) > _RESAMPLE_CACHE_MAX:
+            _RESAMPLE_CACHE.popitem(last=False)
+    return result
+
+
+def _resample_window(df, axis, columns, freq, method, max_gap_ns, start, end):
+    """Berechnet das Raster (ohne Cache)"""
+    start = axis.start if start is None else pd.Timestamp(start)
+    end = axis.end if end is None else pd.Timestamp(end)
+    grid_start_ns, step_ns, n_cells = regular_grid(start, end, freq)
+
+    gap_ns = max_gap_ns if max_gap_ns is not None else max(typical_interval(axis.values), step_ns)
+
+    # Messpunkte ab eine Haltezeit vor dem Raster (Wert gilt in die erste Zelle hinein)
+    i0, i1 = axis.index_range(grid_start_ns - gap_ns, grid_start_ns + n_cells * step_ns, closed='left')
+    values = df[columns].iloc[axis.indexer(i0, i1)].to_numpy(dtype=np.float64, na_value=np.nan)
+    grid = resample_arrays(axis.values[i0:i1], values, grid_start_ns, step_ns, n_cells,
+                           method, gap_ns)
+
+    result = pd.DataFrame(grid, columns=columns)
+    result.insert(0, axis.column, pd.to_datetime(grid_start_ns + np.arange(n_cells, dtype=np.int64) * step_ns))
+    return result
@@ -0,0 +1,132 @@
+"""
+Antwort-Kompression und bedingte Auslieferung
+=============================================
+Komprimiert Dash-Antworten (Seite, Layout, Dependencies und
+Callback-Antworten) per Brotli oder gzip, je nach Accept-Encoding des
+Browsers, ab einer Mindestgröße. GET-Antworten ('/', Layout, Dependencies)
+erhalten ein ETag; bei passendem If-None-Match antwortet der Server mit 304
+ohne Body.
+
+Dataset-Daten laufen über Callback-Antworten (POST /_dash-update-component)
+und werden nur komprimiert, nicht bedingt ausgeliefert: Browser senden bei
+POST kein If-None-Match. Sie enthalten nur die sichtbare Tabellenseite bzw.
+die Figure, nicht das ganze Dataset (serverseitige Tabelle, Figure-Cache).
+
+Bandbreiten-Statistik (unkomprimiert vs. übertragen) pro Pfad über
+compression_stats().
+"""
+
+import gzip
+import threading
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # Brotli ist optional, gzip ist immer verfügbar
+    brotli = None
+
+
+COMPRESSION_MIN_SIZE = 1024  # Bytes
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+COMPRESSIBLE_PATHS = ('/_dash-update-component', '/_dash-layout', '/_dash-dependencies')
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/html', 'text/plain')
+
+_STATS = {}
+_STATS_LOCK = threading.Lock()
+
+
+def _accepted_encodings(header):
+    """Menge der akzeptierten Encodings (q=0 wird ausgeschlossen)"""
+    accepted = set()
+    for part in (header or '').split(','):
+        name, _, params = part.strip().partition(';')
+        if params.strip().replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        if name:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def choose_encoding(header):
+    """Bevorzugt Brotli, sonst gzip, sonst keine Kompression"""
+    accepted = _accepted_encodings(header)
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted or '*' in accepted:
+        return 'gzip'
+    return None
+
+
+def compress_body(body, encoding):
+    """Komprimiert Bytes mit dem gewählten Encoding"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def _record(path, raw_bytes, sent_bytes, not_modified=False):
+    with _STATS_LOCK:
+        entry = _STATS.setdefault(path, {'responses': 0, 'raw_bytes': 0, 'sent_bytes': 0, 'not_modified': 0})
+        entry['responses'] += 1
+        entry['raw_bytes'] += raw_bytes
+        entry['sent_bytes'] += sent_bytes
+        entry['not_modified'] += int(not_modified)
+
+
+def compression_stats():
+    """Bandbreiten-Statistik pro Pfad inkl. Einsparung in Prozent"""
+    with _STATS_LOCK:
+        stats = {path: dict(entry) for path, entry in _STATS.items()}
+    for entry in stats.values():
+        raw = entry['raw_bytes']
+        entry['saving_pct'] = round(100 * (1 - entry['sent_bytes'] / raw), 1) if raw else 0.0
+    return stats
+
+
+def reset_compression_stats():
+    with _STATS_LOCK:
+        _STATS.clear()
+
+
+def register_response_compression(server, min_size=COMPRESSION_MIN_SIZE):
+    """Registriert Kompression und ETag-Validierung am Flask-Server"""
+
+    @server.after_request
+    def compress_response(response):
+        path = request.path
+        if not path.startswith(COMPRESSIBLE_PATHS) and path != '/':
+            return response
+        if response.direct_passthrough or response.status_code != 200 \
+                or 'Content-Encoding' in response.headers \
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES:
+            return response
+
+        body = response.get_data()
+        raw_size = len(body)
+
+        # Bedingte Auslieferung für GET: ETag aus dem Inhalt (sofern nicht gesetzt)
+        if request.method == 'GET':
+            if not response.get_etag()[0]:
+                response.add_etag()
+            response.make_conditional(request)
+            if response.status_code == 304:
+                _record(path, raw_size, 0, not_modified=True)
+                return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+        if encoding is None or raw_size < min_size:
+            _record(path, raw_size, raw_size)
+            return response
+
+        compressed = compress_body(body, encoding)
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        response.headers['Content-Length'] = str(len(compressed))
+        _record(path, raw_size, len(compressed))
+        return response
+
+    return server
@@ -0,0 +1,144 @@
+"""
+Produktionsmodus (mehrere Worker)
+=================================
+App-Factory für gunicorn. Mit preload_app=True lädt der Master-Prozess
+alle Datasets einmal, danach werden die Worker geforkt und teilen die
+Daten copy-on-write.
+
+Start (Linux, aus dem Projektverzeichnis):
+    gunicorn -c gunicorn.conf.py "server_app:create_app()"
+
+- /health: Liveness (Prozess antwortet)
+- /ready:  Readiness pro Prozess: 200 erst, wenn dieser Prozess nach dem
+  Warmup selbst geprüft wurde (mark_ready), sonst 503. Bei preload_app
+  läuft der Warmup im Master; die geforkten Worker sind erst nach der
+  Prüfung im post_fork-Hook (gunicorn.conf.py) bereit
+- Warmup: Daten laden, KPI-Tabelle materialisieren, Vergleichskanäle
+  vorbereiten, danach gc.freeze(), damit der Garbage Collector die
+  geteilten Objekte nicht anfasst (sonst werden Seiten kopiert)
+
+Hinweis: Speicher pro Worker ist über /ready (USS/PSS) bzw.
+worker_memory_report.py messbar.
+"""
+
+import gc
+import os
+import time
+
+import psutil
+from flask import jsonify
+
+from dataset_memory import row_counts
+
+
+_READINESS = {
+    'ready': False,
+    'checked_pid': None,
+    'started': time.time(),
+    'warmup_seconds': None,
+    'datasets': 0,
+    'rows': 0
+}
+
+
+def process_memory(pid=None):
+    """RSS, USS und PSS eines Prozesses in MB (USS/PSS nur unter Linux)"""
+    info = psutil.Process(pid).memory_full_info()
+    to_mb = 1024 * 1024
+    return {
+        'rss_mb': round(info.rss / to_mb, 1),
+        'uss_mb': round(getattr(info, 'uss', 0) / to_mb, 1),
+        'pss_mb': round(getattr(info, 'pss', 0) / to_mb, 1)
+    }
+
+
+def warmup(all_data):
+    """Bereitet abgeleitete Strukturen vor, bevor Worker geforkt werden"""
+    from kpi_engine import KPI_ENGINE
+    from comparison_engine import list_comparison_channels
+
+    KPI_ENGINE.refresh(all_data)
+    list_comparison_channels(all_data)
+
+    # Alle bis hier erzeugten Objekte in die permanente Generation schieben:
+    # der GC der Worker schreibt dann nicht mehr in die geteilten Seiten
+    gc.collect()
+    gc.freeze()
+
+
+def worker_check():
+    """Prüft im aktuellen Prozess, ob Warmup und geteilte Daten vorhanden sind"""
+    if _READINESS['warmup_seconds'] is None:
+        return False
+    import dashboard_optimized
+    from kpi_engine import KPI_ENGINE
+
+    all_data = dashboard_optimized.ALL_DATA
+    return (dashboard_optimized.DATA_READY.is_set()
+            and any(all_data.values())
+            and not KPI_ENGINE.table.empty)
+
+
+def mark_ready():
+    """
+    Setzt die Readiness für diesen Prozess. Das Ergebnis gilt nur für die
+    PID, die geprüft hat: ein aus dem Master geforkter Worker bleibt bei
+    503, bis er selbst mark_ready() aufgerufen hat (post_fork).
+    """
+    ok = worker_check()
+    _READINESS.update(ready=ok, checked_pid=os.getpid())
+    return ok
+
+
+def is_ready():
+    """True, wenn dieser Prozess geprüft und bereit ist"""
+    return _READINESS['ready'] and _READINESS['checked_pid'] == os.getpid()
+
+
+def register_health_routes(server):
+    """Registriert /health und /ready am Flask-Server"""
+
+    @server.route('/health')
+    def health():
+        return jsonify({'status': 'ok', 'pid': os.getpid()})
+
+    @server.route('/ready')
+    def ready():
+        ready = is_ready()
+        payload = dict(_READINESS, ready=ready, pid=os.getpid(), memory=process_memory())
+        return jsonify(payload), 200 if ready else 503
+
+
+def create_app():
+    """
+    App-Factory für gunicorn: lädt Daten, führt den Warmup aus und liefert
+    den Flask-Server (WSGI-App) zurück.
+
+    Die Readiness wird für den ausführenden Prozess gesetzt: ohne
+    preload_app ist das der Worker selbst, mit preload_app der Master
+    (die Worker prüfen sich nach dem Fork erneut, siehe mark_ready).
+    """
+    t0 = time.time()
+    # Import lädt die Daten (einmal pro Prozess, im Master bei preload_app)
+    import dashboard_optimized
+
+    server = dashboard_optimized.server
+    if 'ready' not in server.view_functions:
+        register_health_routes(server)
+
+    # Im Schnellstart (MOKIG_FAST_START=1) laden die Daten im Hintergrund;
+    # der Warmup braucht sie vollständig
+    dashboard_optimized.start_data_loading()
+    dashboard_optimized.DATA_READY.wait()
+    all_data = dashboard_optimized.ALL_DATA
+    warmup(all_data)
+
+    _READINESS.update(
+        warmup_seconds=round(time.time() - t0, 2),
+        datasets=sum(len(datasets) for datasets in all_data.values()),
+        rows=sum(sum(row_counts(datasets).values()) for datasets in all_data.values())
+    )
+    mark_ready()
+    print(f"[OK] Warmup abgeschlossen in {_READINESS['warmup_seconds']}s "
+          f"({_READINESS['datasets']} Datasets, {_READINESS['rows']:,} Zeilen)")
+    return server
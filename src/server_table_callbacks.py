@@ -0,0 +1,61 @@
+"""
+Server Table Callbacks
+======================
+Liefert Seiten der serverseitigen Datentabelle (Paging, Sortierung,
+Filterung und Spaltenfenster) aus den im Speicher gehaltenen Datasets.
+"""
+
+from dash import Input, Output, State, MATCH
+from dash.exceptions import PreventUpdate
+
+from instrumentation import section
+
+
+def register_server_table_callbacks(app, ALL_DATA):
+    """Registriert die Callbacks für serverseitige Tabellen"""
+
+    @app.callback(
+        [Output({'type': 'server-table', 'id': MATCH}, 'data'),
+         Output({'type': 'server-table', 'id': MATCH}, 'page_count'),
+         Output({'type': 'server-table', 'id': MATCH}, 'columns'),
+         Output({'type': 'server-table-info', 'id': MATCH}, 'children'),
+         Output({'type': 'column-window', 'id': MATCH}, 'max_value')],
+        [Input({'type': 'server-table', 'id': MATCH}, 'page_current'),
+         Input({'type': 'server-table', 'id': MATCH}, 'page_size'),
+         Input({'type': 'server-table', 'id': MATCH}, 'sort_by'),
+         Input({'type': 'server-table', 'id': MATCH}, 'filter_query'),
+         Input({'type': 'column-window', 'id': MATCH}, 'active_page'),
+         Input({'type': 'server-table', 'id': MATCH}, 'hidden_columns')],
+        [State({'type': 'server-table-meta', 'id': MATCH}, 'data')],
+        prevent_initial_call=True
+    )
+    def update_server_table(page_current, page_size, sort_by, filter_query,
+                            active_page, hidden_columns, meta):
+        """Berechnet die sichtbare Seite im aktuellen Spaltenfenster"""
+        if not meta:
+            raise PreventUpdate
+        from table_server import column_window, get_table_page, window_count
+        from time_axis import find_time_column
+        from ui_components_improved import build_column_definition
+
+        df = ALL_DATA.get(meta['source'], {}).get(meta['dataset'])
+        if df is None or df.empty:
+            raise PreventUpdate
+
+        # Ausgeblendete Spalten werden gar nicht erst übertragen
+        hidden = set(hidden_columns or [])
+        all_columns = [col for col in meta.get('columns') or df.columns
+                       if col in df.columns and col not in hidden]
+        time_col = find_time_column(df)
+        n_windows = window_count(all_columns, pinned=time_col)
+        window_index = min((active_page or 1) - 1, n_windows - 1)
+        window_columns = column_window(all_columns, window_index, pinned=time_col)
+
+        columns = [build_column_definition(df, col) for col in window_columns]
+
+        with section('data'):
+            records, page_count, total = get_table_page(
+                df, page_current, page_size, sort_by, filter_query, window_columns
+            )
+        info = f"{total:,} von {len(df):,} Zeilen - Seite für Seite vom Server geladen"
+        return records, page_count, columns, info, n_windows
@@ -0,0 +1,277 @@
+"""
+Startzeit-Profil des Dashboards
+===============================
+Misst, wie schnell dashboard_optimized antwortet, und wo die Importzeit
+bleibt - jeweils in einem frischen Python-Prozess:
+
+- imports:     python -X importtime -c "import dashboard_optimized";
+               Gesamtzeit, Eigenzeit pro Paket (ohne Doppelzählung) und
+               die teuersten Module
+- first_byte:  Start des Servers bis zum ersten Byte von GET /
+- layout / dependencies:  danach /_dash-layout und /_dash-dependencies
+               (erst dann kann der Browser die Seite aufbauen)
+
+Standard ist der Schnellstart (MOKIG_FAST_START=1, Layout aus dem
+Katalog-Snapshot); mit --full wird der normale Start mit vollständigem
+Laden gemessen. Ziel: erstes Byte unter FIRST_BYTE_TARGET_S. Ergebnisse
+werden wie in der Benchmark-Suite gegen eine Baseline verglichen; bei
+Regressionen oder verfehltem Ziel endet der Lauf mit Exit-Code 1.
+
+Aufruf:
+    python src/startup_profile.py
+    python src/startup_profile.py --runs 5 --top 30 --output start.json
+    python src/startup_profile.py --update-baseline
+    python src/startup_profile.py --imports-only
+"""
+
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+
+src_path = Path(__file__).parent
+
+DEFAULT_BASELINE = src_path.parent / "benchmarks" / "startup_baseline.json"
+DEFAULT_RUNS = 3
+DEFAULT_TOP = 20
+FIRST_BYTE_TARGET_S = 1.0
+SERVER_TIMEOUT_S = 120.0
+TIME_THRESHOLD = 0.25        # +25% gilt als Regression
+MIN_TIME_DELTA_MS = 30.0     # Rauschgrenze (Prozessstart schwankt)
+TARGET_MODULE = 'dashboard_optimized'
+
+
+def _environment(fast_start, port=None):
+    env = dict(os.environ)
+    env.pop('MOKIG_FAST_START', None)
+    if fast_start:
+        env['MOKIG_FAST_START'] = '1'
+    if port is not None:
+        env['MOKIG_PORT'] = str(port)
+    return env
+
+
+def parse_importtime(text):
+    """
+    Zeilen von -X importtime als Liste von (Modul, Tiefe, Eigenzeit µs,
+    kumuliert µs)
+    """
+    entries = []
+    for line in text.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        head, cumulative_us, name = line.split('|', 2)
+        self_us = int(head.split(':', 1)[1])
+        indent = len(name) - len(name.lstrip(' '))
+        entries.append((name.strip(), indent // 2, self_us, int(cumulative_us)))
+    return entries
+
+
+def profile_imports(fast_start=True, top=DEFAULT_TOP):
+    """Importprofil von dashboard_optimized in einem frischen Prozess"""
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {TARGET_MODULE}'],
+        cwd=src_path, env=_environment(fast_start), capture_output=True, text=True
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    if completed.returncode != 0:
+        raise RuntimeError(f"Import fehlgeschlagen:\n{completed.stderr[-2000:]}")
+
+    entries = parse_importtime(completed.stderr)
+    target = next((entry for entry in entries if entry[0] == TARGET_MODULE), None)
+    packages = {}
+    for name, _, self_us, _ in entries:
+        root = name.split('.')[0]
+        packages[root] = packages.get(root, 0) + self_us
+    packages = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    modules = sorted(entries, key=lambda entry: entry[2], reverse=True)[:top]
+    return {
+        'wall_ms': round(wall_ms, 1),
+        'total_ms': round(target[3] / 1000, 1) if target else None,
+        'module_count': len(entries),
+        'packages': {name: round(us / 1000, 1) for name, us in packages},
+        'modules': [{'module': name, 'self_ms': round(self_us / 1000, 1),
+                     'cumulative_ms': round(cumulative_us / 1000, 1)}
+                    for name, _, self_us, cumulative_us in modules]
+    }
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _get(url, timeout):
+    """Liest die Antwort; Sekunden bis zum ersten Byte"""
+    start = time.perf_counter()
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        response.read(1)
+        first = time.perf_counter() - start
+        response.read()
+    return first
+
+
+def measure_first_byte(fast_start=True, timeout_s=SERVER_TIMEOUT_S):
+    """Startet das Dashboard und misst erstes Byte von /, Layout und Dependencies (s)"""
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}/"
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, f'{TARGET_MODULE}.py'], cwd=src_path,
+                               env=_environment(fast_start, port),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"Dashboard beendet (Exit-Code {process.returncode})")
+            if time.perf_counter() - start > timeout_s:
+                raise RuntimeError(f"Keine Antwort nach {timeout_s:.0f} s")
+            try:
+                _get(base, timeout_s)
+                break
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.005)
+        first_byte = time.perf_counter() - start
+        _get(base + '_dash-layout', timeout_s)
+        layout = time.perf_counter() - start
+        _get(base + '_dash-dependencies', timeout_s)
+        dependencies = time.perf_counter() - start
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    return {'first_byte_ms': round(first_byte * 1000, 1), 'layout_ms': round(layout * 1000, 1),
+            'dependencies_ms': round(dependencies * 1000, 1)}
+
+
+def run_profile(fast_start=True, runs=DEFAULT_RUNS, top=DEFAULT_TOP, imports_only=False):
+    """Importprofil (schnellster Lauf) und Median der Server-Messungen"""
+    profiles = [profile_imports(fast_start, top) for _ in range(runs)]
+    results = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'mode': 'fast' if fast_start else 'full',
+        'runs': runs,
+        'imports': min(profiles, key=lambda profile: profile['total_ms'] or 0)
+    }
+    if not imports_only:
+        timings = [measure_first_byte(fast_start) for _ in range(runs)]
+        results['server'] = {key: round(statistics.median(t[key] for t in timings), 1)
+                             for key in timings[0]}
+    return results
+
+
+def flatten_metrics(results):
+    """{'imports.total_ms': ..., 'package.pandas': ..., 'server.first_byte_ms': ...}"""
+    flat = {'imports.total_ms': results['imports']['total_ms']}
+    for name, ms in results['imports']['packages'].items():
+        flat[f"package.{name}"] = ms
+    for key, ms in results.get('server', {}).items():
+        flat[f"server.{key}"] = ms
+    return {metric: value for metric, value in flat.items() if value is not None}
+
+
+def compare_results(current, baseline, time_threshold=TIME_THRESHOLD, min_time_delta_ms=MIN_TIME_DELTA_MS):
+    """Vergleich mit der Baseline (Liste von Dicts wie in benchmark_suite)"""
+    current_flat = flatten_metrics(current)
+    baseline_flat = flatten_metrics(baseline)
+    comparison = []
+    for metric in sorted(current_flat.keys() & baseline_flat.keys()):
+        old, new = baseline_flat[metric], current_flat[metric]
+        change = (new - old) / old if old else 0.0
+        comparison.append({'metric': metric, 'baseline': old, 'current': new, 'change': round(change, 4),
+                           'regression': change > time_threshold and (new - old) > min_time_delta_ms})
+    # Neu hinzugekommene teure Pakete sind ebenfalls Regressionen
+    for metric in sorted(current_flat.keys() - baseline_flat.keys()):
+        if metric.startswith('package.') and current_flat[metric] > min_time_delta_ms:
+            comparison.append({'metric': metric, 'baseline': 0.0, 'current': current_flat[metric],
+                               'change': 1.0, 'regression': True})
+    return comparison
+
+
+def print_results(results):
+    """Gibt Server-Zeiten, Pakete und Module als Tabelle aus"""
+    imports = results['imports']
+    print("\n" + "=" * 72)
+    print(f"Startprofil ({results['mode']}), Python {results['python']}, {results['runs']} Läufe")
+    print("=" * 72)
+    if 'server' in results:
+        server = results['server']
+        status = "OK" if server['first_byte_ms'] <= FIRST_BYTE_TARGET_S * 1000 else "ZIEL VERFEHLT"
+        print(f"Erstes Byte (GET /):        {server['first_byte_ms']:>9.1f} ms   "
+              f"[{status}, Ziel {FIRST_BYTE_TARGET_S * 1000:.0f} ms]")
+        print(f"Layout geladen:             {server['layout_ms']:>9.1f} ms")
+        print(f"Dependencies geladen:       {server['dependencies_ms']:>9.1f} ms")
+    print(f"Import {TARGET_MODULE}: {imports['total_ms']:>9.1f} ms "
+          f"({imports['module_count']} Module, Prozess {imports['wall_ms']:.0f} ms)")
+
+    print(f"\n{'Paket':<40}{'Eigenzeit ms':>14}")
+    for name, ms in imports['packages'].items():
+        print(f"  {name:<38}{ms:>14.1f}")
+    print(f"\n{'Modul':<46}{'Eigenzeit ms':>14}{'kumuliert ms':>14}")
+    for entry in imports['modules']:
+        print(f"  {entry['module'][:44]:<44}{entry['self_ms']:>14.1f}{entry['cumulative_ms']:>14.1f}")
+
+
+def print_comparison(comparison):
+    """Gibt Regressionen aus"""
+    regressions = [entry for entry in comparison if entry['regression']]
+    print(f"\nBaseline-Vergleich: {len(comparison)} Kennzahlen, {len(regressions)} Regressionen")
+    for entry in regressions:
+        print(f"  [REGRESSION] {entry['metric']}: {entry['baseline']} -> {entry['current']} "
+              f"({entry['change']:+.0%})")
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Startzeit-Profil des Dashboards")
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS, help="Messläufe (frische Prozesse)")
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP, help="Anzahl Pakete/Module im Bericht")
+    parser.add_argument('--full', action='store_true', help="Normaler Start statt Schnellstart")
+    parser.add_argument('--imports-only', action='store_true', help="Nur Importprofil, ohne Server")
+    parser.add_argument('--output', help="Ergebnisse als JSON speichern")
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help="Baseline-JSON für den Vergleich")
+    parser.add_argument('--update-baseline', action='store_true', help="Ergebnisse als neue Baseline speichern")
+    parser.add_argument('--time-threshold', type=float, default=TIME_THRESHOLD)
+    args = parser.parse_args()
+
+    results = run_profile(not args.full, max(args.runs, 1), args.top, args.imports_only)
+    print_results(results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n[OK] Ergebnisse gespeichert: {args.output}")
+
+    failed = 'server' in results and results['server']['first_byte_ms'] > FIRST_BYTE_TARGET_S * 1000
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"[OK] Baseline aktualisiert: {baseline_path}")
+    elif baseline_path.exists():
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('mode') != results['mode']:
+            print(f"\n[INFO] Baseline wurde im Modus '{baseline.get('mode')}' gemessen - kein Vergleich")
+        elif print_comparison(compare_results(results, baseline, args.time_threshold)):
+            failed = True
+    else:
+        print(f"\n[INFO] Keine Baseline unter {baseline_path} - mit --update-baseline anlegen")
+
+    if failed:
+        sys.exit(1)
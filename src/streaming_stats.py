@@ -0,0 +1,266 @@
+"""
+Streaming-Statistik für sehr große Datasets
+===========================================
+Berechnet Kennzahlen blockweise mit konstantem Speicherbedarf:
+
+- Mittelwert/Varianz/Min/Max: Welford-Updates, vektorisiert über alle
+  Spalten, Blöcke werden nach Chan et al. zusammengeführt (exakt).
+- Perzentile: KLL-Sketch (Karnin, Lang, Liberty 2016) pro Spalte.
+
+Fehlerschranke der Perzentile: Der KLL-Sketch mit Parameter k liefert
+Quantile mit normiertem Rangfehler von ca. 1.65% bei k=200 (99% Konfidenz,
+Referenzwerte der Apache-DataSketches-KLL-Implementierung); der Fehler
+skaliert etwa mit 1/k. Ein Ergebnis für das 50%-Quantil liegt also mit
+hoher Wahrscheinlichkeit zwischen dem wahren 48.35%- und 51.65%-Quantil.
+Speicher pro Spalte: O(k) Werte, unabhängig von der Zeilenzahl (plus
+log2(n/k) Ebenen-Overhead).
+
+Alle Akkumulatoren sind mergebar, d.h. Partitionen (Parquet-Row-Groups,
+Dateien, Worker) können getrennt berechnet und danach vereinigt werden.
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pyarrow.types as pat
+
+
+# Ab dieser Zeilenzahl verwendet das Statistik-Panel die Streaming-Engine
+STREAMING_STATS_THRESHOLD = 1_000_000
+
+DEFAULT_SKETCH_K = 200
+DEFAULT_BATCH_SIZE = 65536
+# Normierter Rangfehler bei k=200 (99% Konfidenz), skaliert etwa mit 1/k
+KLL_RANK_ERROR_K200 = 0.0165
+
+DESCRIBE_PERCENTILES = (0.25, 0.5, 0.75)
+
+
+class WelfordAccumulator:
+    """Mittelwert, Varianz, Min und Max für mehrere Spalten gleichzeitig"""
+
+    def __init__(self, n_columns):
+        self.count = np.zeros(n_columns, dtype=np.int64)
+        self.mean = np.zeros(n_columns, dtype=np.float64)
+        self.m2 = np.zeros(n_columns, dtype=np.float64)
+        self.min = np.full(n_columns, np.inf)
+        self.max = np.full(n_columns, -np.inf)
+
+    def update(self, values):
+        """Verarbeitet einen Block (Zeilen x Spalten), NaN wird ignoriert"""
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim == 1:
+            values = values[:, None]
+        valid = ~np.isnan(values)
+        n_b = valid.sum(axis=0)
+        if not n_b.any():
+            return
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_b = np.where(n_b > 0, np.nansum(values, axis=0) / n_b, 0.0)
+            m2_b = np.nansum((values - mean_b) ** 2, axis=0)
+        self._merge_moments(n_b, mean_b, m2_b)
+
+        has_values = n_b > 0
+        self.min[has_values] = np.minimum(self.min[has_values], np.nanmin(values[:, has_values], axis=0))
+        self.max[has_values] = np.maximum(self.max[has_values], np.nanmax(values[:, has_values], axis=0))
+
+    def _merge_moments(self, n_b, mean_b, m2_b):
+        """Paralleler Welford-Schritt (Chan et al.)"""
+        n_a = self.count
+        n = n_a + n_b
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = mean_b - self.mean
+            self.mean = np.where(n > 0, self.mean + delta * n_b / np.maximum(n, 1), 0.0)
+            self.m2 = self.m2 + m2_b + delta ** 2 * n_a * n_b / np.maximum(n, 1)
+        self.count = n
+
+    def merge(self, other):
+        """Vereinigt einen Akkumulator einer anderen Partition"""
+        self._merge_moments(other.count, other.mean, other.m2)
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        return self
+
+    @property
+    def std(self):
+        """Stichproben-Standardabweichung (ddof=1, wie DataFrame.describe)"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.count > 1, np.sqrt(self.m2 / (self.count - 1)), np.nan)
+
+
+class KLLSketch:
+    """
+    Mergebarer Quantil-Sketch (KLL) für eine Spalte.
+
+    Ebene h hält Werte mit Gewicht 2**h. Läuft eine Ebene über, wird sie
+    sortiert und jedes zweite Element (zufälliger Offset) eine Ebene höher
+    geschoben. Kapazitäten sinken geometrisch (Faktor 2/3) nach unten.
+    """
+
+    def __init__(self, k=DEFAULT_SKETCH_K, seed=None):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(8, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype=np.float64))
+                items = np.sort(items)
+                # Bei ungerader Anzahl bleibt ein Element auf dieser Ebene
+                keep = len(items) % 2
+                promoted = items[keep:][self._rng.integers(2)::2]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                self.levels[level] = items[:keep]
+            level += 1
+
+    def update(self, values):
+        """Fügt einen Block von Werten hinzu (NaN wird ignoriert)"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other):
+        """Vereinigt einen Sketch einer anderen Partition"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype=np.float64))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def quantiles(self, qs):
+        """Approximierte Quantile für eine Liste von Wahrscheinlichkeiten"""
+        if self.n == 0:
+            return np.full(len(qs), np.nan)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items_h), 2 ** h, dtype=np.float64)
+                                  for h, items_h in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        cumulative = np.cumsum(weights[order])
+        targets = np.asarray(qs, dtype=np.float64) * cumulative[-1]
+        idx = np.minimum(np.searchsorted(cumulative, targets, side='left'), len(items) - 1)
+        return items[order][idx]
+
+    @property
+    def retained(self):
+        """Anzahl gespeicherter Werte (Speicherbedarf)"""
+        return sum(len(items) for items in self.levels)
+
+
+class StreamingStatistics:
+    """
+    Statistik-Engine über DataFrames, Record-Batches oder Parquet-Dateien.
+
+    Beispiel:
+        stats = StreamingStatistics.from_parquet(pfad)
+        stats.describe()  # gleiche Form wie DataFrame.describe()
+    """
+
+    def __init__(self, columns, k=DEFAULT_SKETCH_K, seed=None):
+        self.columns = list(columns)
+        self.k = k
+        self.rows = 0
+        self.moments = WelfordAccumulator(len(self.columns))
+        self.sketches = [KLLSketch(k, seed=None if seed is None else seed + i)
+                         for i in range(len(self.columns))]
+
+    @property
+    def rank_error(self):
+        """Dokumentierte normierte Rangfehler-Schranke der Perzentile"""
+        return KLL_RANK_ERROR_K200 * 200 / self.k
+
+    def update_array(self, values, n_rows=None):
+        """Verarbeitet einen 2D-Block (Zeilen x Spalten in Reihenfolge von self.columns)"""
+        values = np.asarray(values, dtype=np.float64)
+        self.rows += len(values) if n_rows is None else n_rows
+        self.moments.update(values)
+        for i, sketch in enumerate(self.sketches):
+            sketch.update(values[:, i])
+
+    def update_frame(self, df, batch_size=DEFAULT_BATCH_SIZE):
+        """Verarbeitet einen DataFrame blockweise"""
+        for start in range(0, len(df), batch_size):
+            chunk = df.iloc[start:start + batch_size]
+            self.update_array(np.column_stack([
+                chunk[col].to_numpy(dtype=np.float64, na_value=np.nan) for col in self.columns
+            ]) if self.columns else np.empty((len(chunk), 0)), n_rows=len(chunk))
+
+    def update_record_batch(self, batch):
+        """Verarbeitet einen pyarrow RecordBatch (Nulls -> NaN)"""
+        arrays = []
+        for col in self.columns:
+            column = batch.column(batch.schema.get_field_index(col))
+            arrays.append(np.asarray(column.to_numpy(zero_copy_only=False), dtype=np.float64))
+        self.update_array(np.column_stack(arrays) if arrays else np.empty((batch.num_rows, 0)),
+                          n_rows=batch.num_rows)
+
+    def merge(self, other):
+        """Vereinigt die Statistik einer anderen Partition (gleiche Spalten)"""
+        if other.columns != self.columns:
+            raise ValueError("Statistiken mit unterschiedlichen Spalten können nicht vereinigt werden")
+        self.rows += other.rows
+        self.moments.merge(other.moments)
+        for sketch, other_sketch in zip(self.sketches, other.sketches):
+            sketch.merge(other_sketch)
+        return self
+
+    def describe(self, percentiles=DESCRIBE_PERCENTILES):
+        """Kennzahlen im Format von DataFrame.describe()"""
+        moments = self.moments
+        quantiles = np.array([sketch.quantiles(percentiles) for sketch in self.sketches]).reshape(
+            len(self.columns), len(percentiles))
+        has_values = moments.count > 0
+        data = {
+            'count': moments.count.astype(np.float64),
+            'mean': np.where(has_values, moments.mean, np.nan),
+            'std': moments.std,
+            'min': np.where(has_values, moments.min, np.nan)
+        }
+        for i, q in enumerate(percentiles):
+            data[f"{q * 100:g}%"] = quantiles[:, i]
+        data['max'] = np.where(has_values, moments.max, np.nan)
+        return pd.DataFrame(data, index=self.columns).T
+
+    @classmethod
+    def for_frame(cls, df, k=DEFAULT_SKETCH_K):
+        """Berechnet die Statistik für alle numerischen Spalten eines DataFrames"""
+        columns = [col for col in df.columns
+                   if pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col])]
+        stats = cls(columns, k=k)
+        stats.update_frame(df)
+        return stats
+
+    @classmethod
+    def from_parquet(cls, parquet_path, columns=None, k=DEFAULT_SKETCH_K, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Berechnet die Statistik direkt über die Record-Batches einer Parquet-Datei,
+        ohne die Datei als DataFrame zu materialisieren.
+        """
+        pf = pq.ParquetFile(parquet_path)
+        if columns is None:
+            schema = pf.schema_arrow
+            columns = [field.name for field in schema if _is_numeric_arrow_type(field.type)]
+        stats = cls(columns, k=k)
+        for batch in pf.iter_batches(batch_size=batch_size, columns=columns):
+            stats.update_record_batch(batch)
+        return stats
+
+
+def _is_numeric_arrow_type(arrow_type):
+    """Prüft ob ein Arrow-Typ numerisch ist (ohne Bool)"""
+    return pat.is_integer(arrow_type) or pat.is_floating(arrow_type) or pat.is_decimal(arrow_type)
@@ -0,0 +1,367 @@
+"""
+Serverseitiges Paging, Sortieren und Filtern für die Datentabelle
+=================================================================
+Übersetzt die DataTable-Grammatik (filter_query, sort_by) in vektorisierte
+Pandas/NumPy-Prädikate. Zeitbereiche werden per searchsorted über die
+kanonische Zeitachse (time_axis) aufgelöst, Sortierreihenfolgen pro Spalte
+gecacht.
+Formatiert wird nur die sichtbare Seite im sichtbaren Spaltenfenster.
+"""
+
+import operator
+import re
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from time_axis import NAT, datetime_values_ns, get_time_axis
+
+
+# Ab dieser Zeilenzahl wird die Tabelle serverseitig betrieben
+SERVER_SIDE_ROW_THRESHOLD = 20000
+
+# Zeilen pro Seite und Spalten pro Spaltenfenster
+DEFAULT_PAGE_SIZE = 100
+COLUMN_WINDOW_SIZE = 25
+
+DATE_DISPLAY_FORMAT = '%d.%m.%Y %H:%M:%S'
+
+# DataTable-Operatoren (inkl. Wort-Varianten) -> interne Operatoren
+_OPERATOR_ALIASES = {
+    '=': 'eq', 'eq': 'eq',
+    '!=': 'ne', 'ne': 'ne',
+    '>': 'gt', 'gt': 'gt',
+    '>=': 'ge', 'ge': 'ge',
+    '<': 'lt', 'lt': 'lt',
+    '<=': 'le', 'le': 'le',
+    'contains': 'contains',
+    'datestartswith': 'datestartswith',
+    'is blank': 'blank',
+    'is nil': 'blank'
+}
+
+# {Spalte} op wert  -  Spaltennamen dürfen Leerzeichen enthalten
+_CONDITION_RE = re.compile(
+    r'^\{(?P<column>[^}]+)\}\s+'
+    r'(?P<op>is blank|is nil|[si]?(?:contains|datestartswith|eq|ne|gt|ge|lt|le)|[si]?(?:>=|<=|!=|=|>|<))'
+    r'(?:\s+(?P<value>.+))?$'
+)
+
+_COMPARATORS = {
+    'eq': operator.eq, 'ne': operator.ne,
+    'gt': operator.gt, 'ge': operator.ge,
+    'lt': operator.lt, 'le': operator.le
+}
+
+# Sortierreihenfolgen pro (DataFrame, Spalte)
+_SORT_CACHE = OrderedDict()
+_SORT_LOCK = threading.Lock()
+_SORT_CACHE_MAX = 32
+
+
+def parse_filter_query(filter_query):
+    """
+    Zerlegt eine DataTable filter_query in Bedingungen.
+
+    Beispiel: '{Temp (°C)} > 20 && {Status} icontains "ein"'
+    -> [('Temp (°C)', 'gt', '20', True), ('Status', 'contains', 'ein', False)]
+
+    Returns:
+        Liste von (spalte, operator, wert, case_sensitive)
+    """
+    conditions = []
+    if not filter_query:
+        return conditions
+
+    for part in filter_query.split(' && '):
+        match = _CONDITION_RE.match(part.strip())
+        if not match:
+            continue
+        op = match.group('op')
+        case_sensitive = True
+        if op[0] in 'si' and op not in ('is blank', 'is nil'):
+            case_sensitive = op[0] == 's'
+            op = op[1:]
+        value = match.group('value')
+        if value is not None:
+            value = value.strip()
+            if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'`':
+                value = value[1:-1]
+        conditions.append((match.group('column'), _OPERATOR_ALIASES[op], value, case_sensitive))
+    return conditions
+
+
+def _to_number(value):
+    """Konvertiert Filterwerte (auch mit Dezimalkomma) in float"""
+    try:
+        return float(str(value).replace(',', '.'))
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_timestamp(value):
+    """Interpretiert ISO- und deutsche Datumsangaben"""
+    dayfirst = bool(re.match(r'^\d{1,2}\.\d{1,2}\.', str(value)))
+    try:
+        return pd.Timestamp(pd.to_datetime(value, dayfirst=dayfirst))
+    except (TypeError, ValueError):
+        return None
+
+
+def _date_prefix_range(value):
+    """
+    Wandelt ein Datums-Präfix in ein halboffenes Intervall [start, ende) um.
+
+    '2025' -> Jahr, '2025-02' bzw. '02.2025' -> Monat, sonst Tag/Zeitpunkt.
+    """
+    value = str(value).strip()
+    if re.fullmatch(r'\d{4}', value):
+        period = pd.Period(value, freq='Y')
+    elif re.fullmatch(r'\d{4}-\d{1,2}', value):
+        period = pd.Period(value, freq='M')
+    elif re.fullmatch(r'\d{1,2}\.\d{4}', value):
+        month, year = value.split('.')
+        period = pd.Period(year=int(year), month=int(month), freq='M')
+    else:
+        ts = _to_timestamp(value)
+        if ts is None:
+            return None
+        freq = 'D' if ts == ts.normalize() and ':' not in value else 's'
+        period = ts.to_period(freq)
+    return period.start_time, period.end_time + pd.Timedelta(1, 'ns')
+
+
+def _datetime_mask(series, op, value, axis=None):
+    """Vektorisiertes Prädikat für Datetime-Spalten (Zeitachse: searchsorted)"""
+    n = len(series)
+
+    if op == 'datestartswith':
+        bounds = _date_prefix_range(value)
+        if bounds is None:
+            return np.zeros(n, dtype=bool)
+        start, end = (pd.Timestamp(b).as_unit('ns').value for b in bounds)
+        if axis is not None:
+            return axis.mask(start, end, closed='left')
+        values = datetime_values_ns(series)
+        return (values != NAT) & (values >= start) & (values < end)
+
+    ts = _to_timestamp(value)
+    if ts is None:
+        return np.zeros(n, dtype=bool)
+    t = ts.as_unit('ns').value
+
+    if axis is not None and op in ('gt', 'ge', 'lt', 'le', 'eq'):
+        bounds = {
+            'gt': (t + 1, None), 'ge': (t, None),
+            'lt': (None, t), 'le': (None, t + 1),
+            'eq': (t, t + 1)
+        }[op]
+        return axis.mask(bounds[0], bounds[1], closed='left')
+
+    if op not in _COMPARATORS:
+        return np.zeros(n, dtype=bool)
+    values = datetime_values_ns(series)
+    return (values != NAT) & _COMPARATORS[op](values, t)
+
+
+def _condition_mask(df, column, op, value, case_sensitive, axis=None):
+    """Berechnet die Boolesche Maske für eine einzelne Bedingung"""
+    series = df[column]
+
+    if op == 'blank':
+        mask = series.isna().to_numpy()
+        if series.dtype == object:
+            mask |= (series.astype(str).str.strip() == '').to_numpy()
+        return mask
+
+    if pd.api.types.is_datetime64_any_dtype(series) and op != 'contains':
+        return _datetime_mask(series, op, value, axis if axis is not None and axis.column == column else None)
+
+    if pd.api.types.is_numeric_dtype(series) and op != 'contains':
+        number = _to_number(value)
+        if number is None:
+            return np.zeros(len(series), dtype=bool)
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        if op in ('eq', 'ne'):
+            # float32-Spalten: Gleichheit mit relativer Toleranz
+            equal = np.isclose(values, number, rtol=1e-6, atol=0)
+            return equal if op == 'eq' else ~equal & ~np.isnan(values)
+        return _COMPARATORS[op](values, number)
+
+    # Text-Vergleiche (auch 'contains' auf Zahlen/Datum über die Textdarstellung)
+    if pd.api.types.is_datetime64_any_dtype(series):
+        text = format_dates(series)
+    else:
+        text = series.astype(str)
+    value = '' if value is None else str(value)
+
+    if op == 'contains':
+        return text.str.contains(value, case=case_sensitive, regex=False, na=False).to_numpy()
+
+    if not case_sensitive:
+        text = text.str.lower()
+        value = value.lower()
+    return _COMPARATORS[op](text, value).to_numpy() & series.notna().to_numpy()
+
+
+def filter_positions(df, filter_query):
+    """
+    Wendet eine filter_query an.
+
+    Returns:
+        Array mit Zeilenpositionen (np.intp) oder None wenn ungefiltert
+    """
+    conditions = parse_filter_query(filter_query)
+    if not conditions:
+        return None
+
+    axis = get_time_axis(df)
+
+    mask = np.ones(len(df), dtype=bool)
+    for column, op, value, case_sensitive in conditions:
+        if column not in df.columns:
+            continue
+        mask &= _condition_mask(df, column, op, value, case_sensitive, axis)
+    return np.flatnonzero(mask)
+
+
+def _cached_sort_order(df, column, descending=False):
+    """Sortierreihenfolge einer Spalte (stabil, fehlende Werte am Ende), gecacht"""
+    key = (id(df), column)
+    with _SORT_LOCK:
+        entry = _SORT_CACHE.get(key)
+        if entry is not None and entry[0]() is df:
+            _SORT_CACHE.move_to_end(key)
+        else:
+            entry = None
+    if entry is not None:
+        order, n_valid = entry[1], entry[2]
+    else:
+        series = df[column]
+        nulls = series.isna().to_numpy()
+        valid_positions = np.flatnonzero(~nulls)
+        if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(series):
+            values = series.to_numpy()[valid_positions]
+        else:
+            values = series.astype(str).to_numpy()[valid_positions]
+        order = np.concatenate([valid_positions[np.argsort(values, kind='stable')],
+                                np.flatnonzero(nulls)])
+        n_valid = len(valid_positions)
+
+        with _SORT_LOCK:
+            _SORT_CACHE[key] = (weakref.ref(df), order, n_valid)
+            _SORT_CACHE.move_to_end(key)
+            if len(_SORT_CACHE) > _SORT_CACHE_MAX:
+                _SORT_CACHE.popitem(last=False)
+
+    if descending:
+        return np.concatenate([order[:n_valid][::-1], order[n_valid:]])
+    return order
+
+
+def sort_positions(df, positions, sort_by):
+    """
+    Sortiert Zeilenpositionen gemäß DataTable sort_by.
+
+    Einfache Sortierung nutzt die gecachte Reihenfolge der ganzen Spalte
+    (O(n) Maskierung statt Neusortierung), Mehrfachsortierung ein lexsort
+    über die gefilterten Zeilen.
+    """
+    sort_by = [s for s in (sort_by or []) if s.get('column_id') in df.columns]
+    if not sort_by:
+        return positions
+
+    if len(sort_by) == 1:
+        order = _cached_sort_order(df, sort_by[0]['column_id'],
+                                   descending=sort_by[0].get('direction') == 'desc')
+        if positions is None:
+            return order
+        keep = np.zeros(len(df), dtype=bool)
+        keep[positions] = True
+        return order[keep[order]]
+
+    if positions is None:
+        positions = np.arange(len(df))
+    keys = []
+    # lexsort sortiert nach dem letzten Schlüssel zuerst
+    for spec in reversed(sort_by):
+        # Dichte Ränge, damit gleiche Werte für den nächsten Schlüssel gleichrangig bleiben
+        series = df[spec['column_id']].iloc[positions]
+        if not (pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(series)):
+            series = series.astype(str)
+        key = series.rank(method='dense', na_option='bottom').to_numpy()
+        keys.append(-key if spec.get('direction') == 'desc' else key)
+    return positions[np.lexsort(keys)]
+
+
+def column_window(columns, window_index, window_size=COLUMN_WINDOW_SIZE, pinned=None):
+    """
+    Liefert die Spalten eines Spaltenfensters.
+
+    Die Zeitspalte (pinned) bleibt in jedem Fenster als erste Spalte sichtbar.
+    """
+    others = [col for col in columns if col != pinned]
+    start = max(window_index, 0) * window_size
+    window = others[start:start + window_size]
+    return ([pinned] if pinned in columns else []) + window
+
+
+def window_count(columns, window_size=COLUMN_WINDOW_SIZE, pinned=None):
+    """Anzahl Spaltenfenster"""
+    others = len([col for col in columns if col != pinned])
+    return max(1, -(-others // window_size))
+
+
+def format_dates(series):
+    """Datumsspalte als Text (Arrow-Zeitstempel über numpy, sonst '%S' mit Nachkommastellen)"""
+    if isinstance(series.dtype, pd.ArrowDtype):
+        series = pd.to_datetime(series)
+    return series.dt.strftime(DATE_DISPLAY_FORMAT)
+
+
+def format_page(page_df):
+    """Formatiert nur die sichtbare Seite (Datumsspalten als Text)"""
+    page_df = page_df.copy()
+    for col in page_df.columns:
+        if pd.api.types.is_datetime64_any_dtype(page_df[col]):
+            formatted = format_dates(page_df[col])
+            page_df[col] = formatted.where(page_df[col].notna(), '')
+    return page_df.to_dict('records')
+
+
+def get_table_page(df, page_current=0, page_size=DEFAULT_PAGE_SIZE, sort_by=None,
+                   filter_query='', columns=None):
+    """
+    Berechnet eine Tabellenseite serverseitig.
+
+    Args:
+        df: Vollständiger DataFrame
+        page_current: Aktuelle Seite (0-basiert)
+        page_size: Zeilen pro Seite
+        sort_by: DataTable sort_by
+        filter_query: DataTable filter_query
+        columns: Zu übertragende Spalten (sichtbares Fenster)
+
+    Returns:
+        (records, page_count, gefilterte Zeilenzahl)
+    """
+    positions = filter_positions(df, filter_query)
+    positions = sort_positions(df, positions, sort_by)
+
+    total = len(df) if positions is None else len(positions)
+    page_size = max(int(page_size or DEFAULT_PAGE_SIZE), 1)
+    page_count = max(1, -(-total // page_size))
+    page_current = min(max(int(page_current or 0), 0), page_count - 1)
+
+    start = page_current * page_size
+    if positions is None:
+        page_index = np.arange(start, min(start + page_size, total))
+    else:
+        page_index = positions[start:start + page_size]
+
+    columns = [col for col in (columns or df.columns) if col in df.columns]
+    page_df = df.iloc[page_index][columns]
+    return format_page(page_df), page_count, total
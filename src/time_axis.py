@@ -0,0 +1,231 @@
+"""
+Kanonische Zeitachse pro Dataset
+================================
+Eine Zeitachse pro Dataset: die Zeitspalte als aufsteigend sortiertes
+int64-Array (ns, tz-naiv in UTC) ohne NaT. Ist das Dataset bereits sortiert
+und lückenlos, zeigt die Achse direkt auf die Zeilen (order=None), sonst
+bildet order die Achsenpositionen auf Zeilenpositionen ab.
+
+Bereichs- und "nächster Messpunkt"-Abfragen laufen per searchsorted in
+O(log n) statt über Masken über alle Zeilen:
+
+    axis = get_time_axis(df)
+    rows = axis.row_slice('2024-01-01', '2024-01-31 23:59')   # slice oder Positionen
+    part = slice_frame(df, '2024-01-01', '2024-02-01', closed='left')
+    pos = axis.nearest('2024-03-01 12:07')
+
+Achsen werden pro DataFrame gecacht (schwache Referenz, wie die
+Sortierreihenfolgen der Tabelle); find_time_column bestimmt die Zeitspalte.
+"""
+
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+TIME_COLUMNS = ['Date', 'DateTime', 'Datum + Uhrzeit', 'Zeit', 'Timestamp', 'ZEIT_VON_UTC']
+NAT = np.iinfo(np.int64).min
+
+_AXIS_CACHE = OrderedDict()
+_AXIS_LOCK = threading.Lock()
+_AXIS_CACHE_MAX = 32
+
+
+def find_time_column(df):
+    """Findet die Zeitspalte eines Datasets"""
+    for col in TIME_COLUMNS:
+        if col in df.columns and pd.api.types.is_datetime64_any_dtype(df[col]):
+            return col
+    return None
+
+
+def to_ns(value):
+    """Zeitpunkt (Timestamp, String, datetime, int-ns) als int64-ns (tz-naiv in UTC)"""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert('UTC').tz_localize(None)
+    return ts.as_unit('ns').value
+
+
+def datetime_values_ns(series):
+    """Datetime-Spalte als int64-ns (NaT -> int64 min), tz-naiv in UTC"""
+    values = pd.DatetimeIndex(series)
+    if values.tz is not None:
+        values = values.tz_convert('UTC').tz_localize(None)
+    return values.as_unit('ns').asi8
+
+
+class TimeAxis:
+    """Sortierte int64-Zeitachse mit searchsorted-Abfragen"""
+
+    __slots__ = ('column', 'values', 'order', 'n_rows')
+
+    def __init__(self, column, values, order, n_rows):
+        self.column = column
+        self.values = values
+        self.order = order
+        self.n_rows = n_rows
+
+    @classmethod
+    def from_series(cls, series, column=None):
+        """Baut die Achse aus einer Datetime-Spalte (sortiert nur, wenn nötig)"""
+        raw = datetime_values_ns(series)
+        valid = raw != NAT
+        if valid.all() and (len(raw) < 2 or bool((raw[1:] >= raw[:-1]).all())):
+            return cls(column or series.name, raw, None, len(raw))
+        positions = np.flatnonzero(valid)
+        order = positions[np.argsort(raw[positions], kind='stable')]
+        return cls(column or series.name, raw[order], order, len(raw))
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def is_identity(self):
+        """True wenn Achsen- und Zeilenpositionen übereinstimmen"""
+        return self.order is None
+
+    @property
+    def start(self):
+        return pd.Timestamp(self.values[0]) if len(self.values) else None
+
+    @property
+    def end(self):
+        return pd.Timestamp(self.values[-1]) if len(self.values) else None
+
+    def bounds(self):
+        """(Start, Ende) oder None bei leerer Achse"""
+        return (self.start, self.end) if len(self.values) else None
+
+    def index_range(self, start=None, end=None, closed='both'):
+        """
+        Achsenpositionen [i0, i1) für den Zeitbereich.
+
+        Args:
+            closed: 'both' (start <= t <= end) oder 'left' (start <= t < end)
+        """
+        i0 = 0 if start is None else int(np.searchsorted(self.values, to_ns(start), side='left'))
+        if end is None:
+            i1 = len(self.values)
+        else:
+            side = 'right' if closed == 'both' else 'left'
+            i1 = int(np.searchsorted(self.values, to_ns(end), side=side))
+        return i0, max(i0, i1)
+
+    def rows(self, i0, i1):
+        """Zeilenpositionen der Achsenpositionen [i0, i1) (zeitlich sortiert)"""
+        if self.order is None:
+            return np.arange(i0, i1)
+        return self.order[i0:i1]
+
+    def row_order(self):
+        """Zeitlich sortierte Zeilenpositionen, Zeilen ohne Zeitstempel am Ende (None = unverändert)"""
+        if self.order is None:
+            return None
+        missing = np.ones(self.n_rows, dtype=bool)
+        missing[self.order] = False
+        return np.concatenate([self.order, np.flatnonzero(missing)])
+
+    def indexer(self, i0, i1):
+        """Für df.iloc: slice bei sortierten Datasets (ohne Kopie), sonst Positionen"""
+        if self.order is None:
+            return slice(i0, i1)
+        return self.order[i0:i1]
+
+    def row_slice(self, start=None, end=None, closed='both'):
+        """iloc-Indexer für den Zeitbereich (siehe indexer)"""
+        return self.indexer(*self.index_range(start, end, closed))
+
+    def positions(self, start=None, end=None, closed='both'):
+        """Zeilenpositionen im Zeitbereich als Array"""
+        return self.rows(*self.index_range(start, end, closed))
+
+    def mask(self, start=None, end=None, closed='both'):
+        """Boolesche Zeilenmaske für den Zeitbereich"""
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[self.row_slice(start, end, closed)] = True
+        return mask
+
+    def asof(self, value):
+        """Zeilenposition des letzten Messpunkts <= value (None wenn keiner)"""
+        i = int(np.searchsorted(self.values, to_ns(value), side='right')) - 1
+        if i < 0:
+            return None
+        return i if self.order is None else int(self.order[i])
+
+    def nearest(self, value):
+        """Zeilenposition des zeitlich nächsten Messpunkts (None bei leerer Achse)"""
+        n = len(self.values)
+        if n == 0:
+            return None
+        t = to_ns(value)
+        i = int(np.searchsorted(self.values, t, side='left'))
+        if i == n or (i > 0 and t - self.values[i - 1] <= self.values[i] - t):
+            i -= 1
+        return i if self.order is None else int(self.order[i])
+
+    def times(self, start=None, end=None, closed='both'):
+        """Zeitstempel (int64-ns) im Zeitbereich"""
+        i0, i1 = self.index_range(start, end, closed)
+        return self.values[i0:i1]
+
+
+def drop_time_index(df):
+    """
+    Überführt einen Datums-Index in eine Spalte, ohne Zeitstempel doppelt zu
+    halten: existiert die Spalte bereits (ältere Parquet-Dateien mit
+    set_index(drop=False)), wird der Index verworfen. Ein unbenannter Index
+    wird zur ersten freien Zeitspalte aus TIME_COLUMNS.
+    """
+    if not isinstance(df.index, pd.DatetimeIndex) and df.index.name not in TIME_COLUMNS:
+        return df
+    if df.index.name is not None and df.index.name in df.columns:
+        return df.reset_index(drop=True)
+    if df.index.name is None:
+        name = next((col for col in TIME_COLUMNS if col not in df.columns), None)
+        if name is None:
+            return df.reset_index(drop=True)
+        return df.rename_axis(name).reset_index()
+    return df.reset_index()
+
+
+def get_time_axis(df, column=None):
+    """Gecachte Zeitachse eines DataFrames (None ohne Zeitspalte)"""
+    if df is None or df.empty:
+        return None
+    column = column or find_time_column(df)
+    if column is None:
+        return None
+    key = (id(df), column)
+    with _AXIS_LOCK:
+        entry = _AXIS_CACHE.get(key)
+        if entry is not None and entry[0]() is df and entry[1].n_rows == len(df):
+            _AXIS_CACHE.move_to_end(key)
+            return entry[1]
+
+    axis = TimeAxis.from_series(df[column], column)
+    with _AXIS_LOCK:
+        _AXIS_CACHE[key] = (weakref.ref(df), axis)
+        _AXIS_CACHE.move_to_end(key)
+        if len(_AXIS_CACHE) > _AXIS_CACHE_MAX:
+            _AXIS_CACHE.popitem(last=False)
+    return axis
+
+
+def slice_frame(df, start=None, end=None, closed='both'):
+    """Zeilen im Zeitbereich, zeitlich sortiert (ohne Zeitspalte unverändert)"""
+    axis = get_time_axis(df)
+    if axis is None:
+        return df
+    return df.iloc[axis.row_slice(start, end, closed)]
+
+
+def time_bounds(df):
+    """(Start, Ende) der Zeitachse oder None"""
+    axis = get_time_axis(df)
+    return axis.bounds() if axis is not None else None
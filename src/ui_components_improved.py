@@ -8,59 +8,105 @@ import dash
 from dash import dcc, html, dash_table
 import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
-import plotly.express as px
+from plotly.colors import qualitative
 import pandas as pd
 import numpy as np
 from column_toggle_component import create_enhanced_data_table, create_column_toggle_panel
+from payload_encoder import encode_figure, encode_table_columns
+from streaming_stats import STREAMING_STATS_THRESHOLD, StreamingStatistics
+from comparison_engine import (
+    NICE_RESOLUTIONS, SOURCE_LABELS,
+    channel_value, dataset_summaries, default_comparison_channels, parse_channel_value
+)
+from channel_catalog import CHANNEL_CATALOG, INITIAL_OPTIONS, dropdown_options
+from kpi_engine import KEY_COLUMNS, KPI_RESOLUTIONS, kpi_column_labels
+from figure_cache import memoize_figure
+from table_server import (
+    DEFAULT_PAGE_SIZE,
+    column_window,
+    format_dates,
+    get_table_page,
+    window_count
+)
+from time_axis import find_time_column, get_time_axis
+from completeness_engine import completeness_report
+from resampling_engine import RESAMPLE_METHODS
+from anomaly_engine import EVENT_COLUMNS, anomaly_report
+from query_service import QUERY_MAX_ROWS, QUERY_TIMEOUT_S
+from export_service import EXPORT_FORMATS, export_url
+from layout_components import COLORS, create_metric_card, create_navbar
 
 
-# Farbschema
-COLORS = {
-    'primary': '#2E86AB',
-    'secondary': '#A23B72',
-    'success': '#2ca02c',
-    'danger': '#d62728',
-    'warning': '#ff9800',
-    'info': '#17a2b8',
-    'twin2sim': '#2E86AB',
-    'erentrudis': '#A23B72',
-    'fis': '#F18F01',
-    'kw': '#048A81',
-    'background': '#f5f7fa',
-    'card': '#ffffff',
-    'text': '#2c3e50'
-}
-
-
-def create_navbar():
-    """Erstellt die Navigation"""
-    return dbc.Navbar([
-        dbc.Container([
-            dbc.NavbarBrand([
-                html.I(className="fas fa-chart-line me-2"),
-                "MokiG Dashboard - Energiemonitoring"
-            ], className="ms-2"),
-            dbc.Nav([
-                dbc.NavItem(dbc.NavLink("Übersicht", href="#", id="nav-overview")),
-                dbc.NavItem(dbc.NavLink("Dokumentation", href="#", id="nav-docs")),
-            ], className="ms-auto", navbar=True)
-        ], fluid=True)
-    ], color="dark", dark=True, className="mb-4")
-
-
-def create_metric_card(title, value, subtitle="", color="primary", icon=None):
-    """Erstellt eine Metrik-Karte"""
-    return dbc.Card([
-        dbc.CardBody([
-            html.Div([
-                html.I(className=f"fas fa-{icon} me-2", style={'color': COLORS[color]}) if icon else None,
-                html.H6(title, className="text-muted mb-2")
-            ], className="d-flex align-items-center"),
-            html.H3(f"{value:,}" if isinstance(value, (int, float)) else value, 
-                   style={'color': COLORS[color]}),
-            html.Small(subtitle, className="text-muted")
-        ])
-    ], className="h-100 shadow-sm")
+def _table_style_kwargs():
+    """Gemeinsames Styling für native und serverseitige Datentabellen"""
+    return dict(
+        # Tabellen-Styling mit horizontalem Scrolling
+        fixed_rows={'headers': True},
+        style_table={
+            'height': '700px',
+            'overflowY': 'auto',
+            'overflowX': 'auto',  # Horizontales Scrolling
+            'width': '100%'
+        },
+
+        # Zellen-Styling für bessere Lesbarkeit
+        style_cell={
+            'textAlign': 'left',
+            'padding': '10px',
+            'whiteSpace': 'normal',  # Allow text wrapping in headers
+            'height': 'auto',
+            'minWidth': '180px',  # Increased minimum width
+            'maxWidth': '500px',  # Maximum width
+        },
+
+        # Header-Styling mit vollem Text
+        style_header={
+            'backgroundColor': COLORS['primary'],
+            'color': 'white',
+            'fontWeight': 'bold',
+            'textAlign': 'left',
+            'whiteSpace': 'normal',  # Erlaubt Umbruch im Header
+            'height': 'auto',
+            'minHeight': '50px',
+            'lineHeight': '15px',
+            'padding': '10px'
+        },
+
+        # Daten-Styling
+        style_data={
+            'backgroundColor': 'white',
+            'color': COLORS['text'],
+            'border': '1px solid #e0e0e0'
+        },
+
+        # Bedingte Formatierung
+        style_data_conditional=[
+            {
+                'if': {'row_index': 'odd'},
+                'backgroundColor': '#f8f9fa'
+            },
+            {
+                'if': {'state': 'selected'},
+                'backgroundColor': 'rgba(46, 134, 171, 0.1)',
+                'border': '2px solid ' + COLORS['primary']
+            }
+        ]
+    )
+
+
+def build_column_definition(df, col):
+    """Spalten-Definition mit vollem Namen und Zahlenformat"""
+    col_def = {
+        "name": str(col),  # Voller Name ohne Kürzung
+        "id": str(col),
+        "deletable": False,
+        "selectable": True,
+        "hideable": False  # Hideable wird über das Toggle-Panel gesteuert
+    }
+    if pd.api.types.is_numeric_dtype(df[col]):
+        col_def["type"] = "numeric"
+        col_def["format"] = {"specifier": ",.2f"}
+    return col_def
 
 
 def create_data_table_with_full_columns(df, table_id, max_rows=None, visible_columns=None):
@@ -79,30 +125,22 @@ def create_data_table_with_full_columns(df, table_id, max_rows=None, visible_col
     if max_rows is None:
         max_rows = len(df)  # Zeige IMMER alle Daten, unabhängig von der Größe
     
-    # Verwende immer den gesamten DataFrame, keine Limitierung
-    display_df = df.copy()
-    
-    # Sortiere nach Datum wenn vorhanden
-    if 'Date' in df.columns:
-        try:
-            display_df = display_df.sort_values('Date', ascending=True)
-        except:
-            pass
+    # Verwende immer den gesamten DataFrame, keine Limitierung; zeitlich
+    # sortiert über die Zeitachse (bereits sortierte Datasets ohne Umordnung)
+    axis = get_time_axis(df)
+    if axis is not None and not axis.is_identity:
+        display_df = df.iloc[axis.row_order()].copy()
+    else:
+        display_df = df.copy()
     
     # Keine Limitierung mehr - zeige immer alle Daten
     is_limited = False
     
-    # Formatiere Datumsspalte wenn vorhanden
-    if 'Date' in display_df.columns:
+    # Formatiere die Zeitspalte für die Anzeige
+    if axis is not None:
         try:
-            # Stelle sicher dass es datetime ist
-            if not pd.api.types.is_datetime64_any_dtype(display_df['Date']):
-                display_df['Date'] = pd.to_datetime(display_df['Date'], errors='coerce')
-            
-            # Formatiere für Anzeige
-            mask = display_df['Date'].notna()
-            display_df.loc[mask, 'Date'] = display_df.loc[mask, 'Date'].dt.strftime('%d.%m.%Y %H:%M:%S')
-            display_df.loc[~mask, 'Date'] = ''
+            time_col = axis.column
+            display_df[time_col] = format_dates(display_df[time_col]).where(display_df[time_col].notna(), '')
         except:
             pass
     
@@ -112,21 +150,7 @@ def create_data_table_with_full_columns(df, table_id, max_rows=None, visible_col
     for col in display_df.columns:
         if col not in cols_to_show:
             continue
-        col_def = {
-            "name": str(col),  # Voller Name ohne Kürzung
-            "id": str(col),
-            "deletable": False,
-            "selectable": True,
-            "hideable": False  # Hideable wird nun über das Toggle-Panel gesteuert
-            # resizable entfernt - nicht unterstützt in Dash DataTable
-        }
-        
-        # Typ-spezifische Formatierung
-        if pd.api.types.is_numeric_dtype(df[col]):
-            col_def["type"] = "numeric"
-            col_def["format"] = {"specifier": ",.2f"}
-        
-        columns.append(col_def)
+        columns.append(build_column_definition(df, col))
     
     # Info-Alert für vollständige Datenanzeige
     info_alert = None
@@ -160,57 +184,8 @@ def create_data_table_with_full_columns(df, table_id, max_rows=None, visible_col
         row_selectable='multi',
         selected_rows=[],
         
-        # Tabellen-Styling mit horizontalem Scrolling
-        fixed_rows={'headers': True},
-        style_table={
-            'height': '700px',
-            'overflowY': 'auto',
-            'overflowX': 'auto',  # Horizontales Scrolling
-            'width': '100%'
-        },
-        
-        # Zellen-Styling für bessere Lesbarkeit
-        style_cell={
-            'textAlign': 'left',
-            'padding': '10px',
-            'whiteSpace': 'normal',  # Allow text wrapping in headers
-            'height': 'auto',
-            'minWidth': '180px',  # Increased minimum width
-            'maxWidth': '500px',  # Maximum width
-        },
-        
-        # Header-Styling mit vollem Text
-        style_header={
-            'backgroundColor': COLORS['primary'],
-            'color': 'white',
-            'fontWeight': 'bold',
-            'textAlign': 'left',
-            'whiteSpace': 'normal',  # Erlaubt Umbruch im Header
-            'height': 'auto',
-            'minHeight': '50px',
-            'lineHeight': '15px',
-            'padding': '10px'
-        },
-        
-        # Daten-Styling
-        style_data={
-            'backgroundColor': 'white',
-            'color': COLORS['text'],
-            'border': '1px solid #e0e0e0'
-        },
-        
-        # Bedingte Formatierung
-        style_data_conditional=[
-            {
-                'if': {'row_index': 'odd'},
-                'backgroundColor': '#f8f9fa'
-            },
-            {
-                'if': {'state': 'selected'},
-                'backgroundColor': 'rgba(46, 134, 171, 0.1)',
-                'border': '2px solid ' + COLORS['primary']
-            }
-        ],
+        # Einheitliches Tabellen-Styling
+        **_table_style_kwargs(),
         
         # Tooltip für abgeschnittene Werte
         tooltip_data=[
@@ -232,6 +207,123 @@ def create_data_table_with_full_columns(df, table_id, max_rows=None, visible_col
         return table_component
 
 
+def create_server_side_table(df, table_id, source, dataset, visible_columns=None):
+    """
+    Erstellt eine serverseitig betriebene Datentabelle für große Datasets.
+
+    Paging, Sortierung und Filterung laufen über Callbacks
+    (page_action/sort_action/filter_action='custom'). Übertragen wird nur
+    die sichtbare Seite im aktuellen Spaltenfenster; die erste Seite wird
+    direkt mitgeliefert, damit die Tabelle sofort erscheint.
+    """
+    if df.empty:
+        return html.Div("Keine Daten verfügbar", className="text-muted text-center p-4")
+
+    all_columns = [col for col in df.columns if visible_columns is None or col in visible_columns]
+    time_col = find_time_column(df)
+    n_windows = window_count(all_columns, pinned=time_col)
+    window_columns = column_window(all_columns, 0, pinned=time_col)
+
+    first_page, page_count, total = get_table_page(df, 0, DEFAULT_PAGE_SIZE, columns=window_columns)
+
+    table_component = dash_table.DataTable(
+        id={'type': 'server-table', 'id': table_id},
+        columns=[build_column_definition(df, col) for col in window_columns],
+        data=first_page,
+
+        # Serverseitiges Paging, Sortieren und Filtern
+        page_action='custom',
+        page_current=0,
+        page_size=DEFAULT_PAGE_SIZE,
+        page_count=page_count,
+        sort_action='custom',
+        sort_mode='multi',
+        sort_by=[],
+        filter_action='custom',
+        filter_query='',
+
+        # Selektion
+        row_selectable='multi',
+        selected_rows=[],
+
+        # Einheitliches Tabellen-Styling
+        **_table_style_kwargs()
+    )
+
+    return html.Div([
+        dbc.Row([
+            dbc.Col([
+                html.Small(
+                    f"{total:,} Zeilen - Seite für Seite vom Server geladen",
+                    id={'type': 'server-table-info', 'id': table_id},
+                    className="text-muted"
+                )
+            ], md=6),
+            dbc.Col([
+                html.Small("Spaltenfenster:", className="text-muted me-2"),
+                dbc.Pagination(
+                    id={'type': 'column-window', 'id': table_id},
+                    max_value=n_windows,
+                    active_page=1,
+                    fully_expanded=False,
+                    size="sm",
+                    className="d-inline-flex mb-0"
+                )
+            ], md=6, className="text-end",
+               # Bei nur einem Fenster ausblenden (Callback-Input bleibt erhalten)
+               style={} if n_windows > 1 else {'display': 'none'})
+        ], className="mb-2 align-items-center"),
+
+        table_component,
+
+        # Zuordnung der Tabelle zum Dataset im ALL_DATA-Speicher
+        dcc.Store(
+            id={'type': 'server-table-meta', 'id': table_id},
+            data={'source': source, 'dataset': dataset, 'columns': all_columns}
+        )
+    ])
+
+
+def create_export_bar(table_id, table_type, source, dataset):
+    """
+    Export der Tabellenauswahl (Spalten, Filter, Zeitraum) über den
+    Streaming-Export; der Link wird per Callback aktuell gehalten.
+    """
+    def export_id(kind):
+        return {'type': kind, 'table': table_type, 'id': table_id}
+
+    return dbc.Row([
+        dbc.Col([
+            dcc.Dropdown(
+                id=export_id('export-format'),
+                options=[{'label': label, 'value': fmt} for fmt, (label, _, _) in EXPORT_FORMATS.items()],
+                value='csv_de',
+                clearable=False
+            )
+        ], md=3),
+        dbc.Col([
+            dcc.DatePickerRange(
+                id=export_id('export-range'),
+                display_format='DD.MM.YYYY',
+                start_date_placeholder_text="Von",
+                end_date_placeholder_text="Bis",
+                clearable=True
+            )
+        ], md=5),
+        dbc.Col([
+            html.A(
+                dbc.Button([html.I(className="fas fa-download me-2"), "Exportieren"],
+                           color="secondary", size="sm"),
+                id=export_id('export-link'),
+                href=export_url(source, dataset, 'csv_de'),
+                download=''
+            ),
+            html.Small(" Spalten und Filter der Tabelle werden übernommen", className="text-muted ms-2")
+        ], md=4, className="d-flex align-items-center"),
+        dcc.Store(id=export_id('export-meta'), data={'source': source, 'dataset': dataset})
+    ], className="mb-3 align-items-center")
+
+
 def create_visualization_panel_with_defaults(df, panel_id):
     """
     Erstellt ein Visualisierungs-Panel mit:
@@ -245,19 +337,14 @@ def create_visualization_panel_with_defaults(df, panel_id):
     # Finde numerische Spalten für Y-Achse
     numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
     
-    # Finde Datumsspalte
-    date_col = None
-    for col in ['Date', 'DateTime', 'Datum + Uhrzeit', 'Zeit', 'Timestamp']:
-        if col in df.columns:
-            date_col = col
-            break
-    
-    # Falls keine Datumsspalte, verwende Index oder erste Spalte
-    if not date_col:
-        if 'Date' in df.columns:
-            date_col = 'Date'
-        else:
-            date_col = df.columns[0] if len(df.columns) > 0 else None
+    # Datumsspalte = Zeitachse (zeitlich sortiert), sonst erste Spalte
+    axis = get_time_axis(df)
+    if axis is not None:
+        date_col = axis.column
+        if not axis.is_identity:
+            df = df.iloc[axis.order]
+    else:
+        date_col = df.columns[0] if len(df.columns) > 0 else None
     
     # Entferne Datumsspalte aus Y-Achsen-Optionen
     y_options = [col for col in numeric_cols if col != date_col]
@@ -345,13 +432,13 @@ def create_visualization_panel_with_defaults(df, panel_id):
             html.Div(id=f"{panel_id}-chart-container", children=[
                 dcc.Graph(
                     id=f"{panel_id}-chart",
-                    figure=initial_fig,
+                    figure=encode_figure(initial_fig),
                     style={'height': '500px'}
                 )
             ]),
             
             # Hidden Store für Daten
-            dcc.Store(id=f"{panel_id}-data-store", data=df.to_dict('records')),
+            dcc.Store(id=f"{panel_id}-data-store", data=encode_table_columns(df)),
             
             # Zusätzliche Optionen
             dbc.Row([
@@ -374,16 +461,32 @@ def create_statistics_panel(df):
     if df.empty:
         return html.Div("Keine Daten für Statistik", className="text-muted text-center p-4")
     
-    # Berechne Statistiken
-    stats = df.describe()
     numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
     
-    # Erstelle Zeitraum-Information wenn Datumsspalte vorhanden
+    # Berechne Statistiken - große Datasets mit Streaming-Engine (Welford + KLL)
+    approx_note = None
+    if len(df) > STREAMING_STATS_THRESHOLD:
+        streaming = StreamingStatistics.for_frame(df)
+        stats = streaming.describe()
+        approx_note = dbc.Alert(
+            f"Perzentile approximiert (KLL-Sketch, Rangfehler ≤ {streaming.rank_error:.2%}); "
+            "Mittelwert, Streuung, Minimum und Maximum sind exakt.",
+            color="secondary",
+            className="mb-2 small"
+        )
+    else:
+        # Nur numerische Spalten (Arrow-Frames würden sonst Zeitspalten mitbeschreiben)
+        stats = df[numeric_cols].describe() if numeric_cols else pd.DataFrame()
+    
+    # Fehlende Werte nur einmal zählen
+    completeness = (1 - df.isna().sum().sum() / (len(df) * len(df.columns))) * 100
+    
+    # Erstelle Zeitraum-Information über die Zeitachse (Start/Ende in O(1))
     date_range_info = None
-    if 'Date' in df.columns and df['Date'].notna().any():
+    axis = get_time_axis(df)
+    if axis is not None and len(axis):
         try:
-            date_min = df['Date'].min()
-            date_max = df['Date'].max()
+            date_min, date_max = axis.bounds()
             date_range_info = dbc.Alert(
                 [
                     html.I(className="fas fa-calendar-alt me-2"),
@@ -391,7 +494,7 @@ def create_statistics_panel(df):
                     html.Br(),
                     f"Anzahl Tage: {(date_max - date_min).days} Tage",
                     html.Br(),
-                    f"Anzahl Datenpunkte: {df['Date'].notna().sum():,}"
+                    f"Anzahl Datenpunkte: {len(axis):,}"
                 ],
                 color="success",
                 className="mb-3"
@@ -416,6 +519,7 @@ def create_statistics_panel(df):
             
             # Statistik-Tabelle für numerische Spalten
             html.H5("Statistische Kennzahlen:", className="mt-3 mb-2"),
+            approx_note if approx_note else html.Div(),
             html.Div([
                 create_data_table_with_full_columns(
                     stats.round(2).reset_index().rename(columns={'index': 'Statistik'}),
@@ -428,15 +532,184 @@ def create_statistics_panel(df):
             html.H5("Datenqualität:", className="mt-4 mb-2"),
             html.Div([
                 dbc.Progress(
-                    value=(1 - df.isna().sum().sum() / (len(df) * len(df.columns))) * 100,
-                    label=f"{(1 - df.isna().sum().sum() / (len(df) * len(df.columns))) * 100:.1f}% vollständig",
-                    color="success" if df.isna().sum().sum() == 0 else "warning"
+                    value=completeness,
+                    label=f"{completeness:.1f}% vollständig",
+                    color="success" if completeness == 100 else "warning"
                 )
             ])
         ])
     ], className="shadow-sm")
 
 
+@memoize_figure(key_func=lambda report: report.version)
+def create_quality_heatmap(report):
+    """
+    Qualitätskarte Kanal x Tag (Vollständigkeit in %), gecacht pro
+    Dataset-Version.
+    """
+    fig = go.Figure(go.Heatmap(
+        z=report.completeness * 100,
+        x=report.days,
+        y=report.channels,
+        zmin=0,
+        zmax=100,
+        colorscale='RdYlGn',
+        colorbar=dict(title='%'),
+        hovertemplate='%{y}<br>%{x|%d.%m.%Y}: %{z:.1f}%<extra></extra>'
+    ))
+    fig.update_layout(
+        title="Vollständigkeit pro Kanal und Tag",
+        xaxis_title="Tag",
+        yaxis=dict(autorange='reversed', tickfont=dict(size=9)),
+        height=min(max(20 * len(report.channels) + 150, 350), 2400),
+        margin=dict(l=250, r=20, t=50, b=50)
+    )
+    return fig
+
+
+def create_quality_panel(df):
+    """Datenqualität: Lücken und Vollständigkeit pro Kanal und Tag"""
+    report = completeness_report(df)
+    if report is None or not report.channels:
+        return html.Div("Keine Zeitachse oder numerischen Kanäle für die Qualitätsanalyse",
+                        className="text-muted text-center p-4")
+
+    overall = float(report.overall.mean()) * 100
+    gap_start, _, gap_missing = report.sampling_gaps
+    gaps = report.gap_table()
+    gaps['Beginn'] = format_dates(gaps['Beginn'])
+    gaps['Ende'] = format_dates(gaps['Ende'])
+
+    return dbc.Card([
+        dbc.CardHeader([
+            html.I(className="fas fa-th me-2"),
+            "Datenqualität"
+        ]),
+        dbc.CardBody([
+            dbc.Alert(
+                [
+                    f"Messintervall: {report.interval_ns / 6e10:g} min · "
+                    f"{len(report.channels)} Kanäle · {len(report.days)} Tage",
+                    html.Br(),
+                    f"Gesamtvollständigkeit: {overall:.1f}% · "
+                    f"Abtastlücken (alle Kanäle): {len(gap_start)} "
+                    f"({int(gap_missing.sum()):,} fehlende Zeitpunkte)"
+                ],
+                color="success" if overall >= 99 else "warning",
+                className="mb-3"
+            ),
+            dcc.Graph(
+                figure=encode_figure(create_quality_heatmap(report)),
+                config={'displayModeBar': True, 'displaylogo': False}
+            ),
+            html.H5("Vollständigkeit pro Kanal:", className="mt-4 mb-2"),
+            create_data_table_with_full_columns(
+                report.channel_summary().sort_values('Vollständigkeit (%)', kind='stable'),
+                "quality-channel-table",
+                max_rows=len(report.channels)
+            ),
+            html.H5("Größte Lücken:", className="mt-4 mb-2"),
+            create_data_table_with_full_columns(gaps, "quality-gap-table", max_rows=len(gaps))
+            if not gaps.empty else html.Div("Keine Lücken gefunden", className="text-muted")
+        ])
+    ], className="shadow-sm")
+
+
+ANOMALY_MAX_EVENTS = 2000
+ANOMALY_WINDOW_PADDING = pd.Timedelta(hours=12)
+
+
+def create_anomaly_panel(df, source, dataset):
+    """Anomalie-Scan: Ereignisliste, Klick auf ein Ereignis zeigt das Zeitfenster"""
+    report = anomaly_report(df)
+    if report is None or not report.channels:
+        return html.Div("Keine Zeitachse oder numerischen Kanäle für den Anomalie-Scan",
+                        className="text-muted text-center p-4")
+
+    events = report.events
+    counts = report.counts()
+    # Schwerwiegendste Ereignisse zuerst, Liste begrenzt
+    shown = events.sort_values('Bewertung', ascending=False, kind='stable').head(ANOMALY_MAX_EVENTS)
+    records = shown.assign(
+        Beginn=format_dates(shown['Beginn']),
+        Ende=format_dates(shown['Ende']),
+        beginn_ns=shown['Beginn'].astype('int64'),
+        ende_ns=shown['Ende'].astype('int64')
+    ).to_dict('records')
+
+    summary = [
+        f"{len(report.channels)} Kanäle · {report.n_rows:,} Messpunkte · "
+        f"Scan in {report.elapsed_ms:.0f} ms",
+        html.Br(),
+        " · ".join(f"{kind}: {count}" for kind, count in counts.items())
+    ]
+    if len(events) > len(shown):
+        summary += [html.Br(), f"Angezeigt: {len(shown):,} von {len(events):,} Ereignissen (höchste Bewertung)"]
+
+    table = dash_table.DataTable(
+        id="anomaly-event-table",
+        columns=[build_column_definition(shown, col) for col in EVENT_COLUMNS],
+        data=records,
+        virtualization=True,
+        page_action='none',
+        sort_action='native',
+        filter_action='native',
+        filter_options={'case': 'insensitive'},
+        row_selectable='single',
+        selected_rows=[],
+        **_table_style_kwargs()
+    ) if records else html.Div("Keine Auffälligkeiten gefunden", className="text-muted")
+
+    return dbc.Card([
+        dbc.CardHeader([
+            html.I(className="fas fa-exclamation-triangle me-2"),
+            "Anomalie-Scan"
+        ]),
+        dbc.CardBody([
+            dbc.Alert(summary, color="warning" if len(events) else "success", className="mb-3"),
+            dcc.Store(id="anomaly-context", data={'source': source, 'dataset': dataset}),
+            html.Div(
+                "Ereignis in der Liste auswählen, um das betroffene Zeitfenster anzuzeigen.",
+                id="anomaly-window-chart",
+                className="text-muted mb-3"
+            ),
+            html.H5("Ereignisse:", className="mt-2 mb-2"),
+            table,
+            html.H5("Betroffene Kanäle:", className="mt-4 mb-2"),
+            create_data_table_with_full_columns(report.channel_summary(), "anomaly-channel-table")
+        ])
+    ], className="shadow-sm")
+
+
+def create_anomaly_window_chart(df, event):
+    """Kanalverlauf im Zeitfenster eines Ereignisses, Ereignis hervorgehoben"""
+    column = event['Kanal']
+    start = pd.Timestamp(event['beginn_ns'])
+    end = pd.Timestamp(event['ende_ns'])
+    padding = max(end - start, ANOMALY_WINDOW_PADDING)
+
+    axis = get_time_axis(df)
+    window = df.iloc[axis.row_slice(start - padding, end + padding)]
+    fig = go.Figure(go.Scattergl(
+        x=window[axis.column],
+        y=window[column],
+        mode='lines+markers',
+        marker=dict(size=3),
+        name=column
+    ))
+    fig.add_vrect(x0=start, x1=max(end, start + pd.Timedelta(minutes=1)),
+                  fillcolor=COLORS['danger'], opacity=0.2, line_width=0)
+    fig.update_layout(
+        title=f"{event['Typ']}: {column}",
+        xaxis_title="Zeit",
+        yaxis_title=column,
+        height=400,
+        margin=dict(l=60, r=20, t=50, b=50),
+        showlegend=False
+    )
+    return fig
+
+
 def get_dataset_description(source, dataset_name):
     """
     Gibt eine kurze Beschreibung für das ausgewählte Dataset zurück.
@@ -453,9 +726,9 @@ def get_dataset_description(source, dataset_name):
         },
         'erentrudis': {
             'default': 'Erentrudisstraße: Gebäudemonitoring-Daten mit Energieverbrauch, Temperaturen und Durchflussmessungen.',
-            'gesamtdaten_2024': '\ud83d\udcc1 Datei: Relevant-1_2024_export_2011_2024-01-01-00-00_2024-12-31-23-59 (3).csv\n\u2192 Gesamtjahr 2024 mit 23 ausgewählten Parametern: Heizkreistemperaturen, Ventilstellungen, Fernwärme- und Zirkulationsdaten.',
-            'detail_juli_2024': '\ud83d\udcc1 Datei: All_24-07_export_2011_2024-07-01-00-00_2024-07-31-23-59.csv\n\u2192 Detailanalyse Juli 2024 mit 44 Parametern: Alle Messgrößen inkl. Ventilstellungen, Pumpendrehzahlen, Temperaturen und Energieverbrauch für den Sommermonat.',
-            'langzeit_2023_2025': '\ud83d\udcc1 Datei: export_ERS_2023-12-01-00-00_2025-03-31-23-59.csv\n\u2192 Langzeitdaten Dezember 2023 bis März 2025 in täglicher Auflösung mit 48 Parametern: Kompletter Systemüberblick inkl. Pumpensteuerung, Puffertemperaturen, Heizkreise und Fernwärmedaten.',
+            'gesamtdaten_2024': '📁 Datei: Relevant-1_2024_export_2011_2024-01-01-00-00_2024-12-31-23-59 (3).csv\n\u2192 Gesamtjahr 2024 mit 23 ausgewählten Parametern: Heizkreistemperaturen, Ventilstellungen, Fernwärme- und Zirkulationsdaten.',
+            'detail_juli_2024': '📁 Datei: All_24-07_export_2011_2024-07-01-00-00_2024-07-31-23-59.csv\n\u2192 Detailanalyse Juli 2024 mit 44 Parametern: Alle Messgrößen inkl. Ventilstellungen, Pumpendrehzahlen, Temperaturen und Energieverbrauch für den Sommermonat.',
+            'langzeit_2023_2025': '📁 Datei: export_ERS_2023-12-01-00-00_2025-03-31-23-59.csv\n\u2192 Langzeitdaten Dezember 2023 bis März 2025 in täglicher Auflösung mit 48 Parametern: Kompletter Systemüberblick inkl. Pumpensteuerung, Puffertemperaturen, Heizkreise und Fernwärmedaten.',
             'durchfluss': 'Durchflussmessungen für Heizkreise und Warmwasser.',
             '2024': 'Monitoring-Daten aus 2024 mit Energieverbrauch und Temperaturen.',
             'relevant': 'Ausgewählte relevante Parameter für Energieanalyse.'
@@ -493,13 +766,14 @@ def get_dataset_description(source, dataset_name):
     return source_desc.get('default', f'Dataset aus {source.upper()}')
 
 
+@memoize_figure()
 def create_comparison_chart(dataframes, labels, chart_type='line'):
     """
-    Erstellt ein Vergleichsdiagramm für mehrere Datasets.
+    Erstellt ein Vergleichsdiagramm für mehrere Datasets (Figure-Cache).
     """
     fig = go.Figure()
     
-    colors = px.colors.qualitative.Set2
+    colors = qualitative.Set2
     
     for i, (df, label) in enumerate(zip(dataframes, labels)):
         if 'Date' in df.columns and len(df) > 0:
@@ -533,4 +807,259 @@ def create_comparison_chart(dataframes, labels, chart_type='line'):
         height=500
     )
     
-    return fig
\ No newline at end of file
+    return fig
+
+
+def create_comparison_panel(all_data):
+    """
+    Erstellt die Vergleichsansicht: Übersicht der Quellen mit den aus den
+    Daten ermittelten Zeiträumen und Kanalauswahl für den Overlay-Vergleich.
+    """
+    overview_items, range_items = [], []
+    all_starts, all_ends = [], []
+    summaries = dataset_summaries(all_data)
+    for source, datasets in all_data.items():
+        label = SOURCE_LABELS.get(source, source)
+        overview_items.append(html.Li(f"{label}: {len(datasets)} Datasets"))
+        ranges = [summaries[(source, dataset)]['time_range'] for dataset in datasets
+                  if summaries[(source, dataset)]['time_range']]
+        if ranges:
+            start = min(r[0] for r in ranges)
+            end = max(r[1] for r in ranges)
+            all_starts.append(start)
+            all_ends.append(end)
+            range_items.append(html.Li(f"{label}: {start:%d.%m.%Y} bis {end:%d.%m.%Y}"))
+        else:
+            range_items.append(html.Li(f"{label}: keine Zeitreihen"))
+
+    channel_options = [option for summary in summaries.values() for option in summary['channels']]
+    selected_channels = default_comparison_channels(channel_options)
+    # Katalog vorhanden: nur Vorauswahl und erste Kanäle senden, der Rest kommt über die Suche
+    catalog_channels = CHANNEL_CATALOG.channels()
+    if catalog_channels:
+        initial = [CHANNEL_CATALOG.get(*parse_channel_value(value)) for value in selected_channels]
+        initial = [channel for channel in initial if channel is not None]
+        initial += [channel for channel in catalog_channels[:INITIAL_OPTIONS] if channel not in initial]
+        channel_options = dropdown_options(
+            initial, lambda channel: channel_value(channel.source, channel.dataset, channel.name),
+            with_dataset=True)
+    resolution_options = [{'label': 'Automatisch', 'value': 'auto'}] + \
+        [{'label': res, 'value': res} for res in NICE_RESOLUTIONS]
+
+    return dbc.Card([
+        dbc.CardHeader([
+            html.I(className="fas fa-chart-bar me-2"),
+            "Datenquellen-Vergleich"
+        ]),
+        dbc.CardBody([
+            dbc.Row([
+                dbc.Col([
+                    html.H5("Verfügbare Datenquellen:", className="mb-3"),
+                    html.Ul(overview_items)
+                ], md=6),
+                dbc.Col([
+                    html.H5("Datenzeiträume:", className="mb-3"),
+                    html.Ul(range_items)
+                ], md=6)
+            ]),
+            html.Hr(),
+            dbc.Row([
+                dbc.Col([
+                    html.Label("Kanäle:", className="fw-bold"),
+                    dcc.Dropdown(
+                        id="comparison-channels",
+                        options=channel_options,
+                        value=selected_channels,
+                        multi=True,
+                        placeholder="Kanäle aus beliebigen Quellen suchen (z.B. Vorlauftemperatur)..."
+                    )
+                ], md=12, className="mb-3")
+            ]),
+            dbc.Row([
+                dbc.Col([
+                    html.Label("Zeitraum:", className="fw-bold"),
+                    dcc.DatePickerRange(
+                        id="comparison-date-range",
+                        min_date_allowed=min(all_starts).date() if all_starts else None,
+                        max_date_allowed=max(all_ends).date() if all_ends else None,
+                        display_format='DD.MM.YYYY',
+                        clearable=True
+                    )
+                ], md=3),
+                dbc.Col([
+                    html.Label("Auflösung:", className="fw-bold"),
+                    dcc.Dropdown(
+                        id="comparison-resolution",
+                        options=resolution_options,
+                        value='auto',
+                        clearable=False
+                    )
+                ], md=3),
+                dbc.Col([
+                    html.Label("Aggregation:", className="fw-bold"),
+                    dcc.Dropdown(
+                        id="comparison-method",
+                        options=[{'label': label, 'value': method}
+                                 for method, label in RESAMPLE_METHODS.items()],
+                        value='mean',
+                        clearable=False
+                    )
+                ], md=3),
+                dbc.Col([
+                    html.Label("Diagrammtyp:", className="fw-bold"),
+                    dbc.RadioItems(
+                        id="comparison-chart-type",
+                        options=[
+                            {'label': 'Linie', 'value': 'line'},
+                            {'label': 'Balken', 'value': 'bar'}
+                        ],
+                        value='line',
+                        inline=True
+                    )
+                ], md=3)
+            ], className="mb-3"),
+            html.Small(id="comparison-info", className="text-muted"),
+            dcc.Loading(html.Div(id="comparison-chart-container"), type="default")
+        ])
+    ], className="shadow-sm")
+
+
+def kpi_table_columns(kpi_table):
+    """Spalten-Definitionen der KPI-Tabelle (Schlüssel + vorhandene KPIs)"""
+    labels = kpi_column_labels()
+    columns = [{'name': col, 'id': col} for col in KEY_COLUMNS if col != 'Auflösung']
+    columns += [{'name': label, 'id': kpi, 'type': 'numeric', 'format': {'specifier': ',.2f'}}
+                for kpi, label in labels.items() if kpi in kpi_table.columns]
+    return columns
+
+
+def create_kpi_overview_panel(kpi_table):
+    """
+    Erstellt die KPI-Übersicht über alle Gebäude und Kraftwerke.
+    Die Tabelle wird aus der materialisierten KPI-Tabelle gefiltert.
+    """
+    sources = sorted(kpi_table['Quelle'].unique()) if not kpi_table.empty else []
+    return dbc.Card([
+        dbc.CardHeader([
+            html.I(className="fas fa-tachometer-alt me-2"),
+            "KPI-Übersicht"
+        ]),
+        dbc.CardBody([
+            dbc.Row([
+                dbc.Col([
+                    html.Label("Auflösung:", className="fw-bold"),
+                    dbc.RadioItems(
+                        id="kpi-resolution",
+                        options=[{'label': label, 'value': label} for label in KPI_RESOLUTIONS],
+                        value='Monat',
+                        inline=True
+                    )
+                ], md=6),
+                dbc.Col([
+                    html.Label("Datenquelle:", className="fw-bold"),
+                    dcc.Dropdown(
+                        id="kpi-source",
+                        options=[{'label': SOURCE_LABELS.get(source, source), 'value': source}
+                                 for source in sources],
+                        placeholder="Alle Datenquellen"
+                    )
+                ], md=6)
+            ], className="mb-3"),
+            html.Small(id="kpi-info", className="text-muted"),
+            dash_table.DataTable(
+                id="kpi-table",
+                columns=kpi_table_columns(kpi_table),
+                data=[],
+                sort_action='native',
+                filter_action='native',
+                page_action='native',
+                page_size=50,
+                **_table_style_kwargs()
+            )
+        ])
+    ], className="shadow-sm")
+
+
+PERFORMANCE_COLUMNS = [
+    ('callback', 'Callback'), ('calls', 'Aufrufe'),
+    ('wall_mean', 'Ø ms'), ('wall_p50', 'p50 ms'), ('wall_p95', 'p95 ms'), ('wall_p99', 'p99 ms'),
+    ('data_p95', 'Daten p95 ms'), ('figure_p95', 'Figure p95 ms'),
+    ('serialization_p95', 'Serialisierung p95 ms'),
+    ('request_kb_p95', 'Request p95 kB'), ('response_kb_p95', 'Response p95 kB')
+]
+
+
+MEMORY_COLUMNS = [
+    ('source', 'Quelle'), ('dataset', 'Dataset'), ('tier', 'Tier'), ('memory_mb', 'Speicher (MB)'),
+    ('rows', 'Zeilen'), ('columns', 'Spalten'), ('arrow', 'Arrow'), ('reloadable', 'Parquet-Quelle'),
+    ('promotions', 'Nachgeladen'), ('idle_s', 'Ungenutzt (s)')
+]
+
+
+def create_performance_panel():
+    """Erstellt den (versteckten) Performance-Admin-Tab"""
+    return dbc.Card([
+        dbc.CardHeader([
+            html.I(className="fas fa-stopwatch me-2"),
+            "Performance - Callback-Instrumentierung"
+        ]),
+        dbc.CardBody([
+            dcc.Interval(id="performance-refresh", interval=5000),
+            html.Div(id="performance-extras", className="mb-3 small"),
+            dash_table.DataTable(
+                id="performance-table",
+                columns=[{'name': label, 'id': col, 'type': 'text' if col == 'callback' else 'numeric'}
+                         for col, label in PERFORMANCE_COLUMNS],
+                data=[],
+                sort_action='native',
+                **_table_style_kwargs()
+            ),
+            html.H5("Speicher und Tiering:", className="mt-4 mb-2"),
+            html.Div(id="memory-summary", className="mb-2 small"),
+            dash_table.DataTable(
+                id="memory-table",
+                columns=[{'name': label, 'id': col} for col, label in MEMORY_COLUMNS],
+                data=[],
+                sort_action='native',
+                **_table_style_kwargs()
+            ),
+            create_query_box()
+        ])
+    ], className="shadow-sm")
+
+
+def create_query_box():
+    """SQL-Abfragebox (DuckDB auf data_optimized/) mit Zeit- und Zeilenlimit"""
+    return html.Div([
+        html.H5("SQL-Abfrage (Parquet-Speicher):", className="mt-4 mb-2"),
+        html.Small(id="query-views", className="text-muted d-block mb-2"),
+        dcc.Textarea(
+            id="query-sql",
+            placeholder='SELECT date_trunc(\'day\', "Datum + Uhrzeit") AS tag, max("...") FROM fis_export_q1_2025 GROUP BY 1',
+            style={'width': '100%', 'height': '120px', 'fontFamily': 'monospace'}
+        ),
+        dbc.Row([
+            dbc.Col([
+                html.Label("Zeitlimit (s):", className="fw-bold"),
+                dbc.Input(id="query-timeout", type="number", min=1, max=120, step=1, value=QUERY_TIMEOUT_S)
+            ], md=3),
+            dbc.Col([
+                html.Label("Max. Zeilen:", className="fw-bold"),
+                dbc.Input(id="query-max-rows", type="number", min=1, max=QUERY_MAX_ROWS, step=1, value=1000)
+            ], md=3),
+            dbc.Col([
+                dbc.Button("Abfrage ausführen", id="query-run-btn", color="primary", className="mt-4")
+            ], md=3)
+        ], className="my-2"),
+        html.Div(id="query-status", className="mb-2 small"),
+        dash_table.DataTable(
+            id="query-result-table",
+            columns=[],
+            data=[],
+            sort_action='native',
+            page_action='native',
+            page_size=50,
+            **_table_style_kwargs()
+        )
+    ])
+
@@ -7,28 +7,43 @@ Replaces the simple visualization with a fully customizable parameter selection.
 from dash import dcc, html, Input, Output, State, callback_context
 import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
-import plotly.express as px
 import pandas as pd
 import numpy as np
-from plotly.subplots import make_subplots
 
+from payload_encoder import encode_figure, encode_table_columns, decode_table_columns, is_column_block
+from figure_cache import freeze_argument, memoize_figure
+from time_axis import get_time_axis
+from channel_catalog import CHANNEL_CATALOG, INITIAL_OPTIONS, dropdown_options
 
-def create_advanced_visualization_panel(df, panel_id):
+
+def _parameter_options(y_options, default_params, source, dataset):
+    """
+    Dropdown options: with a catalogued dataset only the defaults plus the
+    first channels (labelled with description/unit); further channels are
+    loaded on demand by the search callback (channel_callbacks).
+    """
+    channels = CHANNEL_CATALOG.channels(source, dataset) if source and dataset else []
+    if not channels:
+        return [{'label': col, 'value': col} for col in y_options], None
+    by_name = {channel.name: channel for channel in channels}
+    initial = [by_name[col] for col in default_params if col in by_name]
+    initial += [channel for channel in channels[:INITIAL_OPTIONS] if channel.name not in default_params]
+    return dropdown_options(initial), {'source': source, 'dataset': dataset}
+
+
+def create_advanced_visualization_panel(df, panel_id, source=None, dataset=None):
     """
     Creates an advanced visualization panel with user-defined parameter selection
+    (source/dataset enable the catalog-backed parameter search)
     """
     if df.empty:
         return html.Div("Keine Daten verfügbar", className="text-muted text-center p-4")
     
-    # Find date column
-    date_col = None
-    for col in ['Date', 'DateTime', 'Datum + Uhrzeit', 'Zeit', 'Timestamp']:
-        if col in df.columns:
-            date_col = col
-            break
-    
-    if not date_col and 'Date' in df.columns:
-        date_col = 'Date'
+    # Date column = canonical time axis; unsorted datasets are put in time order
+    axis = get_time_axis(df)
+    date_col = axis.column if axis is not None else None
+    if axis is not None and not axis.is_identity:
+        df = df.iloc[axis.order]
     
     # Find numeric columns for visualization
     numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
@@ -61,6 +76,8 @@ def create_advanced_visualization_panel(df, panel_id):
                 if len(default_params) >= 3:
                     break
     
+    param_options, param_scope = _parameter_options(y_options, default_params, source, dataset)
+    
     return dbc.Card([
         dbc.CardHeader([
             html.I(className="fas fa-chart-line me-2"),
@@ -80,7 +97,7 @@ def create_advanced_visualization_panel(df, panel_id):
                     html.Label("Parameter auswählen:", className="fw-bold mb-2"),
                     dcc.Dropdown(
                         id={'type': 'param-selector', 'index': panel_id},
-                        options=[{'label': col, 'value': col} for col in y_options],
+                        options=param_options,
                         value=default_params,
                         multi=True,
                         placeholder="Wählen Sie Parameter zur Visualisierung...",
@@ -91,7 +108,9 @@ def create_advanced_visualization_panel(df, panel_id):
                     html.Small(
                         "Tipp: Sie können mehrere Parameter auswählen oder abwählen", 
                         className="text-muted"
-                    )
+                    ),
+                    # Dataset for the server-side parameter search (None = all options above)
+                    dcc.Store(id={'type': 'param-scope', 'index': panel_id}, data=param_scope)
                 ], md=8),
                 dbc.Col([
                     html.Label("Darstellungsart:", className="fw-bold mb-2"),
@@ -135,24 +154,50 @@ def create_advanced_visualization_panel(df, panel_id):
                 color="#2E86AB"
             ),
             
-            # Store for data
+            # Store für die Figure: mit source/dataset zeichnet der Callback aus
+            # dem Server-Frame (Figure-Cache-Key = dessen Dataset-Version),
+            # nur ohne Dataset-Bezug liegen die Daten spaltenorientiert im Store
             dcc.Store(
                 id={'type': 'viz-data-store', 'index': panel_id},
-                data={
-                    'df': df.to_dict('records'),
-                    'date_col': date_col,
-                    'numeric_cols': y_options
-                }
+                data=_visualization_store(df, date_col, y_options, source, dataset)
             )
         ])
     ], className="shadow-sm")
 
 
-def create_visualization_figure(df_dict, selected_params, chart_type, chart_options, date_col):
+def _visualization_store(df, date_col, y_options, source, dataset):
+    """Store content: dataset reference, or the column block without one"""
+    store = {'source': source, 'dataset': dataset, 'date_col': date_col, 'numeric_cols': y_options}
+    if not (source and dataset):
+        store['df'] = encode_table_columns(df[([date_col] if date_col else []) + y_options])
+    return store
+
+
+def _visualization_frame(data, selected_params, date_col):
+    """Figure columns in time order, from the server frame or a stored column block"""
+    if not isinstance(data, pd.DataFrame):
+        return decode_table_columns(data) if is_column_block(data) else pd.DataFrame(data)
+    axis = get_time_axis(data)
+    if axis is not None and not axis.is_identity:
+        data = data.iloc[axis.order]
+    columns = [col for col in [date_col, *(selected_params or [])] if col is not None and col in data.columns]
+    return data[list(dict.fromkeys(columns))].reset_index(drop=True)
+
+
+def _visualization_cache_key(data, selected_params, chart_type, chart_options, date_col):
+    """Figure-Cache-Key: Dataset-Version (server-side), Auswahl, Darstellungsart und Optionen"""
+    return (freeze_argument(data), tuple(selected_params or []), chart_type,
+            tuple(sorted(chart_options or [])), date_col)
+
+
+@memoize_figure(key_func=_visualization_cache_key)
+def create_visualization_figure(data, selected_params, chart_type, chart_options, date_col):
     """
     Creates the actual visualization figure based on user selections
+    (data: server-side DataFrame or stored column block;
+    memoized: repeated combinations come from the figure cache)
     """
-    df = pd.DataFrame(df_dict)
+    df = _visualization_frame(data, selected_params, date_col)
     
     if not selected_params:
         return html.Div(
@@ -211,7 +256,7 @@ def create_visualization_figure(df_dict, selected_params, chart_type, chart_opti
                 if show_rangeslider and date_col:
                     fig.update_xaxes(rangeslider_visible=True)
                 
-                figures.append(dcc.Graph(figure=fig, style={'marginBottom': '20px'}))
+                figures.append(dcc.Graph(figure=encode_figure(fig), style={'marginBottom': '20px'}))
         
         return html.Div(figures)
     
@@ -257,9 +302,12 @@ def create_visualization_figure(df_dict, selected_params, chart_type, chart_opti
         if show_rangeslider and date_col:
             fig.update_xaxes(rangeslider_visible=True)
         
-        return dcc.Graph(figure=fig)
+        return dcc.Graph(figure=encode_figure(fig))
     
     else:  # subplots
+        # Imported lazily, plotly.subplots is only needed for this chart type
+        from plotly.subplots import make_subplots
+
         # Create subplots for each parameter
         n_params = len(selected_params)
         fig = make_subplots(
@@ -307,4 +355,4 @@ def create_visualization_figure(df_dict, selected_params, chart_type, chart_opti
         if show_rangeslider and date_col:
             fig.update_xaxes(rangeslider_visible=True, row=n_params, col=1)
         
-        return dcc.Graph(figure=fig)
\ No newline at end of file
+        return dcc.Graph(figure=encode_figure(fig))
\ No newline at end of file
@@ -0,0 +1,57 @@
+"""
+Speicherbericht für gunicorn-Worker
+===================================
+Misst RSS, USS und PSS des Masters und aller Worker. USS ist der Speicher,
+den ein Worker exklusiv belegt (nach copy-on-write kopierte Seiten), PSS
+verteilt geteilte Seiten anteilig. Die Summe der PSS-Werte entspricht dem
+tatsächlichen Gesamtverbrauch.
+
+Verwendung:
+    python src/worker_memory_report.py <master-pid> [--json]
+"""
+
+import argparse
+import json
+
+import psutil
+
+from server_app import process_memory
+
+
+def worker_memory_report(master_pid):
+    """Speicherwerte (MB) von Master und Workern"""
+    master = psutil.Process(master_pid)
+    workers = [child.pid for child in master.children()]
+    report = {
+        'master': dict(process_memory(master_pid), pid=master_pid),
+        'workers': [dict(process_memory(pid), pid=pid) for pid in workers]
+    }
+    if workers:
+        report['avg_worker_uss_mb'] = round(sum(w['uss_mb'] for w in report['workers']) / len(workers), 1)
+        report['avg_worker_rss_mb'] = round(sum(w['rss_mb'] for w in report['workers']) / len(workers), 1)
+    report['total_pss_mb'] = round(report['master']['pss_mb'] + sum(w['pss_mb'] for w in report['workers']), 1)
+    return report
+
+
+def print_report(report):
+    """Gibt den Bericht als Tabelle aus"""
+    print(f"{'Prozess':<10} {'PID':>8} {'RSS MB':>10} {'USS MB':>10} {'PSS MB':>10}")
+    rows = [('Master', report['master'])] + [('Worker', w) for w in report['workers']]
+    for name, mem in rows:
+        print(f"{name:<10} {mem['pid']:>8} {mem['rss_mb']:>10.1f} {mem['uss_mb']:>10.1f} {mem['pss_mb']:>10.1f}")
+    if report['workers']:
+        print(f"\nØ exklusiver Speicher pro Worker (USS): {report['avg_worker_uss_mb']:.1f} MB")
+    print(f"Gesamtverbrauch (Summe PSS): {report['total_pss_mb']:.1f} MB")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Speicherbericht für gunicorn-Worker")
+    parser.add_argument('master_pid', type=int, help="PID des gunicorn-Masters")
+    parser.add_argument('--json', action='store_true', help="Ausgabe als JSON")
+    args = parser.parse_args()
+
+    result = worker_memory_report(args.master_pid)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_report(result)